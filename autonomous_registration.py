@@ -3,12 +3,42 @@
 """
 SFG Aluminium Website - Autonomous App Registration
 Registers the website in the SFG App Portfolio on GitHub
+
+Usage:
+    python autonomous_registration.py                 # register ./business-logic.json
+    python autonomous_registration.py --all           # register every apps/*/business-logic.json
+    python autonomous_registration.py --all --workers 4 --api-url http://localhost:8080
+    python autonomous_registration.py --all --on-change comment   # comment the delta
+    python autonomous_registration.py --all --force               # re-register unchanged apps too
+
+Reruns compare each manifest's content hashes with the last backup: unchanged
+apps make no API calls, changed ones update their existing issue.
 """
 
+import argparse
 import json
 import os
-from datetime import datetime
-from github import Github, GithubIntegration
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from github import Github, GithubException, GithubIntegration
+
+from portfolio_manifests import APPS_DIR, discover_manifests
+from registration_renderer import renderer as issue_renderer
+from registration_state import diff, fingerprint, load_state, render_delta
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+REGISTRATION_LABELS = ['registration', 'satellite-app', 'sfg-aluminium-app', 'pending-approval']
+REGISTRATION_BACKUP = 'registration-backup.json'
+PORTFOLIO_BACKUP = 'registration-portfolio-backup.json'
+ON_CHANGE_MODES = ('edit', 'comment')  # update the issue body, or comment the delta
+
+# GitHub secondary rate limits: content-creating requests must not run
+# concurrently and should stay well under 80 per minute.
+MIN_SECONDS_BETWEEN_WRITES = 1.0
+MAX_RATE_LIMIT_RETRIES = 5
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
 
 def load_business_logic():
     """Load business logic from JSON file"""
@@ -43,106 +73,254 @@ def load_github_credentials():
     
     return credentials
 
-def create_issue_body(bl):
-    """Create the GitHub issue body"""
-    body = f"""# {bl['appName']} - Registration Complete
+def create_issue_body(bl, fingerprint=None):
+    """Create the GitHub issue body (with a fingerprint, unchanged sections come from the render cache)"""
+    return issue_renderer.render(bl, fingerprint)
 
-## ✅ Registration Complete
+class InstallationTokenCache:
+    """
+    Reuses one GitHub App installation token until shortly before it expires
 
-**App Name:** {bl['appName']}  
-**Platform:** {bl['platform']}  
-**Category:** {bl['category']}  
-**Status:** {bl['status']}  
-**Version:** {bl['version']}
+    fetch_token() returns (token, expires_at). Each thread gets its own
+    Github client (PyGithub clients are not shared across threads), rebuilt
+    only when the token is refreshed.
+    """
 
-**Deployed URL:** {bl['deployed_url']}  
-**Webhook URL:** {bl['webhook_url']}  
-**Message Handler URL:** {bl['message_handler_url']}
+    def __init__(self, fetch_token, base_url=GITHUB_API_URL):
+        self._fetch_token = fetch_token
+        self._base_url = base_url
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._token = None
+        self._expires_at = None
+        self.fetches = 0
 
-## 📋 App Information
+    @classmethod
+    def for_app(cls, creds, base_url=GITHUB_API_URL):
+        integration = GithubIntegration(creds['app_id'], creds['private_key'], base_url=base_url)
 
-**Purpose:** {bl['description']}
+        def fetch():
+            auth = integration.get_access_token(creds['installation_id'])
+            return auth.token, auth.expires_at
 
-## 🎯 Capabilities
+        return cls(fetch, base_url)
 
-"""
-    for cap in bl['capabilities']:
-        body += f"- {cap}\n"
-    
-    body += "\n## 🔄 Workflows\n\n"
-    for workflow in bl['workflows']:
-        body += f"### {workflow['name']}\n\n"
-        for i, step in enumerate(workflow['steps'], 1):
-            body += f"{i}. {step}\n"
-        body += f"\n**Triggers:** {', '.join(workflow['triggers'])}  \n"
-        body += f"**Outputs:** {', '.join(workflow['outputs'])}\n\n"
-    
-    body += "## 📏 Business Rules\n\n"
-    for rule in bl['businessRules']:
-        body += f"- **{rule['rule']}**\n"
-        body += f"  - Condition: `{rule['condition']}`\n"
-        body += f"  - Action: {rule['action']}\n\n"
-    
-    body += "## 🔗 Integration Points\n\n"
-    for integration in bl['integrations']:
-        body += f"- **{integration['system']}**\n"
-        body += f"  - Purpose: {integration['purpose']}\n"
-        body += f"  - Methods: {', '.join(integration['methods'])}\n\n"
-    
-    body += "## 🔔 Webhook Events\n\n"
-    for event in bl['webhook_events']:
-        body += f"- {event}\n"
-    
-    body += "\n## 💬 Supported Messages\n\n"
-    for msg in bl['supported_messages']:
-        body += f"- {msg}\n"
-    
-    body += "\n## 🌐 API Endpoints\n\n"
-    for endpoint in bl['apiEndpoints']:
-        body += f"- **{endpoint['method']} {endpoint['path']}**\n"
-        body += f"  - Description: {endpoint['description']}\n"
-        body += f"  - Auth: {endpoint['auth']}\n"
-        body += f"  - Rate Limit: {endpoint['rate_limit']}\n\n"
-    
-    body += "## 📊 Data Models\n\n"
-    for model in bl['dataModels']:
-        body += f"### {model['name']}\n\n"
-        for field in model['fields']:
-            required = ' (required)' if field.get('required') else ''
-            body += f"- {field['name']}: {field['type']}{required}\n"
-        body += "\n"
-    
-    body += """## 📁 Files Backed Up
+    def token(self):
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if self._token is None or (self._expires_at and now >= self._expires_at - TOKEN_REFRESH_MARGIN):
+                self._token, self._expires_at = self._fetch_token()
+                self.fetches += 1
+            return self._token
 
-- ✅ business-logic.json
-- ✅ Full project source code
-- ✅ Configuration files
-- ✅ Documentation
+    def client(self):
+        token = self.token()
+        if getattr(self._local, 'token', None) != token:
+            # Writes are paced by WriteThrottle across all threads instead
+            self._local.client = Github(token, base_url=self._base_url,
+                                        seconds_between_writes=None)
+            self._local.token = token
+        return self._local.client
 
-"""
-    
-    body += f"""## 👥 Team
 
-- **Owner:** {bl['team']['owner']}
-- **Developers:** {', '.join(bl['team']['developers'])}
-- **Contact:** {bl['team']['contact']}
+class WriteThrottle:
+    """Serialises content-creating requests and spaces them out"""
 
-## 📈 Monitoring
+    def __init__(self, min_interval=MIN_SECONDS_BETWEEN_WRITES):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._last = 0.0
 
-- **Health Check:** {bl['monitoring']['health_check_url']}
-- **Uptime Requirement:** {bl['monitoring']['uptime_requirement']}
-- **Response Time Target:** {bl['monitoring']['response_time_target']}
+    def call(self, fn, *args, **kwargs):
+        """Run one write, retrying on secondary rate limit responses"""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            with self._lock:
+                wait = self._last + self.min_interval - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    return fn(*args, **kwargs)
+                except GithubException as e:
+                    if not is_rate_limit(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                        raise
+                    delay = retry_delay(e, attempt)
+                finally:
+                    self._last = time.monotonic()
+            print(f"   ⏳ Rate limited, retrying in {delay:.0f}s...")
+            time.sleep(delay)
 
----
 
-**Registered by:** DeepAgent (Autonomous Registration)  
-**Date:** {datetime.now().strftime('%Y-%m-%d')}  
-**Repository:** {bl['repository']['url']}
-"""
-    
-    return body
+def is_rate_limit(e):
+    """429, or a 403 GitHub marks as a rate limit (other 403s are permission errors)"""
+    if e.status == 429:
+        return True
+    if e.status != 403:
+        return False
+    headers = {name.lower(): value for name, value in (e.headers or {}).items()}
+    message = e.data.get('message', '') if isinstance(e.data, dict) else str(e.data or '')
+    return ('retry-after' in headers or headers.get('x-ratelimit-remaining') == '0'
+            or 'secondary rate limit' in message.lower())
+
+
+def retry_delay(e, attempt):
+    """Seconds to wait: Retry-After, else until the rate limit resets, else a growing backoff"""
+    headers = {name.lower(): value for name, value in (e.headers or {}).items()}
+    if headers.get('retry-after'):
+        return float(headers['retry-after'])
+    if headers.get('x-ratelimit-remaining') == '0' and headers.get('x-ratelimit-reset'):
+        return max(1.0, float(headers['x-ratelimit-reset']) - time.time())
+    return 60 * (attempt + 1)
+
+
+def find_registration_issues(repo):
+    """Existing registration issues by title (one paginated listing)"""
+    issues = {}
+    for issue in repo.get_issues(state='all', labels=['registration']):
+        issues.setdefault(issue.title, issue)
+    return issues
+
+
+def update_issue(issue, title, bl, previous, current, on_change='edit', write=None):
+    """
+    Bring an existing registration issue up to date with the manifest
 
-def register_app():
+    'edit' rewrites the issue body (and title, if the app was renamed);
+    'comment' leaves the body as registered and comments only the delta.
+    """
+    write = write or (lambda fn, *args, **kwargs: fn(*args, **kwargs))
+    if on_change == 'comment':
+        write(issue.create_comment, render_delta(diff(previous, current)))
+        return 'commented'
+    changes = {'body': create_issue_body(bl, current)}
+    if issue.title != title:
+        changes['title'] = title
+    write(issue.edit, **changes)
+    return 'updated'
+
+
+def register_portfolio(apps_dir=APPS_DIR, max_workers=4, api_url=GITHUB_API_URL,
+                       token_cache=None, creds=None,
+                       min_write_interval=MIN_SECONDS_BETWEEN_WRITES,
+                       force=False, on_change='edit'):
+    """Register or update every new or changed manifest under apps/ through a bounded thread pool"""
+    print("🚀 Starting portfolio registration...\n")
+
+    manifests = discover_manifests(apps_dir)
+    valid = [m for m in manifests if m.ok]
+    print(f"📦 Found {len(manifests)} manifests ({len(valid)} valid)")
+    for m in manifests:
+        if not m.ok:
+            print(f"   ⚠️  Skipping {m.path}: {m.error}")
+
+    previous = {app['path']: app for app in load_state(PORTFOLIO_BACKUP).get('apps', [])
+                if isinstance(app, dict) and 'path' in app}
+    results = []
+    pending = []
+    for m in valid:
+        current = fingerprint(m.bl)
+        prev = previous.get(m.path)
+        if prev and prev.get('issue_number') and not force and prev.get('action') != 'failed' \
+                and prev.get('content_hash') == current['content_hash']:
+            results.append({**prev, 'action': 'unchanged'})
+        else:
+            pending.append((m, prev, current))
+    print(f"   {len(results)} unchanged, {len(pending)} new or changed\n")
+
+    failures = []
+    started = time.perf_counter()
+    if pending:
+        token_cache = _register_pending(pending, results, failures, max_workers, api_url,
+                                        token_cache, creds, min_write_interval, on_change)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n💾 Saving portfolio backup...")
+    backup = {
+        'registered_at': datetime.now().isoformat(),
+        'apps': sorted(results, key=lambda r: r['path']),
+        'failures': failures,
+    }
+    with open(PORTFOLIO_BACKUP, 'w') as f:
+        json.dump(backup, f, indent=2)
+    print(f"   Backup saved: {PORTFOLIO_BACKUP}\n")
+
+    fetches = token_cache.fetches if token_cache is not None else 0
+    written = sum(1 for r in results if r['action'] not in ('unchanged', 'failed'))
+    unchanged = sum(1 for r in results if r['action'] == 'unchanged')
+    print(f"{'🎉' if not failures else '⚠️ '} {written} apps registered, {unchanged} unchanged, "
+          f"{len(failures)} failed in {elapsed:.1f}s ({fetches} installation token fetch(es))\n")
+    return backup
+
+
+def _register_pending(pending, results, failures, max_workers, api_url,
+                      token_cache, creds, min_write_interval, on_change):
+    """Create or update the issues for pending (manifest, previous, fingerprint) jobs"""
+    if token_cache is None:
+        creds = creds or load_github_credentials()
+        token_cache = InstallationTokenCache.for_app(creds, api_url)
+    else:
+        creds = creds or {'owner': os.environ.get('GITHUB_OWNER'), 'repo': os.environ.get('GITHUB_REPO')}
+
+    repo_name = f"{creds['owner']}/{creds['repo']}"
+    repo = token_cache.client().get_repo(repo_name)
+    print(f"🔑 Connected to: {repo.full_name}")
+    existing = {}
+    if any(not (prev and prev.get('issue_number')) for _, prev, _ in pending):
+        # Apps without a recorded issue may still have one from an older run
+        existing = find_registration_issues(repo)
+        print(f"   {len(existing)} existing registration issues")
+    print()
+
+    throttle = WriteThrottle(min_write_interval)
+    local = threading.local()
+
+    def thread_repo():
+        client = token_cache.client()
+        if getattr(local, 'client', None) is not client:
+            local.client = client
+            local.repo = client.get_repo(repo_name, lazy=True)
+        return local.repo
+
+    def register_one(manifest, prev, current):
+        bl = manifest.bl
+        title = f"[Registration] {bl['appName']}"
+        number = prev.get('issue_number') if prev else None
+        if number is None and title in existing:
+            number = existing[title].number
+        if number is not None:
+            issue = thread_repo().get_issue(number)
+            action = update_issue(issue, title, bl, prev, current, on_change, throttle.call)
+        else:
+            issue = throttle.call(thread_repo().create_issue, title=title,
+                                  body=create_issue_body(bl, current), labels=REGISTRATION_LABELS)
+            action = 'created'
+        return issue, action
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(register_one, *job): job for job in pending}
+        for future in as_completed(futures):
+            manifest, prev, current = futures[future]
+            try:
+                issue, action = future.result()
+            except Exception as e:
+                failures.append({'app': manifest.name, 'path': manifest.path, 'error': str(e)})
+                print(f"   ❌ {manifest.name}: {e}")
+                if prev:
+                    # Keep the issue number; retried next run
+                    results.append({**prev, 'action': 'failed', 'error': str(e)})
+                continue
+            print(f"   ✅ {manifest.name}: #{issue.number} {action}")
+            results.append({
+                'app': manifest.name,
+                'path': manifest.path,
+                'action': action,
+                'issue_number': issue.number,
+                'issue_url': issue.html_url,
+                **current,
+            })
+    return token_cache
+
+
+def register_app(force=False, on_change='edit'):
     """Main registration function"""
     print("🚀 Starting SFG-Website Registration...\n")
     
@@ -153,6 +331,17 @@ def register_app():
     print(f"   Version: {bl['version']}")
     print(f"   Description: {bl['description']}\n")
     
+    # Compare with the last registration
+    previous = load_state(REGISTRATION_BACKUP)
+    current = fingerprint(bl)
+    if previous.get('issue_number') and 'content_hash' not in previous and 'business_logic' in previous:
+        previous.update(fingerprint(previous['business_logic']))  # backup from before hashing
+    if previous.get('issue_number') and not force \
+            and previous.get('content_hash') == current['content_hash']:
+        print(f"✅ Unchanged since issue #{previous['issue_number']} - nothing to do.")
+        print(f"🔗 URL: {previous.get('issue_url')}\n")
+        return None
+    
     # Load credentials
     print("🔐 Loading GitHub credentials...")
     creds = load_github_credentials()
@@ -168,20 +357,27 @@ def register_app():
     repo = g.get_repo(f"{creds['owner']}/{creds['repo']}")
     print(f"   Connected to: {repo.full_name}\n")
     
-    # Create issue
-    print("📝 Creating registration issue...")
     title = f"[Registration] {bl['appName']}"
-    body = create_issue_body(bl)
-    labels = ['registration', 'satellite-app', 'sfg-aluminium-app', 'pending-approval']
-    
-    issue = repo.create_issue(
-        title=title,
-        body=body,
-        labels=labels
-    )
-    
-    print("✅ SUCCESS!\n")
-    print(f"📝 Issue Created: #{issue.number}")
+    if previous.get('issue_number'):
+        # Update the existing issue
+        print(f"📝 Updating registration issue #{previous['issue_number']}...")
+        changed = ', '.join(diff(previous, current)) or 'none'
+        print(f"   Changed sections: {changed}")
+        issue = repo.get_issue(previous['issue_number'])
+        action = update_issue(issue, title, bl, previous, current, on_change)
+        print("✅ SUCCESS!\n")
+        print(f"📝 Issue {action.capitalize()}: #{issue.number}")
+    else:
+        # Create issue
+        print("📝 Creating registration issue...")
+        body = create_issue_body(bl, current)
+        issue = repo.create_issue(
+            title=title,
+            body=body,
+            labels=REGISTRATION_LABELS
+        )
+        print("✅ SUCCESS!\n")
+        print(f"📝 Issue Created: #{issue.number}")
     print(f"🔗 URL: {issue.html_url}")
     print(f"📅 Created: {issue.created_at}\n")
     
@@ -191,22 +387,46 @@ def register_app():
         'issue_number': issue.number,
         'issue_url': issue.html_url,
         'created_at': str(issue.created_at),
-        'business_logic': bl
+        'business_logic': bl,
+        **current,
     }
     
-    with open('registration-backup.json', 'w') as f:
+    with open(REGISTRATION_BACKUP, 'w') as f:
         json.dump(backup, f, indent=2)
     
-    print("   Backup saved: registration-backup.json\n")
+    print(f"   Backup saved: {REGISTRATION_BACKUP}\n")
     
     print("🎉 SFG-Website successfully registered in the portfolio!")
     print("🔄 NEXUS will review and approve within 24 hours.\n")
     
     return issue
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Register SFG apps in the portfolio on GitHub')
+    parser.add_argument('--all', action='store_true',
+                        help='register every apps/*/business-logic.json')
+    parser.add_argument('--apps-dir', default=APPS_DIR)
+    parser.add_argument('--workers', type=int, default=4,
+                        help='concurrent registrations in --all mode')
+    parser.add_argument('--api-url', default=GITHUB_API_URL,
+                        help='GitHub API base URL (e.g. a local stub for testing)')
+    parser.add_argument('--force', action='store_true',
+                        help='re-register apps whose manifest has not changed')
+    parser.add_argument('--on-change', choices=ON_CHANGE_MODES, default='edit',
+                        help='update changed issues in place, or comment the delta')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
+    args = parse_args()
     try:
-        register_app()
+        if args.all:
+            backup = register_portfolio(args.apps_dir, args.workers, args.api_url,
+                                        force=args.force, on_change=args.on_change)
+            if backup['failures']:
+                exit(1)
+        else:
+            register_app(args.force, args.on_change)
     except Exception as e:
         print(f"❌ Registration failed: {str(e)}")
         import traceback
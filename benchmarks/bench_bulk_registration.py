@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Bulk registration benchmark
+
+Registers every apps/*/business-logic.json against the local GitHub stub
+and compares a single worker with a thread pool for:
+
+- a first registration (creates an issue per app)
+- a forced rerun (updates every issue)
+- an incremental rerun with nothing changed (no API calls)
+- an incremental rerun after editing a few manifests (updates only those)
+
+Usage:
+    python benchmarks/bench_bulk_registration.py [--latency 0.05] [--workers 4]
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import autonomous_registration as registration  # noqa: E402
+from github_stub import GithubStub  # noqa: E402
+
+CREDS = {'owner': 'sfgaluminium1-spec', 'repo': 'sfg-app-portfolio'}
+
+
+def run(stub, apps_dir, workers, write_interval, force=False):
+    def fetch():
+        return 'stub-token', datetime.now(timezone.utc) + timedelta(hours=1)
+
+    cache = registration.InstallationTokenCache(fetch, stub.url)
+    calls = len(stub.requests)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        backup = registration.register_portfolio(
+            apps_dir, workers, stub.url, token_cache=cache, creds=CREDS,
+            min_write_interval=write_interval, force=force)
+    elapsed = time.perf_counter() - start
+    written = sum(1 for app in backup['apps'] if app['action'] not in ('unchanged', 'failed'))
+    return elapsed, written, len(stub.requests) - calls
+
+
+def copy_manifests(source, target):
+    for path in glob.glob(os.path.join(source, '*', 'business-logic.json')):
+        app_dir = os.path.join(target, os.path.basename(os.path.dirname(path)))
+        os.makedirs(app_dir)
+        shutil.copy(path, app_dir)
+
+
+def edit_manifests(apps_dir, count):
+    """Add a capability to the first count valid manifests"""
+    edited = 0
+    for name in sorted(os.listdir(apps_dir)):
+        path = os.path.join(apps_dir, name, 'business-logic.json')
+        try:
+            with open(path) as f:
+                bl = json.load(f)
+        except (OSError, ValueError):
+            continue
+        bl['capabilities'] = list(bl.get('capabilities') or []) + ['Benchmark capability']
+        with open(path, 'w') as f:
+            json.dump(bl, f)
+        edited += 1
+        if edited == count:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='simulated GitHub latency per request (seconds)')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--write-interval', type=float, default=0.05)
+    parser.add_argument('--edited', type=int, default=2,
+                        help='manifests changed before the last rerun')
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    for workers in (1, args.workers):
+        print(f"workers={workers}")
+        # Work on a copy: the backup file and the edited manifests stay out of the repo
+        with tempfile.TemporaryDirectory() as tmp, GithubStub(latency=args.latency) as stub:
+            apps_dir = os.path.join(tmp, 'apps')
+            copy_manifests(os.path.join(ROOT, 'apps'), apps_dir)
+            os.chdir(tmp)
+            try:
+                steps = [('first run', False), ('forced rerun', True), ('unchanged rerun', False)]
+                for label, force in steps:
+                    elapsed, written, calls = run(stub, 'apps', workers, args.write_interval, force)
+                    print(f"  {label:18} {elapsed:6.2f}s  {written:3} written  {calls:3} API calls")
+                edit_manifests(apps_dir, args.edited)
+                elapsed, written, calls = run(stub, 'apps', workers, args.write_interval)
+                print(f"  {f'{args.edited} edited':18} {elapsed:6.2f}s  {written:3} written  {calls:3} API calls")
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    main()
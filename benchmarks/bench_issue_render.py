@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Registration issue rendering benchmark
+
+Compares the original string-concatenating create_issue_body with the
+section renderer on the portfolio manifests (one batch) and on
+complex-app-example.json scaled up:
+
+- plain:  renderer without a fingerprint (no caching)
+- cached: renderer given the fingerprints registration already computed,
+          with every section unchanged since the last render
+- edited: as cached, but with one section (capabilities) changed per render
+
+Usage:
+    python benchmarks/bench_issue_render.py [--repeat 200] [--scale 1,10,100]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from portfolio_manifests import discover_manifests, normalize_manifest  # noqa: E402
+from registration_renderer import IssueBodyRenderer  # noqa: E402
+from registration_state import fingerprint  # noqa: E402
+
+COMPLEX_EXAMPLE = os.path.join(ROOT, 'satellite-registration', 'examples', 'complex-app-example.json')
+LIST_SECTIONS = ('capabilities', 'workflows', 'businessRules', 'integrations',
+                 'webhook_events', 'supported_messages', 'apiEndpoints', 'dataModels')
+
+
+def legacy_create_issue_body(bl):
+    """create_issue_body as it was before the section renderer"""
+    body = f"""# {bl['appName']} - Registration Complete
+
+## ✅ Registration Complete
+
+**App Name:** {bl['appName']}  
+**Platform:** {bl['platform']}  
+**Category:** {bl['category']}  
+**Status:** {bl['status']}  
+**Version:** {bl['version']}
+
+**Deployed URL:** {bl['deployed_url']}  
+**Webhook URL:** {bl['webhook_url']}  
+**Message Handler URL:** {bl['message_handler_url']}
+
+## 📋 App Information
+
+**Purpose:** {bl['description']}
+
+## 🎯 Capabilities
+
+"""
+    for cap in bl['capabilities']:
+        body += f"- {cap}\n"
+    body += "\n## 🔄 Workflows\n\n"
+    for workflow in bl['workflows']:
+        body += f"### {workflow['name']}\n\n"
+        for i, step in enumerate(workflow['steps'], 1):
+            body += f"{i}. {step}\n"
+        body += f"\n**Triggers:** {', '.join(workflow['triggers'])}  \n"
+        body += f"**Outputs:** {', '.join(workflow['outputs'])}\n\n"
+    body += "## 📏 Business Rules\n\n"
+    for rule in bl['businessRules']:
+        body += f"- **{rule['rule']}**\n"
+        body += f"  - Condition: `{rule['condition']}`\n"
+        body += f"  - Action: {rule['action']}\n\n"
+    body += "## 🔗 Integration Points\n\n"
+    for integration in bl['integrations']:
+        body += f"- **{integration['system']}**\n"
+        body += f"  - Purpose: {integration['purpose']}\n"
+        body += f"  - Methods: {', '.join(integration['methods'])}\n\n"
+    body += "## 🔔 Webhook Events\n\n"
+    for event in bl['webhook_events']:
+        body += f"- {event}\n"
+    body += "\n## 💬 Supported Messages\n\n"
+    for msg in bl['supported_messages']:
+        body += f"- {msg}\n"
+    body += "\n## 🌐 API Endpoints\n\n"
+    for endpoint in bl['apiEndpoints']:
+        body += f"- **{endpoint['method']} {endpoint['path']}**\n"
+        body += f"  - Description: {endpoint['description']}\n"
+        body += f"  - Auth: {endpoint['auth']}\n"
+        body += f"  - Rate Limit: {endpoint['rate_limit']}\n\n"
+    body += "## 📊 Data Models\n\n"
+    for model in bl['dataModels']:
+        body += f"### {model['name']}\n\n"
+        for field in model['fields']:
+            required = ' (required)' if field.get('required') else ''
+            body += f"- {field['name']}: {field['type']}{required}\n"
+        body += "\n"
+    body += """## 📁 Files Backed Up
+
+- ✅ business-logic.json
+- ✅ Full project source code
+- ✅ Configuration files
+- ✅ Documentation
+
+"""
+    body += f"""## 👥 Team
+
+- **Owner:** {bl['team']['owner']}
+- **Developers:** {', '.join(bl['team']['developers'])}
+- **Contact:** {bl['team']['contact']}
+
+## 📈 Monitoring
+
+- **Health Check:** {bl['monitoring']['health_check_url']}
+- **Uptime Requirement:** {bl['monitoring']['uptime_requirement']}
+- **Response Time Target:** {bl['monitoring']['response_time_target']}
+
+---
+
+**Registered by:** DeepAgent (Autonomous Registration)  
+**Date:** {datetime.now().strftime('%Y-%m-%d')}  
+**Repository:** {bl['repository']['url']}
+"""
+    return body
+
+
+def scaled(bl, factor):
+    big = dict(bl)
+    for key in LIST_SECTIONS:
+        big[key] = bl[key] * factor
+    return big
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def report(label, manifests, repeat):
+    renderer = IssueBodyRenderer()
+    fingerprints = [fingerprint(bl) for bl in manifests]
+    assert [legacy_create_issue_body(bl) for bl in manifests] == renderer.render_many(manifests)
+    assert renderer.render_many(manifests, fingerprints) == renderer.render_many(manifests)
+
+    edits = []
+    for i in range(repeat):
+        edited = [dict(bl, capabilities=bl['capabilities'] + [f"Capability {i}"]) for bl in manifests]
+        edits.append((edited, [fingerprint(bl) for bl in edited]))
+    edits = iter(edits)
+
+    legacy = timed(lambda: [legacy_create_issue_body(bl) for bl in manifests], repeat)
+    plain = timed(lambda: renderer.render_many(manifests), repeat)
+    cached = timed(lambda: renderer.render_many(manifests, fingerprints), repeat)
+    edited = timed(lambda: renderer.render_many(*next(edits)), repeat)
+    size = sum(len(legacy_create_issue_body(bl)) for bl in manifests)
+    print(f"{label:28} {size / 1024:7.1f} KiB  legacy {legacy * 1e3:8.3f} ms  "
+          f"plain {plain * 1e3:8.3f} ms ({legacy / plain:4.1f}x)  "
+          f"cached {cached * 1e3:8.3f} ms ({legacy / cached:5.1f}x)  "
+          f"edited {edited * 1e3:8.3f} ms ({legacy / edited:4.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--scale', default='1,10,100',
+                        help='comma-separated list multipliers for complex-app-example.json')
+    args = parser.parse_args()
+
+    portfolio = [m.bl for m in discover_manifests(os.path.join(ROOT, 'apps')) if m.ok]
+    report(f"portfolio ({len(portfolio)} apps, batch)", portfolio, args.repeat)
+
+    with open(COMPLEX_EXAMPLE) as f:
+        example = normalize_manifest(json.load(f), 'complex-app-example')
+    for factor in (int(x) for x in args.scale.split(',')):
+        report(f"complex example x{factor}", [scaled(example, factor)],
+               max(1, args.repeat // factor))
+
+
+if __name__ == '__main__':
+    main()
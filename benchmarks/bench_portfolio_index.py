@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Manifest index benchmark
+
+Answers the same portfolio questions four ways:
+
+- scan:     re-read and normalise every manifest, then scan it (no index)
+- build:    read every manifest once and build the inverted indexes
+- snapshot: memory-map the saved snapshot, refresh by mtime, run one query
+            (the cost of a fresh CLI process, minus interpreter startup)
+- query:    lookup in an already open index
+
+Usage:
+    python benchmarks/bench_portfolio_index.py [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from portfolio_index import PortfolioIndex, manifest_terms  # noqa: E402
+from portfolio_manifests import load_manifest  # noqa: E402
+
+QUERIES = [
+    ('events', 'quote.requested'),
+    ('messages', 'query.customer_data'),
+    ('paths', '/api/enquiries'),
+    ('integrations', 'xero'),
+    ('fields', 'email'),
+]
+
+
+def scan(index, paths, term):
+    matches = []
+    for path in paths:
+        manifest = load_manifest(path)
+        if manifest.ok and term in manifest_terms(manifest.bl)[index]:
+            matches.append(manifest.name)
+    return list(dict.fromkeys(matches))
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    index = PortfolioIndex.build(ROOT)
+    paths = [os.path.join(ROOT, app['path']) for app in index.apps]
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'portfolio-index.bin')
+        index.save(snapshot)
+        size = os.path.getsize(snapshot)
+
+        def from_snapshot(name, term):
+            with PortfolioIndex.open(ROOT, snapshot) as mapped:
+                return mapped.lookup(name, term)
+
+        for name, term in QUERIES:
+            assert scan(name, paths, term) == index.lookup(name, term) == from_snapshot(name, term)
+
+        print(f"{len(paths)} manifests, {sum(index.stats()['terms'].values())} terms, "
+              f"snapshot {size / 1024:.1f} KiB\n")
+        build = timed(lambda: PortfolioIndex.build(ROOT), args.repeat)
+        print(f"  build              {build * 1e3:9.3f} ms")
+        for name, term in QUERIES:
+            scanned = timed(lambda: scan(name, paths, term), args.repeat)
+            opened = timed(lambda: from_snapshot(name, term), args.repeat)
+            query = timed(lambda: index.lookup(name, term), args.repeat * 1000)
+            print(f"  {name:12} {term:22} scan {scanned * 1e3:8.3f} ms  "
+                  f"snapshot {opened * 1e3:7.3f} ms ({scanned / opened:5.0f}x)  "
+                  f"query {query * 1e6:6.2f} us ({scanned / query:8.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
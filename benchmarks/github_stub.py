@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Local GitHub API Stub
+Minimal in-memory stand-in for the GitHub REST endpoints used by
+autonomous_registration.py, so bulk registration can be exercised and
+benchmarked (and tested) offline.
+
+Supported:
+    GET   /repos/{owner}/{repo}
+    GET   /repos/{owner}/{repo}/issues
+    POST  /repos/{owner}/{repo}/issues
+    GET   /repos/{owner}/{repo}/issues/{number}
+    PATCH /repos/{owner}/{repo}/issues/{number}
+    POST  /repos/{owner}/{repo}/issues/{number}/comments
+
+rate_limit() makes the next writes fail with a secondary rate limit
+response (403 or 429 with Retry-After), as GitHub does; forbid() makes
+them fail with a plain 403 (a permission error, not a rate limit).
+"""
+
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_REPO = re.compile(r'^/repos/([^/]+)/([^/?]+)(/issues(?:/(\d+))?(/comments)?)?(?:\?.*)?$')
+
+
+class GithubStub:
+    """Threaded stub server; use as a context manager"""
+
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        self.issues = {}
+        self.requests = []
+        self.rate_limited = []
+        self.forbidden = []
+        self._limits = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def count(self, method):
+        return sum(1 for m, _ in self.requests if m == method)
+
+    def rate_limit(self, count=1, status=403, retry_after=1):
+        """Answer the next count POST/PATCH requests with a secondary rate limit"""
+        with self._lock:
+            self._limits.extend([(status, {
+                'message': 'You have exceeded a secondary rate limit. '
+                           'Please wait a few minutes before you try again.',
+            }, {'Retry-After': str(retry_after)}, self.rate_limited)] * count)
+
+    def forbid(self, count=1):
+        """Answer the next count POST/PATCH requests with a 403 that is not a rate limit"""
+        with self._lock:
+            self._limits.extend([(403, {'message': 'Resource not accessible by integration'},
+                                  {}, self.forbidden)] * count)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _issue_json(self, owner, repo, issue):
+        base = f"{self.url}/repos/{owner}/{repo}"
+        return {
+            **issue,
+            'url': f"{base}/issues/{issue['number']}",
+            'html_url': f"https://github.com/{owner}/{repo}/issues/{issue['number']}",
+            'labels': [{'name': name} for name in issue['labels']],
+            'state': 'open',
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def _route(self, method):
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub._lock:
+                    stub.requests.append((method, self.path))
+                    limit = stub._limits.pop(0) if stub._limits and method != 'GET' else None
+                    if limit:
+                        limit[3].append((method, self.path, time.monotonic()))
+                if limit:
+                    self._body()
+                    status, payload, headers, _ = limit
+                    return self._send(status, payload, headers)
+                match = _REPO.match(self.path)
+                if not match:
+                    return self._send(404, {'message': 'Not Found'})
+                owner, repo, issues_path, number, comments = match.groups()
+
+                if issues_path is None and method == 'GET':
+                    return self._send(200, {
+                        'id': 1, 'name': repo, 'full_name': f"{owner}/{repo}",
+                        'owner': {'login': owner},
+                        'url': f"{stub.url}/repos/{owner}/{repo}",
+                    })
+                if number is None and method == 'GET':
+                    with stub._lock:
+                        issues = [stub._issue_json(owner, repo, i) for i in stub.issues.values()]
+                    return self._send(200, issues)
+                if number is None and method == 'POST':
+                    data = self._body()
+                    with stub._lock:
+                        issue = {
+                            'number': len(stub.issues) + 1,
+                            'title': data.get('title'),
+                            'body': data.get('body'),
+                            'labels': data.get('labels', []),
+                            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                            'comments': [],
+                        }
+                        stub.issues[issue['number']] = issue
+                    return self._send(201, stub._issue_json(owner, repo, issue))
+
+                issue = stub.issues.get(int(number))
+                if issue is None:
+                    return self._send(404, {'message': 'Not Found'})
+                if comments and method == 'POST':
+                    data = self._body()
+                    with stub._lock:
+                        issue['comments'].append(data.get('body'))
+                        comment_id = len(issue['comments'])
+                    return self._send(201, {'id': comment_id, 'body': data.get('body')})
+                if method == 'PATCH':
+                    data = self._body()
+                    with stub._lock:
+                        issue.update({k: v for k, v in data.items() if k in ('title', 'body')})
+                return self._send(200, stub._issue_json(owner, repo, issue))
+
+            def do_GET(self):
+                self._route('GET')
+
+            def do_POST(self):
+                self._route('POST')
+
+            def do_PATCH(self):
+                self._route('PATCH')
+
+        return Handler
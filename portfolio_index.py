@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Manifest Index
+Inverted indexes over every manifest in the portfolio
+(config/business-logic.json and apps/*/business-logic.json), so questions
+like "which apps emit quote.requested" or "who handles
+query.customer_data" do not need every JSON file re-read and scanned.
+
+Indexes (term -> apps):
+    events        webhook event published
+    messages      message type handled
+    paths         API endpoint path
+    integrations  integration system
+    fields        data model field
+
+Integration and field names are also indexed under their base name, so
+"NEXUS - Orchestration Hub" is found as "nexus" and "email (unique)" as
+"email".
+
+Terms are case-insensitive. The index is saved as a binary snapshot that is
+memory-mapped and binary-searched in place, so a query after startup reads
+only the pages it touches. refresh() stats the manifests and re-reads only
+files whose mtime or size changed.
+
+Usage:
+    python portfolio_index.py event quote.requested
+    python portfolio_index.py message query.customer_data
+    python portfolio_index.py integration xero
+    python portfolio_index.py terms events
+    python portfolio_index.py stats
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+
+from portfolio_manifests import APPS_DIR, NOT_SET, load_manifest, manifest_paths
+
+CONFIG_MANIFEST = os.path.join('config', 'business-logic.json')
+SNAPSHOT = 'portfolio-index.bin'
+
+INDEXES = ('events', 'messages', 'paths', 'integrations', 'fields')
+QUERY_INDEX = {
+    'event': 'events', 'message': 'messages', 'path': 'paths',
+    'integration': 'integrations', 'field': 'fields',
+}
+
+# Snapshot layout (little endian, offsets from the end of the header):
+#   MAGIC, u32 header length, header JSON
+#   per index: `count` RECORDs sorted by key, then key bytes and u16 app ids
+#   terms JSON (per-app term lists, only read by refresh())
+MAGIC = b'SFGPIDX1'
+HEADER_LEN = struct.Struct('<I')
+RECORD = struct.Struct('<IIII')  # key offset, key length, postings offset, postings count
+APP_ID = struct.Struct('<H')
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is missing, truncated or from another format"""
+
+
+def manifest_terms(bl):
+    """Index terms of one normalised manifest"""
+    terms = {
+        'events': {_key(e) for e in bl['webhook_events']},
+        'messages': {_key(m) for m in bl['supported_messages']},
+        'paths': {e['path'] for e in bl['apiEndpoints']},
+        'integrations': set(),
+        'fields': set(),
+    }
+    for integration in bl['integrations']:
+        terms['integrations'].update(_with_base(integration['system']))
+    for model in bl['dataModels']:
+        for field in model['fields']:
+            terms['fields'].update(_with_base(field['name']))
+    missing = {'', NOT_SET, _key(NOT_SET)}
+    return {index: sorted(values - missing) for index, values in terms.items()}
+
+
+def _key(term):
+    return term.strip().casefold()
+
+
+def _with_base(term):
+    key = _key(term)
+    base = key.split(' - ')[0].split(' (')[0].strip()
+    return {key, base}
+
+
+class PortfolioIndex:
+    """
+    Query API over the portfolio's inverted indexes
+
+    Backed either by in-memory dicts (after build() or refresh()) or by a
+    memory-mapped snapshot (after load()).
+    """
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.apps = []           # [{'name', 'path', 'mtime_ns', 'size', 'error'}], id = position
+        self._terms = None       # per-app term lists, parallel to self.apps
+        self._memory = None      # {index: {term: [app ids]}}
+        self._mmap = None
+        self._file = None
+        self._tables = {}        # {index: (records offset, count)}
+        self._terms_span = None
+
+    # -- building ----------------------------------------------------------
+
+    @classmethod
+    def build(cls, root='.'):
+        """Read every manifest and build the indexes"""
+        index = cls(root)
+        index._terms = []
+        for path in index._paths():
+            index._add(path)
+        index._rebuild()
+        return index
+
+    @classmethod
+    def load(cls, snapshot=SNAPSHOT, root='.'):
+        """Memory-map a saved snapshot"""
+        index = cls(root)
+        index._open(snapshot)
+        return index
+
+    @classmethod
+    def open(cls, root='.', snapshot=None):
+        """Load the snapshot if there is one, refresh it, and save it back if anything changed"""
+        snapshot = snapshot or os.path.join(root, SNAPSHOT)
+        try:
+            index = cls.load(snapshot, root)
+        except SnapshotError:
+            index = cls.build(root)
+            index.save(snapshot)
+            return index
+        if index.refresh():
+            index.save(snapshot)
+        return index
+
+    def refresh(self):
+        """Re-read manifests whose mtime or size changed; returns the paths reloaded or dropped"""
+        current = {path: _stat(os.path.join(self.root, path)) for path in self._paths()}
+        known = {app['path']: i for i, app in enumerate(self.apps)}
+        changed = [path for path, stat in current.items()
+                   if path not in known or _app_stat(self.apps[known[path]]) != stat]
+        removed = [path for path in known if path not in current]
+        if not changed and not removed:
+            return []
+
+        terms = self._load_terms()
+        apps, self.apps, self._terms = self.apps, [], []
+        for path in current:
+            if path in known and path not in changed:
+                self.apps.append(apps[known[path]])
+                self._terms.append(terms[known[path]])
+            else:
+                self._add(path)
+        self.close()
+        self._rebuild()
+        return sorted(changed + removed)
+
+    def _paths(self):
+        """Manifest paths relative to root, so a snapshot survives a moved checkout"""
+        paths = []
+        if os.path.exists(os.path.join(self.root, CONFIG_MANIFEST)):
+            paths.append(CONFIG_MANIFEST)
+        apps = manifest_paths(os.path.join(self.root, APPS_DIR))
+        return paths + [os.path.relpath(path, self.root) for path in apps]
+
+    def _add(self, path):
+        mtime_ns, size = _stat(os.path.join(self.root, path))
+        manifest = load_manifest(os.path.join(self.root, path))
+        self.apps.append({'name': manifest.name, 'path': path, 'mtime_ns': mtime_ns,
+                          'size': size, 'error': manifest.error})
+        self._terms.append(manifest_terms(manifest.bl) if manifest.ok else {})
+
+    def _rebuild(self):
+        memory = {index: {} for index in INDEXES}
+        for app_id, terms in enumerate(self._terms):
+            for index, values in terms.items():
+                table = memory[index]
+                for term in values:
+                    table.setdefault(term, []).append(app_id)
+        self._memory = memory
+
+    # -- snapshot ----------------------------------------------------------
+
+    def save(self, snapshot=SNAPSHOT):
+        """Write the snapshot atomically (a reader never sees a partial file)"""
+        if self._memory is None:
+            return  # an unrefreshed mmap is already on disk
+        blobs = []
+        tables = {}
+        offset = 0
+        for index in INDEXES:
+            table = self._memory[index]
+            keys = sorted((term.encode('utf-8'), ids) for term, ids in table.items())
+            records_size = RECORD.size * len(keys)
+            data = bytearray()
+            records = bytearray()
+            data_start = offset + records_size
+            for key, ids in keys:
+                key_off = data_start + len(data)
+                data += key
+                post_off = data_start + len(data)
+                data += b''.join(APP_ID.pack(i) for i in ids)
+                records += RECORD.pack(key_off, len(key), post_off, len(ids))
+            tables[index] = [offset, len(keys)]
+            blobs.append(bytes(records) + bytes(data))
+            offset += records_size + len(data)
+        terms = json.dumps(self._terms, separators=(',', ':')).encode('utf-8')
+        header = {'version': 1, 'apps': self.apps, 'indexes': tables, 'terms': [offset, len(terms)]}
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+        tmp = f"{snapshot}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(MAGIC)
+            f.write(HEADER_LEN.pack(len(encoded)))
+            f.write(encoded)
+            for blob in blobs:
+                f.write(blob)
+            f.write(terms)
+        os.replace(tmp, snapshot)
+
+    def _open(self, snapshot):
+        try:
+            self._file = open(snapshot, 'rb')
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self.close()
+            raise SnapshotError(f"Cannot open {snapshot}: {e}") from e
+        buf = self._mmap
+        if buf[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise SnapshotError(f"{snapshot} is not a portfolio index snapshot")
+        try:
+            (length,) = HEADER_LEN.unpack_from(buf, len(MAGIC))
+            start = len(MAGIC) + HEADER_LEN.size
+            header = json.loads(bytes(buf[start:start + length]))
+            base = start + length
+            self.apps = header['apps']
+            self._tables = {index: (base + offset, count)
+                            for index, (offset, count) in header['indexes'].items()}
+            offset, size = header['terms']
+            self._terms_span = (base + offset, size)
+            if base + offset + size > len(buf):
+                raise ValueError('truncated')
+        except (ValueError, KeyError, struct.error) as e:
+            self.close()
+            raise SnapshotError(f"{snapshot} is corrupt: {e}") from e
+        self._base = base
+
+    def _load_terms(self):
+        if self._terms is None:
+            offset, size = self._terms_span
+            self._terms = json.loads(bytes(self._mmap[offset:offset + size]))
+        return self._terms
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- queries -----------------------------------------------------------
+
+    def lookup(self, index, term):
+        """App names whose manifest has term in index"""
+        if index not in INDEXES:
+            raise KeyError(f"Unknown index {index!r} (expected one of {', '.join(INDEXES)})")
+        key = term if index == 'paths' else _key(term)
+        if self._memory is not None:
+            ids = self._memory[index].get(key, ())
+        else:
+            ids = self._mapped_ids(index, key.encode('utf-8'))
+        # config/business-logic.json and apps/<app>/ may describe the same app
+        return list(dict.fromkeys(self.apps[i]['name'] for i in ids))
+
+    def apps_for_event(self, event):
+        return self.lookup('events', event)
+
+    def apps_for_message(self, message_type):
+        return self.lookup('messages', message_type)
+
+    def apps_for_path(self, path):
+        return self.lookup('paths', path)
+
+    def apps_for_integration(self, system):
+        return self.lookup('integrations', system)
+
+    def apps_for_field(self, field):
+        return self.lookup('fields', field)
+
+    def terms(self, index, prefix=''):
+        """Sorted terms of an index, optionally filtered by prefix"""
+        if self._memory is not None:
+            keys = sorted(self._memory[index])
+        else:
+            keys = [self._mapped_key(index, i) for i in range(self._tables[index][1])]
+        prefix = prefix if index == 'paths' else _key(prefix)
+        return [k for k in keys if k.startswith(prefix)]
+
+    def stats(self):
+        if self._memory is not None:
+            sizes = {index: len(self._memory[index]) for index in INDEXES}
+        else:
+            sizes = {index: count for index, (_, count) in self._tables.items()}
+        return {
+            'apps': len(self.apps),
+            'invalid': [app['path'] for app in self.apps if app.get('error')],
+            'terms': sizes,
+            'backing': 'memory' if self._memory is not None else 'mmap',
+        }
+
+    def _mapped_key(self, index, position):
+        start, _ = self._tables[index]
+        key_off, key_len, _, _ = RECORD.unpack_from(self._mmap, start + position * RECORD.size)
+        return self._mmap[self._base + key_off:self._base + key_off + key_len].decode('utf-8')
+
+    def _mapped_ids(self, index, key):
+        buf = self._mmap
+        start, count = self._tables[index]
+        base = self._base
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, post_off, post_count = RECORD.unpack_from(buf, start + mid * RECORD.size)
+            probe = buf[base + key_off:base + key_off + key_len]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return [i for (i,) in APP_ID.iter_unpack(buf[base + post_off:base + post_off + 2 * post_count])]
+        return []
+
+
+def _stat(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _app_stat(app):
+    return app['mtime_ns'], app['size']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Query the SFG app portfolio manifests')
+    parser.add_argument('--root', default='.', help='portfolio checkout (default: current directory)')
+    parser.add_argument('--snapshot', help=f'snapshot file (default: <root>/{SNAPSHOT})')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the snapshot and re-read every manifest')
+    parser.add_argument('--json', action='store_true', help='print JSON instead of text')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command, index in QUERY_INDEX.items():
+        query = sub.add_parser(command, help=f'apps by {index[:-1]}')
+        query.add_argument('term')
+    terms = sub.add_parser('terms', help='list the terms of an index')
+    terms.add_argument('index', choices=INDEXES)
+    terms.add_argument('prefix', nargs='?', default='')
+    sub.add_parser('stats', help='index statistics')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    snapshot = args.snapshot or os.path.join(args.root, SNAPSHOT)
+    started = time.perf_counter()
+    if args.rebuild:
+        index = PortfolioIndex.build(args.root)
+        index.save(snapshot)
+    else:
+        index = PortfolioIndex.open(args.root, snapshot)
+
+    with index:
+        if args.command in QUERY_INDEX:
+            result = index.lookup(QUERY_INDEX[args.command], args.term)
+        elif args.command == 'terms':
+            result = index.terms(args.index, args.prefix)
+        else:
+            result = index.stats()
+        elapsed = time.perf_counter() - started
+
+        if args.json:
+            print(json.dumps(result, indent=2))
+        elif isinstance(result, dict):
+            for key, value in result.items():
+                print(f"{key}: {value}")
+        else:
+            for item in result:
+                print(item)
+            if not result:
+                print('(no matches)', file=sys.stderr)
+    print(f"({elapsed * 1e3:.1f} ms)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
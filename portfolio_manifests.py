@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Manifest Discovery
+Finds every apps/*/business-logic.json and normalises it to the shape of
+config/business-logic.json, so registration and indexing can treat all
+apps the same way.
+
+The manifests were written by different teams: keys are camelCase or
+snake_case (businessRules / business_rules, apiEndpoints / api_endpoints),
+lists are sometimes dicts of lists, and entries are sometimes plain strings.
+"""
+
+import json
+import os
+from glob import glob
+
+APPS_DIR = 'apps'
+MANIFEST_NAME = 'business-logic.json'
+
+# Canonical key -> keys used across the portfolio, in order of preference
+KEY_ALIASES = {
+    'appName': ['appName', 'app_name', 'name'],
+    'description': ['description', 'purpose', 'overview', 'full_name'],
+    'version': ['version', 'app_version'],
+    'platform': ['platform'],
+    'category': ['category'],
+    'status': ['status'],
+    'deployed_url': ['deployed_url', 'deployment_url', 'deploymentUrl', 'url'],
+    'webhook_url': ['webhook_url'],
+    'message_handler_url': ['message_handler_url'],
+    'capabilities': ['capabilities', 'key_features'],
+    'workflows': ['workflows'],
+    'businessRules': ['businessRules', 'business_rules', 'core_business_rules'],
+    'integrations': ['integrations', 'integrations_summary', 'integration_points'],
+    'webhook_events': ['webhook_events', 'webhookEvents', 'events_published', 'event_subscriptions'],
+    'supported_messages': ['supported_messages', 'supportedMessages', 'message_types_supported'],
+    'apiEndpoints': ['apiEndpoints', 'api_endpoints'],
+    'dataModels': ['dataModels', 'data_models', 'database_schema'],
+}
+
+NOT_SET = 'N/A'
+
+
+class Manifest:
+    """One discovered manifest (raw JSON plus its normalised form)"""
+
+    def __init__(self, path, raw=None, error=None):
+        self.path = path
+        self.app_dir = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        self.raw = raw
+        self.error = error
+        self.bl = normalize_manifest(raw, self.app_dir) if raw is not None else None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def name(self):
+        return self.bl['appName'] if self.bl else self.app_dir
+
+
+def load_manifest(path):
+    """Load one manifest file (an invalid file gives a Manifest with .error set)"""
+    try:
+        with open(path, 'r') as f:
+            return Manifest(path, raw=json.load(f))
+    except (OSError, ValueError) as e:
+        return Manifest(path, error=str(e))
+
+
+def discover_manifests(apps_dir=APPS_DIR):
+    """Load every apps/*/business-logic.json (invalid files are reported, not raised)"""
+    return [load_manifest(path) for path in manifest_paths(apps_dir)]
+
+
+def manifest_paths(apps_dir=APPS_DIR):
+    return sorted(glob(os.path.join(apps_dir, '*', MANIFEST_NAME)))
+
+
+def normalize_manifest(raw, default_name=NOT_SET):
+    """Return a copy of a manifest in the config/business-logic.json shape"""
+    metadata = raw.get('app_metadata') if isinstance(raw.get('app_metadata'), dict) else {}
+    source = {**metadata, **raw}
+
+    def pick(key):
+        for alias in KEY_ALIASES[key]:
+            if source.get(alias) not in (None, '', [], {}):
+                return source[alias]
+        return None
+
+    bl = dict(raw)
+    for key in ('description', 'version', 'platform', 'category', 'status',
+                'deployed_url', 'webhook_url', 'message_handler_url'):
+        bl[key] = _text(pick(key)) or NOT_SET
+    bl['appName'] = _text(pick('appName')) or default_name
+
+    bl['capabilities'] = [_text(c) for c in _as_list(pick('capabilities'))]
+    bl['workflows'] = [_workflow(w) for w in _as_list(pick('workflows'))]
+    bl['businessRules'] = [_rule(r) for r in _as_list(pick('businessRules'))]
+    bl['integrations'] = [_integration(i) for i in _as_list(pick('integrations'))]
+    bl['webhook_events'] = [_name(e, 'event', 'name', 'type') for e in _as_list(pick('webhook_events'))]
+    bl['supported_messages'] = [_name(m, 'type', 'name') for m in _as_list(pick('supported_messages'))]
+    bl['apiEndpoints'] = [_endpoint(e) for e in _as_list(pick('apiEndpoints'))]
+    bl['dataModels'] = [_data_model(m) for m in _as_list(pick('dataModels'))]
+
+    team = raw.get('team') if isinstance(raw.get('team'), dict) else {}
+    bl['team'] = {
+        'owner': _text(team.get('owner')) or _text(raw.get('maintained_by')) or NOT_SET,
+        'developers': [_text(d) for d in _as_list(team.get('developers'))],
+        'contact': _text(team.get('contact')) or _text(raw.get('contact')) or NOT_SET,
+    }
+    monitoring = raw.get('monitoring') if isinstance(raw.get('monitoring'), dict) else {}
+    bl['monitoring'] = {
+        'health_check_url': _text(monitoring.get('health_check_url')) or NOT_SET,
+        'uptime_requirement': _text(monitoring.get('uptime_requirement')) or NOT_SET,
+        'response_time_target': _text(monitoring.get('response_time_target')) or NOT_SET,
+    }
+    repository = raw.get('repository') if isinstance(raw.get('repository'), dict) else {}
+    bl['repository'] = {
+        **repository,
+        'url': _text(repository.get('url')) or _text(raw.get('repositoryUrl')) or NOT_SET,
+    }
+    return bl
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        for key in ('name', 'title', 'description', 'action', 'value'):
+            if isinstance(value.get(key), str):
+                return value[key]
+        return json.dumps(value, sort_keys=True)
+    if isinstance(value, list):
+        return ', '.join(_text(v) for v in value)
+    return str(value)
+
+
+def _as_list(value):
+    """Lists pass through; dicts of lists are flattened; dicts of entries get names"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        items = []
+        for key, entry in value.items():
+            if isinstance(entry, list):
+                items.extend(entry)
+            elif isinstance(entry, dict):
+                items.append({'name': key, **entry})
+            else:
+                items.append({'name': key, 'value': entry})
+        return items
+    return [value]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return [_text(v) for v in _as_list(value)]
+
+
+def _name(value, *keys):
+    if isinstance(value, dict):
+        for key in keys:
+            if value.get(key):
+                return _text(value[key])
+    return _text(value)
+
+
+def _workflow(value):
+    if not isinstance(value, dict):
+        return {'name': _text(value), 'steps': [], 'triggers': [], 'outputs': []}
+    return {
+        **value,
+        'name': _text(value.get('name')) or NOT_SET,
+        'steps': [_text(s) for s in _as_list(value.get('steps'))],
+        'triggers': _strings(value.get('triggers')),
+        'outputs': _strings(value.get('outputs')),
+    }
+
+
+def _rule(value):
+    if not isinstance(value, dict):
+        return {'rule': _text(value), 'condition': NOT_SET, 'action': NOT_SET}
+    return {
+        **value,
+        'rule': _name(value, 'rule', 'name', 'rule_id') or NOT_SET,
+        'condition': _text(value.get('condition')) or NOT_SET,
+        'action': _text(value.get('action')) or _text(value.get('description')) or NOT_SET,
+    }
+
+
+def _integration(value):
+    if not isinstance(value, dict):
+        return {'system': _text(value), 'purpose': NOT_SET, 'methods': []}
+    methods = value.get('methods') or value.get('type') or value.get('integration_type')
+    return {
+        **value,
+        'system': _name(value, 'system', 'name') or NOT_SET,
+        'purpose': _text(value.get('purpose')) or _text(value.get('description')) or NOT_SET,
+        'methods': _strings(methods),
+    }
+
+
+def _endpoint(value):
+    if not isinstance(value, dict):
+        # "POST /api/chat - AI chatbot conversations"
+        text = _text(value)
+        head, _, description = text.partition(' - ')
+        method, _, path = head.partition(' ')
+        if not path:
+            method, path = NOT_SET, head
+        return {'method': method, 'path': path, 'description': description or NOT_SET,
+                'auth': NOT_SET, 'rate_limit': NOT_SET}
+    auth = value.get('auth', value.get('authentication', value.get('auth_required')))
+    return {
+        **value,
+        'method': _text(value.get('method')) or NOT_SET,
+        'path': _text(value.get('path') or value.get('endpoint') or value.get('value')) or NOT_SET,
+        'description': (_text(value.get('description')) or _text(value.get('purpose'))
+                        or _text(value.get('name')) or NOT_SET),
+        'auth': _text(auth) if auth is not None else NOT_SET,
+        'rate_limit': _text(value.get('rate_limit')) or NOT_SET,
+    }
+
+
+def _data_model(value):
+    if not isinstance(value, dict):
+        return {'name': _text(value), 'fields': []}
+    fields = value.get('fields') or value.get('key_fields') or []
+    normalized = []
+    for field in _as_list(fields):
+        if isinstance(field, dict):
+            normalized.append({**field,
+                               'name': _text(field.get('name')) or NOT_SET,
+                               'type': _text(field.get('type')) or NOT_SET,
+                               'required': bool(field.get('required'))})
+        else:
+            normalized.append({'name': _text(field), 'type': NOT_SET, 'required': False})
+    return {**value, 'name': _name(value, 'name', 'model') or NOT_SET, 'fields': normalized}
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Registration Issue Renderer
+Renders the registration issue Markdown section by section.
+
+Each section writes its lines into a list that is joined once, so the cost
+grows linearly with the manifest instead of relying on in-place string
+concatenation. When the caller has the manifest's fingerprint
+(registration_state.fingerprint, already computed for change detection),
+rendered sections are cached by section hash and only changed sections are
+rendered again. Without a fingerprint nothing is hashed or cached: hashing a
+section costs more than rendering it.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+MAX_CACHED_SECTIONS = 4096
+
+FILES_BACKED_UP = """## 📁 Files Backed Up
+
+- ✅ business-logic.json
+- ✅ Full project source code
+- ✅ Configuration files
+- ✅ Documentation
+
+"""
+
+
+def _header(bl):
+    # Trailing double spaces are Markdown line breaks
+    return [f"# {bl['appName']} - Registration Complete\n\n"
+            f"## ✅ Registration Complete\n\n"
+            f"**App Name:** {bl['appName']}  \n"
+            f"**Platform:** {bl['platform']}  \n"
+            f"**Category:** {bl['category']}  \n"
+            f"**Status:** {bl['status']}  \n"
+            f"**Version:** {bl['version']}\n\n"
+            f"**Deployed URL:** {bl['deployed_url']}  \n"
+            f"**Webhook URL:** {bl['webhook_url']}  \n"
+            f"**Message Handler URL:** {bl['message_handler_url']}\n\n"
+            f"## 📋 App Information\n\n"
+            f"**Purpose:** {bl['description']}\n\n"]
+
+
+def _capabilities(bl):
+    out = ["## 🎯 Capabilities\n\n"]
+    out.extend(f"- {cap}\n" for cap in bl['capabilities'])
+    return out
+
+
+def _workflows(bl):
+    out = ["\n## 🔄 Workflows\n\n"]
+    for workflow in bl['workflows']:
+        out.append(f"### {workflow['name']}\n\n")
+        out.extend(f"{i}. {step}\n" for i, step in enumerate(workflow['steps'], 1))
+        out.append(f"\n**Triggers:** {', '.join(workflow['triggers'])}  \n"
+                   f"**Outputs:** {', '.join(workflow['outputs'])}\n\n")
+    return out
+
+
+def _business_rules(bl):
+    out = ["## 📏 Business Rules\n\n"]
+    out.extend(f"- **{rule['rule']}**\n"
+               f"  - Condition: `{rule['condition']}`\n"
+               f"  - Action: {rule['action']}\n\n" for rule in bl['businessRules'])
+    return out
+
+
+def _integrations(bl):
+    out = ["## 🔗 Integration Points\n\n"]
+    out.extend(f"- **{integration['system']}**\n"
+               f"  - Purpose: {integration['purpose']}\n"
+               f"  - Methods: {', '.join(integration['methods'])}\n\n"
+               for integration in bl['integrations'])
+    out.append("## 🔔 Webhook Events\n\n")
+    out.extend(f"- {event}\n" for event in bl['webhook_events'])
+    out.append("\n## 💬 Supported Messages\n\n")
+    out.extend(f"- {msg}\n" for msg in bl['supported_messages'])
+    return out
+
+
+def _api_endpoints(bl):
+    out = ["\n## 🌐 API Endpoints\n\n"]
+    out.extend(f"- **{endpoint['method']} {endpoint['path']}**\n"
+               f"  - Description: {endpoint['description']}\n"
+               f"  - Auth: {endpoint['auth']}\n"
+               f"  - Rate Limit: {endpoint['rate_limit']}\n\n" for endpoint in bl['apiEndpoints'])
+    return out
+
+
+def _data_models(bl):
+    out = ["## 📊 Data Models\n\n"]
+    for model in bl['dataModels']:
+        out.append(f"### {model['name']}\n\n")
+        for field in model['fields']:
+            required = ' (required)' if field.get('required') else ''
+            out.append(f"- {field['name']}: {field['type']}{required}\n")
+        out.append("\n")
+    return out
+
+
+def _team(bl):
+    return [f"""## 👥 Team
+
+- **Owner:** {bl['team']['owner']}
+- **Developers:** {', '.join(bl['team']['developers'])}
+- **Contact:** {bl['team']['contact']}
+
+## 📈 Monitoring
+
+- **Health Check:** {bl['monitoring']['health_check_url']}
+- **Uptime Requirement:** {bl['monitoring']['uptime_requirement']}
+- **Response Time Target:** {bl['monitoring']['response_time_target']}
+
+---
+
+"""]
+
+
+# (cache name, registration_state section its content hash comes from, renderer)
+# in body order
+SECTION_RENDERERS = (
+    ('header', 'metadata', _header),
+    ('capabilities', 'capabilities', _capabilities),
+    ('workflows', 'workflows', _workflows),
+    ('businessRules', 'businessRules', _business_rules),
+    ('integrations', 'integrations', _integrations),
+    ('apiEndpoints', 'apiEndpoints', _api_endpoints),
+    ('dataModels', 'dataModels', _data_models),
+    ('files', None, lambda bl: [FILES_BACKED_UP]),
+    ('team', 'metadata', _team),
+)
+
+
+class IssueBodyRenderer:
+    """Section renderer with an LRU cache of rendered sections"""
+
+    def __init__(self, max_sections=MAX_CACHED_SECTIONS):
+        self.max_sections = max_sections
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def iter_body(self, bl, fingerprint=None, date=None):
+        """Yield the issue body chunk by chunk, one section at a time"""
+        sections = fingerprint['sections'] if fingerprint else None
+        for name, section, render in SECTION_RENDERERS:
+            if sections is None:
+                yield ''.join(render(bl))
+                continue
+            key = (name, sections[section]['hash'] if section else None)
+            with self._lock:
+                text = self._cache.get(key)
+                if text is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+            if text is None:
+                text = ''.join(render(bl))
+                with self._lock:
+                    self.misses += 1
+                    self._cache[key] = text
+                    if len(self._cache) > self.max_sections:
+                        self._cache.popitem(last=False)
+            yield text
+        # The footer carries today's date, so it is never cached
+        yield (f"**Registered by:** DeepAgent (Autonomous Registration)  \n"
+               f"**Date:** {date or datetime.now().strftime('%Y-%m-%d')}  \n"
+               f"**Repository:** {bl['repository']['url']}\n")
+
+    def render(self, bl, fingerprint=None, date=None):
+        return ''.join(self.iter_body(bl, fingerprint, date))
+
+    def render_many(self, manifests, fingerprints=None):
+        """Render a batch of manifests with one shared date and cache"""
+        date = datetime.now().strftime('%Y-%m-%d')
+        fingerprints = fingerprints or [None] * len(manifests)
+        return [self.render(bl, fp, date) for bl, fp in zip(manifests, fingerprints)]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'sections': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+renderer = IssueBodyRenderer()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+SFG App Portfolio - Registration State
+Content hashes for registered manifests, so a rerun of
+autonomous_registration.py can skip apps whose manifest has not changed and
+describe exactly what changed for the ones that have.
+
+A fingerprint holds one hash for the whole manifest plus, per section, a
+section hash and the hash of every entry (capability, workflow, rule, ...)
+keyed to a short label. Hashes are taken over canonical JSON, so key order
+and whitespace in the manifest file do not count as changes.
+"""
+
+import hashlib
+import json
+import os
+
+# Section -> manifest keys it covers. List keys contribute one entry per
+# list item; the rest contribute one entry per key.
+SECTIONS = {
+    'metadata': ('appName', 'description', 'version', 'platform', 'category', 'status',
+                 'deployed_url', 'webhook_url', 'message_handler_url',
+                 'team', 'monitoring', 'repository'),
+    'capabilities': ('capabilities',),
+    'workflows': ('workflows',),
+    'businessRules': ('businessRules',),
+    'integrations': ('integrations', 'webhook_events', 'supported_messages'),
+    'apiEndpoints': ('apiEndpoints',),
+    'dataModels': ('dataModels',),
+}
+
+SECTION_TITLES = {
+    'metadata': 'App Information',
+    'capabilities': 'Capabilities',
+    'workflows': 'Workflows',
+    'businessRules': 'Business Rules',
+    'integrations': 'Integrations, Events & Messages',
+    'apiEndpoints': 'API Endpoints',
+    'dataModels': 'Data Models',
+}
+
+HASH_LENGTH = 16
+
+
+def canonical_json(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def content_hash(value):
+    return hashlib.sha256(canonical_json(value).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def fingerprint(bl):
+    """
+    Hash a manifest section by section
+
+    Returns {'content_hash': ..., 'sections': {name: {'hash': ..., 'items': {hash: label}}}}
+    """
+    sections = {}
+    for section, keys in SECTIONS.items():
+        items = {}
+        order = []
+        for key in keys:
+            value = bl.get(key)
+            entries = value if isinstance(value, list) else [{key: value}]
+            for entry in entries:
+                if not isinstance(value, list):
+                    label = key
+                else:
+                    label = _label(entry)
+                # Entries of different keys with equal values stay distinct
+                item_hash = content_hash([key, entry])
+                items[item_hash] = label
+                order.append(item_hash)
+        sections[section] = {'hash': content_hash(order), 'items': items}
+    return {
+        'content_hash': content_hash([sections[s]['hash'] for s in SECTIONS]),
+        'sections': sections,
+    }
+
+
+def changed_sections(old, new):
+    """Names of the sections whose hash differs (all of them when old is missing)"""
+    if not old or 'sections' not in old:
+        return list(SECTIONS)
+    old_sections = old['sections']
+    return [s for s in SECTIONS
+            if old_sections.get(s, {}).get('hash') != new['sections'][s]['hash']]
+
+
+def diff(old, new):
+    """
+    Per-section delta between two fingerprints
+
+    Returns {section: {'added': [...], 'removed': [...], 'changed': [...]}} for
+    the changed sections only. An entry removed and re-added under the same
+    label counts as changed. A section whose only change is entry order has
+    empty lists.
+    """
+    delta = {}
+    for section in changed_sections(old, new):
+        old_items = (old or {}).get('sections', {}).get(section, {}).get('items', {})
+        new_items = new['sections'][section]['items']
+        removed = [label for h, label in old_items.items() if h not in new_items]
+        added = [label for h, label in new_items.items() if h not in old_items]
+        changed = [label for label in added if label in removed]
+        delta[section] = {
+            'added': [label for label in added if label not in changed],
+            'removed': [label for label in removed if label not in changed],
+            'changed': changed,
+        }
+    return delta
+
+
+def render_delta(delta):
+    """Markdown comment describing a diff()"""
+    if not delta:
+        return 'No changes.\n'
+    body = "## 🔄 Registration Updated\n\n"
+    for section, change in delta.items():
+        body += f"### {SECTION_TITLES[section]}\n\n"
+        for label in change['added']:
+            body += f"- ➕ {label}\n"
+        for label in change['changed']:
+            body += f"- ✏️ {label}\n"
+        for label in change['removed']:
+            body += f"- ➖ {label}\n"
+        if not any(change.values()):
+            body += "- Order changed\n"
+        body += "\n"
+    return body
+
+
+def load_state(path):
+    """Previous backup file as a dict ({} when missing or unreadable)"""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _label(entry):
+    if isinstance(entry, dict):
+        if entry.get('method') and entry.get('path'):
+            return f"{entry['method']} {entry['path']}"
+        for key in ('name', 'rule', 'system', 'event', 'type', 'path'):
+            if isinstance(entry.get(key), str) and entry[key]:
+                return entry[key]
+        return content_hash(entry)
+    return str(entry)
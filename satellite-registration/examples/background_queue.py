@@ -0,0 +1,264 @@
+"""
+SFG Aluminium - Background Work Queue
+Version: 1.0.0
+Date: November 5, 2025
+
+In-process asyncio queue for webhook side effects (SharePoint, Xero,
+notifications), so NEXUS gets its acknowledgement without waiting on the
+slowest downstream system.
+
+- Each integration has its own queue and a fixed number of workers, which
+  bounds concurrency per system (e.g. at most 2 concurrent Xero calls).
+- Failed jobs are retried with exponential backoff and jitter.
+- With a journal path set, every job is appended to a JSONL journal and
+  marked done when it finishes; jobs still pending at shutdown or after a
+  crash are replayed on the next start. Worker processes sharing a host
+  each need their own journal (see set_journal_path).
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+Task = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+DEFAULT_CONCURRENCY = 4
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5      # seconds, doubled on every retry
+MAX_DELAY = 60.0
+
+
+class Job:
+    __slots__ = ("id", "task", "payload", "attempts", "enqueued_at")
+
+    def __init__(self, task: str, payload: Dict[str, Any], job_id: Optional[str] = None,
+                 attempts: int = 0):
+        self.id = job_id or uuid.uuid4().hex
+        self.task = task
+        self.payload = payload
+        self.attempts = attempts
+        self.enqueued_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "task": self.task, "payload": self.payload,
+                "attempts": self.attempts}
+
+
+class _Journal:
+    """Append-only JSONL journal of enqueued and finished jobs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        """Jobs that were enqueued but never finished"""
+        pending: Dict[str, Dict[str, Any]] = {}
+        if not os.path.exists(self.path):
+            return pending
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line after a crash
+                if record.get("op") == "enqueue":
+                    pending[record["id"]] = record
+                else:
+                    pending.pop(record.get("id"), None)
+        return pending
+
+    def open(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        # Compact: rewrite only the jobs that are still pending
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for record in pending.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", buffering=1)
+
+    def write(self, op: str, job: Job) -> None:
+        if self._file is None:
+            return
+        record = job.as_dict() if op == "enqueue" else {"id": job.id}
+        record["op"] = op
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BackgroundQueue:
+    """
+    Bounded-concurrency background queue
+
+    Tasks are registered by name so journalled jobs can be replayed:
+
+        queue = BackgroundQueue(limits={"Xero": 2})
+
+        @queue.task("xero.create_invoice", integration="Xero")
+        async def create_xero_invoice(payload): ...
+
+        job_id = queue.enqueue("xero.create_invoice", {"order_id": "..."})
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None,
+                 default_limit: int = DEFAULT_CONCURRENCY,
+                 max_attempts: int = MAX_ATTEMPTS,
+                 base_delay: float = BASE_DELAY,
+                 max_delay: float = MAX_DELAY,
+                 journal_path: Optional[str] = None):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._journal = _Journal(journal_path) if journal_path else None
+
+        self._tasks: Dict[str, Task] = {}
+        self._integrations: Dict[str, str] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: list = []
+        self._retry_handles: set = set()
+        self._running = False
+        self._backlog: Deque[Job] = deque()   # enqueued before start()
+        self.failed: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self._counters = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0}
+
+    def task(self, name: str, integration: str = "default") -> Callable[[Task], Task]:
+        """Register the decorated coroutine as a named background task"""
+        def decorator(fn: Task) -> Task:
+            if name in self._tasks:
+                raise ValueError(f"Duplicate background task '{name}'")
+            self._tasks[name] = fn
+            self._integrations[name] = integration
+            return fn
+        return decorator
+
+    def enqueue(self, name: str, payload: Dict[str, Any]) -> str:
+        """Queue a job and return its id (never blocks the caller)"""
+        if name not in self._tasks:
+            raise KeyError(f"Unknown background task '{name}'")
+        job = Job(name, payload)
+        self._counters["enqueued"] += 1
+        if self._journal:
+            self._journal.write("enqueue", job)
+        self._submit(job)
+        return job.id
+
+    def set_journal_path(self, journal_path: Optional[str]) -> None:
+        """Journal to use from the next start(), e.g. one per worker slot"""
+        if self._running:
+            raise RuntimeError("Journal path can only be changed before start()")
+        self._journal = _Journal(journal_path) if journal_path else None
+
+    async def start(self) -> None:
+        """Start the workers and replay any journalled jobs"""
+        if self._running:
+            return
+        self._running = True
+        if self._journal:
+            pending = self._journal.pending()
+            self._journal.open(pending)
+            for job in self._backlog:
+                self._journal.write("enqueue", job)
+            for record in pending.values():
+                if record["task"] in self._tasks:
+                    self._backlog.append(Job(record["task"], record["payload"],
+                                             record["id"], record.get("attempts", 0)))
+        for integration in set(self._integrations.values()):
+            self._ensure_workers(integration)
+        while self._backlog:
+            self._submit(self._backlog.popleft())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Drain queued work (up to timeout) and stop the workers"""
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(q.join() for q in self._queues.values())), timeout)
+        except asyncio.TimeoutError:
+            pass  # anything unfinished stays in the journal for the next start
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+        self._running = False
+        if self._journal:
+            self._journal.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "queued": {name: q.qsize() for name, q in self._queues.items()},
+            "scheduled_retries": len(self._retry_handles),
+        }
+
+    def _submit(self, job: Job) -> None:
+        if not self._running:
+            self._backlog.append(job)
+            return
+        integration = self._integrations[job.task]
+        self._ensure_workers(integration).put_nowait(job)
+
+    def _ensure_workers(self, integration: str) -> asyncio.Queue:
+        queue = self._queues.get(integration)
+        if queue is None:
+            queue = self._queues[integration] = asyncio.Queue()
+            for _ in range(self.limits.get(integration, self.default_limit)):
+                self._workers.append(asyncio.create_task(self._worker(queue)))
+        return queue
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.attempts += 1
+        try:
+            await self._tasks[job.task](job.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if job.attempts >= self.max_attempts:
+                self._counters["failed"] += 1
+                self.failed.append({**job.as_dict(), "error": repr(e),
+                                    "failed_at": time.time()})
+                if self._journal:
+                    self._journal.write("failed", job)
+                return
+            self._counters["retried"] += 1
+            self._schedule_retry(job)
+            return
+        self._counters["completed"] += 1
+        if self._journal:
+            self._journal.write("done", job)
+
+    def _schedule_retry(self, job: Job) -> None:
+        delay = min(self.max_delay, self.base_delay * 2 ** (job.attempts - 1))
+        delay *= random.uniform(0.5, 1.0)
+
+        def resubmit():
+            self._retry_handles.discard(handle)
+            self._submit(job)
+
+        handle = asyncio.get_running_loop().call_later(delay, resubmit)
+        self._retry_handles.add(handle)
@@ -0,0 +1,143 @@
+"""
+SFG Aluminium - Bulk export benchmark
+
+Fills a record store with --records quotes (default 200,000, about 700
+bytes of JSON each) and compares, for the whole list
+- the query.* way: every record read and decoded into a dict
+  (RecordStore.find), then the list encoded as one JSON response body
+- BulkExporter.stream: PAGE_SIZE rows at a time, stored JSON text written
+  as NDJSON without decoding
+reporting time, rows per second and the peak Python heap (tracemalloc;
+SQLite's own page cache is not included and is the same for both), then
+- a delta export after --touched records change (?modified_after=)
+- a filtered export (one status) and one customer's quotes
+
+Usage:
+    python benchmarks/bench_bulk_export.py [--records 200000] [--touched 2000]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from bulk_export import BulkExporter, ExportQuery  # noqa: E402
+from json_codec import dumps  # noqa: E402
+from record_store import AsyncRecordStore, RecordStore  # noqa: E402
+
+STATUSES = ["draft", "sent", "accepted", "rejected", "expired"]
+PRODUCTS = ["window", "door", "curtain-wall", "rooflight", "shopfront"]
+
+
+def quote(i, rng, customers):
+    return {
+        "id": f"QUO-{i:07d}",
+        "customer_id": f"CUST-{rng.randrange(customers):05d}",
+        "status": rng.choice(STATUSES),
+        "created_at": f"2025-{1 + i * 12 // 200_000 % 12:02d}-{1 + i % 28:02d}T09:{i % 60:02d}:00",
+        "items": [{"product": rng.choice(PRODUCTS), "width_mm": rng.randrange(400, 3000),
+                   "height_mm": rng.randrange(400, 3000), "quantity": rng.randint(1, 20),
+                   "unit_price": round(rng.uniform(200, 4000), 2)}
+                  for _ in range(rng.randint(2, 5))],
+        "total": round(rng.uniform(1000, 150000), 2),
+        "valid_until": "2025-12-31",
+        "notes": "Powder coated RAL 7016, thermally broken, installation included",
+    }
+
+
+def fill(path, count, customers):
+    store = RecordStore(path)
+    rng = random.Random(24)
+    for start in range(0, count, 10_000):
+        store.put_many("quotes", [quote(i, rng, customers)
+                                  for i in range(start, min(count, start + 10_000))])
+    size = os.path.getsize(path)
+    store.close()
+    return size
+
+
+def whole_list(records, count):
+    """find() every record, then encode the list as one response body"""
+    rows = records.store.find("quotes", limit=count, newest_first=False)
+    return len(dumps({"status": "success", "result": rows}))
+
+
+async def export(records, params, headers=None):
+    exporter = BulkExporter(records)
+    query = ExportQuery.from_request("quotes", params, headers or {})
+    watermark = await records.last_modified("quotes")
+    size = 0
+    async for chunk in exporter.stream(query, watermark):
+        size += len(chunk)
+    return size, exporter.stats()["rows"]
+
+
+def measure(fn):
+    """(seconds, peak Python heap bytes, result): timed and traced runs"""
+    gc.collect()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--customers", type=int, default=2_000)
+    parser.add_argument("--touched", type=int, default=2_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="sfg-export-")
+    path = os.path.join(directory, "records.db")
+    start = time.perf_counter()
+    size = fill(path, args.records, args.customers)
+    print(f"{args.records:,} quotes, {size / 1e6:.0f} MB store, filled in "
+          f"{time.perf_counter() - start:.1f}s")
+    records = AsyncRecordStore(RecordStore(path))
+    try:
+        print(f"\n  {'whole list':<36}{'seconds':>9}{'rows/s':>11}{'body MB':>9}{'peak MB':>9}")
+        elapsed, peak, body = measure(lambda: whole_list(records, args.records))
+        print(f"  {'find() + one JSON body':<36}{elapsed:>9.2f}{args.records / elapsed:>11,.0f}"
+              f"{body / 1e6:>9.0f}{peak / 1e6:>9.1f}")
+        elapsed, peak, (body, rows) = measure(lambda: asyncio.run(export(records, {})))
+        print(f"  {'BulkExporter NDJSON stream':<36}{elapsed:>9.2f}{rows / elapsed:>11,.0f}"
+              f"{body / 1e6:>9.0f}{peak / 1e6:>9.1f}")
+
+        watermark = records.store.last_modified("quotes")
+        rng = random.Random(7)
+        touched = rng.sample(range(args.records), args.touched)
+        changed = [quote(i, rng, args.customers) for i in touched]
+        for record in changed:
+            record["status"] = "accepted"
+        records.store.put_many("quotes", changed)
+        print(f"\n  {'partial exports':<36}{'seconds':>9}{'rows':>11}")
+        for label, params in (
+                (f"delta after {args.touched:,} updates", {"modified_after": repr(watermark)}),
+                ("status=rejected", {"status": "rejected"}),
+                ("one customer", {"customer_id": "CUST-00042"})):
+            start = time.perf_counter()
+            _, rows = asyncio.run(export(records, params))
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<36}{elapsed:>9.3f}{rows:>11,}")
+    finally:
+        records.close()
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
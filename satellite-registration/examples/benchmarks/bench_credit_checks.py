@@ -0,0 +1,166 @@
+"""
+SFG Aluminium - Credit check benchmark
+
+Runs CreditChecker against MockExperian / MockCompaniesHouse with simulated
+bureau latency (--experian-ms, --companies-house-ms per call, --batch-ms per
+bulk call) and measures
+- one check: the two bureaus called one after the other (what chaining the
+  MCP-FINANCE and Companies House calls costs) against in parallel
+- the order path for repeat customers: --orders checks drawn from
+  --customers customers, --concurrency in flight, uncached (a lookup per
+  order) against CreditChecker (cached for the validity period, concurrent
+  checks for one customer coalesced); reports bureau calls and wall time
+- the nightly re-check of --recheck customers whose checks are expiring:
+  per-customer lookups against lookup_many() batches of RECHECK_BATCH
+- a bureau that hangs: check() returns after the connector timeout with the
+  error recorded, instead of holding the order
+
+Usage:
+    python benchmarks/bench_credit_checks.py [--orders 2000] [--customers 200]
+        [--recheck 1000] [--experian-ms 120] [--companies-house-ms 80]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from credit_checks import (RECHECK_BATCH, RECHECK_CONCURRENCY, CreditChecker,  # noqa: E402
+                           MockCompaniesHouse, MockExperian)
+
+
+class _PerCustomer:
+    """A connector without a bulk call (hides lookup_many)"""
+
+    def __init__(self, connector):
+        self.connector = connector
+        self.name = connector.name
+        self.mode = connector.mode
+
+    async def lookup(self, customer_id, company_number):
+        return await self.connector.lookup(customer_id, company_number)
+
+
+class _Hanging(MockExperian):
+    async def lookup(self, customer_id, company_number):
+        await asyncio.sleep(3600)
+
+
+def connectors(args):
+    return (MockExperian(args.experian_ms / 1000, args.batch_ms / 1000),
+            MockCompaniesHouse(args.companies_house_ms / 1000, args.batch_ms / 1000))
+
+
+def calls(*mocks):
+    return sum(mock.calls + mock.batch_calls for mock in mocks)
+
+
+async def single_check(args):
+    experian, companies_house = connectors(args)
+    start = time.perf_counter()
+    for i in range(args.singles):
+        await experian.lookup(f"CUST-{i}", "01234567")
+        await companies_house.lookup(f"CUST-{i}", "01234567")
+    sequential = (time.perf_counter() - start) / args.singles
+    checker = CreditChecker(*connectors(args))
+    start = time.perf_counter()
+    for i in range(args.singles):
+        await checker.check(f"CUST-{i}", "01234567")
+    parallel = (time.perf_counter() - start) / args.singles
+    print("One check (ms)")
+    print(f"  {'bureaus one after the other':<44}{sequential * 1000:>8.1f}")
+    print(f"  {'bureaus in parallel (check())':<44}{parallel * 1000:>8.1f}")
+
+
+async def order_path(args, rng):
+    customers = [f"CUST-{rng.randrange(args.customers):05d}" for _ in range(args.orders)]
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def run(check):
+        async def one(customer_id):
+            async with limit:
+                await check(customer_id)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(customer_id) for customer_id in customers))
+        return time.perf_counter() - start
+
+    experian, companies_house = connectors(args)
+
+    async def uncached(customer_id):
+        await asyncio.gather(experian.lookup(customer_id, None),
+                             companies_house.lookup(customer_id, None))
+    uncached_time = await run(uncached)
+    uncached_calls = calls(experian, companies_house)
+
+    experian, companies_house = connectors(args)
+    checker = CreditChecker(experian, companies_house)
+    cached_time = await run(checker.check)
+    stats = checker.stats()
+
+    print(f"\nOrder path: {args.orders:,} orders from {len(set(customers)):,} customers, "
+          f"{args.concurrency} in flight")
+    print(f"  {'':<34}{'bureau calls':>14}{'wall s':>10}{'orders/s':>10}")
+    print(f"  {'lookup per order':<34}{uncached_calls:>14,}{uncached_time:>10.2f}"
+          f"{args.orders / uncached_time:>10,.0f}")
+    print(f"  {'CreditChecker':<34}{calls(experian, companies_house):>14,}{cached_time:>10.2f}"
+          f"{args.orders / cached_time:>10,.0f}")
+    print(f"  {'':<34}hits {stats['hits']:,}, coalesced {stats['coalesced']:,}, "
+          f"lookups {stats['lookups']:,}")
+
+
+async def recheck(args):
+    subjects = [(f"CUST-{i:05d}", f"{i:08d}") for i in range(args.recheck)]
+    print(f"\nRe-check of {args.recheck:,} expiring customers "
+          f"(batches of {RECHECK_BATCH}, {RECHECK_CONCURRENCY} in flight)")
+    print(f"  {'':<34}{'bureau calls':>14}{'wall s':>10}")
+    for label, wrap in (("per-customer lookups", _PerCustomer), ("lookup_many() batches", None)):
+        experian, companies_house = connectors(args)
+        checker = (CreditChecker(wrap(experian), wrap(companies_house)) if wrap
+                   else CreditChecker(experian, companies_house))
+        start = time.perf_counter()
+        results = await checker.check_many(subjects, force=True)
+        elapsed = time.perf_counter() - start
+        assert len(results) == len(subjects) and all(r.complete for r in results.values())
+        print(f"  {label:<34}{calls(experian, companies_house):>14,}{elapsed:>10.2f}")
+
+
+async def hanging(args):
+    checker = CreditChecker(_Hanging(), MockCompaniesHouse(args.companies_house_ms / 1000),
+                            timeout=args.timeout)
+    start = time.perf_counter()
+    result = await checker.check("CUST-1", "01234567")
+    elapsed = time.perf_counter() - start
+    print(f"\nExperian hangs, timeout {args.timeout:g}s")
+    print(f"  check() returned after {elapsed:.2f}s, complete={result.complete}, "
+          f"errors={result.errors}, cached={checker.cached('CUST-1') is not None}")
+
+
+async def run(args):
+    rng = random.Random(5)
+    await single_check(args)
+    await order_path(args, rng)
+    await recheck(args)
+    await hanging(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--recheck", type=int, default=1000)
+    parser.add_argument("--singles", type=int, default=20)
+    parser.add_argument("--experian-ms", type=float, default=120)
+    parser.add_argument("--companies-house-ms", type=float, default=80)
+    parser.add_argument("--batch-ms", type=float, default=400)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
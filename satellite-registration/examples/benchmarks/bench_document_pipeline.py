@@ -0,0 +1,221 @@
+"""
+SFG Aluminium - Document pipeline benchmark
+
+Renders --documents quotes and invoices (3-40 lines each, descriptions
+drawn from a small product catalogue as real quotes are) and reports
+- render_pdf() in this process, with the per-worker fragment caches
+  (header, footer, terms, wrapped descriptions) and with them cleared
+  before every document
+- how long one large document (--large-lines lines) takes, which is how
+  long it would hold up every other request if rendered on the event loop
+- documents per second through DocumentPipeline for each --workers count
+  (--clients requesters), written atomically to a temporary uploads
+  directory, and the event-loop stalls meanwhile (how late a 5 ms timer
+  fires), against rendering on the loop itself
+- deduplication: every document requested --repeats times at once
+
+Usage:
+    python benchmarks/bench_document_pipeline.py [--documents 2000]
+        [--workers 1 2 4] [--clients 16] [--repeats 3] [--large-lines 400]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import document_pipeline  # noqa: E402
+from document_pipeline import (DocumentPipeline, invoice_document, quote_document,  # noqa: E402
+                               render_pdf)
+
+PRODUCTS = [
+    "Commercial curtain wall system, anthracite grey, thermally broken, double glazed",
+    "Aluminium casement window, white, triple glazed, trickle vents",
+    "Bi-fold door, 4 panel, RAL 7016, low threshold",
+    "Sliding patio door, 2 panel, slimline frame, toughened glass",
+    "Shopfront framing with automatic door and level access",
+    "Rooflight, flat glass, 1000 x 2000 mm, solar control coating",
+    "Fire rated aluminium screen, 30 minutes integrity",
+    "Powder coating, RAL colour of choice, 60 micron",
+    "Site survey and measurement",
+    "Installation, two fitters, per day",
+]
+
+
+def documents(count, rng):
+    result = []
+    for i in range(count):
+        items = [{"description": f"{rng.choice(PRODUCTS)} ({rng.randrange(400, 3000)} x "
+                                 f"{rng.randrange(400, 3000)} mm)" if rng.random() < 0.5
+                  else rng.choice(PRODUCTS),
+                  "quantity": rng.randint(1, 40), "unit_price": round(rng.uniform(80, 6000), 2),
+                  "discount": rng.choice([0, 0, 0.05, 0.1])}
+                 for _ in range(rng.randint(3, 40))]
+        customer = {"company": f"Customer {i} Ltd", "name": "Accounts", "email": f"c{i}@example.com",
+                    "address": {"line1": f"{i} High Street", "city": "London",
+                                "postcode": "SW1A 1AA"}}
+        if i % 2:
+            result.append(("invoice", invoice_document(
+                {"invoice_number": f"INV-251105-{i:05d}", "order_id": f"ORD-{i:05d}",
+                 "sent_at": "2025-11-05T10:00:00"}, items, customer)))
+        else:
+            result.append(("quote", quote_document(
+                {"quote_id": f"q_{i:05d}", "quote_number": f"QUO-251105-{i:05d}",
+                 "enquiry_id": f"ENQ-{i:05d}",
+                 "customer_id": f"CUST-{i:05d}", "created_at": "2025-11-05T10:00:00"},
+                items, customer)))
+    return result
+
+
+def clear_caches():
+    for cached in (document_pipeline.wrap, document_pipeline._header, document_pipeline._footer,
+                   document_pipeline._terms):
+        cached.cache_clear()
+
+
+def inline(batch, cold):
+    start = time.perf_counter()
+    size = 0
+    for kind, document in batch:
+        if cold:
+            clear_caches()
+        size += len(render_pdf(kind, document))
+    return time.perf_counter() - start, size
+
+
+def worst(stalls):
+    stalls = sorted(stalls) or [0.0]
+    return stalls[int(len(stalls) * 0.99)], stalls[-1]
+
+
+async def watch_loop(stalls, interval=0.005):
+    """Record how late a 5 ms timer fires (the event loop's stalls)"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def through_pipeline(batch, workers, directory, clients):
+    """clients request documents one after another, as handlers would"""
+    pipeline = DocumentPipeline(directory=directory, workers=workers)
+    warm = [(kind, dict(document, id=f"WARM-{i}")) for i, (kind, document)
+            in enumerate(batch[:workers * 2])]
+    await asyncio.gather(*(pipeline.render(kind, document) for kind, document in warm))
+    pending = iter(batch)
+
+    async def client():
+        for kind, document in pending:
+            await pipeline.render(kind, document)
+
+    stalls = []
+    watcher = asyncio.create_task(watch_loop(stalls))
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+    stats = pipeline.stats()
+    pipeline.close()
+    return elapsed, worst(stalls), stats
+
+
+async def dedup(batch, workers, directory, repeats):
+    """Each document requested repeats times at once, then all of them again"""
+    pipeline = DocumentPipeline(directory=directory, workers=workers)
+    start = time.perf_counter()
+    await asyncio.gather(*(pipeline.render(kind, document)
+                           for kind, document in batch for _ in range(repeats)))
+    elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    await asyncio.gather(*(pipeline.render(kind, document) for kind, document in batch))
+    again = time.perf_counter() - start
+    stats = pipeline.stats()
+    pipeline.close()
+    return elapsed, again, stats
+
+
+async def on_loop(batch):
+    stalls = []
+    watcher = asyncio.create_task(watch_loop(stalls))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for kind, document in batch:
+        render_pdf(kind, document)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+    return elapsed, worst(stalls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16,
+                        help="concurrent requesters driving the pipeline")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--large-lines", type=int, default=400)
+    args = parser.parse_args()
+
+    batch = documents(args.documents, random.Random(25))
+    lines = sum(len(document["lines"]) for _, document in batch)
+    print(f"{len(batch):,} documents ({lines / len(batch):.0f} lines on average), "
+          f"{os.cpu_count()} CPU(s)")
+
+    print(f"\n  {'render_pdf() in this process':<40}{'docs/s':>10}{'ms/doc':>10}{'KB/doc':>9}")
+    for label, cold in (("fragment caches cleared", True), ("fragment caches", False)):
+        clear_caches()
+        elapsed, size = inline(batch, cold)
+        print(f"  {label:<40}{len(batch) / elapsed:>10,.0f}{elapsed / len(batch) * 1000:>10.2f}"
+              f"{size / len(batch) / 1024:>9.1f}")
+
+    kind, large = batch[0]
+    rng = random.Random(4)
+    large = dict(large, number="QUO-LARGE", lines=[
+        dict(rng.choice(large["lines"]), description=f"{rng.choice(PRODUCTS)}, item {n}")
+        for n in range(args.large_lines)])
+    start = time.perf_counter()
+    pdf = render_pdf(kind, large)
+    elapsed = time.perf_counter() - start
+    print(f"  {f'one {args.large_lines}-line quote':<40}{1 / elapsed:>10,.0f}"
+          f"{elapsed * 1000:>10.2f}{len(pdf) / 1024:>9.1f}")
+
+    elapsed, stall = asyncio.run(on_loop(batch))
+    print(f"\n  {'rendered':<40}{'docs/s':>10}{'loop stall p99':>16}{'max':>8}")
+    print(f"  {'on the event loop':<40}{len(batch) / elapsed:>10,.0f}{stall[0] * 1000:>13.1f} ms"
+          f"{stall[1] * 1000:>5.1f} ms")
+    for workers in args.workers:
+        directory = tempfile.mkdtemp(prefix="sfg-uploads-")
+        try:
+            elapsed, stall, stats = asyncio.run(
+                through_pipeline(batch, workers, directory, args.clients))
+            assert stats["rendered"] == len(batch) + workers * 2, stats
+        finally:
+            shutil.rmtree(directory)
+        print(f"  {f'DocumentPipeline, {workers} worker(s)':<40}{len(batch) / elapsed:>10,.0f}"
+              f"{stall[0] * 1000:>13.1f} ms{stall[1] * 1000:>5.1f} ms")
+
+    directory = tempfile.mkdtemp(prefix="sfg-uploads-")
+    try:
+        workers = args.workers[-1]
+        elapsed, again, stats = asyncio.run(dedup(batch, workers, directory, args.repeats))
+        print(f"\n{len(batch) * args.repeats:,} requests ({args.repeats} per document) on "
+              f"{workers} worker(s): {stats['rendered']:,} rendered, "
+              f"{stats['deduplicated']:,} deduplicated, in {elapsed:.2f}s")
+        print(f"  the same {len(batch):,} again: {stats['unchanged']:,} unchanged, "
+              f"in {again * 1000:.0f} ms")
+        names = [name for _, _, files in os.walk(directory) for name in files]
+        print(f"  {sum(name.endswith('.pdf') for name in names):,} PDFs written, "
+              f"{sum(name.endswith('.tmp') for name in names)} temporary files left")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+SFG Aluminium - Domain model benchmark
+
+For Customer, Enquiry, Quote (with its QuoteItem lines), Order and Payment,
+compares
+- validating a bulk payload: a spec-driven check of each dict (walks the
+  field list and dispatches on the type name for every payload, returning
+  the declared fields as a dict) against the model's compiled validate()
+- the memory held per in-flight record: the decoded dict against the
+  validated model, measured with tracemalloc over the whole batch (field
+  values are the same objects in both, so the difference is the containers)
+
+Payloads are built from the data/ templates with bench_handlers'
+PayloadFactory, so quote and order lines match what the webhook events carry.
+
+Usage:
+    python benchmarks/bench_domain_models.py [--records 20000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from bench_handlers import ROOT, PayloadFactory, load_templates  # noqa: E402
+from domain_models import MODELS, ValidationError  # noqa: E402
+
+STATUSES = {"Enquiry": "new", "Quote": "sent", "Order": "fabrication"}
+
+
+def payloads(factory, name, count):
+    """count JSON bodies for one model"""
+    rng = factory.rng
+    today = date(2025, 11, 5)
+    bodies = []
+    for i in range(count):
+        customer = factory._customer()
+        created = (datetime(2025, 11, 5, 9) + timedelta(minutes=i)).isoformat() + "Z"
+        value = round(rng.uniform(1000, 150000), 2)
+        record = {
+            "Customer": lambda: dict(customer, tier=rng.choice(["platinum", "sapphire", "steel"]),
+                                     phone="+44 20 7777 8888", credit_limit=50000.0,
+                                     outstanding_balance=round(value / 10, 2), payment_terms="net_30"),
+            "Enquiry": lambda: {"id": factory._id("ENQ"), "customer_id": customer["id"],
+                                "description": factory.enquiry["enquiry"]["message"],
+                                "estimated_value": value, "status": STATUSES["Enquiry"],
+                                "assigned_estimator": None, "created_at": created},
+            "Quote": lambda: {"id": factory._id("QUO"), "quote_number": f"QUO-{i:06d}",
+                              "enquiry_id": factory._id("ENQ"), "customer_id": customer["id"],
+                              "items": factory._items(), "total_amount": value, "margin": 0.22,
+                              "status": STATUSES["Quote"], "created_at": created,
+                              "expires_at": (today + timedelta(days=30)).isoformat()},
+            "Order": lambda: {"id": factory._id("ORD"), "order_number": f"ORD-{i:06d}",
+                              "quote_id": factory._id("QUO"), "customer_id": customer["id"],
+                              "items": factory._items(), "total_amount": value,
+                              "status": STATUSES["Order"], "production_start": today.isoformat(),
+                              "estimated_completion": (today + timedelta(days=21)).isoformat(),
+                              "installation_date": None, "created_at": created},
+            "Payment": lambda: {"payment_id": factory._id("PAY"), "invoice_id": factory._id("INV"),
+                                "customer_id": customer["id"], "amount": value, "currency": "GBP",
+                                "method": "bacs", "received_at": created},
+        }[name]()
+        bodies.append(json.dumps(record).encode())
+    return bodies
+
+
+def _is_iso(parse, value):
+    try:
+        parse(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    except ValueError:
+        return False
+    return True
+
+
+def validate_dict(cls, data):
+    """The dict approach: interpret the field spec for every payload"""
+    if not isinstance(data, dict):
+        raise ValidationError("expected an object")
+    result = {}
+    for field in cls._spec:
+        value = data.get(field.name)
+        for alias in field.aliases:
+            if value is None:
+                value = data.get(alias)
+        if value is None:
+            if field.required:
+                raise ValidationError("is required", (field.name,))
+            result[field.name] = None
+            continue
+        kind = field.type
+        if kind == "string":
+            ok = isinstance(value, str)
+        elif kind == "integer":
+            ok = isinstance(value, int) and not isinstance(value, bool)
+        elif kind == "decimal":
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        elif kind == "boolean":
+            ok = isinstance(value, bool)
+        elif kind == "enum":
+            ok = isinstance(value, str) and value in field.values
+        elif kind == "date":
+            ok = isinstance(value, str) and _is_iso(date.fromisoformat, value)
+        elif kind == "datetime":
+            ok = isinstance(value, str) and _is_iso(datetime.fromisoformat, value)
+        elif kind in ("object", "model"):
+            ok = isinstance(value, dict)
+        elif kind == "list":
+            ok = isinstance(value, list)
+        else:
+            ok = True
+        if not ok:
+            raise ValidationError(f"expected {kind}", (field.name,))
+        if field.model is not None:
+            nested = MODELS[field.model]
+            value = ([validate_dict(nested, item) for item in value] if kind == "list"
+                     else validate_dict(nested, value))
+        result[field.name] = value
+    return result
+
+
+def per_record_us(fn, records, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(records)
+        best = min(best, time.perf_counter() - start)
+    return best / len(records) * 1e6
+
+
+def held_bytes(build):
+    """Memory still allocated by the objects build() returns"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.records
+
+    factory = PayloadFactory(load_templates(ROOT))
+    print(f"{n} records per model; validation in µs per record (best of 3), "
+          f"memory in bytes per record\n")
+    print(f"{'model':<10}{'dict':>9}{'model':>9}{'speedup':>9}{'dict B':>10}{'model B':>10}{'saved':>8}")
+    for name in ("Customer", "Enquiry", "Quote", "Order", "Payment"):
+        cls = MODELS[name]
+        records = [json.loads(body) for body in payloads(factory, name, n)]
+        assert cls.validate(records[0]).to_dict() == validate_dict(cls, records[0])
+
+        dict_us = per_record_us(lambda batch: [validate_dict(cls, data) for data in batch], records)
+        model_us = per_record_us(cls.validate_many, records)
+
+        # Both keep the decoded field values; only the containers differ
+        bodies = payloads(factory, name, n)
+        dict_bytes = held_bytes(lambda: [json.loads(body) for body in bodies]) / n
+        model_bytes = held_bytes(lambda: [cls.validate(json.loads(body)) for body in bodies]) / n
+
+        print(f"{name:<10}{dict_us:>9.2f}{model_us:>9.2f}{dict_us / model_us:>8.1f}x"
+              f"{dict_bytes:>10,.0f}{model_bytes:>10,.0f}{1 - model_bytes / dict_bytes:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+SFG Aluminium - Estimator assignment benchmark
+
+Builds a roster of --estimators estimators (default 10,000; one of
+--regions regions, one to three project-type skills, one in ten part time)
+and streams --enquiries enquiries (default 1,000,000) through
+EstimatorAssigner, releasing each enquiry's work --open enquiries later (the
+quote going out), and measures
+- assign() + release() per enquiry on the pool heaps, against picking the
+  least-loaded matching estimator by scanning the whole roster (on
+  --scan-enquiries, it is O(estimators) per enquiry)
+- assign_many() for a trade-show burst of --burst enquiries
+- how even the load ends up: highest and lowest estimator load against the
+  mean, within one pool
+- the load snapshot: taking it (on the event loop), encoding and writing
+  it (in a thread in the handler), and restoring it
+
+Usage:
+    python benchmarks/bench_estimator_assignment.py [--estimators 10000]
+        [--enquiries 1000000] [--open 50000] [--burst 300]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from estimator_assignment import (PROJECT_WEIGHTS, EstimatorAssigner, _write,  # noqa: E402
+                                  workload)
+
+PROJECT_TYPES = sorted(PROJECT_WEIGHTS)
+
+
+def roster(args, rng):
+    return [{"id": f"EST-{i:05d}", "region": f"region-{rng.randrange(args.regions)}",
+             "skills": rng.sample(PROJECT_TYPES, rng.randint(1, 3)),
+             "capacity": 0.5 if rng.random() < 0.1 else 1.0} for i in range(args.estimators)]
+
+
+def enquiries(count, rng, args, prefix="ENQ"):
+    for i in range(count):
+        yield {"enquiry_id": f"{prefix}-{i:07d}", "project_type": rng.choice(PROJECT_TYPES),
+               "region": f"region-{rng.randrange(args.regions)}",
+               "estimated_value": round(rng.lognormvariate(10.5, 1.0), 2)}
+
+
+class ScanAssigner:
+    """Least-loaded matching estimator by looking at every estimator"""
+
+    def __init__(self, specs):
+        self.estimators = [dict(spec, load=0.0, skills=frozenset(spec["skills"]))
+                           for spec in specs]
+        self.assignments = {}
+
+    def assign(self, enquiry_id, project_type, region, estimated_value):
+        weight = workload(project_type, estimated_value)
+        tests = (lambda e: project_type in e["skills"] and e["region"] == region,
+                 lambda e: project_type in e["skills"],
+                 lambda e: e["region"] == region,
+                 lambda e: True)
+        for test in tests:
+            best = None
+            for estimator in self.estimators:
+                if test(estimator) and (best is None or estimator["load"] / estimator["capacity"]
+                                        < best["load"] / best["capacity"]):
+                    best = estimator
+            if best is not None:
+                break
+        best["load"] += weight
+        self.assignments[enquiry_id] = (best, weight)
+
+    def release(self, enquiry_id):
+        estimator, weight = self.assignments.pop(enquiry_id)
+        estimator["load"] -= weight
+
+
+def stream(assigner, batch, window):
+    """assign each enquiry, releasing the one `window` enquiries back"""
+    open_ids = deque()
+    start = time.perf_counter()
+    for enquiry in batch:
+        assigner.assign(enquiry["enquiry_id"], enquiry["project_type"], enquiry["region"],
+                        enquiry["estimated_value"])
+        open_ids.append(enquiry["enquiry_id"])
+        if len(open_ids) > window:
+            assigner.release(open_ids.popleft())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--estimators", type=int, default=10_000)
+    parser.add_argument("--regions", type=int, default=8)
+    parser.add_argument("--enquiries", type=int, default=1_000_000)
+    parser.add_argument("--open", type=int, default=50_000,
+                        help="enquiries in progress (released this many assignments later)")
+    parser.add_argument("--scan-enquiries", type=int, default=2_000)
+    parser.add_argument("--burst", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(22)
+    specs = roster(args, rng)
+    start = time.perf_counter()
+    assigner = EstimatorAssigner(specs)
+    print(f"{args.estimators:,} estimators in {args.regions} regions, "
+          f"{len(assigner._heaps)} pools, built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    batch = list(enquiries(args.enquiries, rng, args))
+    elapsed = stream(assigner, batch, args.open)
+    print(f"\n{args.enquiries:,} enquiries, {args.open:,} open at a time")
+    print(f"  {'':<40}{'µs/enquiry':>12}{'enquiries/s':>14}")
+    print(f"  {'pool heaps: assign() + release()':<40}{elapsed / len(batch) * 1e6:>12.1f}"
+          f"{len(batch) / elapsed:>14,.0f}")
+    scan = ScanAssigner(specs)
+    scan_batch = batch[:args.scan_enquiries]
+    scan_elapsed = stream(scan, scan_batch, args.open)
+    print(f"  {f'roster scan ({len(scan_batch):,} enquiries)':<40}"
+          f"{scan_elapsed / len(scan_batch) * 1e6:>12.1f}{len(scan_batch) / scan_elapsed:>14,.0f}")
+    stats = assigner.stats()
+    print(f"  heap entries {stats['heap_entries']:,} for {sum(assigner._members.values()):,} "
+          f"pool memberships, {stats['compactions']:,} compactions")
+
+    # Balance inside the largest skill+region pool
+    pool = max((p for p in assigner._members if p[0] and p[1]), key=assigner._members.get)
+    scores = [e.score for e in assigner._estimators.values()
+              if pool[0] in e.skills and e.region == pool[1]]
+    mean = sum(scores) / len(scores)
+    print(f"  balance in {pool[0]}/{pool[1]} ({len(scores)} estimators): "
+          f"min {min(scores) / mean:.2f}x, max {max(scores) / mean:.2f}x the mean load")
+
+    burst = list(enquiries(args.burst, rng, args, prefix="SHOW"))
+    start = time.perf_counter()
+    assigner.assign_many(burst)
+    elapsed = time.perf_counter() - start
+    print(f"\nassign_many(): {args.burst} enquiries in {elapsed * 1000:.1f} ms "
+          f"({elapsed / args.burst * 1e6:.1f} µs each)")
+
+    directory = tempfile.mkdtemp(prefix="sfg-estimators-")
+    path = os.path.join(directory, "snapshot.json")
+    start = time.perf_counter()
+    snapshot = assigner.snapshot()
+    taken = time.perf_counter() - start
+    start = time.perf_counter()
+    _write(path, snapshot)
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = EstimatorAssigner(specs)
+    restored.restore(path)
+    loaded = time.perf_counter() - start
+    assert restored.stats()["open"] == assigner.stats()["open"]
+    print(f"\nsnapshot: {os.path.getsize(path) / 1e6:.1f} MB ({stats['open']:,} open), "
+          f"taken in {taken * 1000:.0f} ms, encoded and written in {saved * 1000:.0f} ms, "
+          f"restored (roster + snapshot) in {loaded * 1000:.0f} ms")
+    os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
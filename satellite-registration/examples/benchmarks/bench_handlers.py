@@ -0,0 +1,386 @@
+"""
+SFG Aluminium - Handler load test
+
+Drives webhook-handler-python.py and message-handler-python.py with
+realistic payloads for all seven webhook event types (signed with
+X-Nexus-Signature) and all six message types, seeded from the repository's
+data/*/TEMPLATE.json records, and reports p50/p95/p99 latency and requests
+per second per event type.
+
+Two modes:
+    inprocess   the ASGI apps are called in this process (no network); shows
+                handler cost on its own
+    uvicorn     each app is served by a local uvicorn process and driven over
+                keep-alive HTTP; includes the server and the network stack
+
+Results are checked against the targets in config/business-logic.json
+(monitoring.response_time_target and the apiEndpoints rate_limit of the
+webhook and message endpoints) and written as JSON (benchmarks/results/ is
+not committed); pass --compare with an earlier result file to see
+regressions of more than 10%.
+
+The load generator is one Python process using httpx (about 1 ms of CPU per
+request), so in uvicorn mode on a machine with few cores the client and the
+server compete for CPU: keep --concurrency low there, or the measured tail
+is mostly queueing in the driver.
+
+Usage:
+    python benchmarks/bench_handlers.py [--mode inprocess|uvicorn|both]
+        [--requests 2000] [--concurrency 16] [--output results.json]
+        [--compare previous.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import copy
+import hashlib
+import hmac
+import io
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "..")
+ROOT = os.path.join(EXAMPLES, "..", "..")
+sys.path.insert(0, EXAMPLES)
+# The load test sends far more than the manifest's per-client rate limits
+os.environ.setdefault("SFG_RATE_LIMITS", "off")
+
+SECRET = "your-webhook-secret-here"
+APPS = {
+    "webhooks": ("webhook-handler-python", "/webhooks/nexus"),
+    "messages": ("message-handler-python", "/messages/handle"),
+}
+WEBHOOK_EVENTS = ["enquiry.created", "quote.requested", "order.approved", "customer.registered",
+                  "credit.check_required", "invoice.due", "payment.received"]
+MESSAGE_TYPES = ["query.customer_data", "query.quote_status", "query.order_status",
+                 "action.create_quote", "action.approve_order", "action.send_invoice"]
+TIERS = ["steel", "bronze", "silver", "gold", "platinum", "sapphire"]
+# Share of queries that reuse a recent id (cache hits in the message handler)
+REPEAT_QUERY_RATE = 0.5
+
+
+def load_templates(root):
+    templates = {}
+    for name in ("customers", "enquiries", "quotes", "services"):
+        with open(os.path.join(root, "data", name, "TEMPLATE.json")) as f:
+            templates[name] = json.load(f)
+    return templates
+
+
+def load_targets(root):
+    """Latency target and per-endpoint rate limits from config/business-logic.json"""
+    with open(os.path.join(root, "config", "business-logic.json")) as f:
+        bl = json.load(f)
+    target = (bl.get("monitoring") or {}).get("response_time_target", "< 500ms")
+    match = re.search(r"(\d+(?:\.\d+)?)\s*(ms|s)\b", target)
+    latency_ms = float(match.group(1)) * (1000 if match.group(2) == "s" else 1) if match else 500.0
+    limits = {}
+    for endpoint in bl.get("apiEndpoints", []):
+        match = re.match(r"(\d+)\s*/\s*(second|minute|hour)", str(endpoint.get("rate_limit", "")))
+        if not match:
+            continue
+        per = {"second": 1, "minute": 60, "hour": 3600}[match.group(2)]
+        path = endpoint.get("path", "")
+        if path.endswith("/webhooks/nexus"):
+            limits["webhooks"] = int(match.group(1)) / per
+        elif path.endswith("/messages/handle"):
+            limits["messages"] = int(match.group(1)) / per
+    return {"p99_ms": latency_ms, "target": target, "rate_limit_per_second": limits}
+
+
+class PayloadFactory:
+    """Varied, valid payloads derived from the data/ templates"""
+
+    def __init__(self, templates, seed=7):
+        self.rng = random.Random(seed)
+        self.customer = templates["customers"]
+        self.enquiry = templates["enquiries"]
+        self.quote = templates["quotes"]
+        self.recent = {"customer": ["CUST-20251105-001"], "quote": ["QUO-20251105-001"],
+                       "order": ["ORD-20251105-001"]}
+        self.counter = 0
+
+    def _id(self, prefix):
+        self.counter += 1
+        return f"{prefix}-{datetime.now():%Y%m%d}-{self.counter:06d}"
+
+    def _reuse(self, kind, prefix):
+        if self.rng.random() < REPEAT_QUERY_RATE:
+            return self.rng.choice(self.recent[kind])
+        value = self._id(prefix)
+        self.recent[kind] = (self.recent[kind] + [value])[-50:]
+        return value
+
+    def _customer(self):
+        personal = self.customer["personal"]
+        return {"id": self._reuse("customer", "CUST"),
+                "name": f"{personal['first_name']} {personal['last_name']}",
+                "email": personal["email"], "company": self.customer["company"]["name"]}
+
+    def _items(self):
+        items = []
+        for product in self.quote["products"]:
+            quantity = max(1, int(product.get("quantity", 1) * self.rng.uniform(0.5, 1.5)))
+            unit_price = product.get("estimated_price", 1000) / max(1, product.get("quantity", 1))
+            items.append({"sku": product.get("product_name"), "quantity": quantity,
+                          "unit_price": round(unit_price, 2),
+                          "unit_cost": round(unit_price * self.rng.uniform(0.55, 0.8), 2),
+                          "specifications": copy.deepcopy(product.get("specifications", {}))})
+        return items
+
+    def webhook(self, event_type):
+        value = self.enquiry["enquiry"]["estimated_value"] * self.rng.uniform(0.1, 3.0)
+        data = {
+            "enquiry.created": lambda: {
+                "enquiry_id": self._id("ENQ"), "customer": self._customer(),
+                "estimated_value": round(value, 2), "enquiry": copy.deepcopy(self.enquiry["enquiry"])},
+            "quote.requested": lambda: {
+                "enquiry_id": self._id("ENQ"), "customer_tier": self.rng.choice(TIERS),
+                "items": self._items()},
+            "order.approved": lambda: {
+                "order_id": self._id("ORD"), "customer": self._customer(), "items": self._items()},
+            "customer.registered": lambda: {
+                "customer_id": self._id("CUST"), "customer_name": self.customer["company"]["name"]},
+            "credit.check_required": lambda: {
+                "customer_id": self._reuse("customer", "CUST"), "order_value": round(value, 2)},
+            "invoice.due": lambda: {
+                "invoice_id": self._id("INV"), "customer_id": self._reuse("customer", "CUST"),
+                "amount_due": round(value, 2)},
+            "payment.received": lambda: {
+                "payment_id": self._id("PAY"), "invoice_id": self._id("INV"),
+                "amount": round(value, 2)},
+        }[event_type]()
+        event = {"id": uuid.uuid4().hex, "type": event_type,
+                 "timestamp": datetime.now(timezone.utc).isoformat(), "data": data}
+        body = json.dumps(event).encode()
+        signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+        return body, {"Content-Type": "application/json", "X-Nexus-Signature": signature}
+
+    def message(self, message_type):
+        params = {
+            "query.customer_data": lambda: {"customer_id": self._reuse("customer", "CUST")},
+            "query.quote_status": lambda: {"quote_id": self._reuse("quote", "QUO")},
+            "query.order_status": lambda: {"order_id": self._reuse("order", "ORD")},
+            "action.create_quote": lambda: {
+                "enquiry_id": self._id("ENQ"), "customer_id": self._reuse("customer", "CUST"),
+                "customer_tier": self.rng.choice(TIERS), "items": self._items()},
+            "action.approve_order": lambda: {
+                "order_id": self._reuse("order", "ORD"), "approved_by": "director@sfg.example"},
+            "action.send_invoice": lambda: {
+                "order_id": self._reuse("order", "ORD"), "customer_email": self.customer["personal"]["email"]},
+        }[message_type]()
+        message = {"type": message_type, "params": params, "request_id": uuid.uuid4().hex}
+        return json.dumps(message).encode(), {"Content-Type": "application/json"}
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarise(samples, errors, elapsed):
+    latencies = [s * 1000 for s in samples]
+    return {
+        "requests": len(samples) + errors,
+        "errors": errors,
+        "rps": round((len(samples) + errors) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "max_ms": round(max(latencies), 3) if latencies else 0.0,
+    }
+
+
+async def drive(client, path, kinds, make, requests, concurrency):
+    """Send `requests` requests spread evenly over kinds; returns per-kind results"""
+    plan = [kinds[i % len(kinds)] for i in range(requests)]
+    random.Random(11).shuffle(plan)
+    payloads = [(kind, *make(kind)) for kind in plan]   # built up front, outside the timing
+    samples = {kind: [] for kind in kinds}
+    errors = {kind: 0 for kind in kinds}
+    position = 0
+
+    async def worker():
+        nonlocal position
+        while position < len(payloads):
+            kind, body, headers = payloads[position]
+            position += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, content=body, headers=headers)
+                ok = response.status_code < 300
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                samples[kind].append(time.perf_counter() - start)
+            else:
+                errors[kind] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    results = {kind: summarise(samples[kind], errors[kind], elapsed) for kind in kinds}
+    results["all"] = summarise([s for kind in kinds for s in samples[kind]],
+                               sum(errors.values()), elapsed)
+    return results
+
+
+def load_app(module_name):
+    import importlib
+    return importlib.import_module(module_name)
+
+
+async def run_inprocess(app_key, factory, requests, concurrency):
+    module_name, path = APPS[app_key]
+    app = load_app(module_name).app
+    # The handlers print per request; keep that out of the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                return await _drive_app(app_key, client, path, factory, requests, concurrency)
+
+
+async def run_uvicorn(app_key, factory, requests, concurrency):
+    module_name, path = APPS[app_key]
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module_name}:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=EXAMPLES, stdout=subprocess.DEVNULL)
+    try:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits,
+                                     timeout=30) as client:
+            for _ in range(200):
+                try:
+                    await client.get("/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError(f"uvicorn did not start {module_name}")
+            return await _drive_app(app_key, client, path, factory, requests, concurrency)
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+async def _drive_app(app_key, client, path, factory, requests, concurrency):
+    if app_key == "webhooks":
+        return await drive(client, path, WEBHOOK_EVENTS, factory.webhook, requests, concurrency)
+    return await drive(client, path, MESSAGE_TYPES, factory.message, requests, concurrency)
+
+
+def check(results, targets):
+    """Pass/fail against the manifest's latency target and rate limits"""
+    verdicts = {}
+    for app_key, per_kind in results.items():
+        overall = per_kind["all"]
+        limit = targets["rate_limit_per_second"].get(app_key)
+        verdicts[app_key] = {
+            "p99_within_target": overall["p99_ms"] < targets["p99_ms"],
+            "rate_limit_per_second": limit,
+            "headroom_over_rate_limit": round(overall["rps"] / limit, 1) if limit else None,
+            "errors": overall["errors"],
+        }
+    return verdicts
+
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous_path} ({previous.get('created_at')}):")
+    for mode, apps in current["modes"].items():
+        for app_key, per_kind in apps["results"].items():
+            before = previous.get("modes", {}).get(mode, {}).get("results", {}).get(app_key, {})
+            for kind, now in per_kind.items():
+                old = before.get(kind)
+                if not old:
+                    continue
+                p99 = (now["p99_ms"] - old["p99_ms"]) / old["p99_ms"] * 100 if old["p99_ms"] else 0.0
+                rps = (now["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+                flag = "  REGRESSION" if p99 > 10 or rps < -10 else ""
+                print(f"  {mode:9} {kind:24} p99 {p99:+6.1f}%  rps {rps:+6.1f}%{flag}")
+
+
+def print_results(mode, results, verdicts, targets):
+    print(f"\n== {mode}")
+    for app_key, per_kind in results.items():
+        verdict = verdicts[app_key]
+        print(f"  {app_key}: p99 target {targets['target']} "
+              f"{'met' if verdict['p99_within_target'] else 'MISSED'}; "
+              f"{per_kind['all']['rps']:,.0f} req/s = {verdict['headroom_over_rate_limit']}x the "
+              f"{verdict['rate_limit_per_second']:.1f}/s rate limit")
+        print(f"    {'type':24} {'reqs':>6} {'err':>4} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for kind, r in per_kind.items():
+            print(f"    {kind:24} {r['requests']:6} {r['errors']:4} {r['rps']:9,.1f} "
+                  f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['max_ms']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="both")
+    parser.add_argument("--apps", default="webhooks,messages")
+    parser.add_argument("--requests", type=int, default=2000, help="per app")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--root", default=ROOT, help="repository root (data/ and config/)")
+    parser.add_argument("--output", default=os.path.join(HERE, "results", "handlers-latest.json"))
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    os.chdir(EXAMPLES)
+    templates = load_templates(args.root)
+    targets = load_targets(args.root)
+    modes = ["inprocess", "uvicorn"] if args.mode == "both" else [args.mode]
+    runners = {"inprocess": run_inprocess, "uvicorn": run_uvicorn}
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requests_per_app": args.requests,
+        "concurrency": args.concurrency,
+        "targets": targets,
+        "modes": {},
+    }
+    for mode in modes:
+        results = {}
+        for app_key in args.apps.split(","):
+            factory = PayloadFactory(templates, args.seed)
+            results[app_key] = asyncio.run(
+                runners[mode](app_key, factory, args.requests, args.concurrency))
+        verdicts = check(results, targets)
+        report["modes"][mode] = {"results": results, "verdicts": verdicts}
+        print_results(mode, results, verdicts, targets)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved: {args.output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
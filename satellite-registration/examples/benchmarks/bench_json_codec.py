@@ -0,0 +1,107 @@
+"""
+SFG Aluminium - JSON codec benchmark
+
+Per message type, compares the cost of
+- decoding the request body: json.loads against each installed backend
+- encoding the /messages/handle response envelope: FastAPI's default path
+  (jsonable_encoder + JSONResponse) against json_codec.dumps of the same
+  dict, and of the slotted response model for the three query.* types
+- the memory a cached query result takes as a dict and as a model
+
+Request bodies come from bench_handlers' PayloadFactory and results from the
+message handler's own process_message, so the payloads match what the
+handler really sends.
+
+Usage:
+    python benchmarks/bench_json_codec.py [--iterations 20000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "..")
+sys.path.insert(0, EXAMPLES)
+os.environ.setdefault("SFG_LOG_LEVEL", "warning")
+os.environ.setdefault("SFG_RATE_LIMITS", "off")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from bench_handlers import MESSAGE_TYPES, ROOT, PayloadFactory, load_templates  # noqa: E402
+from json_codec import BACKENDS  # noqa: E402
+from response_models import ResponseModel  # noqa: E402
+
+
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def handler_results(factory):
+    """(message type, request body, envelope) for every message type"""
+    handler = importlib.import_module("message-handler-python")
+    cases = []
+    for message_type in MESSAGE_TYPES:
+        body, _ = factory.message(message_type)
+        message = json.loads(body)
+        status, result = await handler.process_message(message_type, message["params"])
+        envelope = {"request_id": message["request_id"], "status": status, "result": result,
+                    "timestamp": datetime.now().isoformat()}
+        cases.append((message_type, body, envelope))
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    factory = PayloadFactory(load_templates(ROOT))
+    with contextlib.redirect_stdout(io.StringIO()):
+        cases = asyncio.run(handler_results(factory))
+
+    backends = list(BACKENDS)
+    print(f"Backends: {', '.join(backends)}; {n} iterations, µs per message\n")
+
+    print("Decode request body")
+    print(f"{'message type':<22}" + "".join(f"{name:>10}" for name in backends))
+    for message_type, body, _ in cases:
+        row = [per_call_us(lambda: BACKENDS[name][0](body), n) for name in backends]
+        print(f"{message_type:<22}" + "".join(f"{us:>10.2f}" for us in row))
+
+    print("\nEncode response envelope")
+    header = f"{'message type':<22}{'fastapi':>10}" + "".join(f"{name:>10}" for name in backends)
+    print(header + "".join(f"{name + '+model':>15}" for name in backends))
+    for message_type, _, envelope in cases:
+        result = envelope["result"]
+        as_dict = dict(envelope, result=result.to_dict() if isinstance(result, ResponseModel) else result)
+        row = [per_call_us(lambda: JSONResponse(jsonable_encoder(as_dict)).body, n)]
+        row += [per_call_us(lambda: BACKENDS[name][1](as_dict), n) for name in backends]
+        line = f"{message_type:<22}" + "".join(f"{us:>10.2f}" for us in row)
+        if isinstance(result, ResponseModel):
+            line += "".join(f"{per_call_us(lambda: BACKENDS[name][1](envelope), n):>15.2f}"
+                            for name in backends)
+        print(line)
+
+    print("\nCached query result size (bytes)")
+    for message_type, _, envelope in cases:
+        result = envelope["result"]
+        if isinstance(result, ResponseModel):
+            print(f"{message_type:<22}{'dict':>8} {sys.getsizeof(result.to_dict()):>5}"
+                  f"{'model':>8} {sys.getsizeof(result):>5}")
+
+
+if __name__ == "__main__":
+    main()
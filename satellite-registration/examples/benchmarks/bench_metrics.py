@@ -0,0 +1,134 @@
+"""
+SFG Aluminium - Instrumentation overhead benchmark
+
+Measures what the metrics and logging layer adds to each request:
+
+- EventRouter.dispatch of a no-op handler with and without a registry
+- MetricsMiddleware around a minimal ASGI app, called directly
+- StructuredLogger.info against print() of the same line, both to /dev/null
+- MetricsRegistry.render() for a scrape of every series
+
+Usage:
+    python benchmarks/bench_metrics.py [--iterations 200000]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from event_router import EventRouter  # noqa: E402
+from metrics import MetricsMiddleware, MetricsRegistry  # noqa: E402
+from structured_log import StructuredLogger  # noqa: E402
+
+EVENT_TYPES = ["enquiry.created", "quote.requested", "order.approved", "customer.registered",
+               "credit.check_required", "invoice.due", "payment.received"]
+
+
+def per_call_us(elapsed: float, iterations: int) -> float:
+    return elapsed / iterations * 1e6
+
+
+async def bench_dispatch(iterations: int, metrics) -> float:
+    router = EventRouter("bench", metrics=metrics)
+
+    @router.on("*")
+    async def noop(data):
+        return data
+
+    payload = {"id": 1}
+    start = time.perf_counter()
+    for i in range(iterations):
+        await router.dispatch(EVENT_TYPES[i % 7], payload)
+    return per_call_us(time.perf_counter() - start, iterations)
+
+
+class _Route:
+    def __init__(self, path):
+        self.path = path
+
+
+class _App:
+    """Smallest ASGI app that answers like a route would"""
+    routes = [_Route("/webhooks/nexus")]
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def bench_middleware(iterations: int, wrapped: bool) -> float:
+    inner = _App()
+    app = MetricsMiddleware(inner, MetricsRegistry()) if wrapped else inner
+    scope = {"type": "http", "method": "POST", "path": "/webhooks/nexus", "app": inner}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await app(scope, receive, send)
+    return per_call_us(time.perf_counter() - start, iterations)
+
+
+def bench_print(iterations: int) -> float:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for i in range(iterations):
+            print(f"[{datetime.now().isoformat()}] Received event: {EVENT_TYPES[i % 7]}")
+        return per_call_us(time.perf_counter() - start, iterations)
+
+
+def bench_logger(iterations: int):
+    with open(os.devnull, "w") as devnull:
+        # Writer idle during the loop: the request-path cost on its own
+        log = StructuredLogger("bench", stream=devnull, flush_interval=3600,
+                               flush_at=iterations + 1, max_buffer=iterations + 1)
+        start = time.perf_counter()
+        for i in range(iterations):
+            log.info("event.received", type=EVENT_TYPES[i % 7])
+        hot_path = per_call_us(time.perf_counter() - start, iterations)
+        start = time.perf_counter()
+        log.close()
+        writer = per_call_us(time.perf_counter() - start, iterations)
+        return hot_path, writer, log.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    registry = MetricsRegistry()
+    plain = asyncio.run(bench_dispatch(n, None))
+    measured = asyncio.run(bench_dispatch(n, registry))
+    print(f"dispatch        plain {plain:6.2f} us  with histograms {measured:6.2f} us  "
+          f"overhead {measured - plain:+.2f} us/event")
+
+    plain = asyncio.run(bench_middleware(n, wrapped=False))
+    measured = asyncio.run(bench_middleware(n, wrapped=True))
+    print(f"middleware      plain {plain:6.2f} us  with middleware {measured:6.2f} us  "
+          f"overhead {measured - plain:+.2f} us/request")
+
+    printed = bench_print(n)
+    hot_path, writer, stats = bench_logger(n)
+    print(f"logging         print {printed:6.2f} us  logger.info     {hot_path:6.2f} us  "
+          f"(writer thread {writer:.2f} us/line off the request path, {stats['written']} written)")
+
+    start = time.perf_counter()
+    text = registry.render()
+    print(f"scrape          {len(text.splitlines())} lines rendered in "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+SFG Aluminium - Quote pricing benchmark
+
+Compares the original per-handler generator sums with PricingEngine for
+one large curtain-walling quote and for re-pricing a portfolio of quotes.
+
+Usage:
+    python benchmarks/bench_pricing.py [--items 5000] [--quotes 2000] [--quote-items 40]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pricing_engine  # noqa: E402
+from pricing_engine import PricingEngine  # noqa: E402
+
+
+def make_items(count, rng):
+    items = []
+    for _ in range(count):
+        quantity = rng.randint(1, 20)
+        cost = rng.uniform(50, 2000) * quantity
+        items.append({"cost": cost, "price": cost * rng.uniform(1.1, 1.6),
+                      "quantity": quantity, "discount": rng.choice([0, 0, 0.05])})
+    return items
+
+
+def loop_price(items):
+    """The original handler calculation (line totals), extended with line discounts"""
+    total_cost = sum(item.get("cost", 0) for item in items)
+    total_price = sum(item.get("price", 0) * (1 - item.get("discount", 0)) for item in items)
+    margin = (total_price - total_cost) / total_price if total_price > 0 else 0
+    approval_tier = None
+    if total_price > 100000:
+        approval_tier = "T2"
+    elif total_price > 25000:
+        approval_tier = "T3"
+    return total_price, margin, margin >= 0.15, approval_tier
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--quotes", type=int, default=2000)
+    parser.add_argument("--quote-items", type=int, default=40)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    engine = PricingEngine()
+    big_quote = make_items(args.items, rng)
+    portfolio = [{"items": make_items(args.quote_items, rng), "customer_tier": "steel"}
+                 for _ in range(args.quotes)]
+    lines = args.quotes * args.quote_items
+
+    print(f"NumPy: {'available' if pricing_engine.np is not None else 'not installed (loop fallback)'}\n")
+
+    print(f"Single quote, {args.items} items")
+    base = timed(lambda: loop_price(big_quote))
+    fast = timed(lambda: engine.price_quote(big_quote))
+    print(f"  generator sums     {base * 1e3:8.2f} ms")
+    print(f"  PricingEngine      {fast * 1e3:8.2f} ms  ({base / fast:.1f}x)\n")
+
+    print(f"Portfolio re-price, {args.quotes} quotes x {args.quote_items} items ({lines} lines)")
+    base = timed(lambda: [loop_price(q["items"]) for q in portfolio], repeat=3)
+    fast = timed(lambda: engine.price_quotes(portfolio), repeat=3)
+    print(f"  generator sums     {base * 1e3:8.2f} ms")
+    print(f"  PricingEngine      {fast * 1e3:8.2f} ms  ({base / fast:.1f}x)")
+
+    if pricing_engine.np is not None:
+        np = pricing_engine.np
+        quantity = np.array([i["quantity"] for q in portfolio for i in q["items"]], dtype=float)
+        cost = np.array([i["cost"] for q in portfolio for i in q["items"]]) / quantity
+        price = np.array([i["price"] for q in portfolio for i in q["items"]]) / quantity
+        discount = np.array([i["discount"] for q in portfolio for i in q["items"]])
+        index = np.repeat(np.arange(args.quotes), args.quote_items)
+        columnar = timed(lambda: engine.price_columns(
+            cost, price, quantity, discount, quote_index=index, quote_count=args.quotes), repeat=3)
+        print(f"  price_columns      {columnar * 1e3:8.2f} ms  ({base / columnar:.1f}x, columns pre-built)")
+
+
+if __name__ == "__main__":
+    main()
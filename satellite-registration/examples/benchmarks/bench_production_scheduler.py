@@ -0,0 +1,154 @@
+"""
+SFG Aluminium - Production scheduler benchmark
+
+Places --orders approved orders (default 100,000; 4-40 fabrication hours
+each, approvals spread so demand is --load times the lines' capacity) on
+--workshops workshops of --lines lines, and measures
+- placement: ProductionScheduler (Fenwick tree per line, one O(log days)
+  search per line) against walking each line's calendar day by day from
+  the order's earliest start, the way a capacity check without an index
+  finds a slot; both place every order on the same days
+- bulk re-planning: one line shut for two weeks in the middle of the
+  booked period (set_capacity) and a line added there (add_line), with
+  the number of orders moved
+
+Usage:
+    python benchmarks/bench_production_scheduler.py [--orders 100000]
+        [--workshops 3] [--lines 6] [--load 0.95 1.05]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from production_scheduler import ProductionScheduler  # noqa: E402
+
+ORIGIN = date(2025, 11, 3)
+HOURS_PER_DAY = 16.0
+
+
+class ScanScheduler:
+    """Earliest-finish placement by walking each line's free minutes per day"""
+
+    def __init__(self, scheduler):
+        # Same calendars, without the trees
+        self.lines = {workshop: [line.free[:] for line in lines]
+                      for workshop, lines in scheduler._lines.items()}
+        self.capacity = {workshop: [line.capacity for line in lines]
+                         for workshop, lines in scheduler._lines.items()}
+        self.lead_days = scheduler.lead_days
+        self.placements = {}
+
+    def schedule(self, order_id, hours, approved, workshop):
+        earliest = (approved - ORIGIN).days + self.lead_days
+        minutes = max(1, round(hours * 60))
+        best, best_finish = None, None
+        for index, free in enumerate(self.lines[workshop]):
+            total, day = 0, earliest
+            while True:
+                if day >= len(free):
+                    capacity = self.capacity[workshop][index]
+                    free.extend(capacity(d) for d in range(len(free), len(free) * 2))
+                total += free[day]
+                if total >= minutes:
+                    break
+                day += 1
+            if best is None or day < best_finish:
+                best, best_finish = index, day
+        free = self.lines[workshop][best]
+        allocations, day = [], earliest
+        while minutes:
+            used = min(free[day], minutes)
+            if used:
+                free[day] -= used
+                allocations.append((day, used))
+                minutes -= used
+            day += 1
+        self.placements[order_id] = (best, allocations)
+
+
+def orders(args, load, rng):
+    """(order_id, hours, approved, workshop), approvals paced to load x capacity"""
+    workshops = [f"workshop-{w}" for w in range(args.workshops)]
+    daily = args.lines * HOURS_PER_DAY * 5 / 7          # hours per calendar day per workshop
+    result, clock = [], {workshop: 0.0 for workshop in workshops}
+    for i in range(args.orders):
+        workshop = workshops[i % len(workshops)]
+        hours = rng.uniform(4, 40)
+        clock[workshop] += hours / (daily * load)
+        result.append((f"ORD-{i:06d}", hours, ORIGIN + timedelta(days=int(clock[workshop])),
+                       workshop))
+    return result
+
+
+def new_scheduler(args):
+    return ProductionScheduler(
+        {f"workshop-{w}": {f"line-{n}": HOURS_PER_DAY for n in range(args.lines)}
+         for w in range(args.workshops)}, origin=ORIGIN)
+
+
+def run(args, load):
+    rng = random.Random(21)
+    batch = orders(args, load, rng)
+    print(f"\nLoad {load:.2f}: {len(batch):,} orders, {args.workshops} workshops x "
+          f"{args.lines} lines of {HOURS_PER_DAY:g} h")
+
+    scheduler = new_scheduler(args)
+    scan = ScanScheduler(new_scheduler(args))
+    start = time.perf_counter()
+    for order in batch:
+        scheduler.schedule(*order)
+    tree = time.perf_counter() - start
+
+    scan_orders = batch[:args.scan_orders or len(batch)]
+    start = time.perf_counter()
+    for order in scan_orders:
+        scan.schedule(*order)
+    walk = time.perf_counter() - start
+    for order_id, _, _, _ in scan_orders:
+        assert scan.placements[order_id][1] == scheduler.get(order_id).allocations
+
+    waits = [(p.start - ORIGIN).days - p.earliest for p in scheduler._placements.values()]
+    last = max(p.finish for p in scheduler._placements.values())
+    print(f"  booked to {last}, mean wait after lead time {sum(waits) / len(waits):.1f} days, "
+          f"worst {max(waits)}")
+    print(f"  {'placement':<40}{'µs/order':>10}{'orders/s':>12}")
+    print(f"  {'ProductionScheduler':<40}{tree / len(batch) * 1e6:>10.1f}"
+          f"{len(batch) / tree:>12,.0f}")
+    print(f"  {f'calendar walk ({len(scan_orders):,} orders)':<40}"
+          f"{walk / len(scan_orders) * 1e6:>10.1f}{len(scan_orders) / walk:>12,.0f}")
+
+    middle = ORIGIN + (last - ORIGIN) / 2
+    start = time.perf_counter()
+    moved = scheduler.set_capacity("workshop-0", "line-0", middle, middle + timedelta(days=13), 0)
+    elapsed = time.perf_counter() - start
+    print(f"  {'line-0 shut for 2 weeks from ' + middle.isoformat():<40}"
+          f"{elapsed * 1000:>10.1f} ms, {len(moved):,} orders moved")
+    start = time.perf_counter()
+    moved = scheduler.add_line("workshop-0", "line-extra", HOURS_PER_DAY, from_date=middle)
+    elapsed = time.perf_counter() - start
+    print(f"  {'line added from ' + middle.isoformat():<40}"
+          f"{elapsed * 1000:>10.1f} ms, {len(moved):,} orders moved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--scan-orders", type=int, default=None,
+                        help="orders placed by the calendar walk (default: all)")
+    parser.add_argument("--workshops", type=int, default=3)
+    parser.add_argument("--lines", type=int, default=6)
+    parser.add_argument("--load", type=float, nargs="+", default=[0.95, 1.05])
+    args = parser.parse_args()
+    for load in args.load:
+        run(args, load)
+
+
+if __name__ == "__main__":
+    main()
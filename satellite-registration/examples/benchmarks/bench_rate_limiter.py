@@ -0,0 +1,193 @@
+"""
+SFG Aluminium - Rate limiter benchmark
+
+Measures the manifest-driven rate limiter (rate_limiter.py):
+- check() per request: the in-memory GCRA backend and the shared SQLite
+  backend, over --keys clients
+- the added cost per request through ASGI: a trivial Starlette app with the
+  /messages/handle route, called directly (no server, no HTTP client, so
+  the middleware is not lost in their noise), with and without
+  RateLimitMiddleware
+- memory per client key, against a sliding-window log (a deque of request
+  times per key) holding a minute of traffic at --rate requests per minute,
+  and the time to sweep idle keys
+- Retry-After: a burst against 10/minute (the contact form's limit)
+
+Usage:
+    python benchmarks/bench_rate_limiter.py [--keys 100000] [--checks 1000000]
+        [--requests 100000]
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from rate_limiter import (Limit, MemoryBackend, RateLimiter,  # noqa: E402
+                          RateLimitMiddleware, SQLiteBackend)
+
+MANIFEST = {"apiEndpoints": [
+    {"path": "/api/contact", "rate_limit": "10/minute"},
+    {"path": "/api/messages/handle", "method": "POST", "rate_limit": "1000/minute"},
+]}
+
+
+class Clock:
+    """Synthetic time, moved on by the benchmark"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def bench_checks(backend, keys, count, clock):
+    limiter = RateLimiter.from_business_logic(MANIFEST, backend=backend, clock=clock)
+    limit = limiter.limits["/api/messages/handle"]
+    rng = random.Random(23)
+    batch = [f"/messages/handle {rng.randrange(keys)}" for _ in range(count)]
+    start = time.perf_counter()
+    for key in batch:
+        clock.now += 0.0001
+        limiter.check(key, limit)
+    elapsed = time.perf_counter() - start
+    return elapsed / count, limiter.stats()
+
+
+async def ok(request):
+    return Response(b"{}", media_type="application/json")
+
+
+def asgi_app(limiter):
+    app = Starlette(routes=[Route("/messages/handle", ok, methods=["POST"])])
+    if limiter is not None:
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return app
+
+
+async def drive(app, requests, clients):
+    """Call the app directly, request by request; seconds per request"""
+    async def receive():
+        return {"type": "http.request", "body": b"{}", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    statuses = []
+    scopes = [{"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+               "method": "POST", "scheme": "http", "path": "/messages/handle", "raw_path":
+               b"/messages/handle", "query_string": b"", "root_path": "", "headers": [],
+               "client": (f"10.0.{i // 256}.{i % 256}", 50000), "server": ("test", 80)}
+              for i in range(clients)]
+    for scope in scopes[:100]:                              # warm up, build the stack
+        await app(dict(scope), receive, send)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(scopes[i % clients]), receive, send)
+    elapsed = time.perf_counter() - start
+    return elapsed / requests, statuses.count(429)
+
+
+def memory_per_key(make, keys):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = make(keys)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / keys, held
+
+
+def gcra_keys(keys):
+    backend, limit = MemoryBackend(), Limit(1000, 60)
+    for i in range(keys):
+        backend.acquire(f"/messages/handle 10.{i >> 16}.{(i >> 8) & 255}.{i & 255}", limit, 0.0)
+    return backend
+
+
+def log_keys(keys, rate):
+    """Sliding-window log: one deque of the last minute's request times per key"""
+    windows = {}
+    for i in range(keys):
+        windows[f"/messages/handle 10.{i >> 16}.{(i >> 8) & 255}.{i & 255}"] = deque(
+            float(t) for t in range(rate))
+    return windows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--checks", type=int, default=1_000_000)
+    parser.add_argument("--sqlite-checks", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--rate", type=int, default=1000,
+                        help="requests per minute per key held by the sliding-window log")
+    args = parser.parse_args()
+
+    print(f"check() over {args.keys:,} clients at 1000/minute")
+    print(f"  {'backend':<40}{'µs/check':>10}{'checks/s':>12}{'limited':>10}")
+    per, stats = bench_checks(MemoryBackend(), args.keys, args.checks, Clock())
+    print(f"  {'memory (sharded dicts)':<40}{per * 1e6:>10.2f}{1 / per:>12,.0f}"
+          f"{stats['limited']:>10,}")
+    directory = tempfile.mkdtemp(prefix="sfg-limits-")
+    path = os.path.join(directory, "shared-state.db")
+    backend = SQLiteBackend(path)
+    per, stats = bench_checks(backend, args.keys, args.sqlite_checks, Clock())
+    print(f"  {f'sqlite, shared ({args.sqlite_checks:,} checks)':<40}{per * 1e6:>10.2f}"
+          f"{1 / per:>12,.0f}{stats['limited']:>10,}")
+    backend.close()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    print(f"\nASGI round trip, trivial app, {args.requests:,} requests from 1,000 clients")
+    print(f"  {'':<40}{'µs/request':>12}{'429s':>8}")
+    base, _ = asyncio.run(drive(asgi_app(None), args.requests, 1000))
+    print(f"  {'no middleware':<40}{base * 1e6:>12.2f}{0:>8}")
+    clock = Clock()
+    clock.now = time.time()
+    per, refused = asyncio.run(drive(asgi_app(RateLimiter.from_business_logic(
+        MANIFEST, clock=clock)), args.requests, 1000))
+    print(f"  {'RateLimitMiddleware (memory)':<40}{per * 1e6:>12.2f}{refused:>8,}")
+    print(f"  added per request: {(per - base) * 1e6:.2f} µs")
+
+    gcra_per, backend = memory_per_key(gcra_keys, args.keys)
+    log_per, _ = memory_per_key(lambda keys: log_keys(keys, args.rate), min(args.keys, 2_000))
+    print("\nmemory per client key")
+    print(f"  GCRA (one float per key):              {gcra_per:>10,.0f} bytes")
+    print(f"  sliding-window log, {args.rate}/minute:      {log_per:>10,.0f} bytes")
+    start = time.perf_counter()
+    evicted = sum(backend.sweep(1e9) for _ in range(len(backend._shards)))
+    elapsed = time.perf_counter() - start
+    print(f"  sweeping {evicted:,} idle keys: {elapsed * 1000:.1f} ms in all, "
+          f"{elapsed / len(backend._shards) * 1000:.1f} ms per shard (one per sweep)")
+
+    clock = Clock()
+    limiter = RateLimiter.from_business_logic(MANIFEST, clock=clock)
+    contact = limiter.limits["/api/contact"]
+    waits = [limiter.check("/api/contact 203.0.113.9", contact) for _ in range(12)]
+    allowed = sum(1 for wait in waits if not wait)
+    print(f"\nburst of 12 at 10/minute: {allowed} allowed, then Retry-After "
+          f"{waits[allowed]:.0f} s and {waits[allowed + 1]:.0f} s")
+    clock.now += waits[allowed]
+    print(f"  {waits[allowed]:.0f} s later: "
+          f"{'allowed' if not limiter.check('/api/contact 203.0.113.9', contact) else 'refused'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+SFG Aluminium - Record store benchmark
+
+Loads --records quotes (default 1,000,000, spread over --customers customers
+and two years of created_at) into a RecordStore and measures
+- bulk import rate (put_many in BATCH_SIZE transactions)
+- point lookups by id: blocking get() and AsyncRecordStore.get() with
+  --concurrency lookups in flight on the connection pool
+- range scans on each secondary index: a customer's latest 20 quotes, the
+  newest 100 quotes with a status, and one day of quotes by created_at
+
+For comparison the same lookups run against the one-JSON-file-per-record
+layout the data/ directory was meant to use, at --file-records (a customer
+scan there has to read every file, so it is measured at that size only).
+
+Usage:
+    python benchmarks/bench_record_store.py [--records 1000000] [--db PATH]
+        [--lookups 20000] [--concurrency 64] [--file-records 20000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from record_store import BATCH_SIZE, AsyncRecordStore, RecordStore  # noqa: E402
+
+STATUSES = ["draft", "sent", "accepted", "rejected"]
+START = datetime(2024, 1, 1)
+SPAN_MINUTES = 2 * 365 * 24 * 60
+
+
+def quote(i, customers, rng):
+    created = START + timedelta(minutes=rng.randrange(SPAN_MINUTES))
+    lines = rng.randint(1, 4)
+    return {
+        "id": f"QUO-{i:08d}",
+        "quote_number": f"QUO-{created:%y%m%d}-{i % 10000:04d}",
+        "enquiry_id": f"ENQ-{i:08d}",
+        "customer_id": f"CUST-{rng.randrange(customers):06d}",
+        "customer_name": "Brown Developments Ltd",
+        "items": [{"sku": "Commercial Curtain Wall System", "quantity": rng.randint(1, 80),
+                   "price": round(rng.uniform(200, 2000), 2)} for _ in range(lines)],
+        "total_amount": round(rng.uniform(1000, 150000), 2),
+        "margin": round(rng.uniform(0.12, 0.35), 3),
+        "status": rng.choice(STATUSES),
+        "created_at": created.isoformat() + "Z",
+        "expires_at": (created + timedelta(days=30)).date().isoformat(),
+    }
+
+
+def timed(label, fn, count, unit="µs/op"):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<44}{elapsed / count * 1e6:>10.1f} {unit}   ({count / elapsed:>10,.0f}/s)")
+    return elapsed
+
+
+def bench_store(store, args, rng):
+    ids = [f"QUO-{rng.randrange(args.records):08d}" for _ in range(args.lookups)]
+    customers = [f"CUST-{rng.randrange(args.customers):06d}" for _ in range(args.scans)]
+    days = [(START + timedelta(days=rng.randrange(729))) for _ in range(args.scans)]
+
+    print("\nPoint lookups")
+    timed("get() by id", lambda: [store.get("quotes", i) for i in ids], len(ids))
+
+    async_store = AsyncRecordStore(store)
+
+    async def concurrent():
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def one(record_id):
+            async with sem:
+                return await async_store.get("quotes", record_id)
+        return await asyncio.gather(*(one(i) for i in ids))
+
+    timed(f"AsyncRecordStore.get(), {args.concurrency} in flight",
+          lambda: asyncio.run(concurrent()), len(ids))
+    timed("get_many() by id, 100 per call",
+          lambda: [store.get_many("quotes", ids[i:i + 100]) for i in range(0, len(ids), 100)],
+          len(ids), unit="µs/record")
+
+    print("\nRange scans")
+    found = []
+    timed("customer_id: latest 20",
+          lambda: found.extend(len(store.find("quotes", customer_id=c, limit=20))
+                               for c in customers), len(customers))
+    print(f"  {'':<44}avg {sum(found) / len(found):.1f} rows")
+    found.clear()
+    timed("status + created_at: newest 100 before a day",
+          lambda: found.extend(len(store.find("quotes", status=rng.choice(STATUSES),
+                                              until=d.isoformat(), limit=100)) for d in days),
+          len(days))
+    print(f"  {'':<44}avg {sum(found) / len(found):.1f} rows")
+    found.clear()
+    timed("created_at: one day",
+          lambda: found.extend(len(store.find("quotes", since=d.isoformat(),
+                                              until=(d + timedelta(days=1)).isoformat(),
+                                              limit=10000, newest_first=False)) for d in days),
+          len(days))
+    print(f"  {'':<44}avg {sum(found) / len(found):.1f} rows")
+    timed("count(): one customer", lambda: [store.count("quotes", customer_id=c) for c in customers],
+          len(customers))
+    async_store.close()
+
+
+def bench_files(args, rng):
+    """The one-JSON-file-per-record layout at args.file_records"""
+    directory = tempfile.mkdtemp(prefix="sfg-records-files-")
+    try:
+        start = time.perf_counter()
+        for i in range(args.file_records):
+            with open(os.path.join(directory, f"QUO-{i:08d}.json"), "w") as f:
+                json.dump(quote(i, args.customers, rng), f)
+        elapsed = time.perf_counter() - start
+        print(f"\nOne JSON file per record, {args.file_records:,} files")
+        print(f"  {'write':<44}{elapsed / args.file_records * 1e6:>10.1f} µs/op   "
+              f"({args.file_records / elapsed:>10,.0f}/s)")
+
+        ids = [f"QUO-{rng.randrange(args.file_records):08d}" for _ in range(args.lookups)]
+
+        def read(record_id):
+            with open(os.path.join(directory, record_id + ".json")) as f:
+                return json.load(f)
+
+        timed("read file by id", lambda: [read(i) for i in ids], len(ids))
+
+        def customer_scan(customer_id):
+            rows = []
+            for name in os.listdir(directory):
+                record = read(name[:-5])
+                if record["customer_id"] == customer_id:
+                    rows.append(record)
+            rows.sort(key=lambda r: r["created_at"], reverse=True)
+            return rows[:20]
+
+        scans = max(1, args.scans // 100)
+        timed("customer_id: latest 20 (reads every file)",
+              lambda: [customer_scan(f"CUST-{rng.randrange(args.customers):06d}")
+                       for _ in range(scans)], scans)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=20_000)
+    parser.add_argument("--db", default=None, help="store file (default: a temporary file)")
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--scans", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--file-records", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    directory = None if args.db else tempfile.mkdtemp(prefix="sfg-records-")
+    path = args.db or os.path.join(directory, "records.db")
+    store = RecordStore(path)
+    try:
+        existing = store.count("quotes")
+        if existing < args.records:
+            print(f"Importing {args.records - existing:,} quotes into {path}")
+
+            def load():
+                for start in range(existing, args.records, BATCH_SIZE):
+                    store.put_many("quotes", (quote(i, args.customers, rng) for i in
+                                              range(start, min(start + BATCH_SIZE, args.records))))
+            timed("put_many() (includes building the records)", load, args.records - existing)
+        size = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+        print(f"{store.count('quotes'):,} quotes, {size / 1e6:,.0f} MB on disk")
+        bench_store(store, args, rng)
+    finally:
+        store.close()
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+    bench_files(args, rng)
+
+
+if __name__ == "__main__":
+    main()
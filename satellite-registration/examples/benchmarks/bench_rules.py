@@ -0,0 +1,89 @@
+"""
+SFG Aluminium - Business rules throughput benchmark
+
+Compiles the businessRules of every manifest in the portfolio
+(config/business-logic.json and apps/*/business-logic.json) and reports
+compile time and rules evaluated per second against synthetic events.
+
+Usage:
+    python benchmarks/bench_rules.py [--root ../..] [--events 200000]
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from rules_engine import RulesEngine  # noqa: E402
+
+
+def load_manifests(root):
+    paths = [os.path.join(root, "config", "business-logic.json")]
+    paths += sorted(glob.glob(os.path.join(root, "apps", "*", "business-logic.json")))
+    manifests = {}
+    for path in paths:
+        try:
+            with open(path) as f:
+                manifests[os.path.relpath(path, root)] = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  skipped {os.path.relpath(path, root)}: {e}")
+    return manifests
+
+
+def make_event(rng):
+    value = rng.uniform(500, 250000)
+    return {
+        "estimated_value": value,
+        "order_value": value,
+        "value": value,
+        "tier_limit": rng.choice([1000, 10000, 25000, 100000]),
+        "margin": rng.uniform(0.05, 0.4),
+        "credit_check_age": rng.randint(0, 200),
+        "confidence": rng.random(),
+        "user": {"role": rng.choice(["ADMIN", "USER"])},
+        "valid_email_format": True,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--root", default=os.path.join(HERE, "..", "..", ".."))
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    manifests = load_manifests(os.path.abspath(args.root))
+
+    start = time.perf_counter()
+    engines = {name: RulesEngine.from_manifest(bl) for name, bl in manifests.items()}
+    compile_time = time.perf_counter() - start
+    compiled = sum(len(e.rules) for e in engines.values())
+    skipped = sum(len(e.skipped) for e in engines.values())
+    print(f"{len(engines)} manifests, {compiled} rules compiled, {skipped} descriptive rules "
+          f"skipped in {compile_time * 1e3:.2f} ms\n")
+
+    rng = random.Random(7)
+    events = [make_event(rng) for _ in range(1000)]
+    portfolio = list(engines.values())
+
+    evaluated = matched = 0
+    start = time.perf_counter()
+    for i in range(args.events):
+        event = events[i % len(events)]
+        engine = portfolio[i % len(portfolio)]
+        matched += len(engine.evaluate(event))
+        evaluated += len(engine.rules)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.events} events in {elapsed:.2f} s")
+    print(f"  {args.events / elapsed:12,.0f} events/s")
+    print(f"  {evaluated / elapsed:12,.0f} rules/s ({matched} matches)")
+
+
+if __name__ == "__main__":
+    main()
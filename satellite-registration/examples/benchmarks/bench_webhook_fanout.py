@@ -0,0 +1,147 @@
+"""
+SFG Aluminium - Webhook fan-out benchmark
+
+Starts stub receiver processes (keep-alive HTTP/1.1 servers that verify
+X-Nexus-Signature and count events), subscribes them to a WebhookDispatcher
+and measures sustained deliveries per second with and without batching.
+One extra subscriber points at a closed port to show its circuit breaker
+opening without slowing the healthy ones.
+
+Usage:
+    python benchmarks/bench_webhook_fanout.py [--events 20000] [--receivers 4]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from webhook_dispatcher import BATCH_EVENT, WebhookDispatcher  # noqa: E402
+from webhook_verifier import WebhookVerifier  # noqa: E402
+
+SECRET = "your-webhook-secret-here"
+EVENT_TYPES = ["enquiry.created", "quote.requested", "order.approved", "payment.received"]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def run_receiver(port, received, bad, ready):
+    """Stub subscriber: verify every body, count the events it carries"""
+    verifier = WebhookVerifier([SECRET])
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length, signature = 0, None
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    name = name.strip().lower()
+                    if name == b"content-length":
+                        length = int(value)
+                    elif name == b"x-nexus-signature":
+                        signature = value.strip().decode()
+                body = await reader.readexactly(length)
+                if verifier.verify(body, signature):
+                    event = json.loads(body)
+                    count = len(event["data"]["events"]) if event["type"] == BATCH_EVENT else 1
+                    with received.get_lock():
+                        received.value += count
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+                else:
+                    with bad.get_lock():
+                        bad.value += 1
+                    writer.write(b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 2\r\n\r\n{}")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", port, backlog=512)
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+async def run(ports, events, batch_size, dead_port):
+    dispatcher = WebhookDispatcher(WebhookVerifier([SECRET]), batch_size=batch_size,
+                                   max_pending=events + 1, reset_timeout=60.0,
+                                   failure_threshold=3, base_delay=0.05)
+    for i, port in enumerate(ports):
+        # Every receiver takes quotes and orders; half also take all enquiries
+        patterns = ["quote.*", "order.approved"] + (["enquiry.*"] if i % 2 == 0 else [])
+        dispatcher.subscribe(f"receiver-{i}", f"http://127.0.0.1:{port}/webhooks/nexus", patterns)
+    dispatcher.subscribe("dead-app", f"http://127.0.0.1:{dead_port}/webhooks/nexus", ["*"])
+    await dispatcher.start()
+
+    healthy = [s for s in dispatcher.subscribers.values() if s.name != "dead-app"]
+    data = {"enquiry_id": "ENQ-20251105-001", "customer": {"id": "CUST-001", "name": "Acme"},
+            "items": [{"sku": "SKU-1", "qty": 2, "price": 165.0}]}
+    start = time.perf_counter()
+    queued = 0
+    for i in range(events):
+        event_type = EVENT_TYPES[i % len(EVENT_TYPES)]
+        queued += sum(1 for s in dispatcher.targets(event_type) if s in healthy)
+        dispatcher.publish(event_type, data)
+        if i % 500 == 499:
+            await asyncio.sleep(0)  # let the senders run while publishing
+    await asyncio.gather(*(s.queue.join() for s in healthy))
+    elapsed = time.perf_counter() - start
+
+    stats = dispatcher.stats()["subscribers"]
+    await dispatcher.stop(timeout=0)
+    return elapsed, queued, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--receivers", type=int, default=4)
+    parser.add_argument("--batch-sizes", default="1,50")
+    args = parser.parse_args()
+
+    ports = [free_port() for _ in range(args.receivers)]
+    counters = [(multiprocessing.Value("l", 0), multiprocessing.Value("l", 0)) for _ in ports]
+    processes = []
+    for port, (received, bad) in zip(ports, counters):
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=run_receiver, args=(port, received, bad, ready),
+                                          daemon=True)
+        process.start()
+        ready.wait(10)
+        processes.append(process)
+
+    try:
+        for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+            for received, bad in counters:
+                received.value = bad.value = 0
+            elapsed, queued, stats = asyncio.run(run(ports, args.events, batch_size, free_port()))
+            delivered = sum(received.value for received, _ in counters)
+            rejected = sum(bad.value for _, bad in counters)
+            batches = sum(s["batches"] for name, s in stats.items() if name != "dead-app")
+            dead = stats["dead-app"]
+            print(f"batch_size={batch_size:<3} {args.events} events -> {delivered}/{queued} deliveries "
+                  f"to {len(ports)} receivers in {elapsed:.2f}s: {delivered / elapsed:10,.0f} deliveries/s "
+                  f"({batches} requests, {rejected} bad signatures); dead-app breaker "
+                  f"{dead['breaker']} after {dead['retries']} retries")
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
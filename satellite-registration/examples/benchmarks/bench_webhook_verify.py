@@ -0,0 +1,74 @@
+"""
+SFG Aluminium - Webhook verify+parse micro-benchmark
+
+Compares the per-request cost of the original handler (hmac.new per request,
+body parsed twice) with WebhookVerifier (pre-keyed template .copy(), parsed
+once).
+
+Usage:
+    python benchmarks/bench_webhook_verify.py [--iterations 20000] [--items 20]
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from webhook_verifier import WebhookVerifier  # noqa: E402
+
+SECRET = "your-webhook-secret-here"
+
+
+def make_body(items: int) -> bytes:
+    event = {
+        "type": "quote.requested",
+        "data": {
+            "enquiry_id": "ENQ-20251105-001",
+            "customer_tier": "sapphire",
+            "items": [
+                {"sku": f"SKU-{i:05d}", "cost": 120.0 + i, "price": 165.0 + i, "qty": 2}
+                for i in range(items)
+            ],
+        },
+    }
+    return json.dumps(event).encode()
+
+
+def baseline(body: bytes, signature: str):
+    expected = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(signature or "", expected):
+        raise ValueError("Invalid signature")
+    json.loads(body)  # request.body() consumers parse once...
+    return json.loads(body)  # ...and request.json() parses again
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=20)
+    args = parser.parse_args()
+
+    body = make_body(args.items)
+    signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    single = WebhookVerifier([SECRET])
+    rotating = WebhookVerifier(["next-secret", SECRET])
+
+    cases = {
+        "baseline (hmac.new + 2x parse)": lambda: baseline(body, signature),
+        "verifier (1 secret)": lambda: single.verify_and_parse(body, signature),
+        "verifier (2 secrets, rotating)": lambda: rotating.verify_and_parse(body, signature),
+    }
+
+    print(f"Body size: {len(body)} bytes, {args.iterations} iterations\n")
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        print(f"{name:34s} {seconds / args.iterations * 1e6:8.2f} µs/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+SFG Aluminium - Worker scaling benchmark
+
+Serves the webhook handler with serve.py at 1..N worker processes and drives
+it with signed events for all seven webhook types (built by bench_handlers'
+PayloadFactory) from several load-generator processes over keep-alive
+connections, then reports requests per second and the speedup over one
+worker.
+
+After each run the merged /metrics total is compared with the number of
+requests sent, which checks that metrics published through the shared state
+file add up across workers.
+
+The load generators use raw HTTP/1.1 on asyncio streams (a few µs of CPU per
+request instead of httpx's ~1 ms) but still share the machine's cores with
+the server: throughput can only grow while there are idle cores, so expect
+flat numbers on a one- or two-core machine.
+
+Usage:
+    python benchmarks/bench_workers.py [--max-workers 4] [--duration 5]
+        [--clients 2] [--connections 16]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "..")
+
+from bench_handlers import ROOT, WEBHOOK_EVENTS, PayloadFactory, load_templates  # noqa: E402
+
+PATH = "/webhooks/nexus"
+WARMUP = 1.0
+
+# Workers publish metrics once a second; wait that long before comparing totals
+PUBLISH_WAIT = 1.5
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def build_requests(seed, count):
+    factory = PayloadFactory(load_templates(ROOT), seed)
+    requests = []
+    for i in range(count):
+        body, headers = factory.webhook(WEBHOOK_EVENTS[i % len(WEBHOOK_EVENTS)])
+        head = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        requests.append(f"POST {PATH} HTTP/1.1\r\nHost: bench\r\n{head}"
+                        f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    return requests
+
+
+def run_client(port, requests, connections, start_at, stop_at, results):
+    """Load-generator process: returns (requests completed in the window, errors, total sent)"""
+
+    async def connection(offset):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        done = errors = sent = 0
+        i = offset
+        try:
+            while True:
+                now = time.time()
+                if now >= stop_at:
+                    break
+                writer.write(requests[i % len(requests)])
+                i += connections
+                sent += 1
+                head = await reader.readuntil(b"\r\n\r\n")
+                status = int(head.split(b" ", 2)[1])
+                length = int(re.search(rb"(?i)content-length: *(\d+)", head).group(1))
+                await reader.readexactly(length)
+                if now >= start_at:
+                    done += 1
+                    errors += status >= 400
+        finally:
+            writer.close()
+        return done, errors, sent
+
+    async def main():
+        return await asyncio.gather(*(connection(i) for i in range(connections)))
+
+    outcome = asyncio.run(main())
+    results.put(tuple(sum(column) for column in zip(*outcome)))
+
+
+def get(port, path):
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=10) as response:
+        return response.read().decode()
+
+
+def wait_ready(port, workers, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if json.loads(get(port, "/health"))["workers"]["workers"] == workers:
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"serve.py did not start {workers} workers in {timeout}s")
+
+
+def metrics_total(port):
+    text = get(port, "/metrics")
+    pattern = rf'sfg_http_requests_total{{method="POST",path="{PATH}",status="\d+"}} (\d+)'
+    return sum(int(value) for value in re.findall(pattern, text))
+
+
+def run(workers, args, requests_per_client):
+    port = free_port()
+    state_dir = tempfile.mkdtemp(prefix="sfg-workers-")
+    env = dict(os.environ, SFG_LOG_LEVEL="warning", SFG_RATE_LIMITS="off",
+               SFG_SHARED_STATE=os.path.join(state_dir, "shared-state.db"))
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "webhook", "--workers", str(workers), "--port", str(port),
+         "--log-level", "warning"],
+        cwd=EXAMPLES, env=env, stdout=subprocess.DEVNULL)
+    try:
+        wait_ready(port, workers)
+        start_at = time.time() + WARMUP
+        stop_at = start_at + args.duration
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(
+            target=run_client,
+            args=(port, requests_per_client[i], args.connections, start_at, stop_at, results))
+            for i in range(args.clients)]
+        for client in clients:
+            client.start()
+        totals = [results.get(timeout=args.duration + 60) for _ in clients]
+        for client in clients:
+            client.join()
+        done, errors, sent = (sum(column) for column in zip(*totals))
+        time.sleep(PUBLISH_WAIT)
+        counted = metrics_total(port)
+        return done / args.duration, errors, sent, counted
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds measured per run")
+    parser.add_argument("--clients", type=int, default=2, help="load-generator processes")
+    parser.add_argument("--connections", type=int, default=16, help="connections per client")
+    parser.add_argument("--pool", type=int, default=20000,
+                        help="distinct events per client (repeats are idempotent replays)")
+    args = parser.parse_args()
+
+    print(f"Building {args.clients} x {args.pool} signed events...")
+    requests_per_client = [build_requests(seed, args.pool) for seed in range(args.clients)]
+    print(f"{os.cpu_count()} CPU core(s); {args.clients} clients x {args.connections} connections, "
+          f"{args.duration:.0f}s per run\n")
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'errors':>7} {'sent':>8} {'metrics':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        rps, errors, sent, counted = run(workers, args, requests_per_client)
+        baseline = baseline or rps
+        check = "ok" if counted == sent else f"{counted} (!)"
+        print(f"{workers:>7} {rps:>10,.0f} {rps / baseline:>7.2f}x {errors:>7} {sent:>8} {check:>8}")
+
+
+if __name__ == "__main__":
+    main()
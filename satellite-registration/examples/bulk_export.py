@@ -0,0 +1,164 @@
+"""
+SFG Aluminium - Bulk Export
+Version: 1.0.0
+Date: November 5, 2025
+
+Streams customers, quotes and orders from the record store as NDJSON (one
+record per line), for NEXUS and the Unified Dashboard to pull whole entity
+lists without one query.* message per record.
+
+- Rows are read PAGE_SIZE at a time (RecordStore.changes) and written as
+  they come: the stored JSON text goes out as it is, without being decoded
+  into dicts and encoded again, and the response holds no more than a page
+  however many records there are
+- Filters: status, customer_id, since/until (created_at, ISO 8601)
+- Pages are keyset pages in (updated_at, id) order, so rows written while
+  an export runs are never skipped. limit caps the rows in one response;
+  the trailer's next_cursor then continues the export
+- Deltas: every response carries the store's watermark (X-Watermark and the
+  trailer). Passing it back as ?modified_after= returns only the rows
+  written since, and 304 Not Modified when nothing was. If-Modified-Since
+  works the same way against Last-Modified, at whole-second precision (the
+  last second's rows come again)
+- Every response ends with a trailer line, {"_export": {...}}, giving the
+  rows sent, next_cursor (null when the export is complete) and the
+  watermark
+
+Deleted records are not reported in deltas.
+
+Usage:
+
+    exporter = BulkExporter(records)
+
+    @app.get("/export/{kind}")
+    async def export(kind: str, request: Request):
+        return await exporter.response(kind, request.query_params, request.headers)
+
+    GET /export/quotes?status=sent&since=2025-11-01
+    GET /export/quotes?modified_after=1762339200.123456
+"""
+
+import base64
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional, Tuple
+
+from fastapi.responses import Response, StreamingResponse
+
+from json_codec import dumps, loads
+from record_store import AsyncRecordStore
+
+EXPORT_KINDS = ("customers", "quotes", "orders")
+PAGE_SIZE = 1000
+
+MEDIA_TYPE = "application/x-ndjson"
+
+
+class InvalidExport(ValueError):
+    """A bad export parameter (answered with 400)"""
+
+
+def encode_cursor(updated_at: float, record_id: str) -> str:
+    return base64.urlsafe_b64encode(dumps([updated_at, record_id])).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        updated_at, record_id = loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(updated_at), str(record_id)
+    except (ValueError, TypeError):
+        raise InvalidExport("Invalid cursor") from None
+
+
+class ExportQuery:
+    """Filters and position of one export request"""
+
+    __slots__ = ("kind", "filters", "after", "modified_after", "limit")
+
+    def __init__(self, kind: str, filters: Dict[str, str], after: Optional[Tuple[float, str]],
+                 modified_after: Optional[float], limit: Optional[int]):
+        self.kind = kind
+        self.filters = filters
+        self.after = after
+        self.modified_after = modified_after
+        self.limit = limit
+
+    @classmethod
+    def from_request(cls, kind: str, params: Mapping[str, str],
+                     headers: Mapping[str, str]) -> "ExportQuery":
+        """From the query string and If-Modified-Since; raises InvalidExport"""
+        if kind not in EXPORT_KINDS:
+            raise InvalidExport(f"Unknown export {kind!r} (expected one of "
+                                f"{', '.join(EXPORT_KINDS)})")
+        filters = {name: params[name] for name in ("status", "customer_id", "since", "until")
+                   if params.get(name)}
+        after = decode_cursor(params["cursor"]) if params.get("cursor") else None
+        modified_after = _number(params, "modified_after", float)
+        if modified_after is None and headers.get("if-modified-since"):
+            try:
+                # Whole seconds: rows of that second are sent again
+                modified_after = parsedate_to_datetime(
+                    headers["if-modified-since"]).timestamp() - 1e-6
+            except (TypeError, ValueError):
+                pass                                    # ignored, as HTTP says
+        limit = _number(params, "limit", int)
+        if limit is not None and limit <= 0:
+            raise InvalidExport("limit must be positive")
+        return cls(kind, filters, after, modified_after, limit)
+
+
+class BulkExporter:
+    """NDJSON export responses over an AsyncRecordStore"""
+
+    def __init__(self, records: AsyncRecordStore, page_size: int = PAGE_SIZE):
+        self.records = records
+        self.page_size = page_size
+        self._counters = {"exports": 0, "not_modified": 0, "rows": 0}
+
+    async def response(self, kind: str, params: Mapping[str, str],
+                       headers: Mapping[str, str]) -> Response:
+        """304, or a StreamingResponse of the matching rows; raises InvalidExport"""
+        query = ExportQuery.from_request(kind, params, headers)
+        watermark = await self.records.last_modified(kind)
+        validators = {"X-Watermark": repr(watermark or 0.0), "Cache-Control": "no-cache"}
+        if watermark is not None:
+            validators["Last-Modified"] = formatdate(watermark, usegmt=True)
+        if (query.modified_after is not None and query.after is None
+                and (watermark is None or watermark <= query.modified_after)):
+            self._counters["not_modified"] += 1
+            return Response(status_code=304, headers=validators)
+        self._counters["exports"] += 1
+        return StreamingResponse(self.stream(query, watermark), media_type=MEDIA_TYPE,
+                                 headers=validators)
+
+    async def stream(self, query: ExportQuery, watermark: Optional[float]) -> AsyncIterator[bytes]:
+        """One chunk of NDJSON lines per page, then the trailer line"""
+        after, sent, more = query.after, 0, True
+        while more:
+            size = self.page_size if query.limit is None else min(self.page_size,
+                                                                  query.limit - sent)
+            rows = await self.records.changes(
+                query.kind, after=after, modified_after=query.modified_after, limit=size,
+                **query.filters)
+            more = len(rows) == size
+            if rows:
+                after = rows[-1][:2]
+                sent += len(rows)
+                self._counters["rows"] += len(rows)
+                yield "\n".join(data for _, _, data in rows).encode() + b"\n"
+            if query.limit is not None and sent >= query.limit:
+                break
+        next_cursor = encode_cursor(*after) if more and after else None
+        yield dumps({"_export": {"rows": sent, "next_cursor": next_cursor,
+                                 "watermark": watermark}}) + b"\n"
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters)
+
+
+def _number(params: Mapping[str, str], name: str, kind):
+    if not params.get(name):
+        return None
+    try:
+        return kind(params[name])
+    except ValueError:
+        raise InvalidExport(f"{name} must be a number") from None
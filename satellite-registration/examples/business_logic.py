@@ -0,0 +1,55 @@
+"""
+SFG Aluminium - Business Logic Manifest Loader
+Version: 1.0.0
+Date: November 5, 2025
+
+Loads the app's business-logic.json so handlers can use the numbers it
+declares instead of hard-coding their own copies.
+
+The path defaults to business-logic.json in the working directory (the same
+file autonomous_registration.py registers) and can be overridden with
+SFG_BUSINESS_LOGIC.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PATH = "business-logic.json"
+
+
+def manifest_path(path: Optional[str] = None) -> str:
+    return path or os.environ.get("SFG_BUSINESS_LOGIC", DEFAULT_PATH)
+
+
+def load_business_logic(path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Load the manifest, or None if it does not exist"""
+    path = manifest_path(path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def business_rules(bl: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The rules list (manifests use either businessRules or business_rules)"""
+    if not bl:
+        return []
+    rules = bl.get("businessRules", bl.get("business_rules", []))
+    return [rule for rule in rules if isinstance(rule, dict)]
+
+
+def data_models(bl: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The data model list (manifests use either dataModels or data_models)"""
+    if not bl:
+        return []
+    models = bl.get("dataModels", bl.get("data_models", []))
+    return [model for model in models if isinstance(model, dict)]
+
+
+def scheduling_rules(bl: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Scheduling settings (fabrication_lead_time, ...), top level or in business_rules_summary"""
+    if not bl:
+        return {}
+    scheduling = bl.get("scheduling") or (bl.get("business_rules_summary") or {}).get("scheduling")
+    return scheduling if isinstance(scheduling, dict) else {}
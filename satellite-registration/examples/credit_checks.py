@@ -0,0 +1,496 @@
+"""
+SFG Aluminium - Credit Checks
+Version: 1.0.0
+Date: November 5, 2025
+
+Credit checks for credit.check_required and the credit.request_check job,
+replacing the hard-coded score in the webhook handler.
+
+- Experian (score, via MCP-FINANCE) and Companies House (company status)
+  are looked up in parallel, each under its own timeout, so a check takes
+  as long as the slower bureau rather than the sum of both
+- Complete results are cached per customer for the "Credit check
+  validity" period (credit_check_age < 90_days in businessRules); with a
+  db_path they persist in SQLite, shared by every worker, so a restart
+  does not pay for the same check again. Results with a failed or timed
+  out lookup are returned but not cached
+- Concurrent checks for one customer share one lookup
+- check_many() re-checks customers in batches: connectors with a
+  lookup_many() bulk call get one request per batch, others are called per
+  customer with bounded concurrency
+- MockExperian / MockCompaniesHouse answer deterministically per customer
+  after a configurable latency, for offline development and benchmarks.
+  from_env() uses them only when SFG_CREDIT_MOCK=1; otherwise a bureau
+  without SFG_EXPERIAN_URL / COMPANIES_HOUSE_API_KEY is unconfigured, its
+  lookups fail and checker.configured is False, so callers hold the check
+  as pending rather than approve on an invented score. stats() reports each
+  connector's mode (live, mock or unconfigured)
+
+Usage:
+
+    credit = CreditChecker.from_env(load_business_logic(), db_path="credit.db")
+    result = await credit.check("CUST-1", company_number="12345678")
+    decision = credit.decide(result, order_value=25000)
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from business_logic import business_rules
+
+CHECK_VALIDITY_DAYS = 90
+CONNECTOR_TIMEOUT = 5.0             # seconds per bureau call
+RECHECK_BATCH = 50                  # customers per bulk re-check request
+RECHECK_CONCURRENCY = 4             # batches (or single lookups) in flight
+
+# (minimum score, credit limit), highest band first. A score in the top
+# band is approved outright; lower bands approve orders up to the limit.
+SCORE_BANDS: Tuple[Tuple[int, int], ...] = ((700, 50000), (600, 25000), (0, 10000))
+
+# Companies House statuses that stop credit being extended
+INACTIVE_STATUSES = frozenset({
+    "dissolved", "liquidation", "receivership", "administration", "converted-closed",
+    "insolvency-proceedings", "not_found",
+})
+
+COMPANIES_HOUSE_URL = "https://api.company-information.service.gov.uk"
+
+_VALIDITY = re.compile(r"credit_check_age\s*<=?\s*(\d+)[\s_]*days?")
+
+Subject = Tuple[str, Optional[str]]     # (customer_id, company_number)
+
+
+class ConnectorError(Exception):
+    """A bureau lookup failed (status is the HTTP status, if there was one)"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CreditResult:
+    """One customer's combined Experian and Companies House answer"""
+
+    __slots__ = ("customer_id", "company_number", "score", "company_status", "checked_at",
+                 "errors")
+
+    def __init__(self, customer_id: str, company_number: Optional[str], score: Optional[int],
+                 company_status: Optional[str], checked_at: float, errors: Sequence[str] = ()):
+        self.customer_id = customer_id
+        self.company_number = company_number
+        self.score = score
+        self.company_status = company_status
+        self.checked_at = checked_at
+        self.errors = tuple(errors)
+
+    @property
+    def complete(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"customer_id": self.customer_id, "company_number": self.company_number,
+                "score": self.score, "company_status": self.company_status,
+                "checked_at": self.checked_at, "errors": list(self.errors)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CreditResult":
+        return cls(data["customer_id"], data.get("company_number"), data.get("score"),
+                   data.get("company_status"), data["checked_at"], data.get("errors", ()))
+
+
+class _MockConnector:
+    """Deterministic offline answers after `latency` seconds"""
+
+    name = "mock"
+    mode = "mock"
+
+    def __init__(self, latency: float = 0.0, batch_latency: Optional[float] = None):
+        self.latency = latency
+        # A bulk request costs one round trip, however many customers it carries
+        self.batch_latency = latency if batch_latency is None else batch_latency
+        self.calls = 0
+        self.batch_calls = 0
+
+    async def lookup(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._answer(customer_id, company_number)
+
+    async def lookup_many(self, subjects: Sequence[Subject]) -> Dict[str, Dict[str, Any]]:
+        self.batch_calls += 1
+        if self.batch_latency:
+            await asyncio.sleep(self.batch_latency)
+        return {customer_id: self._answer(customer_id, company_number)
+                for customer_id, company_number in subjects}
+
+    def _answer(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    @staticmethod
+    def _digest(value: str) -> int:
+        return int.from_bytes(hashlib.sha256(value.encode()).digest()[:4], "big")
+
+
+class MockExperian(_MockConnector):
+    """Scores 300-999, stable per customer"""
+
+    name = "experian"
+
+    def _answer(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        return {"score": 300 + self._digest(customer_id) % 700}
+
+
+class MockCompaniesHouse(_MockConnector):
+    """Most companies active, one in twenty dissolved"""
+
+    name = "companies_house"
+
+    def _answer(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        if not company_number:
+            return {}
+        dissolved = self._digest(company_number) % 20 == 0
+        return {"company_status": "dissolved" if dissolved else "active"}
+
+
+class UnconfiguredConnector:
+    """Stands in for a bureau with no endpoint or key: every lookup fails"""
+
+    mode = "unconfigured"
+
+    def __init__(self, name: str, setting: str):
+        self.name = name
+        self.setting = setting
+
+    async def lookup(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        raise ConnectorError(f"not configured (set {self.setting})")
+
+
+class ExperianConnector:
+    """Experian scores through the MCP-FINANCE credit-check endpoint"""
+
+    name = "experian"
+    mode = "live"
+
+    def __init__(self, url: str, api_key: Optional[str] = None):
+        self.url = url
+        self.api_key = api_key
+
+    async def lookup(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        body = json.dumps({"customer_id": customer_id, "company_number": company_number}).encode()
+        data = await _request(urllib.request.Request(self.url, data=body, headers=headers,
+                                                     method="POST"))
+        if not isinstance(data, dict) or not isinstance(data.get("score"), (int, float)):
+            raise ConnectorError("Experian response has no score")
+        return {"score": int(data["score"])}
+
+
+class CompaniesHouseConnector:
+    """Company status from the Companies House public data API"""
+
+    name = "companies_house"
+    mode = "live"
+
+    def __init__(self, api_key: str, base_url: str = COMPANIES_HOUSE_URL):
+        self.base_url = base_url.rstrip("/")
+        self._auth = "Basic " + base64.b64encode(f"{api_key}:".encode()).decode()
+
+    async def lookup(self, customer_id: str, company_number: Optional[str]) -> Dict[str, Any]:
+        if not company_number:
+            return {}   # sole traders and individuals have nothing to verify
+        url = f"{self.base_url}/company/{urllib.parse.quote(company_number)}"
+        try:
+            data = await _request(urllib.request.Request(url, headers={"Authorization": self._auth}))
+        except ConnectorError as e:
+            if e.status == 404:
+                return {"company_status": "not_found"}
+            raise
+        return {"company_status": data.get("company_status")}
+
+
+async def _request(req: urllib.request.Request) -> Any:
+    def send():
+        try:
+            with urllib.request.urlopen(req, timeout=CONNECTOR_TIMEOUT) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise ConnectorError(f"HTTP {e.code} from {req.full_url}", e.code) from e
+        except (urllib.error.URLError, ValueError) as e:
+            raise ConnectorError(str(e)) from e
+    return await asyncio.to_thread(send)
+
+
+class CreditChecker:
+    """Cached, coalesced credit checks against Experian and Companies House"""
+
+    def __init__(self, experian, companies_house, validity_days: float = CHECK_VALIDITY_DAYS,
+                 timeout: float = CONNECTOR_TIMEOUT, db_path: Optional[str] = None,
+                 clock=time.time):
+        self.experian = experian
+        self.companies_house = companies_house
+        self.validity = validity_days * 86400
+        self.timeout = timeout
+        self._clock = clock
+        self._results: Dict[str, CreditResult] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db = _open_db(db_path) if db_path else None
+        self._counters = {"hits": 0, "lookups": 0, "coalesced": 0, "incomplete": 0,
+                          "batches": 0}
+
+    @classmethod
+    def from_business_logic(cls, bl: Optional[Dict[str, Any]], experian, companies_house,
+                            **kwargs) -> "CreditChecker":
+        """Use the manifest's "Credit check validity" period"""
+        for rule in business_rules(bl):
+            match = _VALIDITY.search(str(rule.get("condition", "")))
+            if match:
+                kwargs.setdefault("validity_days", int(match.group(1)))
+                break
+        return cls(experian, companies_house, **kwargs)
+
+    @classmethod
+    def from_env(cls, bl: Optional[Dict[str, Any]], **kwargs) -> "CreditChecker":
+        """Mocks if SFG_CREDIT_MOCK=1, else real connectors where configured"""
+        if os.environ.get("SFG_CREDIT_MOCK") == "1":
+            return cls.from_business_logic(bl, MockExperian(), MockCompaniesHouse(), **kwargs)
+        experian_url = os.environ.get("SFG_EXPERIAN_URL")
+        experian = (ExperianConnector(experian_url, os.environ.get("SFG_EXPERIAN_API_KEY"))
+                    if experian_url else UnconfiguredConnector("experian", "SFG_EXPERIAN_URL"))
+        ch_key = os.environ.get("COMPANIES_HOUSE_API_KEY")
+        companies_house = (CompaniesHouseConnector(ch_key) if ch_key else
+                           UnconfiguredConnector("companies_house", "COMPANIES_HOUSE_API_KEY"))
+        return cls.from_business_logic(bl, experian, companies_house, **kwargs)
+
+    @property
+    def configured(self) -> bool:
+        """False if either bureau has no connector (checks cannot complete)"""
+        return all(getattr(connector, "mode", "live") != "unconfigured"
+                   for connector in (self.experian, self.companies_house))
+
+    def cached(self, customer_id: str) -> Optional[CreditResult]:
+        """The customer's check if it is still within the validity period"""
+        now = self._clock()
+        result = self._results.get(customer_id)
+        if result is not None and now - result.checked_at < self.validity:
+            return result
+        if self._db is not None:
+            # Another worker may have checked this customer
+            row = self._db.execute("SELECT result FROM credit_checks WHERE customer_id = ?",
+                                   (customer_id,)).fetchone()
+            if row:
+                result = CreditResult.from_dict(json.loads(row[0]))
+                self._results[customer_id] = result
+                if now - result.checked_at < self.validity:
+                    return result
+        return None
+
+    def age_days(self, customer_id: str) -> Optional[float]:
+        """Days since the customer's last valid check (credit_check_age), or None"""
+        result = self.cached(customer_id)
+        return None if result is None else (self._clock() - result.checked_at) / 86400
+
+    async def check(self, customer_id: str, company_number: Optional[str] = None,
+                    force: bool = False) -> CreditResult:
+        """The cached check if still valid (unless force), else a fresh lookup"""
+        if not force:
+            result = self.cached(customer_id)
+            if result is not None:
+                self._counters["hits"] += 1
+                return result
+        future = self._inflight.get(customer_id)
+        if future is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(future)
+        future = self._begin(customer_id)
+        try:
+            result = await self._lookup(customer_id, company_number)
+        except BaseException as e:
+            self._fail(customer_id, future, e)
+            raise
+        self._finish(future, result)
+        return result
+
+    async def check_many(self, subjects: Iterable[Subject], force: bool = False,
+                         batch_size: int = RECHECK_BATCH,
+                         concurrency: int = RECHECK_CONCURRENCY) -> Dict[str, CreditResult]:
+        """Check many customers, looking up the uncached ones in batches"""
+        results: Dict[str, CreditResult] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        todo: List[Subject] = []
+        for customer_id, company_number in subjects:
+            if customer_id in results or customer_id in waiting:
+                continue
+            cached = None if force else self.cached(customer_id)
+            if cached is not None:
+                self._counters["hits"] += 1
+                results[customer_id] = cached
+            elif customer_id in self._inflight:
+                self._counters["coalesced"] += 1
+                waiting[customer_id] = self._inflight[customer_id]
+            else:
+                todo.append((customer_id, company_number))
+
+        futures = {customer_id: self._begin(customer_id) for customer_id, _ in todo}
+        limit = asyncio.Semaphore(concurrency)
+
+        async def run_batch(batch: List[Subject]) -> None:
+            async with limit:
+                try:
+                    found = await self._lookup_batch(batch)
+                except BaseException as e:
+                    for customer_id, _ in batch:
+                        self._fail(customer_id, futures[customer_id], e)
+                    raise
+            for customer_id, _ in batch:
+                self._finish(futures[customer_id], found[customer_id])
+                results[customer_id] = found[customer_id]
+
+        await asyncio.gather(*(run_batch(todo[i:i + batch_size])
+                               for i in range(0, len(todo), batch_size)))
+        for customer_id, future in waiting.items():
+            results[customer_id] = await asyncio.shield(future)
+        return results
+
+    def expiring(self, within_days: float = 7) -> List[Subject]:
+        """Customers whose check runs out within the given number of days"""
+        cutoff = self._clock() - self.validity + within_days * 86400
+        if self._db is not None:
+            rows = self._db.execute(
+                "SELECT customer_id, result FROM credit_checks WHERE checked_at < ?",
+                (cutoff,)).fetchall()
+            return [(customer_id, json.loads(result).get("company_number"))
+                    for customer_id, result in rows]
+        return [(result.customer_id, result.company_number)
+                for result in self._results.values() if result.checked_at < cutoff]
+
+    def decide(self, result: CreditResult, order_value: float = 0) -> Dict[str, Any]:
+        """Credit limit and approval for an order value"""
+        if result.company_status in INACTIVE_STATUSES:
+            return {"credit_limit": 0, "approved": False,
+                    "reason": f"Company status is {result.company_status}"}
+        if result.score is None:
+            return {"credit_limit": 0, "approved": False, "reason": "Credit score unavailable"}
+        for index, (minimum, limit) in enumerate(SCORE_BANDS):
+            if result.score >= minimum:
+                return {"credit_limit": limit, "approved": index == 0 or order_value <= limit,
+                        "reason": None}
+        return {"credit_limit": 0, "approved": False, "reason": "Score below every band"}
+
+    def valid_until(self, result: CreditResult) -> float:
+        return result.checked_at + self.validity
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "cached": len(self._results), "inflight": len(self._inflight),
+                "validity_days": self.validity / 86400,
+                "configured": self.configured,
+                "connectors": {connector.name: getattr(connector, "mode", "live")
+                               for connector in (self.experian, self.companies_house)}}
+
+    def _begin(self, customer_id: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[customer_id] = future
+        return future
+
+    def _fail(self, customer_id: str, future: asyncio.Future, error: BaseException) -> None:
+        if self._inflight.get(customer_id) is future:
+            del self._inflight[customer_id]
+        future.set_exception(error)
+        future.exception()  # waiters re-raise; don't warn if there are none
+
+    def _finish(self, future: asyncio.Future, result: CreditResult) -> None:
+        if self._inflight.get(result.customer_id) is future:
+            del self._inflight[result.customer_id]
+        if result.complete:
+            self._store(result)
+        else:
+            self._counters["incomplete"] += 1
+        future.set_result(result)
+
+    async def _lookup(self, customer_id: str, company_number: Optional[str]) -> CreditResult:
+        self._counters["lookups"] += 1
+        (score, score_error), (company, company_error) = await asyncio.gather(
+            self._call(self.experian, self.experian.lookup(customer_id, company_number)),
+            self._call(self.companies_house,
+                       self.companies_house.lookup(customer_id, company_number)))
+        return self._combine(customer_id, company_number, score, company,
+                             [error for error in (score_error, company_error) if error])
+
+    async def _lookup_batch(self, batch: List[Subject]) -> Dict[str, CreditResult]:
+        self._counters["batches"] += 1
+        self._counters["lookups"] += len(batch)
+        (scores, score_errors), (companies, company_errors) = await asyncio.gather(
+            self._call_many(self.experian, batch), self._call_many(self.companies_house, batch))
+        results = {}
+        for customer_id, company_number in batch:
+            errors = [errors[customer_id] for errors in (score_errors, company_errors)
+                      if customer_id in errors]
+            results[customer_id] = self._combine(customer_id, company_number,
+                                                 scores.get(customer_id, {}),
+                                                 companies.get(customer_id, {}), errors)
+        return results
+
+    async def _call(self, connector, call) -> Tuple[Dict[str, Any], Optional[str]]:
+        """(answer, error) of one connector call under the timeout"""
+        try:
+            return await asyncio.wait_for(call, self.timeout), None
+        except asyncio.TimeoutError:
+            return {}, f"{connector.name} timed out after {self.timeout:g}s"
+        except Exception as e:
+            return {}, f"{connector.name}: {e}"
+
+    async def _call_many(self, connector, batch: List[Subject]
+                         ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """(answers, errors) by customer: one bulk call if the connector has one"""
+        lookup_many = getattr(connector, "lookup_many", None)
+        if lookup_many is not None:
+            answers, error = await self._call(connector, lookup_many(batch))
+            if error:
+                return {}, {customer_id: error for customer_id, _ in batch}
+            missing = f"{connector.name} returned no answer"
+            return answers, {customer_id: missing for customer_id, _ in batch
+                             if customer_id not in answers}
+        calls = await asyncio.gather(*(self._call(connector, connector.lookup(*subject))
+                                       for subject in batch))
+        answers, errors = {}, {}
+        for (customer_id, _), (answer, error) in zip(batch, calls):
+            answers[customer_id] = answer
+            if error:
+                errors[customer_id] = error
+        return answers, errors
+
+    def _combine(self, customer_id: str, company_number: Optional[str], score: Dict[str, Any],
+                 company: Dict[str, Any], errors: List[str]) -> CreditResult:
+        return CreditResult(customer_id, company_number, score.get("score"),
+                            company.get("company_status"), self._clock(), errors)
+
+    def _store(self, result: CreditResult) -> None:
+        self._results[result.customer_id] = result
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO credit_checks (customer_id, checked_at, result) "
+                "VALUES (?, ?, ?)",
+                (result.customer_id, result.checked_at, json.dumps(result.to_dict())))
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS credit_checks ("
+        "customer_id TEXT PRIMARY KEY, checked_at REAL NOT NULL, result TEXT NOT NULL)")
+    db.execute("CREATE INDEX IF NOT EXISTS credit_checks_checked_at ON credit_checks (checked_at)")
+    return db
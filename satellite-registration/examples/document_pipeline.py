@@ -0,0 +1,535 @@
+"""
+SFG Aluminium - Document Pipeline
+Version: 1.0.0
+Date: November 5, 2025
+
+Renders quote and invoice PDFs for action.create_quote and
+action.send_invoice into the repository's data/uploads (SFG_UPLOADS_DIR),
+so the pdf_url they return points at a document that exists.
+
+- Layout (wrapping descriptions, paging the line table, totals) and
+  compression are CPU work, so documents are rendered in a
+  ProcessPoolExecutor of SFG_DOCUMENT_WORKERS processes (default: one per
+  core, at most four) and never on the event loop. The pool starts with the
+  first document, by forkserver, since the handlers already run threads
+  (the workers import the main module again, so a script that renders
+  documents needs an if __name__ == "__main__" guard, as the handlers have)
+- The PDF is written directly (PDF 1.4, the standard Helvetica fonts,
+  nothing embedded), so no PDF library is needed. Identical input gives
+  identical bytes: there are no timestamps in the file
+- Fragments every document shares (the company header, the footer and the
+  terms) are laid out once per worker process and reused as content-stream
+  snippets; wrapped description lines are cached the same way, since the
+  same products come back in quote after quote
+- Identical requests are rendered once: a second request for a document
+  that is being rendered waits for that render, and a document that has not
+  changed since it was written is not rendered again
+- Each worker writes its document to a temporary file beside the target and
+  renames it into place, so data/uploads never holds a half-written PDF
+- Files are named by the document's "id", the full quote id or order id,
+  not by its printed "number" (QUO-/INV-yymmdd-<last four characters>),
+  which two orders can share: a pdf_url only ever serves its own document
+
+Usage:
+
+    documents = DocumentPipeline.from_env()
+    path = await documents.render("quote", quote_document(quote, items, customer))
+    url = documents.url("quote", quote["quote_id"])
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from json_codec import dumps
+
+KINDS = {"quote": "quotes", "invoice": "invoices"}      # kind -> uploads folder
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# The repository's data/uploads, wherever the handler is started from
+DEFAULT_DIRECTORY = os.path.normpath(os.path.join(HERE, "..", "..", "data", "uploads"))
+DEFAULT_URL = "/documents"
+MAX_WORKERS = 4
+RENDERED_MAX = 10000            # documents remembered as unchanged
+VAT_RATE = 0.20
+QUOTE_VALID_DAYS = 30
+PAYMENT_DAYS = 30
+
+COMPANY: Dict[str, Any] = {
+    "name": "SFG Aluminium Ltd",
+    "address": ["Aluminium windows, doors and curtain walling"],
+    "contact": ["info@sfgaluminium.co.uk", "www.sfgaluminium.co.uk"],
+}
+
+TERMS = {
+    "quote": [
+        f"This quotation is valid for {QUOTE_VALID_DAYS} days from its date. Prices exclude VAT, "
+        "which is added at the prevailing rate. Dimensions are subject to site survey before "
+        "manufacture; any change to sizes, specification or quantities will be requoted.",
+        "Orders are accepted subject to a satisfactory credit check. Lead times run from receipt "
+        "of approved drawings and deposit. Goods remain the property of SFG Aluminium Ltd until "
+        "paid for in full.",
+    ],
+    "invoice": [
+        f"Payment is due within {PAYMENT_DAYS} days of the invoice date. Please quote the invoice "
+        "number with your payment. Late payments may incur interest under the Late Payment of "
+        "Commercial Debts (Interest) Act 1998.",
+        "Goods remain the property of SFG Aluminium Ltd until paid for in full. Please report any "
+        "discrepancy within 7 days of receipt.",
+    ],
+}
+
+# Page geometry (points; A4) and the columns of the line table
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+LEFT, RIGHT = 50, 545
+BODY_TOP, BODY_BOTTOM = 720, 80
+DESCRIPTION_WIDTH = 240
+COLUMNS = (("Qty", 345), ("Unit price", 420), ("Discount", 470), ("Amount", RIGHT))
+ROW_LEADING = 11
+
+# Helvetica advance widths (1/1000 em) for " " to "~"; "£" is 556. Only
+# regular-weight text is measured (wrapped or right-aligned): bold text is
+# always set from the left.
+_WIDTHS = dict(zip(map(chr, range(32, 127)), (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584)))
+_WIDTHS["£"] = 556
+
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class UnknownDocument(ValueError):
+    """A document kind other than quote or invoice"""
+
+
+# --- rendering (runs in the worker processes) --------------------------------
+
+def text_width(text: str, size: float) -> float:
+    return sum(_WIDTHS.get(ch, 556) for ch in text) * size / 1000
+
+
+@lru_cache(maxsize=4096)
+def wrap(text: str, size: float, width: float) -> Tuple[str, ...]:
+    """text broken into lines no wider than width (long words are split)"""
+    lines: List[str] = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, size) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while text_width(word, size) > width:
+                cut = len(word) - 1
+                while cut > 1 and text_width(word[:cut], size) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return tuple(lines)
+
+
+def _text(x: float, y: float, text: str, size: float = 9, bold: bool = False) -> bytes:
+    escaped = (text.encode("cp1252", "replace")
+               .replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)"))
+    return b"BT /F%d %g Tf %g %g Td (%s) Tj ET\n" % (2 if bold else 1, size, x, y, escaped)
+
+
+def _right(x: float, y: float, text: str, size: float = 9) -> bytes:
+    return _text(x - text_width(text, size), y, text, size)
+
+
+def _rule(y: float, weight: float = 0.5) -> bytes:
+    return b"%g w %d %g m %d %g l S\n" % (weight, LEFT, y, RIGHT, y)
+
+
+def _money(value: float) -> str:
+    return f"-£{-value:,.2f}" if value < 0 else f"£{value:,.2f}"
+
+
+def _freeze(company: Dict[str, Any]) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    return (str(company.get("name", "")), tuple(company.get("address") or ()),
+            tuple(company.get("contact") or ()))
+
+
+@lru_cache(maxsize=16)
+def _header(company: Tuple[str, Tuple[str, ...], Tuple[str, ...]]) -> bytes:
+    """Company name, address and contact lines above the rule at the top of each page"""
+    name, address, contact = company
+    ops = [_text(LEFT, 795, name, 18, bold=True)]
+    ops += [_text(LEFT, 780 - 11 * i, line) for i, line in enumerate(address)]
+    ops += [_right(RIGHT, 795 - 11 * i, line) for i, line in enumerate(contact)]
+    ops.append(_rule(745, 1))
+    return b"".join(ops)
+
+
+@lru_cache(maxsize=16)
+def _footer(company: Tuple[str, Tuple[str, ...], Tuple[str, ...]]) -> bytes:
+    name, _, contact = company
+    return _rule(52) + _text(LEFT, 40, " | ".join((name,) + contact), 7)
+
+
+@lru_cache(maxsize=8)
+def _terms(kind: str) -> Tuple[bytes, float]:
+    """The terms block drawn down from y=0 (moved into place with cm), and its height"""
+    ops, y = [_text(LEFT, -8, "Terms and conditions", 8, bold=True)], -8.0
+    for paragraph in TERMS[kind]:
+        for line in wrap(paragraph, 7.5, RIGHT - LEFT):
+            y -= 9.5
+            ops.append(_text(LEFT, y, line, 7.5))
+        y -= 4
+    return b"".join(ops), -y
+
+
+def _table_header(y: float) -> bytes:
+    ops = [b"0.92 g %d %g %d 14 re f 0 g\n" % (LEFT, y - 4, RIGHT - LEFT),
+           _text(LEFT + 4, y, "Description")]
+    ops += [_right(x, y, label) for label, x in COLUMNS]
+    return b"".join(ops)
+
+
+def _lines(document: Dict[str, Any]) -> List[Tuple[Tuple[str, ...], List[str], float]]:
+    """(description lines, column texts, amount) per line item"""
+    rows = []
+    for line in document.get("lines") or []:
+        quantity = float(line.get("quantity") or 0)
+        price = float(line.get("unit_price") or 0)
+        discount = float(line.get("discount") or 0)
+        amount = round(quantity * price * (1 - discount), 2)
+        rows.append((wrap(str(line.get("description") or ""), 9, DESCRIPTION_WIDTH),
+                     [f"{quantity:g}", _money(price), f"{discount:.0%}" if discount else "",
+                      _money(amount)], amount))
+    return rows
+
+
+def layout(kind: str, document: Dict[str, Any], company: Dict[str, Any]) -> List[bytes]:
+    """The content stream of each page"""
+    if kind not in KINDS:
+        raise UnknownDocument(f"Unknown document kind {kind!r}")
+    frozen = _freeze(company)
+    pages: List[List[bytes]] = [[]]
+    ops = pages[0]
+
+    # Title, document details and the customer
+    title = "QUOTATION" if kind == "quote" else "INVOICE"
+    ops.append(_text(350, BODY_TOP, title, 16, bold=True))
+    details = [(label, str(value)) for label, value in document.get("details") or [] if value]
+    for i, (label, value) in enumerate(details):
+        y = BODY_TOP - 18 - 11 * i
+        ops.append(_text(350, y, label))
+        ops.append(_right(RIGHT, y, value))
+    ops.append(_text(LEFT, BODY_TOP, "To", 9, bold=True))
+    to_lines = [line for line in document.get("customer") or [] if line]
+    for i, line in enumerate(to_lines):
+        ops.append(_text(LEFT, BODY_TOP - 13 - 11 * i, line))
+    y = BODY_TOP - 18 - 11 * max(len(details), len(to_lines) + 1) - 20
+
+    # Line items, onto new pages as they fill
+    ops.append(_table_header(y))
+    y -= 16
+    rows = _lines(document)
+    for description, columns, _ in rows:
+        height = ROW_LEADING * len(description) + 3
+        if y - height < BODY_BOTTOM:
+            ops = []
+            pages.append(ops)
+            y = BODY_TOP
+            ops.append(_text(LEFT, y, f"{title} {document.get('number', '')} (continued)", 9,
+                             bold=True))
+            y -= 22
+            ops.append(_table_header(y))
+            y -= 16
+        for i, text in enumerate(description):
+            ops.append(_text(LEFT + 4, y - ROW_LEADING * i, text))
+        ops.extend(_right(x, y, text) for (_, x), text in zip(COLUMNS, columns) if text)
+        y -= height
+
+    # Totals, then the terms, on a new page if they do not fit
+    subtotal = round(sum(amount for _, _, amount in rows), 2)
+    net = document.get("net_total")
+    net = subtotal if net is None else round(float(net), 2)
+    vat = round(net * VAT_RATE, 2)
+    totals = [("Subtotal", subtotal)]
+    if abs(subtotal - net) >= 0.01:
+        totals.append(("Customer discount", net - subtotal))
+    totals += [("Net total", net), (f"VAT {VAT_RATE:.0%}", vat), ("Total due" if kind == "invoice"
+                                                                  else "Total", net + vat)]
+    terms, terms_height = _terms(kind)
+    if y - 14 * len(totals) - 24 - terms_height < BODY_BOTTOM:
+        ops = []
+        pages.append(ops)
+        y = BODY_TOP
+    ops.append(_rule(y + 6))
+    for label, value in totals:
+        y -= 14
+        bold = label.startswith("Total")
+        ops.append(_text(350, y, label, 10 if bold else 9, bold=bold))
+        ops.append(_right(RIGHT, y, _money(value), 10 if bold else 9))
+    y -= 24
+    ops.append(b"q 1 0 0 1 0 %g cm\n%sQ\n" % (y, terms))
+
+    header, footer = _header(frozen), _footer(frozen)
+    return [header + footer + _right(RIGHT, 40, f"Page {number} of {len(pages)}", 7)
+            + b"".join(page) for number, page in enumerate(pages, 1)]
+
+
+def render_pdf(kind: str, document: Dict[str, Any],
+               company: Optional[Dict[str, Any]] = None) -> bytes:
+    """The document as a PDF file"""
+    streams = layout(kind, document, company or COMPANY)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % (6 + 2 * i) for i in range(len(streams))), len(streams)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Title (%s) /Producer (SFG Aluminium document pipeline) >>" % (
+            str(document.get("number", "")).encode("cp1252", "replace")
+            .replace(b"(", b"").replace(b")", b"")),
+    ]
+    for stream in streams:
+        packed = zlib.compress(stream, 6)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources "
+                       b"<< /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                       % (PAGE_WIDTH, PAGE_HEIGHT, len(objects) + 2))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+                       % (len(packed), packed))
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_to_file(kind: str, document: Dict[str, Any], company: Optional[Dict[str, Any]],
+                   path: str) -> int:
+    """Render into path atomically (temporary file, then rename); returns the size"""
+    pdf = render_pdf(kind, document, company)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)
+    return len(pdf)
+
+
+# --- documents from handler data ---------------------------------------------
+
+def document_lines(items: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Line items (QuoteItem, order items or template products) for the line table"""
+    lines = []
+    for item in items or []:
+        quantity = item.get("quantity", item.get("qty", 1))
+        price = item.get("unit_price")
+        if price is None:
+            # price / estimated_price are line totals for the quantity
+            total = item.get("price", item.get("estimated_price"))
+            if total is not None:
+                price = float(total) / float(quantity or 1)
+        lines.append({
+            "description": (item.get("description") or item.get("product_name")
+                            or item.get("product_type") or item.get("sku") or "Item"),
+            "quantity": 1 if quantity is None else quantity,
+            "unit_price": float(price or 0),
+            "discount": float(item.get("discount") or 0),
+        })
+    return lines
+
+
+def customer_lines(customer: Optional[Dict[str, Any]]) -> List[str]:
+    """Addressee lines from a customer record (flat or data/customers shape)"""
+    if not customer:
+        return []
+    address = customer.get("address") or {}
+    if not isinstance(address, dict):
+        address = {"line1": str(address)}
+    return [customer.get("company") or customer.get("company_name") or "",
+            customer.get("name") or customer.get("contact_name") or "",
+            address.get("line1", ""), address.get("line2", ""),
+            " ".join(part for part in (address.get("city"), address.get("postcode")) if part),
+            customer.get("email", "")]
+
+
+def quote_document(quote: Dict[str, Any], items: Sequence[Dict[str, Any]],
+                   customer: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Render input for a quote created by action.create_quote"""
+    issued = _day(quote.get("created_at"))
+    return {
+        "id": quote["quote_id"],
+        "number": quote["quote_number"],
+        "details": [("Quote number", quote["quote_number"]), ("Date", issued.isoformat()),
+                    ("Valid until", (issued + timedelta(days=QUOTE_VALID_DAYS)).isoformat()),
+                    ("Enquiry", quote.get("enquiry_id")), ("Customer", quote.get("customer_id"))],
+        "customer": customer_lines(customer),
+        "lines": document_lines(items),
+        "net_total": quote.get("total_amount"),
+    }
+
+
+def invoice_document(invoice: Dict[str, Any], items: Sequence[Dict[str, Any]],
+                     customer: Optional[Dict[str, Any]] = None,
+                     net_total: Optional[float] = None) -> Dict[str, Any]:
+    """Render input for an invoice sent by action.send_invoice"""
+    issued = _day(invoice.get("sent_at"))
+    lines = document_lines(items)
+    if not lines and net_total is not None:
+        lines = [{"description": f"Order {invoice.get('order_id')}", "quantity": 1,
+                  "unit_price": float(net_total), "discount": 0.0}]
+    document = {
+        "id": invoice["order_id"],
+        "number": invoice["invoice_number"],
+        "details": [("Invoice number", invoice["invoice_number"]), ("Date", issued.isoformat()),
+                    ("Due date", (issued + timedelta(days=PAYMENT_DAYS)).isoformat()),
+                    ("Order", invoice.get("order_id"))],
+        "customer": customer_lines(customer) or [invoice.get("sent_to") or ""],
+        "lines": lines,
+    }
+    if net_total is not None:
+        document["net_total"] = net_total
+    return document
+
+
+def _day(value: Any) -> date:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).date()
+    except ValueError:
+        return date.today()
+
+
+# --- the pipeline (event loop side) ------------------------------------------
+
+class DocumentPipeline:
+    """Quote and invoice PDFs rendered in worker processes into an uploads directory"""
+
+    def __init__(self, directory: str = DEFAULT_DIRECTORY, workers: Optional[int] = None,
+                 base_url: str = DEFAULT_URL, company: Optional[Dict[str, Any]] = None):
+        self.directory = directory
+        self.workers = workers or min(MAX_WORKERS, os.cpu_count() or 1)
+        self.base_url = base_url.rstrip("/")
+        self.company = company or COMPANY
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Dict[Tuple[str, str], Tuple[str, "asyncio.Future[int]"]] = {}
+        self._rendered: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._counters = {"rendered": 0, "deduplicated": 0, "unchanged": 0, "failed": 0,
+                          "bytes": 0}
+
+    @classmethod
+    def from_env(cls) -> "DocumentPipeline":
+        """SFG_UPLOADS_DIR, SFG_DOCUMENT_WORKERS, SFG_DOCUMENTS_URL and SFG_COMPANY_DETAILS
+        (a JSON file with name, address and contact lines)"""
+        company = None
+        details = os.environ.get("SFG_COMPANY_DETAILS")
+        if details:
+            with open(details) as f:
+                company = json.load(f)
+        return cls(directory=os.environ.get("SFG_UPLOADS_DIR", DEFAULT_DIRECTORY),
+                   workers=int(os.environ.get("SFG_DOCUMENT_WORKERS", 0)) or None,
+                   base_url=os.environ.get("SFG_DOCUMENTS_URL", DEFAULT_URL), company=company)
+
+    def path(self, kind: str, document_id: str) -> str:
+        if kind not in KINDS:
+            raise UnknownDocument(f"Unknown document kind {kind!r}")
+        if not _NAME.match(document_id):
+            raise ValueError(f"Unusable document id {document_id!r}")
+        return os.path.join(self.directory, KINDS[kind], f"{document_id}.pdf")
+
+    def url(self, kind: str, document_id: str) -> str:
+        return f"{self.base_url}/{KINDS[kind]}/{document_id}.pdf"
+
+    def file(self, folder: str, name: str) -> Optional[str]:
+        """The path of a rendered document by URL parts (None if there is none)"""
+        if folder not in KINDS.values() or not _NAME.match(name) or not name.endswith(".pdf"):
+            return None
+        path = os.path.join(self.directory, folder, name)
+        return path if os.path.isfile(path) else None
+
+    async def render(self, kind: str, document: Dict[str, Any]) -> str:
+        """Render document unless it is already current; returns its path
+
+        document["id"] (the quote or order id) names the file; document["number"]
+        is only printed on it.
+        """
+        document_id = str(document.get("id") or "")
+        path = self.path(kind, document_id)
+        key = (kind, document_id)
+        digest = hashlib.sha256(dumps([kind, document, self.company])).hexdigest()
+        running = self._running.get(key)
+        if running is not None:
+            if running[0] == digest:
+                self._counters["deduplicated"] += 1
+                await asyncio.shield(running[1])
+                return path
+            # A different version is being written: let it land first
+            await asyncio.gather(running[1], return_exceptions=True)
+        if self._rendered.get(key) == digest and os.path.exists(path):
+            self._rendered.move_to_end(key)
+            self._counters["unchanged"] += 1
+            return path
+
+        future = asyncio.ensure_future(self._submit(kind, document, path))
+        self._running[key] = (digest, future)
+        try:
+            size = await asyncio.shield(future)
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            if self._running.get(key, (None, None))[1] is future:
+                del self._running[key]
+        self._counters["rendered"] += 1
+        self._counters["bytes"] += size
+        self._rendered[key] = digest
+        self._rendered.move_to_end(key)
+        while len(self._rendered) > RENDERED_MAX:
+            self._rendered.popitem(last=False)
+        return path
+
+    async def _submit(self, kind: str, document: Dict[str, Any], path: str) -> int:
+        # At most two jobs per worker are handed to the pool, so a burst of
+        # requests is pickled and sent a few at a time, between other work
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers * 2)
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._pool(), render_to_file, kind, document, self.company, path)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, in_progress=len(self._running), workers=self.workers,
+                    directory=self.directory)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
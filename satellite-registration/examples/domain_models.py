@@ -0,0 +1,427 @@
+"""
+SFG Aluminium - Domain Models
+Version: 1.0.0
+Date: November 5, 2025
+
+Typed, slotted models for the records the handlers pass around: Customer,
+Enquiry, Quote, QuoteItem, Order and Payment, plus any model the app's
+manifest declares under dataModels (ContactEnquiry, QuoteRequest, ...).
+
+build_models() turns model specs into classes once, at import time:
+- each class gets __slots__ for its fields (no per-instance __dict__) and
+  a get() that reads like dict.get, so the pricing, scheduling and document
+  code that takes payload dicts accepts models too
+- each class gets a validate() function generated from its field list and
+  compiled with exec, like the __init__ dataclasses writes: one straight
+  run of type checks per field, with enum value sets, nested models and
+  field names bound in, instead of walking the spec for every payload
+
+Specs use the manifest's dataModels format:
+
+    {"name": "Quote", "fields": [
+        {"name": "id", "type": "string", "required": true},
+        {"name": "status", "type": "enum", "values": ["draft", "sent"]},
+        {"name": "items", "type": "list", "model": "QuoteItem"}]}
+
+The shorthand of the satellite examples ("fields" or "key_fields" as
+strings, "model" for the name, "tier (platinum|sapphire)" for an enum) is
+accepted too. A manifest model with the name of a built-in one replaces its
+field list; shorthand fields without a type take the built-in field's type.
+
+Field types: string (also text, email, ...), integer, decimal, boolean,
+enum, date, datetime (ISO 8601 strings, kept as strings), object, list
+(optionally of a model), model, and json for anything. Decimals sent as
+numeric strings ("100.50") are converted to numbers. Missing optional
+fields are None and keys a model does not declare are dropped.
+
+validate() raises ValidationError (a ValueError) naming the field, e.g.
+"items[2].quantity: expected an integer, got '2x'".
+"""
+
+import keyword
+import math
+import re
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from response_models import ResponseModel
+
+CUSTOMER_TIERS = ["platinum", "sapphire", "steel", "green", "crimson"]
+
+# Built-in models: the satellite example's data_models with types from the
+# data/*/TEMPLATE.json records, and QuoteItem / Payment as the webhook
+# events carry them (no manifest declares those two). Customer.id is
+# optional: events often carry the customer as just a name and contact.
+DEFAULT_MODELS: List[Dict[str, Any]] = [
+    {"name": "Customer", "fields": [
+        {"name": "id", "type": "string"},
+        {"name": "name", "type": "string"},
+        {"name": "email", "type": "string"},
+        {"name": "phone", "type": "string"},
+        {"name": "company", "type": "string"},
+        {"name": "tier", "type": "enum", "values": CUSTOMER_TIERS},
+        {"name": "credit_limit", "type": "decimal"},
+        {"name": "outstanding_balance", "type": "decimal"},
+        {"name": "payment_terms", "type": "string"},
+    ]},
+    {"name": "Enquiry", "fields": [
+        {"name": "id", "type": "string", "required": True},
+        {"name": "customer_id", "type": "string"},
+        {"name": "description", "type": "text"},
+        {"name": "estimated_value", "type": "decimal"},
+        {"name": "status", "type": "enum",
+         "values": ["new", "contacted", "quoted", "converted", "closed"]},
+        {"name": "assigned_estimator", "type": "string"},
+        {"name": "created_at", "type": "datetime"},
+    ]},
+    {"name": "QuoteItem", "fields": [
+        {"name": "sku", "type": "string"},
+        {"name": "product_type", "type": "string"},
+        {"name": "description", "type": "text"},
+        {"name": "quantity", "type": "integer", "aliases": ["qty"]},
+        {"name": "price", "type": "decimal"},
+        {"name": "cost", "type": "decimal"},
+        {"name": "unit_price", "type": "decimal"},
+        {"name": "unit_cost", "type": "decimal"},
+        {"name": "discount", "type": "decimal"},
+        {"name": "specifications", "type": "object"},
+    ]},
+    {"name": "Quote", "fields": [
+        {"name": "id", "type": "string", "required": True},
+        {"name": "quote_number", "type": "string"},
+        {"name": "enquiry_id", "type": "string"},
+        {"name": "customer_id", "type": "string"},
+        {"name": "items", "type": "list", "model": "QuoteItem"},
+        {"name": "total_amount", "type": "decimal"},
+        {"name": "margin", "type": "decimal"},
+        {"name": "status", "type": "enum", "values": ["draft", "sent", "accepted", "rejected"]},
+        {"name": "created_at", "type": "datetime"},
+        {"name": "expires_at", "type": "datetime"},
+    ]},
+    {"name": "Order", "fields": [
+        {"name": "id", "type": "string", "required": True},
+        {"name": "order_number", "type": "string"},
+        {"name": "quote_id", "type": "string"},
+        {"name": "customer_id", "type": "string"},
+        {"name": "items", "type": "list", "model": "QuoteItem"},
+        {"name": "total_amount", "type": "decimal"},
+        {"name": "status", "type": "enum",
+         "values": ["approved", "fabrication", "installation", "complete"]},
+        {"name": "production_start", "type": "date"},
+        {"name": "estimated_completion", "type": "date"},
+        {"name": "installation_date", "type": "date"},
+        {"name": "created_at", "type": "datetime"},
+    ]},
+    {"name": "Payment", "fields": [
+        {"name": "payment_id", "type": "string", "required": True},
+        {"name": "invoice_id", "type": "string", "required": True},
+        {"name": "customer_id", "type": "string"},
+        {"name": "amount", "type": "decimal", "required": True},
+        {"name": "currency", "type": "string"},
+        {"name": "method", "type": "string"},
+        {"name": "received_at", "type": "datetime"},
+    ]},
+]
+
+_TYPE_ALIASES = {
+    "text": "string", "str": "string", "email": "string", "phone": "string",
+    "url": "string", "uuid": "string", "int": "integer", "float": "decimal",
+    "number": "decimal", "money": "decimal", "bool": "boolean", "timestamp": "datetime",
+    "array": "list", "dict": "object", "any": "json",
+}
+
+# Generated test for a bad value (v) of each type, and what was expected
+_CHECKS = {
+    "string": ("type(v) is not str", "a string"),
+    "integer": ("type(v) is not int", "an integer"),
+    "decimal": ("type(v) is not float and type(v) is not int", "a number"),
+    "boolean": ("type(v) is not bool", "true or false"),
+    "date": ("type(v) is not str or not _is_date(v)", "an ISO date"),
+    "datetime": ("type(v) is not str or not _is_datetime(v)", "an ISO date-time"),
+    "object": ("type(v) is not dict", "an object"),
+    "list": ("type(v) is not list", "a list"),
+    "model": ("type(v) is not dict", "an object"),
+}
+
+# Converters for values of the wrong type that still carry one (v is not None)
+_COERCE = {"decimal": "_to_number"}
+
+_SHORTHAND = re.compile(r"^\s*(\w+)\s*(?:\(([^)]*)\))?\s*$")
+
+_KINDS = {str: "string", int: "integer", float: "number", bool: "boolean",
+          list: "list", dict: "object", type(None): "null"}
+
+
+class ValidationError(ValueError):
+    """A payload does not match its model"""
+
+    def __init__(self, reason: str, location: Tuple[Any, ...] = ()):
+        super().__init__(reason)
+        self.reason = reason
+        self.location = location
+
+    def within(self, *location: Any) -> "ValidationError":
+        """Prefix the location with the enclosing field (and list index)"""
+        self.location = location + self.location
+        return self
+
+    def __str__(self) -> str:
+        path = ""
+        for part in self.location:
+            path += f"[{part}]" if isinstance(part, int) else (f".{part}" if path else part)
+        return f"{path}: {self.reason}" if path else self.reason
+
+
+class Field:
+    """One normalised field of a model spec"""
+
+    __slots__ = ("name", "type", "required", "values", "model", "aliases")
+
+    def __init__(self, name: str, type: Optional[str] = None, required: bool = False,
+                 values: Optional[Iterable[Any]] = None, model: Optional[str] = None,
+                 aliases: Iterable[str] = ()):
+        if (not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_")
+                or name == "validate" or hasattr(DomainModel, name)):
+            raise ValueError(f"Field name {name!r} cannot be used as a model attribute")
+        self.name = name
+        self.type = type
+        self.required = required
+        self.values = frozenset(values) if values is not None else None
+        self.model = model
+        self.aliases = tuple(aliases)
+
+    @classmethod
+    def from_spec(cls, spec: Any) -> "Field":
+        """Build a field from a dataModels entry or a "name (a|b)" string"""
+        if isinstance(spec, str):
+            match = _SHORTHAND.match(spec)
+            if not match:
+                raise ValueError(f"Unrecognised field {spec!r}")
+            name, values = match.groups()
+            if values is None:
+                return cls(name)
+            return cls(name, "enum", values=[value.strip() for value in values.split("|")])
+        type_name = spec.get("type")
+        if type_name is not None:
+            type_name = str(type_name).lower()
+            type_name = _TYPE_ALIASES.get(type_name, type_name)
+            if type_name != "enum" and type_name not in _CHECKS:
+                type_name = "json"
+        if type_name is None and spec.get("model") is not None:
+            type_name = "model"
+        return cls(spec["name"], type_name, bool(spec.get("required", False)),
+                   spec.get("values"), spec.get("model"), spec.get("aliases", ()))
+
+
+class DomainModel(ResponseModel):
+    """Base class for generated models"""
+
+    __slots__ = ()
+    _nested: Tuple[str, ...] = ()
+    _spec: Tuple[Field, ...] = ()
+    validate: Callable[[Any], "DomainModel"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(zip(self._fields, self._values(self)))
+        for name in self._nested:
+            value = data[name]
+            if type(value) is list:
+                data[name] = [item.to_dict() for item in value]
+            elif value is not None:
+                data[name] = value.to_dict()
+        return data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Unset optional fields are None; answer like a dict without the key
+        value = getattr(self, key) if key in self._fields else None
+        return default if value is None else value
+
+    @classmethod
+    def from_field(cls, data: Dict[str, Any], name: str) -> "DomainModel":
+        """Validate the object in data[name] (errors are located under name)"""
+        try:
+            return cls.validate(data.get(name))
+        except ValidationError as e:
+            raise e.within(name) from None
+
+    @classmethod
+    def validate_many(cls, payloads: Iterable[Any], *location: Any) -> List["DomainModel"]:
+        """Validate a list of payloads (errors are located by list index)"""
+        if payloads is None or isinstance(payloads, (str, bytes, dict)):
+            raise ValidationError(f"expected a list, got {_KINDS.get(type(payloads), 'bytes')}",
+                                  location)
+        return _each(cls.validate, payloads, *location)
+
+
+def _each(check: Callable[[Any], Any], values: Iterable[Any], *location: Any) -> List[Any]:
+    if type(values) is not list:
+        values = list(values)
+    try:
+        return [check(value) for value in values]
+    except ValidationError:
+        pass
+    # Only on failure: find the index to report
+    for index, value in enumerate(values):
+        try:
+            check(value)
+        except ValidationError as e:
+            raise e.within(*location, index) from None
+    raise AssertionError("unreachable")  # pragma: no cover
+
+
+def _is_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_datetime(value: str) -> bool:
+    if value.endswith("Z"):     # fromisoformat only accepts Z from Python 3.11
+        value = value[:-1] + "+00:00"
+    try:
+        datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _to_number(name: str, value: Any) -> float:
+    """A numeric string as a float (NEXUS sends some amounts as "100.50")"""
+    if type(value) is str:
+        try:
+            number = float(value)
+        except ValueError:
+            pass
+        else:
+            if math.isfinite(number):
+                return number
+    raise _invalid(name, "a number", value)
+
+
+def _invalid(name: str, expected: str, value: Any) -> ValidationError:
+    got = repr(value[:40]) if type(value) is str else _KINDS.get(type(value), type(value).__name__)
+    return ValidationError(f"expected {expected}, got {got}", (name,))
+
+
+def _normalise(spec: Dict[str, Any]) -> Tuple[str, List[Field]]:
+    name = spec.get("name", spec.get("model"))
+    if not isinstance(name, str) or not name.isidentifier():
+        raise ValueError(f"Data model needs a name: {spec!r}")
+    fields = [Field.from_spec(field) for field in spec.get("fields", spec.get("key_fields", []))]
+    if len({field.name for field in fields}) != len(fields):
+        raise ValueError(f"Data model {name} declares a field twice")
+    return name, fields
+
+
+def _merge(fields: List[Field], builtin: Optional[List[Field]]) -> List[Field]:
+    """Fill in the types shorthand fields leave out"""
+    known = {field.name: field for field in builtin or ()}
+    merged = []
+    for field in fields:
+        if field.type is None:
+            field = known.get(field.name) or Field(field.name, "json")
+        merged.append(field)
+    return merged
+
+
+def _compile_validator(cls: Type[DomainModel], models: Dict[str, Type[DomainModel]]) -> Callable:
+    """Generate and compile cls.validate from its field list"""
+    namespace: Dict[str, Any] = {
+        "cls": cls, "_new": object.__new__, "ValidationError": ValidationError,
+        "_invalid": _invalid, "_is_date": _is_date, "_is_datetime": _is_datetime,
+        "_to_number": _to_number,
+        "_each": _each, "_kind": lambda value: _KINDS.get(type(value), type(value).__name__),
+    }
+    lines = [
+        "def validate(data):",
+        "    if type(data) is not dict:",
+        "        raise ValidationError('expected an object, got ' + _kind(data))",
+        "    get = data.get",
+        "    self = _new(cls)",
+    ]
+    for i, field in enumerate(cls._spec):
+        name = field.name
+        lines.append(f"    v = get({name!r})")
+        for alias in field.aliases:
+            lines += ["    if v is None:", f"        v = get({alias!r})"]
+        checks = []
+        if field.type == "enum":
+            namespace[f"_values_{i}"] = field.values
+            expected = "one of " + ", ".join(sorted(map(str, field.values)))
+            checks += [f"if type(v) is list or type(v) is dict or v not in _values_{i}:",
+                       f"    raise _invalid({name!r}, {expected!r}, v)"]
+        elif field.type in _COERCE:
+            test, _ = _CHECKS[field.type]
+            checks += [f"if {test}:", f"    v = {_COERCE[field.type]}({name!r}, v)"]
+        elif field.type in _CHECKS:
+            test, expected = _CHECKS[field.type]
+            checks += [f"if {test}:", f"    raise _invalid({name!r}, {expected!r}, v)"]
+        if field.model is not None:
+            if field.model not in models:
+                raise ValueError(f"{cls.__name__}.{name} refers to unknown model {field.model}")
+            namespace[f"_model_{i}"] = models[field.model]
+            if field.type == "list":
+                checks.append(f"v = _each(_model_{i}.validate, v, {name!r})")
+            else:
+                checks += ["try:", f"    v = _model_{i}.validate(v)",
+                           "except ValidationError as e:", f"    raise e.within({name!r}) from None"]
+        if field.required:
+            lines += ["    if v is None:", f"        raise ValidationError('is required', ({name!r},))"]
+            lines += ["    " + line for line in checks]
+        elif checks:
+            lines.append("    if v is not None:")
+            lines += ["        " + line for line in checks]
+        lines.append(f"    self.{name} = v")
+    lines.append("    return self")
+    exec(compile("\n".join(lines), f"<{cls.__name__}.validate>", "exec"), namespace)
+    return namespace["validate"]
+
+
+def _compile_init(cls: Type[DomainModel]) -> Callable:
+    """Keyword-only __init__ for building models in code (no validation)"""
+    fields = cls._spec
+    params = ", ".join(field.name if field.required else f"{field.name}=None" for field in fields)
+    body = "".join(f"\n    self.{field.name} = {field.name}" for field in fields) or "\n    pass"
+    namespace: Dict[str, Any] = {}
+    exec(compile(f"def __init__(self, *, {params}):{body}", f"<{cls.__name__}.__init__>", "exec"),
+         namespace)
+    return namespace["__init__"]
+
+
+def build_models(specs: Iterable[Dict[str, Any]] = ()) -> Dict[str, Type[DomainModel]]:
+    """
+    Model classes for the built-in specs and the given dataModels entries,
+    keyed by name. Validators are compiled here, once per model.
+    """
+    builtin = dict(_normalise(spec) for spec in DEFAULT_MODELS)
+    declared = dict(builtin)
+    for spec in specs:
+        name, fields = _normalise(spec)
+        declared[name] = _merge(fields, builtin.get(name))
+
+    models: Dict[str, Type[DomainModel]] = {}
+    for name, fields in declared.items():
+        cls = type(name, (DomainModel,), {
+            "__slots__": tuple(field.name for field in fields),
+            "__doc__": f"{name} record",
+            "__module__": __name__,
+        })
+        cls._spec = tuple(fields)
+        cls._nested = tuple(field.name for field in fields if field.model is not None)
+        cls.__init__ = _compile_init(cls)
+        models[name] = cls
+    # Nested models are looked up by name, so compile once every class exists
+    for cls in models.values():
+        cls.validate = staticmethod(_compile_validator(cls, models))
+    return models
+
+
+MODELS = build_models()
+Customer = MODELS["Customer"]
+Enquiry = MODELS["Enquiry"]
+Quote = MODELS["Quote"]
+QuoteItem = MODELS["QuoteItem"]
+Order = MODELS["Order"]
+Payment = MODELS["Payment"]
@@ -0,0 +1,456 @@
+"""
+SFG Aluminium - Estimator Assignment
+Version: 1.0.0
+Date: November 5, 2025
+
+Assigns new enquiries to the least-loaded estimator who can take them,
+replacing the assign_estimator_by_workload() placeholder.
+
+- Work is weighted: an enquiry counts PROJECT_WEIGHTS[project_type] times
+  (1 + estimated_value / VALUE_UNIT), and an estimator's load is their
+  open work divided by their capacity (1.0 = full time)
+- Estimators sit in one min-load heap per pool: each of their skills
+  (project types) in their region, each skill anywhere, their region, and
+  everyone. An enquiry goes to the top of the most specific pool with
+  anyone in it, so assign() and release() are O(log n) heap pushes instead
+  of a scan of every estimator's backlog
+- Heap entries are never updated in place: a load change pushes a new
+  entry and bumps the estimator's version, older entries are skipped when
+  they reach the top, and a heap is rebuilt once stale entries outnumber
+  live ones
+- assign_many() places a batch (the enquiries after a trade show) largest
+  first, which spreads the big jobs before the small ones fill the gaps
+- The loads and open assignments are saved to a JSON snapshot and
+  restored on start. save_if_due() writes at most every SNAPSHOT_INTERVAL
+  seconds: the snapshot is taken on the event loop and encoded and written
+  in a thread, so the loop is not held for the file write; the file goes
+  to a unique temp name in the same directory and is renamed over the old
+- With a db_path (the shared state file under serve.py --workers N) the
+  snapshot is replaced by a log in SQLite: each assign, release and
+  hand-over is appended inside one BEGIN IMMEDIATE transaction that first
+  replays the other workers' entries into the heaps, so every worker picks
+  from the same loads. A release deletes the enquiry's earlier entries, so
+  the log holds the open assignments plus one row per release
+
+Usage:
+
+    assigner = EstimatorAssigner.from_env()
+    assignment = assigner.assign("ENQ-1", project_type="commercial",
+                                 region="north", estimated_value=50000)
+    assigner.release("ENQ-1")    # quote sent
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_codec import dumps, loads
+
+PROJECT_WEIGHTS = {
+    "residential": 1.0,
+    "general": 1.0,
+    "commercial": 1.5,
+    "industrial": 2.0,
+    "public_sector": 2.0,
+}
+VALUE_UNIT = 50000.0                # each £50k of estimated value adds one unit of work
+SNAPSHOT_INTERVAL = 30.0            # seconds between snapshot writes
+COMPACT_MIN = 64                    # stale heap entries tolerated before a rebuild
+
+DEFAULT_ESTIMATORS: List[Dict[str, Any]] = [
+    {"id": "EST-001", "name": "Senior Estimator (North)", "region": "north",
+     "skills": ["commercial", "industrial"], "capacity": 1.0},
+    {"id": "EST-002", "name": "Estimator (North)", "region": "north",
+     "skills": ["residential", "commercial"], "capacity": 1.0},
+    {"id": "EST-003", "name": "Estimator (South)", "region": "south",
+     "skills": ["residential", "commercial"], "capacity": 1.0},
+    {"id": "EST-004", "name": "Part-time Estimator (South)", "region": "south",
+     "skills": ["residential"], "capacity": 0.5},
+]
+
+Pool = Tuple[Optional[str], Optional[str]]      # (skill, region); None matches any
+Change = Tuple[str, "Assignment"]               # ("assigned" | "released", assignment)
+
+
+class NoEstimator(LookupError):
+    """Raised when no estimator is available"""
+
+
+def workload(project_type: Optional[str], estimated_value: Optional[float]) -> float:
+    """Units of estimating work for an enquiry"""
+    return PROJECT_WEIGHTS.get(project_type or "", 1.0) * (1 + (estimated_value or 0) / VALUE_UNIT)
+
+
+class Estimator:
+    """An estimator and their open work"""
+
+    __slots__ = ("id", "name", "region", "skills", "capacity", "load", "open", "version", "pools")
+
+    def __init__(self, id: str, name: Optional[str] = None, region: Optional[str] = None,
+                 skills: Iterable[str] = (), capacity: float = 1.0):
+        if capacity <= 0:
+            raise ValueError(f"Estimator {id}: capacity must be positive")
+        self.id = id
+        self.name = name or id
+        self.region = region
+        self.skills = frozenset(skills)
+        self.capacity = capacity
+        self.load = 0.0
+        self.open = 0
+        self.version = 0
+        pools: List[Pool] = [(skill, None) for skill in self.skills]
+        if region is not None:
+            pools.extend((skill, region) for skill in self.skills)
+            pools.append((None, region))
+        pools.append((None, None))
+        self.pools = tuple(pools)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Estimator":
+        return cls(data["id"], data.get("name"), data.get("region"), data.get("skills", ()),
+                   data.get("capacity", 1.0))
+
+    @property
+    def score(self) -> float:
+        return self.load / self.capacity
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "name": self.name, "region": self.region,
+                "skills": sorted(self.skills), "capacity": self.capacity,
+                "load": round(self.load, 3), "open": self.open}
+
+
+class Assignment:
+    """An open enquiry and who is estimating it"""
+
+    __slots__ = ("enquiry_id", "estimator_id", "weight", "project_type", "region")
+
+    def __init__(self, enquiry_id: str, estimator_id: str, weight: float,
+                 project_type: Optional[str], region: Optional[str]):
+        self.enquiry_id = enquiry_id
+        self.estimator_id = estimator_id
+        self.weight = weight
+        self.project_type = project_type
+        self.region = region
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"enquiry_id": self.enquiry_id, "estimator_id": self.estimator_id,
+                "weight": round(self.weight, 3), "project_type": self.project_type,
+                "region": self.region}
+
+
+class EstimatorAssigner:
+    """Least-loaded assignment from one heap per (skill, region) pool"""
+
+    def __init__(self, estimators: Iterable[Dict[str, Any]] = DEFAULT_ESTIMATORS,
+                 snapshot_path: Optional[str] = None, clock=time.time,
+                 db_path: Optional[str] = None):
+        if snapshot_path and db_path:
+            raise ValueError("Use either a snapshot_path or a db_path, not both")
+        self.snapshot_path = snapshot_path
+        self._clock = clock
+        self._estimators: Dict[str, Estimator] = {}
+        self._assignments: Dict[str, Assignment] = {}
+        self._heaps: Dict[Pool, List[Tuple[float, int, str, int]]] = {}
+        self._members: Dict[Pool, int] = {}
+        self._order = itertools.count()   # equal loads: least recently changed first
+        self._dirty = False
+        self._saved_at = clock()
+        self._counters = {"assigned": 0, "released": 0, "unassigned": 0, "compactions": 0,
+                          "snapshots": 0, "replayed": 0}
+        for spec in estimators:
+            self.add_estimator(Estimator.from_dict(spec))
+        self._db = _open_db(db_path) if db_path else None
+        self._last_seq = 0
+        if self._db is not None:
+            self._replay()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "EstimatorAssigner":
+        """Roster from SFG_ESTIMATORS (a JSON list); state in db_path, else SFG_ESTIMATOR_SNAPSHOT"""
+        path = os.environ.get("SFG_ESTIMATORS")
+        if path:
+            with open(path, "r") as f:
+                kwargs.setdefault("estimators", json.load(f))
+        if not kwargs.get("db_path"):
+            kwargs.setdefault("snapshot_path", os.environ.get("SFG_ESTIMATOR_SNAPSHOT"))
+        assigner = cls(**kwargs)
+        if assigner.snapshot_path and os.path.exists(assigner.snapshot_path):
+            assigner.restore(assigner.snapshot_path)
+        return assigner
+
+    def get(self, estimator_id: str) -> Optional[Estimator]:
+        if self._db is not None:
+            self._replay()
+        return self._estimators.get(estimator_id)
+
+    def assignment(self, enquiry_id: str) -> Optional[Assignment]:
+        if self._db is not None:
+            self._replay()
+        return self._assignments.get(enquiry_id)
+
+    def add_estimator(self, estimator: Estimator) -> None:
+        if estimator.id in self._estimators:
+            raise ValueError(f"Estimator {estimator.id} already exists")
+        self._estimators[estimator.id] = estimator
+        for pool in estimator.pools:
+            self._members[pool] = self._members.get(pool, 0) + 1
+        self._push(estimator)
+
+    def remove_estimator(self, estimator_id: str) -> List[Assignment]:
+        """Take an estimator off the roster and hand their open enquiries to others"""
+        with self._changes() as changes:
+            estimator = self._estimators.pop(estimator_id)
+            for pool in estimator.pools:
+                self._members[pool] -= 1
+            self._dirty = True
+            # Their heap entries are now stale (estimator unknown) and get skipped
+            held = sorted((a for a in self._assignments.values()
+                           if a.estimator_id == estimator_id),
+                          key=lambda a: a.weight, reverse=True)
+            moved = []
+            for old in held:
+                del self._assignments[old.enquiry_id]
+                moved.append(self._assign(old.enquiry_id, old.weight, old.project_type,
+                                          old.region))
+                changes.append(("assigned", moved[-1]))
+            return moved
+
+    def assign(self, enquiry_id: str, project_type: Optional[str] = None,
+               region: Optional[str] = None, estimated_value: Optional[float] = None) -> Assignment:
+        """Give the enquiry to the least-loaded estimator who fits (a repeat returns the first)"""
+        with self._changes() as changes:
+            assignment = self._assignments.get(enquiry_id)
+            if assignment is not None:
+                return assignment
+            assignment = self._assign(enquiry_id, workload(project_type, estimated_value),
+                                      project_type, region)
+            changes.append(("assigned", assignment))
+            return assignment
+
+    def assign_many(self, enquiries: Iterable[Dict[str, Any]]) -> Dict[str, Assignment]:
+        """Assign a batch of {enquiry_id, project_type, region, estimated_value}, largest first"""
+        results: Dict[str, Assignment] = {}
+        todo = []
+        with self._changes() as changes:
+            for enquiry in enquiries:
+                enquiry_id = enquiry["enquiry_id"]
+                assignment = self._assignments.get(enquiry_id)
+                if assignment is not None:
+                    results[enquiry_id] = assignment
+                elif enquiry_id not in results:
+                    results[enquiry_id] = None
+                    todo.append((workload(enquiry.get("project_type"),
+                                          enquiry.get("estimated_value")),
+                                 enquiry_id, enquiry.get("project_type"), enquiry.get("region")))
+            todo.sort(key=lambda item: item[0], reverse=True)
+            for weight, enquiry_id, project_type, region in todo:
+                results[enquiry_id] = self._assign(enquiry_id, weight, project_type, region)
+                changes.append(("assigned", results[enquiry_id]))
+        return results
+
+    def release(self, enquiry_id: str) -> Optional[Assignment]:
+        """The enquiry is done with (quote sent, enquiry closed): drop its work"""
+        with self._changes() as changes:
+            assignment = self._release(enquiry_id)
+            if assignment is None:
+                return None
+            self._counters["released"] += 1
+            changes.append(("released", assignment))
+            return assignment
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The loads and open assignments, as plain lists (safe to encode in another thread)"""
+        self._dirty = False
+        self._saved_at = self._clock()
+        self._counters["snapshots"] += 1
+        return {
+            "saved_at": self._saved_at,
+            "estimators": {e.id: [e.load, e.open] for e in self._estimators.values()},
+            "assignments": {a.enquiry_id: [a.estimator_id, a.weight, a.project_type, a.region]
+                            for a in self._assignments.values()},
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        _write(path or self.snapshot_path, self.snapshot())
+
+    async def save_if_due(self) -> bool:
+        if (not self.snapshot_path or not self._dirty
+                or self._clock() - self._saved_at < SNAPSHOT_INTERVAL):
+            return False
+        await asyncio.to_thread(_write, self.snapshot_path, self.snapshot())
+        return True
+
+    def restore(self, path: str) -> None:
+        """Load a snapshot; estimators no longer on the roster lose their work to the others"""
+        with open(path, "rb") as f:
+            snapshot = loads(f.read())
+        for estimator_id, (load, open_count) in snapshot.get("estimators", {}).items():
+            estimator = self._estimators.get(estimator_id)
+            if estimator is not None:
+                estimator.load, estimator.open = load, open_count
+                self._push(estimator)
+        orphans = []
+        for enquiry_id, (estimator_id, weight, project_type, region) in snapshot.get(
+                "assignments", {}).items():
+            if estimator_id in self._estimators:
+                self._assignments[enquiry_id] = Assignment(enquiry_id, estimator_id, weight,
+                                                           project_type, region)
+            else:
+                orphans.append((weight, enquiry_id, project_type, region))
+        orphans.sort(key=lambda item: item[0], reverse=True)
+        for weight, enquiry_id, project_type, region in orphans:
+            self._assign(enquiry_id, weight, project_type, region)
+
+    def stats(self) -> Dict[str, Any]:
+        if self._db is not None:
+            self._replay()
+        scores = [estimator.score for estimator in self._estimators.values()]
+        return {**self._counters, "estimators": len(scores), "open": len(self._assignments),
+                "pools": len(self._heaps),
+                "heap_entries": sum(len(heap) for heap in self._heaps.values()),
+                "load_min": round(min(scores), 3) if scores else None,
+                "load_max": round(max(scores), 3) if scores else None,
+                "shared": self._db is not None}
+
+    # -- shared log ----------------------------------------------------------
+
+    @contextmanager
+    def _changes(self):
+        """Collects an operation's changes; with a db, under the write lock after a replay"""
+        changes: List[Change] = []
+        if self._db is None:
+            yield changes
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._replay()
+            yield changes
+            for action, assignment in changes:
+                if action == "released":
+                    self._db.execute("DELETE FROM estimator_log WHERE enquiry_id = ?",
+                                     (assignment.enquiry_id,))
+                self._last_seq = self._db.execute(
+                    "INSERT INTO estimator_log (action, enquiry_id, record) VALUES (?, ?, ?)",
+                    (action, assignment.enquiry_id, json.dumps(
+                        [assignment.estimator_id, assignment.weight, assignment.project_type,
+                         assignment.region]))
+                ).lastrowid
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _replay(self) -> None:
+        """Apply the assignments and releases other workers logged since the last replay"""
+        rows = self._db.execute(
+            "SELECT seq, action, enquiry_id, record FROM estimator_log WHERE seq > ? "
+            "ORDER BY seq", (self._last_seq,)).fetchall()
+        for seq, action, enquiry_id, record in rows:
+            self._release(enquiry_id)
+            if action == "assigned":
+                estimator_id, weight, project_type, region = json.loads(record)
+                estimator = self._estimators.get(estimator_id)
+                if estimator is not None:
+                    estimator.load += weight
+                    estimator.open += 1
+                    self._push(estimator)
+                    self._assignments[enquiry_id] = Assignment(enquiry_id, estimator_id, weight,
+                                                               project_type, region)
+            self._last_seq = seq
+            self._counters["replayed"] += 1
+
+    def _release(self, enquiry_id: str) -> Optional[Assignment]:
+        assignment = self._assignments.pop(enquiry_id, None)
+        if assignment is None:
+            return None
+        estimator = self._estimators.get(assignment.estimator_id)
+        if estimator is not None:
+            estimator.load = max(0.0, estimator.load - assignment.weight)
+            estimator.open -= 1
+            self._push(estimator)
+        self._dirty = True
+        return assignment
+
+    def _assign(self, enquiry_id: str, weight: float, project_type: Optional[str],
+                region: Optional[str]) -> Assignment:
+        for pool in ((project_type, region), (project_type, None), (None, region), (None, None)):
+            estimator = self._top(pool)
+            if estimator is not None:
+                break
+        else:
+            self._counters["unassigned"] += 1
+            raise NoEstimator(f"No estimator available for {enquiry_id}")
+        estimator.load += weight
+        estimator.open += 1
+        self._push(estimator)
+        assignment = Assignment(enquiry_id, estimator.id, weight, project_type, region)
+        self._assignments[enquiry_id] = assignment
+        self._dirty = True
+        self._counters["assigned"] += 1
+        return assignment
+
+    def _top(self, pool: Pool) -> Optional[Estimator]:
+        """The least-loaded estimator in the pool, dropping stale entries on the way"""
+        heap = self._heaps.get(pool)
+        if not heap:
+            return None
+        estimators = self._estimators
+        while heap:
+            _, _, estimator_id, version = heap[0]
+            estimator = estimators.get(estimator_id)
+            if estimator is not None and estimator.version == version:
+                return estimator
+            heapq.heappop(heap)
+        return None
+
+    def _push(self, estimator: Estimator) -> None:
+        estimator.version += 1
+        entry = (estimator.score, next(self._order), estimator.id, estimator.version)
+        for pool in estimator.pools:
+            heap = self._heaps.setdefault(pool, [])
+            heapq.heappush(heap, entry)
+            if len(heap) > 2 * self._members.get(pool, 0) + COMPACT_MIN:
+                self._compact(pool)
+
+    def _compact(self, pool: Pool) -> None:
+        estimators = self._estimators
+        heap = [entry for entry in self._heaps[pool]
+                if entry[2] in estimators and estimators[entry[2]].version == entry[3]]
+        heapq.heapify(heap)
+        self._heaps[pool] = heap
+        self._counters["compactions"] += 1
+
+
+def _write(path: str, snapshot: Dict[str, Any]) -> None:
+    """Atomically: a unique temp file in the same directory, then rename"""
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(dumps(snapshot))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS estimator_log ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, "
+        "enquiry_id TEXT NOT NULL, record TEXT NOT NULL)")
+    db.execute("CREATE INDEX IF NOT EXISTS estimator_log_enquiry ON estimator_log (enquiry_id)")
+    return db
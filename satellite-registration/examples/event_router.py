@@ -0,0 +1,204 @@
+"""
+SFG Aluminium - Event Router
+Version: 1.0.0
+Date: November 5, 2025
+
+Module-level router for webhook events and messages, built once at import.
+
+Handlers register with a decorator:
+
+    router = EventRouter()
+
+    @router.on("order.approved")
+    async def handle_order_approved(data): ...
+
+    @router.on("quote.*")
+    async def handle_any_quote_event(data): ...
+
+Event types are dotted names. A trailing "*" matches the rest of the name
+("quote.*" matches "quote.requested" and "quote.revision.sent") and a "*" in
+the middle matches exactly one segment. Exact routes win over wildcards and
+longer prefixes win over shorter ones. Resolved routes are memoised, so a
+repeat event type costs one dict lookup however many routes exist.
+
+Pass metrics=MetricsRegistry() to also record a latency histogram and an
+error counter per event type for /metrics.
+"""
+
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+WILDCARD = "*"
+
+# Upper bound on memoised event types (unknown types are memoised too)
+MAX_RESOLVED = 4096
+
+
+class UnknownEvent(LookupError):
+    """Raised when no route matches an event type"""
+
+
+class _Node:
+    __slots__ = ("children", "wildcard", "tail", "handler")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.wildcard: Optional["_Node"] = None
+        self.tail: Optional[Handler] = None   # handler for a trailing "*"
+        self.handler: Optional[Handler] = None
+
+
+class _Stats:
+    __slots__ = ("count", "errors", "total", "max", "histogram", "error_counter")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = None
+        self.error_counter = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class EventRouter:
+    """Decorator-based dispatcher backed by a segment trie"""
+
+    def __init__(self, name: str = "events", metrics=None):
+        self.name = name
+        self._root = _Node()
+        self._patterns: Dict[str, Handler] = {}
+        self._resolved: Dict[str, Optional[Handler]] = {}
+        self._stats: Dict[str, _Stats] = {}
+        self._latency = self._errors = None
+        if metrics is not None:
+            self._latency = metrics.histogram("dispatch_duration_seconds",
+                                              "Handler latency by router and event or message type",
+                                              ("router", "type"))
+            self._errors = metrics.counter("dispatch_errors_total",
+                                           "Handler exceptions by router and event or message type",
+                                           ("router", "type"))
+
+    def on(self, *patterns: str) -> Callable[[Handler], Handler]:
+        """Register the decorated coroutine for one or more event patterns"""
+        def decorator(handler: Handler) -> Handler:
+            for pattern in patterns:
+                self.add(pattern, handler)
+            return handler
+        return decorator
+
+    def add(self, pattern: str, handler: Handler) -> None:
+        if not inspect.iscoroutinefunction(handler):
+            raise TypeError(f"Handler for '{pattern}' must be an async function")
+        if pattern in self._patterns:
+            raise ValueError(f"Duplicate route for '{pattern}'")
+
+        segments = pattern.split(".")
+        node = self._root
+        for i, segment in enumerate(segments):
+            if segment == WILDCARD and i == len(segments) - 1:
+                node.tail = handler
+                break
+            if segment == WILDCARD:
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+        else:
+            node.handler = handler
+
+        self._patterns[pattern] = handler
+        # New routes can change earlier resolutions
+        self._resolved.clear()
+
+    def resolve(self, event_type: Optional[str]) -> Optional[Handler]:
+        """Return the handler for an event type, or None"""
+        if not isinstance(event_type, str):
+            return None
+        try:
+            return self._resolved[event_type]
+        except KeyError:
+            pass
+        handler = self._match(event_type.split(".")) if event_type else None
+        if len(self._resolved) >= MAX_RESOLVED:
+            self._resolved.clear()
+        self._resolved[event_type] = handler
+        return handler
+
+    async def dispatch(self, event_type: Optional[str], payload: Dict[str, Any]) -> Any:
+        """Run the matching handler and record its count and latency"""
+        handler = self.resolve(event_type)
+        if handler is None:
+            raise UnknownEvent(event_type)
+
+        stats = self._stats.get(event_type)
+        if stats is None:
+            stats = self._new_stats(event_type)
+
+        start = time.perf_counter()
+        try:
+            return await handler(payload)
+        except Exception:
+            stats.errors += 1
+            if stats.error_counter is not None:
+                stats.error_counter.inc()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.count += 1
+            stats.total += elapsed
+            if elapsed > stats.max:
+                stats.max = elapsed
+            if stats.histogram is not None:
+                stats.histogram.observe(elapsed)
+
+    def patterns(self) -> List[str]:
+        return sorted(self._patterns)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Dispatch counts and latency per event type"""
+        return {event_type: s.as_dict() for event_type, s in sorted(self._stats.items())}
+
+    def reset_stats(self) -> None:
+        self._stats.clear()
+
+    def _new_stats(self, event_type: str) -> _Stats:
+        # Histogram series are looked up once per event type, not per dispatch
+        stats = self._stats[event_type] = _Stats()
+        if self._latency is not None:
+            stats.histogram = self._latency.labels(self.name, event_type)
+            stats.error_counter = self._errors.labels(self.name, event_type)
+        return stats
+
+    def _match(self, segments: List[str]) -> Optional[Handler]:
+        # Walk every branch that can match and keep the most specific route:
+        # more exact segments first, then full-length routes over a trailing
+        # wildcard. The trie keeps this proportional to the name length, not
+        # to the number of registered routes.
+        best: Tuple[Tuple[int, int], Optional[Handler]] = ((-1, -1), None)
+        stack = [(self._root, 0, 0)]
+        while stack:
+            node, depth, exact = stack.pop()
+            if depth == len(segments):
+                if node.handler is not None and (exact, 1) > best[0]:
+                    best = ((exact, 1), node.handler)
+                continue
+            if node.tail is not None and (exact, 0) > best[0]:
+                best = ((exact, 0), node.tail)
+            if node.wildcard is not None:
+                stack.append((node.wildcard, depth + 1, exact))
+            child = node.children.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1, exact + 1))
+        return best[1]
@@ -0,0 +1,237 @@
+"""
+SFG Aluminium - Webhook Idempotency Store
+Version: 1.0.0
+Date: November 5, 2025
+
+Remembers processed NEXUS webhooks so retried deliveries are answered from
+the stored result instead of re-running the handler (a retried
+order.approved must not schedule production or create an invoice twice).
+
+- Key: event id + SHA-256 digest of the event without its timestamp
+  (event_digest). Senders stamp the time of each delivery attempt, so a
+  retry differs from the first attempt only in its timestamp and must
+  still map to the same key
+- Bounded in-memory LRU with time-based expiry; optional SQLite file so
+  keys survive restarts and are shared by every worker on the host
+- Concurrent deliveries of the same event wait for the first one; with the
+  SQLite file this holds across worker processes too (the first worker
+  claims the key, the others wait for its stored result)
+- Events whose signed timestamp is too old (or too far in the future) are
+  rejected to block replays of captured requests. Only unseen keys are
+  checked: a late retry of a processed event still gets its stored result.
+  Events without a readable timestamp are counted and logged, and rejected
+  when require_timestamp is set. The rejection message is STALE_MESSAGE,
+  which webhook_dispatcher recognises and retries with a fresh timestamp
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from json_codec import dumps, loads
+
+DEFAULT_TTL = 24 * 60 * 60          # seconds a processed event is remembered
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_TOLERANCE = 5 * 60          # accepted clock skew / delivery delay
+CLAIM_TIMEOUT = 30.0                # a claim older than this is taken over
+CLAIM_POLL = 0.01                   # seconds between checks for another worker's result
+
+Outcome = Tuple[int, Dict[str, Any]]   # (status_code, response body)
+
+STALE_MESSAGE = "Event timestamp outside the accepted window"
+
+
+class StaleEvent(Exception):
+    """Raised when an event timestamp is outside the replay window"""
+
+
+class IdempotencyStore:
+    """In-memory (optionally SQLite-backed) store of processed webhook results"""
+
+    def __init__(self, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 tolerance: float = DEFAULT_TOLERANCE, db_path: Optional[str] = None,
+                 require_timestamp: bool = False, log=None, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.require_timestamp = require_timestamp
+        self.log = log
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Outcome]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db = _open_db(db_path) if db_path else None
+        self._writes = 0
+        self._counters = {"processed": 0, "duplicates": 0, "stale_rejected": 0,
+                          "missing_timestamp": 0}
+
+    @staticmethod
+    def key_for(event: Dict[str, Any]) -> str:
+        event_id = event.get("id") or event.get("event_id") or ""
+        return f"{event_id}:{event_digest(event)}"
+
+    def check_timestamp(self, event: Dict[str, Any]) -> None:
+        """Reject events whose timestamp is outside the tolerance window"""
+        sent_at = _parse_timestamp(event.get("timestamp"))
+        if sent_at is None:
+            # Older NEXUS versions do not send one
+            self._counters["missing_timestamp"] += 1
+            if self.log is not None:
+                self.log.warning("event.timestamp_missing", id=event.get("id"),
+                                 type=event.get("type"), rejected=self.require_timestamp)
+            if self.require_timestamp:
+                raise StaleEvent("Event timestamp missing or unreadable")
+            return
+        if abs(self._clock() - sent_at) > self.tolerance:
+            self._counters["stale_rejected"] += 1
+            raise StaleEvent(STALE_MESSAGE)
+
+    def get(self, key: str) -> Optional[Outcome]:
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+        if self._db is not None:
+            row = self._db.execute(
+                "SELECT expires_at, status_code, result FROM idempotency WHERE key = ?",
+                (key,)).fetchone()
+            if row and row[0] > now:
+                outcome = (row[1], loads(row[2]))
+                self._remember(key, row[0], outcome)
+                return outcome
+        return None
+
+    def put(self, key: str, outcome: Outcome) -> None:
+        expires_at = self._clock() + self.ttl
+        self._remember(key, expires_at, outcome)
+        if self._db is not None:
+            self._db.execute(
+                "INSERT OR REPLACE INTO idempotency (key, expires_at, status_code, result) "
+                "VALUES (?, ?, ?, ?)",
+                (key, expires_at, outcome[0], dumps(outcome[1]).decode()))
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._db.execute("DELETE FROM idempotency WHERE expires_at <= ?",
+                                 (self._clock(),))
+
+    async def run_once(self, key: str, handler,
+                       event: Optional[Dict[str, Any]] = None) -> Tuple[bool, Outcome]:
+        """
+        Run handler() once per key and return (duplicate, outcome)
+
+        handler is a coroutine function returning (status_code, body). Errors
+        are not stored, so NEXUS can retry a failed delivery. When event is
+        given, its timestamp is checked (StaleEvent) before a new key runs.
+        """
+        outcome = self.get(key)
+        if outcome is not None:
+            self._counters["duplicates"] += 1
+            return True, outcome
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self._counters["duplicates"] += 1
+            return True, await asyncio.shield(future)
+
+        if event is not None:
+            self.check_timestamp(event)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            if self._db is not None and not self._claim(key):
+                # Another worker is running this event; answer with its result
+                outcome = await self._wait_for_claim(key)
+                if outcome is not None:
+                    self._counters["duplicates"] += 1
+                    future.set_result(outcome)
+                    return True, outcome
+            outcome = await handler()
+        except BaseException as e:
+            self._release(key)
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.put(key, outcome)
+        self._release(key)
+        self._counters["processed"] += 1
+        future.set_result(outcome)
+        return False, outcome
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "entries": len(self._entries),
+                "persistent": self._db is not None, "require_timestamp": self.require_timestamp}
+
+    def _claim(self, key: str) -> bool:
+        """Mark key as running in this process; False if another worker holds it"""
+        now = self._clock()
+        cursor = self._db.execute(
+            "INSERT INTO idempotency_claims (key, claimed_at) VALUES (?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET claimed_at = excluded.claimed_at "
+            "WHERE idempotency_claims.claimed_at < ?",
+            (key, now, now - CLAIM_TIMEOUT))
+        return cursor.rowcount == 1
+
+    async def _wait_for_claim(self, key: str) -> Optional[Outcome]:
+        """Wait for the claiming worker's result; None if it failed or timed out"""
+        while True:
+            await asyncio.sleep(CLAIM_POLL)
+            outcome = self.get(key)
+            if outcome is not None:
+                return outcome
+            if self._claim(key):
+                return None   # released without a result, or stale: run it here
+
+    def _release(self, key: str) -> None:
+        if self._db is not None:
+            self._db.execute("DELETE FROM idempotency_claims WHERE key = ?", (key,))
+
+    def _remember(self, key: str, expires_at: float, outcome: Outcome) -> None:
+        self._entries[key] = (expires_at, outcome)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def event_digest(event: Dict[str, Any]) -> str:
+    """SHA-256 of the event without its timestamp (stdlib json: independent of the codec)"""
+    identity = {key: value for key, value in event.items() if key != "timestamp"}
+    body = json.dumps(identity, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS idempotency ("
+        "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, "
+        "status_code INTEGER NOT NULL, result TEXT NOT NULL)")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS idempotency_claims ("
+        "key TEXT PRIMARY KEY, claimed_at REAL NOT NULL)")
+    return db
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # Accept epoch seconds or milliseconds
+        return value / 1000 if value > 1e11 else float(value)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed.timestamp()   # naive timestamps are taken as local time
@@ -0,0 +1,120 @@
+"""
+SFG Aluminium - JSON Codec
+Version: 1.0.0
+Date: November 5, 2025
+
+One JSON decode/encode path for the handlers, backed by the fastest library
+installed: orjson, then msgspec, then the standard library.
+
+- loads() accepts bytes or str and raises ValueError on invalid JSON,
+  whichever backend is in use
+- dumps() returns compact UTF-8 bytes; datetimes and dates (ISO 8601),
+  Decimals (numbers), sets and ResponseModel / DomainModel instances
+  (their to_dict()) are encoded directly, and any other type raises
+  TypeError, as json.dumps does, rather than being sent as its str()
+- JSONBytesResponse sends a handler result with one dumps() call instead of
+  FastAPI's jsonable_encoder walk followed by json.dumps
+
+Set SFG_JSON_BACKEND=json (or orjson / msgspec) to pick a backend explicitly,
+e.g. to compare them.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Tuple, Union
+
+from fastapi import Response
+
+from response_models import ResponseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - msgspec is optional
+    msgspec = None
+
+
+def _default(obj: Any) -> Any:
+    """Types the backends do not encode natively"""
+    if isinstance(obj, ResponseModel):
+        return obj.to_dict()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_codec() -> Tuple[Callable[[Union[bytes, str]], Any], Callable[..., bytes]]:
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=_default)
+    sorted_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False,
+                                      default=_default, sort_keys=True)
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return (sorted_encoder if sort_keys else encoder).encode(obj).encode()
+
+    return json.loads, dumps
+
+
+def _orjson_codec():
+    options = orjson.OPT_NON_STR_KEYS
+
+    def loads(data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)   # orjson.JSONDecodeError is a ValueError
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(obj, default=_default,
+                            option=(options | orjson.OPT_SORT_KEYS) if sort_keys else options)
+
+    return loads, dumps
+
+
+def _msgspec_codec():
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    sorted_encoder = msgspec.json.Encoder(enc_hook=_default, order="sorted")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+        return (sorted_encoder if sort_keys else encoder).encode(obj)
+
+    return loads, dumps
+
+
+# name -> (loads, dumps) for every backend importable here, fastest first
+BACKENDS: Dict[str, Tuple[Callable, Callable]] = {}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_codec()
+if msgspec is not None:
+    BACKENDS["msgspec"] = _msgspec_codec()
+BACKENDS["json"] = _stdlib_codec()
+
+BACKEND = os.environ.get("SFG_JSON_BACKEND", "").lower()
+if BACKEND not in BACKENDS:
+    BACKEND = next(iter(BACKENDS))
+
+loads, dumps = BACKENDS[BACKEND]
+
+
+class JSONBytesResponse(Response):
+    """JSON response encoded by the codec in one pass"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
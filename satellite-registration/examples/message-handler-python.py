@@ -7,11 +7,103 @@ Date: November 5, 2025
 This message handler responds to requests from NEXUS and other SFG apps.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from typing import Dict, Any
+from fastapi.responses import FileResponse, PlainTextResponse
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
+import asyncio
+import math
 
-app = FastAPI(title="SFG Aluminium Message Handler")
+from bulk_export import BulkExporter, InvalidExport
+from business_logic import data_models, load_business_logic
+from document_pipeline import DocumentPipeline, invoice_document, quote_document
+from domain_models import ValidationError, build_models
+from event_router import EventRouter, UnknownEvent
+from json_codec import JSONBytesResponse, dumps, loads
+from metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry
+from pricing_engine import PricingEngine
+from query_cache import QueryCache, entities_for_event, invalidate_entities
+from rate_limiter import RateLimiter, RateLimitMiddleware
+from record_store import INDEXED_PATHS, AsyncRecordStore, pick
+from response_models import CustomerData, OrderStatus, QuoteStatus, is_error
+from shared_state import SharedState
+from structured_log import StructuredLogger
+from webhook_verifier import InvalidPayload, InvalidSignature, WebhookVerifier, load_secrets
+
+# JSON lines to stdout, written by a background thread (SFG_LOG_LEVEL)
+log = StructuredLogger("messages")
+
+# Workers started by serve.py share cache invalidations and metrics through
+# SFG_SHARED_STATE (a SQLite WAL file on this host)
+shared = SharedState.from_env("messages", log=log)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if shared:
+        await shared.start(on_invalidate=invalidate_entities, metrics=metrics)
+    yield
+    if shared:
+        await shared.stop(metrics=metrics)
+    if records:
+        records.close()
+    if limiter:
+        limiter.close()
+    documents.close()
+    log.flush()
+
+
+app = FastAPI(title="SFG Aluminium Message Handler", lifespan=lifespan)
+
+# Per-client limits from the manifest's apiEndpoints rate_limit (shared
+# across workers through SFG_SHARED_STATE); SFG_RATE_LIMITS=off disables them
+limiter = RateLimiter.from_env(load_business_logic(), shared_path=shared.path if shared else None)
+if limiter:
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+# Request and per-message counters/latency histograms, served at /metrics
+metrics = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Message routes are registered once at import with @router.on(...)
+router = EventRouter("messages", metrics=metrics)
+
+# Read-through cache for query.* handlers (TTL per message type below)
+cache = QueryCache(max_entries=10000)
+
+# The webhook handler signs its /cache/invalidate calls with the webhook
+# secret (NEXUS_WEBHOOK_SECRETS or WEBHOOK_SECRET, as it reads them)
+WEBHOOK_SECRET = "your-webhook-secret-here"
+verifier = WebhookVerifier(load_secrets(WEBHOOK_SECRET))
+
+metrics.collect("query_cache_lookups_total", "Query cache lookups by result",
+                lambda: {result: cache.stats()[result] for result in ("hits", "misses", "coalesced")},
+                kind="counter", label_names=("result",))
+metrics.collect("query_cache_entries", "Cached query results", lambda: cache.stats()["entries"])
+
+# Customers, quotes and orders for the query.* handlers, from the SQLite
+# store at SFG_RECORD_STORE (load it with record_store.py import). Without
+# the variable the handlers answer with example data.
+records = AsyncRecordStore.from_env()
+
+# Streaming NDJSON exports of the same records (GET /export/{kind})
+exporter = BulkExporter(records) if records else None
+
+# Quote and invoice PDFs, rendered in worker processes into data/uploads
+# (SFG_UPLOADS_DIR) and served from /documents
+documents = DocumentPipeline.from_env()
+
+# Margin and T1-T5 approval rules from business-logic.json (shared with the
+# webhook handler's quote.requested)
+pricing = PricingEngine.from_business_logic(load_business_logic())
+
+# Typed quote lines (validator compiled once; see domain_models)
+QuoteItem = build_models(data_models(load_business_logic()))["QuoteItem"]
+
+# Batch endpoint limits
+BATCH_MAX_MESSAGES = 500
+BATCH_CONCURRENCY = 32
 
 @app.post("/messages/handle")
 async def handle_message(request: Request):
@@ -26,39 +118,131 @@ async def handle_message(request: Request):
     - action.approve_order: Approve order
     - action.send_invoice: Send invoice
     """
-    message = await request.json()
+    message = await _read_json(request)
+    if not isinstance(message, dict):
+        raise HTTPException(status_code=400, detail="Message must be a JSON object")
     message_type = message.get("type")
     params = message.get("params", {})
     request_id = message.get("request_id")
     
-    print(f"[{datetime.now().isoformat()}] Received message: {message_type}")
+    log.info("message.received", type=message_type, request_id=request_id)
     
     # Route to appropriate handler
-    handlers = {
-        "query.customer_data": get_customer_data,
-        "query.quote_status": get_quote_status,
-        "query.order_status": get_order_status,
-        "action.create_quote": create_quote,
-        "action.approve_order": approve_order,
-        "action.send_invoice": send_invoice
-    }
-    
-    handler = handlers.get(message_type)
-    if handler:
-        result = await handler(params)
-        status = "success" if "error" not in result else "error"
-    else:
-        result = {"error": f"Unknown message type: {message_type}"}
-        status = "error"
+    status, result = await process_message(message_type, params)
     
-    return {
+    # Encoded in one pass by json_codec (no jsonable_encoder walk)
+    return JSONBytesResponse({
         "request_id": request_id,
         "status": status,
         "result": result,
         "timestamp": datetime.now().isoformat()
-    }
+    })
+
+
+@app.post("/messages/batch")
+async def handle_message_batch(request: Request):
+    """
+    Handle a batch of messages in one request
+    
+    Body is a JSON array of messages, each shaped like a /messages/handle
+    request with its own request_id. Messages run concurrently (at most
+    BATCH_CONCURRENCY at a time) and results come back in request order.
+    Identical query.* messages in the same batch are only executed once.
+    Each message counts as one /messages/handle request for rate limiting.
+    """
+    messages = await _read_json(request)
+    if not isinstance(messages, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array of messages")
+    if len(messages) > BATCH_MAX_MESSAGES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large ({len(messages)} > {BATCH_MAX_MESSAGES} messages)"
+        )
+    
+    # Each message in the batch counts against the /messages/handle limit
+    if limiter:
+        limit, wait = await limiter.charge(request.scope, "/messages/handle", len(messages))
+        if wait:
+            raise HTTPException(status_code=429, detail=f"Rate limit exceeded ({limit.text})",
+                                headers={"Retry-After": str(max(1, math.ceil(wait)))})
+    
+    log.info("batch.received", count=len(messages))
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def run(message_type: str, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await process_message(message_type, params)
+            except Exception as e:
+                return "error", {"error": f"Message failed: {e}"}
+    
+    # Queries have no side effects, so identical ones share one execution
+    queries: Dict[Tuple[str, str], asyncio.Future] = {}
+    futures = []
+    for message in messages:
+        if not isinstance(message, dict):
+            futures.append(_invalid_message())
+            continue
+        message_type = message.get("type")
+        params = message.get("params", {})
+        if isinstance(message_type, str) and message_type.startswith("query."):
+            key = (message_type, dumps(params, sort_keys=True))
+            future = queries.get(key)
+            if future is None:
+                future = queries[key] = asyncio.ensure_future(run(message_type, params))
+            futures.append(future)
+        else:
+            futures.append(asyncio.ensure_future(run(message_type, params)))
+    
+    outcomes = await asyncio.gather(*futures)
+    
+    results = []
+    for message, (status, result) in zip(messages, outcomes):
+        results.append({
+            "request_id": message.get("request_id") if isinstance(message, dict) else None,
+            "status": status,
+            "result": result
+        })
+    
+    succeeded = sum(1 for item in results if item["status"] == "success")
+    return JSONBytesResponse({
+        "status": "success" if succeeded == len(results) else "partial" if succeeded else "error",
+        "count": len(results),
+        "results": results,
+        "timestamp": datetime.now().isoformat()
+    })
+
+
+async def _read_json(request: Request) -> Any:
+    try:
+        return loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
 
 
+async def process_message(message_type: str, params: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Route one message to its handler and return (status, result)"""
+    try:
+        result = await router.dispatch(message_type, params)
+        status = "error" if is_error(result) else "success"
+    except UnknownEvent:
+        result = {"error": f"Unknown message type: {message_type}"}
+        status = "error"
+    return status, result
+
+
+async def _invalid_message() -> Tuple[str, Dict[str, Any]]:
+    return "error", {"error": "Message must be a JSON object"}
+
+
+# Colours of the customer tiers (businessRules "Customer tier discounts")
+TIER_COLORS = {"platinum": "purple", "sapphire": "blue", "steel": "gray",
+               "green": "green", "crimson": "red"}
+
+
+@router.on("query.customer_data")
+@cache.cached("query.customer_data", entity="customer", key="customer_id", ttl=300)
 async def get_customer_data(params: Dict[str, Any]):
     """
     Get customer data
@@ -70,31 +254,61 @@ async def get_customer_data(params: Dict[str, Any]):
     if not customer_id:
         return {"error": "customer_id is required"}
     
-    print(f"Fetching customer data for {customer_id}")
-    
-    # Your business logic here - query database
-    # customer = await db.customers.find_one({"id": customer_id})
-    
-    # Example data
-    customer_data = {
-        "customer_id": customer_id,
-        "name": "Acme Construction Ltd",
-        "email": "orders@acme.co.uk",
-        "phone": "+44 20 1234 5678",
-        "tier": "sapphire",
-        "tier_color": "blue",
-        "credit_limit": 50000,
-        "outstanding_balance": 12500,
-        "available_credit": 37500,
-        "payment_terms": "30 days",
-        "last_order_date": "2025-10-15",
-        "total_orders": 47,
-        "total_revenue": 342500
-    }
-    
-    return customer_data
+    log.info("customer.fetching", customer_id=customer_id)
+    
+    if records is None:
+        # Example data (no record store configured)
+        return CustomerData(
+            customer_id=customer_id,
+            name="Acme Construction Ltd",
+            email="orders@acme.co.uk",
+            phone="+44 20 1234 5678",
+            tier="sapphire",
+            tier_color="blue",
+            credit_limit=50000,
+            outstanding_balance=12500,
+            available_credit=37500,
+            payment_terms="30 days",
+            last_order_date="2025-10-15",
+            total_orders=47,
+            total_revenue=342500
+        )
+    
+    customer = await records.get("customers", customer_id)
+    if customer is None:
+        return {"error": f"Customer {customer_id} not found"}
+    return customer_data(customer)
 
 
+def customer_data(customer: Dict[str, Any]) -> CustomerData:
+    """query.customer_data result for a stored customer (flat or data/customers shape)"""
+    first_name = pick(customer, ("personal", "first_name"), default="")
+    last_name = pick(customer, ("personal", "last_name"), default="")
+    tier = pick(customer, ("tier",), ("tier", "level"), default="steel")
+    credit_limit = pick(customer, ("credit_limit",), ("credit", "limit"), default=0)
+    available = pick(customer, ("available_credit",), ("credit", "available"))
+    outstanding = pick(customer, ("outstanding_balance",),
+                       default=credit_limit - available if available is not None else 0)
+    return CustomerData(
+        customer_id=customer["id"],
+        name=pick(customer, ("name",), ("company", "name"),
+                  default=f"{first_name} {last_name}".strip()),
+        email=pick(customer, ("email",), ("personal", "email"), default=""),
+        phone=pick(customer, ("phone",), ("personal", "phone"), default=""),
+        tier=tier,
+        tier_color=pick(customer, ("tier", "color"), default=TIER_COLORS.get(tier, "gray")),
+        credit_limit=credit_limit,
+        outstanding_balance=outstanding,
+        available_credit=credit_limit - outstanding,
+        payment_terms=pick(customer, ("payment_terms",), ("credit", "terms"), default=""),
+        last_order_date=pick(customer, ("last_order_date",), ("history", "last_order_date")),
+        total_orders=pick(customer, ("total_orders",), ("history", "total_orders"), default=0),
+        total_revenue=pick(customer, ("total_revenue",), ("history", "total_value"), default=0)
+    )
+
+
+@router.on("query.quote_status")
+@cache.cached("query.quote_status", entity="quote", key="quote_id", ttl=60)
 async def get_quote_status(params: Dict[str, Any]):
     """
     Get quote status
@@ -106,30 +320,57 @@ async def get_quote_status(params: Dict[str, Any]):
     if not quote_id:
         return {"error": "quote_id is required"}
     
-    print(f"Fetching quote status for {quote_id}")
-    
-    # Your business logic here
-    # quote = await db.quotes.find_one({"id": quote_id})
-    
-    # Example data
-    quote_data = {
-        "quote_id": quote_id,
-        "quote_number": "QUO-251015-7843",
-        "status": "sent",
-        "customer_name": "Acme Construction Ltd",
-        "total_amount": 15750.00,
-        "margin": 0.22,
-        "created_at": "2025-10-15T09:30:00Z",
-        "sent_at": "2025-10-15T14:20:00Z",
-        "expires_at": "2025-11-14T14:20:00Z",
-        "valid": True,
-        "items_count": 12,
-        "pdf_url": "https://sharepoint.com/quotes/QUO-251015-7843.pdf"
-    }
-    
-    return quote_data
+    log.info("quote_status.fetching", quote_id=quote_id)
+    
+    if records is None:
+        # Example data (no record store configured)
+        return QuoteStatus(
+            quote_id=quote_id,
+            quote_number="QUO-251015-7843",
+            status="sent",
+            customer_name="Acme Construction Ltd",
+            total_amount=15750.00,
+            margin=0.22,
+            created_at="2025-10-15T09:30:00Z",
+            sent_at="2025-10-15T14:20:00Z",
+            expires_at="2025-11-14T14:20:00Z",
+            valid=True,
+            items_count=12,
+            pdf_url="https://sharepoint.com/quotes/QUO-251015-7843.pdf"
+        )
+    
+    quote = await records.get("quotes", quote_id)
+    if quote is None:
+        return {"error": f"Quote {quote_id} not found"}
+    return quote_status(quote)
+
 
+def quote_status(quote: Dict[str, Any]) -> QuoteStatus:
+    """query.quote_status result for a stored quote (flat or data/quotes shape)"""
+    status = pick(quote, ("status",), ("status", "current"), default="draft")
+    expires_at = pick(quote, ("expires_at",), ("quote_document", "valid_until"))
+    margin = pick(quote, ("margin",))
+    if margin is None:
+        margin = pick(quote, ("margin_percentage",), default=0) / 100
+    return QuoteStatus(
+        quote_id=quote["id"],
+        quote_number=pick(quote, ("quote_number",), default=quote["id"]),
+        status=status,
+        customer_name=pick(quote, ("customer_name",), ("customer", "name"), default=""),
+        total_amount=pick(quote, ("total_amount",), ("total_estimated_value",), default=0),
+        margin=margin,
+        created_at=pick(quote, *INDEXED_PATHS["created_at"], default=""),
+        sent_at=pick(quote, ("sent_at",), ("quote_document", "sent_date")),
+        expires_at=expires_at or "",
+        valid=status not in ("accepted", "rejected") and (
+            expires_at is None or expires_at[:10] >= datetime.now().date().isoformat()),
+        items_count=len(quote.get("items") or quote.get("products") or []),
+        pdf_url=pick(quote, ("pdf_url",), ("quote_document", "pdf_url"), default="")
+    )
 
+
+@router.on("query.order_status")
+@cache.cached("query.order_status", entity="order", key="order_id", ttl=30)
 async def get_order_status(params: Dict[str, Any]):
     """
     Get order status
@@ -141,30 +382,53 @@ async def get_order_status(params: Dict[str, Any]):
     if not order_id:
         return {"error": "order_id is required"}
     
-    print(f"Fetching order status for {order_id}")
-    
-    # Your business logic here
-    # order = await db.orders.find_one({"id": order_id})
-    
-    # Example data
-    order_data = {
-        "order_id": order_id,
-        "order_number": "ORD-251020-3421",
-        "status": "fabrication",
-        "customer_name": "Acme Construction Ltd",
-        "total_amount": 15750.00,
-        "created_at": "2025-10-20T11:00:00Z",
-        "production_start": "2025-10-25T08:00:00Z",
-        "estimated_completion": "2025-11-10T17:00:00Z",
-        "installation_date": "2025-11-15T09:00:00Z",
-        "progress": 0.65,
-        "items_completed": 8,
-        "items_total": 12
-    }
-    
-    return order_data
+    log.info("order_status.fetching", order_id=order_id)
+    
+    if records is None:
+        # Example data (no record store configured)
+        return OrderStatus(
+            order_id=order_id,
+            order_number="ORD-251020-3421",
+            status="fabrication",
+            customer_name="Acme Construction Ltd",
+            total_amount=15750.00,
+            created_at="2025-10-20T11:00:00Z",
+            production_start="2025-10-25T08:00:00Z",
+            estimated_completion="2025-11-10T17:00:00Z",
+            installation_date="2025-11-15T09:00:00Z",
+            progress=0.65,
+            items_completed=8,
+            items_total=12
+        )
+    
+    order = await records.get("orders", order_id)
+    if order is None:
+        return {"error": f"Order {order_id} not found"}
+    return order_status(order)
 
 
+def order_status(order: Dict[str, Any]) -> OrderStatus:
+    """query.order_status result for a stored order"""
+    items_total = pick(order, ("items_total",), default=len(order.get("items") or []))
+    items_completed = pick(order, ("items_completed",), default=0)
+    return OrderStatus(
+        order_id=order["id"],
+        order_number=pick(order, ("order_number",), default=order["id"]),
+        status=pick(order, ("status",), ("status", "current"), default="approved"),
+        customer_name=pick(order, ("customer_name",), ("customer", "name"), default=""),
+        total_amount=pick(order, ("total_amount",), default=0),
+        created_at=pick(order, *INDEXED_PATHS["created_at"], default=""),
+        production_start=pick(order, ("production_start",)),
+        estimated_completion=pick(order, ("estimated_completion",)),
+        installation_date=pick(order, ("installation_date",)),
+        progress=pick(order, ("progress",),
+                      default=items_completed / items_total if items_total else 0.0),
+        items_completed=items_completed,
+        items_total=items_total
+    )
+
+
+@router.on("action.create_quote")
 async def create_quote(params: Dict[str, Any]):
     """
     Create new quote
@@ -177,22 +441,26 @@ async def create_quote(params: Dict[str, Any]):
     
     if not enquiry_id or not items:
         return {"error": "enquiry_id and items are required"}
+    try:
+        items = QuoteItem.validate_many(items, "items")
+    except ValidationError as e:
+        return {"error": str(e)}
     
-    print(f"Creating quote for enquiry {enquiry_id}")
+    log.info("quote.creating", enquiry_id=enquiry_id)
     
     # Your business logic here
     # Calculate pricing, check margins, generate PDF
     
-    total_price = sum(item.get("price", 0) for item in items)
-    total_cost = sum(item.get("cost", 0) for item in items)
-    margin = (total_price - total_cost) / total_price if total_price > 0 else 0
+    priced = pricing.price_quote(items, params.get("customer_tier"))
+    total_price = priced["total_price"]
+    margin = priced["margin"]
     
     # Check minimum margin
-    if margin < 0.15:
+    if not priced["margin_ok"]:
         return {
-            "error": "Margin below minimum (15%)",
+            "error": f"Margin below minimum ({pricing.min_margin:.0%})",
             "margin": margin,
-            "required_margin": 0.15
+            "required_margin": pricing.min_margin
         }
     
     # Generate quote
@@ -205,15 +473,21 @@ async def create_quote(params: Dict[str, Any]):
         "customer_id": customer_id,
         "total_amount": total_price,
         "margin": margin,
+        "margin_warning": priced["margin_warning"],
+        "approval_needed": priced["approval_needed"],
+        "approval_tier": priced["approval_tier"],
         "status": "draft",
         "created_at": datetime.now().isoformat(),
         "expires_at": datetime.now().isoformat(),  # + 30 days
-        "pdf_url": f"https://sharepoint.com/quotes/{quote_number}.pdf"
     }
+    customer = await records.get("customers", customer_id) if records and customer_id else None
+    quote_data["pdf_url"] = await _render_document(
+        "quote", quote_document(quote_data, items, customer))
     
     return quote_data
 
 
+@router.on("action.approve_order")
 async def approve_order(params: Dict[str, Any]):
     """
     Approve order
@@ -226,7 +500,7 @@ async def approve_order(params: Dict[str, Any]):
     if not order_id or not approved_by:
         return {"error": "order_id and approved_by are required"}
     
-    print(f"Approving order {order_id} by {approved_by}")
+    log.info("order.approving", order_id=order_id, approved_by=approved_by)
     
     # Your business logic here
     # Update order status, schedule production, create invoice
@@ -243,6 +517,7 @@ async def approve_order(params: Dict[str, Any]):
     return approval_data
 
 
+@router.on("action.send_invoice")
 async def send_invoice(params: Dict[str, Any]):
     """
     Send invoice
@@ -255,7 +530,7 @@ async def send_invoice(params: Dict[str, Any]):
     if not order_id:
         return {"error": "order_id is required"}
     
-    print(f"Sending invoice for order {order_id}")
+    log.info("invoice.sending", order_id=order_id)
     
     # Your business logic here
     # Generate invoice in Xero, send email
@@ -268,12 +543,84 @@ async def send_invoice(params: Dict[str, Any]):
         "sent_at": datetime.now().isoformat(),
         "due_date": datetime.now().isoformat(),  # + 30 days
         "status": "sent",
-        "pdf_url": f"https://xero.com/invoices/INV-{datetime.now().strftime('%y%m%d')}-{order_id[-4:]}.pdf"
     }
+    order = (await records.get("orders", order_id) if records else None) or {}
+    items = params.get("items") or order.get("items") or order.get("products") or []
+    customer = order.get("customer") if isinstance(order.get("customer"), dict) else None
+    invoice_data["pdf_url"] = await _render_document("invoice", invoice_document(
+        invoice_data, items, customer,
+        net_total=pick(order, ("total_amount",), ("total_estimated_value",))))
     
     return invoice_data
 
 
+async def _render_document(kind: str, document: Dict[str, Any]) -> Optional[str]:
+    """URL of the rendered PDF (None, and logged, if it could not be rendered)"""
+    try:
+        await documents.render(kind, document)
+    except Exception as e:
+        log.error("document.failed", kind=kind, id=document.get("id"),
+                  number=document.get("number"), error=str(e))
+        return None
+    return documents.url(kind, document["id"])
+
+
+@app.get("/documents/{folder}/{name}")
+async def get_document(folder: str, name: str):
+    """A rendered quote or invoice PDF (the pdf_url of create_quote / send_invoice)"""
+    path = documents.file(folder, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return FileResponse(path, media_type="application/pdf")
+
+
+@app.get("/export/{kind}")
+async def export_records(kind: str, request: Request):
+    """
+    Stream customers, quotes or orders as NDJSON
+    
+    Query: status, customer_id, since, until (created_at), limit, cursor
+    (from the trailer line) and modified_after (the X-Watermark of an
+    earlier export, for only the rows changed since; If-Modified-Since
+    works too). See bulk_export.
+    """
+    if exporter is None:
+        raise HTTPException(status_code=503, detail="Exports need the record store (SFG_RECORD_STORE)")
+    try:
+        return await exporter.response(kind, request.query_params, request.headers)
+    except InvalidExport as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/cache/invalidate")
+async def invalidate_cache(request: Request):
+    """
+    Invalidate cached query results for a webhook event
+    
+    Called by the webhook handler when payment.received, order.approved or
+    customer.registered arrives. Body: {"type": "<event type>", "data": {...}},
+    signed like a NEXUS webhook (X-Nexus-Signature)
+    """
+    try:
+        _, event = await verifier.read_verified(request)
+    except InvalidSignature:
+        raise HTTPException(status_code=401, detail="Invalid signature")
+    except InvalidPayload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not isinstance(event.get("type"), str):
+        raise HTTPException(status_code=400, detail="type must be an event type string")
+    entities = entities_for_event(event.get("type"), event.get("data"))
+    if shared:
+        # The other workers drop theirs on their next sync
+        shared.publish_invalidations(entities)
+    return {
+        "status": "success",
+        "entities": [{"entity": entity, "id": entity_id} for entity, entity_id in entities],
+        "removed": invalidate_entities(entities),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -281,10 +628,28 @@ async def health_check():
         "status": "healthy",
         "service": "SFG Aluminium Message Handler",
         "version": "1.0.0",
+        "dispatch": router.stats(),
+        "cache": cache.stats(),
+        "logging": log.stats(),
+        "workers": shared.stats() if shared else None,
+        "rate_limits": limiter.stats() if limiter else None,
+        "records": records.stats() if records else None,
+        "exports": exporter.stats() if exporter else None,
+        "documents": documents.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Counters and latency histograms in the Prometheus text format (all workers)"""
+    if shared:
+        shared.publish_metrics(metrics.dump())
+        return PlainTextResponse(metrics.render(shared.worker_metrics()), media_type=CONTENT_TYPE)
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # SFG_WORKERS=4 (or "auto") for more worker processes; see serve.py
+    from serve import serve
+    serve("message")
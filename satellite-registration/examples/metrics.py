@@ -0,0 +1,332 @@
+"""
+SFG Aluminium - Handler Metrics
+Version: 1.0.0
+Date: November 5, 2025
+
+Counters and fixed-bucket latency histograms for the webhook and message
+handlers, exposed in the Prometheus text format at /metrics.
+
+- MetricsRegistry holds metric families; each family keeps one series per
+  label combination (e.g. router="webhooks", type="order.approved")
+- Histograms use fixed bucket bounds, so recording a latency is one bisect
+  and three additions; buckets are only made cumulative when scraped
+- MetricsMiddleware (pure ASGI) records request counts and latency per route
+- EventRouter(name, metrics=registry) records latency per event and message
+  type
+
+Aggregation is per worker process and lock-free: handlers run on one event
+loop thread, so series are plain attributes updated without locks. When
+several workers share a host, each publishes dump() to the shared state file
+and render(dumps) sums them (see shared_state.py).
+
+Usage:
+
+    metrics = MetricsRegistry()
+    app.add_middleware(MetricsMiddleware, registry=metrics)
+    router = EventRouter("webhooks", metrics=metrics)
+
+    @app.get("/metrics")
+    async def prometheus_metrics():
+        return Response(metrics.render(), media_type=CONTENT_TYPE)
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+NAMESPACE = "sfg"
+
+# Seconds; spans the 200ms response-time target with room either side
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.2, 0.5, 1.0, 2.5, 5.0)
+
+# Label combinations per family before new ones are folded into "other"
+MAX_SERIES = 1000
+
+OVERFLOW_LABEL = "other"
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Bucket i counts values <= bounds[i] (Prometheus "le")
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Family:
+    """One named metric and its series, keyed by label values"""
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Tuple[str, ...],
+                 buckets: Optional[Tuple[float, ...]] = None, max_series: int = MAX_SERIES):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.buckets = buckets
+        self.max_series = max_series
+        self.series: Dict[Tuple[Any, ...], Any] = {}
+
+    def labels(self, *values: Any):
+        """Return the series for these label values, creating it on first use"""
+        try:
+            return self.series[values]
+        except KeyError:
+            pass
+        if len(self.series) >= self.max_series:
+            values = (OVERFLOW_LABEL,) * len(self.label_names)
+            existing = self.series.get(values)
+            if existing is not None:
+                return existing
+        series = Histogram(self.buckets) if self.kind == "histogram" else Counter()
+        self.series[values] = series
+        return series
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for values, series in sorted(self.series.items(), key=_sort_key):
+            labels = _format_labels(self.label_names, values)
+            if self.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(series.bounds + (float("inf"),), series.counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                    yield (f"{self.name}_bucket",
+                           "{" + (labels[1:-1] + "," if labels else "") + le + "}", cumulative)
+                yield f"{self.name}_sum", labels, series.sum
+                yield f"{self.name}_count", labels, series.count
+            else:
+                yield self.name, labels, series.value
+
+
+class _Collector:
+    """A family whose values are read from a callback at scrape time"""
+
+    def __init__(self, name: str, help: str, kind: str, label_names: Tuple[str, ...],
+                 callback: Callable[[], Any]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.label_names = label_names
+        self.callback = callback
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        value = self.callback()
+        if not isinstance(value, dict):
+            yield self.name, "", value
+            return
+        for values, sample in sorted(value.items(), key=_sort_key):
+            if not isinstance(values, tuple):
+                values = (values,)
+            yield self.name, _format_labels(self.label_names, values), sample
+
+
+class MetricsRegistry:
+    """Per-process set of metric families, rendered for Prometheus"""
+
+    def __init__(self, namespace: str = NAMESPACE, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets))
+        self.started_at = time.time()
+        self._families: Dict[str, Any] = {}
+
+    def counter(self, name: str, help: str, label_names: Iterable[str] = ()) -> Family:
+        return self._family(name, help, "counter", tuple(label_names))
+
+    def histogram(self, name: str, help: str, label_names: Iterable[str] = (),
+                  buckets: Optional[Tuple[float, ...]] = None) -> Family:
+        return self._family(name, help, "histogram", tuple(label_names),
+                            tuple(sorted(buckets)) if buckets else self.buckets)
+
+    def collect(self, name: str, help: str, callback: Callable[[], Any],
+                kind: str = "gauge", label_names: Iterable[str] = ()) -> None:
+        """
+        Register a value read at scrape time
+
+        The callback returns a number, or a dict of label values (a tuple,
+        or a single value for one label) to numbers.
+        """
+        full_name = self._name(name)
+        self._families[full_name] = _Collector(full_name, help, kind, tuple(label_names), callback)
+
+    def dump(self) -> Dict[str, Dict[str, Any]]:
+        """Every family's current samples, JSON-serialisable for sharing between workers"""
+        return {
+            family.name: {
+                "help": family.help,
+                "kind": family.kind,
+                "samples": [[name + labels, value] for name, labels, value in family.samples()],
+            }
+            for family in self._families.values()
+        }
+
+    def render(self, dumps: Optional[List[Dict[str, Dict[str, Any]]]] = None) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4)
+
+        With dumps (one per worker, see dump()) the samples are summed across
+        workers instead of reporting this process alone.
+        """
+        families = self.dump() if dumps is None else merge_dumps(dumps)
+        lines: List[str] = []
+        for name, family in families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for series, value in family["samples"]:
+                lines.append(f"{series} {_format_value(value)}")
+        lines.append(f"# HELP {self.namespace}_process_start_time_seconds "
+                     f"Start time of this worker since the Unix epoch")
+        lines.append(f"# TYPE {self.namespace}_process_start_time_seconds gauge")
+        lines.append(f"{self.namespace}_process_start_time_seconds {self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Histogram counts with rough p50/p99 per series, for /health"""
+        out: Dict[str, Any] = {}
+        for family in self._families.values():
+            if not isinstance(family, Family) or family.kind != "histogram":
+                continue
+            out[family.name] = {
+                "/".join(str(v) for v in values): {
+                    "count": series.count,
+                    "p50_ms": round(series.quantile(0.5) * 1000, 3),
+                    "p99_ms": round(series.quantile(0.99) * 1000, 3),
+                }
+                for values, series in sorted(family.series.items(), key=_sort_key)
+            }
+        return out
+
+    def reset(self) -> None:
+        for family in self._families.values():
+            if isinstance(family, Family):
+                family.series.clear()
+
+    def _family(self, name: str, help: str, kind: str, label_names: Tuple[str, ...],
+                buckets: Optional[Tuple[float, ...]] = None) -> Family:
+        full_name = self._name(name)
+        family = self._families.get(full_name)
+        if family is None:
+            family = self._families[full_name] = Family(full_name, help, kind, label_names, buckets)
+        elif family.kind != kind or family.label_names != label_names:
+            raise ValueError(f"Metric '{full_name}' is already registered with different labels")
+        return family
+
+    def _name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count and latency per route
+
+    Paths are labelled by the template of the route the router matched
+    (scope["route"], so /export/quotes is "/export/{kind}"); paths that match
+    no route (404s, scanners) share one "other" label so they cannot grow the
+    series.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.requests = registry.counter("http_requests_total",
+                                         "HTTP requests by method, route and status",
+                                         ("method", "path", "status"))
+        self.latency = registry.histogram("http_request_duration_seconds",
+                                          "HTTP request latency by method and route",
+                                          ("method", "path"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            path = getattr(scope.get("route"), "path", None) or OVERFLOW_LABEL
+            method = scope["method"]
+            self.latency.labels(method, path).observe(elapsed)
+            self.requests.labels(method, path, status).inc()
+
+
+def merge_dumps(dumps: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Sum the samples of several dump()s series by series"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for dump in dumps:
+        for name, family in dump.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {"help": family["help"], "kind": family["kind"], "values": {}}
+            values = target["values"]
+            for series, value in family["samples"]:
+                values[series] = values.get(series, 0) + value
+    return {
+        name: {"help": family["help"], "kind": family["kind"],
+               "samples": list(family["values"].items())}
+        for name, family in merged.items()
+    }
+
+
+def _sort_key(item: Tuple[Tuple[Any, ...], Any]):
+    return tuple(str(v) for v in item[0]) if isinstance(item[0], tuple) else (str(item[0]),)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[Any, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
@@ -0,0 +1,240 @@
+"""
+SFG Aluminium - Quote Pricing Engine
+Version: 1.0.0
+Date: November 5, 2025
+
+Shared pricing, margin and approval-tier calculation for the webhook
+handler (quote.requested) and the message handler (action.create_quote).
+
+Item dicts (what the handlers receive) are priced with a plain loop:
+copying them into NumPy arrays costs more than the arithmetic it saves.
+Callers that already hold unit-price columns (unit cost, unit price,
+quantity, discount), such as price-list re-pricing, should call
+price_columns(): every line of
+every quote is priced in one pass, per-quote totals come from np.bincount
+on the quote index, and the T1-T5 approval table is applied to all quotes
+at once with np.searchsorted.
+
+The margins, the approval table and the customer tier discounts are read
+from the manifest's businessRules, either as text ("T1:£1M, T2:£100K",
+"Platinum: 10%") or as a "tiers" list of {"tier", "limit"} or
+{"tier", "discount"} entries.
+
+Item fields:
+- cost, price: the line's total cost and sell price, as the handlers have
+  always summed them and data/quotes stores them (estimated_price is the
+  line total for its quantity)
+- unit_cost, unit_price: per-unit values, multiplied by quantity; used for
+  a line without cost / price
+- quantity (or qty): defaults to 1; only scales the unit fields
+- discount: line discount as a fraction (0.05 = 5%), defaults to 0
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy is optional
+    np = None
+
+from business_logic import business_rules
+
+MIN_MARGIN = 0.15
+WARNING_MARGIN = 0.18
+
+# Tier-based approval limits (businessRules "Tier-based approval limits").
+# A quote above a tier's limit needs sign-off from that tier, so the most
+# senior tier whose limit is exceeded is the approver.
+APPROVAL_LIMITS: Dict[str, float] = {
+    "T1": 1000000,
+    "T2": 100000,
+    "T3": 25000,
+    "T4": 10000,
+    "T5": 1000,
+}
+
+_LIMIT_PATTERN = re.compile(r"(T\d)\s*:\s*£?\s*([\d.,]+)\s*([KkMm]?)")
+_MARGIN_PATTERN = re.compile(r"margin\s*(>=|<)\s*([\d.]+)")
+_ITEM_FIELDS = ("cost", "price", "unit_cost", "unit_price", "quantity", "qty", "discount")
+_DISCOUNT_PATTERN = re.compile(r"([A-Za-z]+)\s*[:(]\s*([\d.]+)\s*%")
+
+
+class PricingEngine:
+    """Prices quotes and evaluates margin and approval rules"""
+
+    def __init__(self, min_margin: float = MIN_MARGIN,
+                 warning_margin: float = WARNING_MARGIN,
+                 approval_limits: Optional[Dict[str, float]] = None,
+                 tier_discounts: Optional[Dict[str, float]] = None):
+        self.min_margin = min_margin
+        self.warning_margin = warning_margin
+        self.tier_discounts = {str(tier).lower(): float(discount)
+                               for tier, discount in (tier_discounts or {}).items()}
+        limits = approval_limits or APPROVAL_LIMITS
+        # Ascending thresholds and the tier each one triggers
+        ordered = sorted(limits.items(), key=lambda item: item[1])
+        self._thresholds = [float(limit) for _, limit in ordered]
+        self._tiers = [tier for tier, _ in ordered]
+        if np is not None:
+            self._np_thresholds = np.array(self._thresholds)
+
+    @classmethod
+    def from_business_logic(cls, bl: Optional[Dict[str, Any]], **kwargs) -> "PricingEngine":
+        """Build an engine from the margin and approval rules in a manifest"""
+        settings: Dict[str, Any] = {}
+        for rule in business_rules(bl):
+            condition = str(rule.get("condition", ""))
+            action = str(rule.get("action", ""))
+            name = str(rule.get("rule", "")).lower()
+            tiers = [tier for tier in rule.get("tiers") or [] if isinstance(tier, dict)]
+            if "tier_limit" in condition or "approval" in name:
+                limits = ({tier["tier"]: float(tier["limit"]) for tier in tiers
+                           if "tier" in tier and "limit" in tier}
+                          or parse_approval_limits(action))
+                if limits:
+                    settings["approval_limits"] = limits
+            if "discount" in name:
+                discounts = ({tier["tier"]: float(tier["discount"]) for tier in tiers
+                              if "tier" in tier and "discount" in tier}
+                             or parse_tier_discounts(action))
+                if discounts:
+                    settings["tier_discounts"] = discounts
+            match = _MARGIN_PATTERN.search(condition)
+            if match:
+                key = "min_margin" if match.group(1) == ">=" else "warning_margin"
+                settings[key] = float(match.group(2))
+        settings.update(kwargs)
+        return cls(**settings)
+
+    @property
+    def approval_limits(self) -> Dict[str, float]:
+        return dict(zip(self._tiers, self._thresholds))
+
+    def price_quote(self, items: Sequence[Dict[str, Any]],
+                    customer_tier: Optional[str] = None) -> Dict[str, Any]:
+        """Price one quote"""
+        return self._price_loop(items, customer_tier)
+
+    def price_quotes(self, quotes: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Price a batch of quotes ({"items": [...], "customer_tier": ...})"""
+        return [self._price_loop(q.get("items") or [], q.get("customer_tier")) for q in quotes]
+
+    def tier_discount(self, customer_tier: Optional[str]) -> float:
+        """The customer tier's discount as a fraction (0 for unknown tiers)"""
+        return self.tier_discounts.get(str(customer_tier).lower(), 0.0) if customer_tier else 0.0
+
+    def price_columns(self, unit_cost, unit_price, quantity, discount, quote_index=None,
+                      quote_count: int = 1, tier_discount=None) -> List[Dict[str, Any]]:
+        """
+        Price pre-built column arrays of unit values (line = unit x quantity)
+
+        quote_index maps each line to its quote (0..quote_count-1); use this
+        directly when re-pricing a portfolio from columnar price-list data.
+        tier_discount is one fraction per quote (see tier_discount()).
+        """
+        if np is None:
+            raise RuntimeError("price_columns requires NumPy")
+        unit_cost = np.asarray(unit_cost, dtype=float)
+        unit_price = np.asarray(unit_price, dtype=float)
+        quantity = np.asarray(quantity, dtype=float)
+        discount = np.asarray(discount, dtype=float)
+        if quote_index is None:
+            quote_index = np.zeros(len(unit_cost), dtype=np.intp)
+
+        line_cost = unit_cost * quantity
+        line_price = unit_price * quantity * (1.0 - discount)
+        total_cost = np.bincount(quote_index, weights=line_cost, minlength=quote_count)
+        total_price = np.bincount(quote_index, weights=line_price, minlength=quote_count)
+        if tier_discount is not None:
+            total_price = total_price * (1.0 - np.asarray(tier_discount, dtype=float))
+
+        positive = total_price > 0
+        margin = np.divide(total_price - total_cost, total_price,
+                           out=np.zeros(quote_count), where=positive)
+
+        # Index of the most senior threshold exceeded (-1 = none)
+        tier_index = np.searchsorted(self._np_thresholds, total_price, side="left") - 1
+        margin_ok = margin >= self.min_margin
+        margin_warning = margin < self.warning_margin
+
+        return [
+            self._result(*row)
+            for row in zip(total_cost.tolist(), total_price.tolist(), margin.tolist(),
+                           tier_index.tolist(), margin_ok.tolist(), margin_warning.tolist())
+        ]
+
+    def _price_loop(self, items: Iterable[Dict[str, Any]],
+                    customer_tier: Optional[str]) -> Dict[str, Any]:
+        items = items if isinstance(items, (list, tuple)) else list(items)
+        try:
+            total_cost, total_price = _totals(items)
+        except TypeError:
+            # Numbers sent as strings ("100.50")
+            total_cost, total_price = _totals(
+                [{field: _number(item.get(field)) for field in _ITEM_FIELDS} for item in items])
+        total_price *= 1.0 - self.tier_discount(customer_tier)
+        margin = (total_price - total_cost) / total_price if total_price > 0 else 0.0
+        # Index of the most senior threshold exceeded (-1 = none)
+        tier_index = bisect_left(self._thresholds, total_price) - 1
+        return self._result(total_cost, total_price, margin, tier_index,
+                            margin >= self.min_margin, margin < self.warning_margin)
+
+    def _result(self, total_cost: float, total_price: float, margin: float,
+                tier_index: int, margin_ok: bool, margin_warning: bool) -> Dict[str, Any]:
+        approval_tier = self._tiers[tier_index] if tier_index >= 0 else None
+        return {
+            "total_cost": total_cost,
+            "total_price": total_price,
+            "margin": margin,
+            "margin_ok": margin_ok,
+            "margin_warning": margin_warning,
+            "approval_needed": approval_tier is not None,
+            "approval_tier": approval_tier,
+        }
+
+
+def parse_approval_limits(text: str) -> Dict[str, float]:
+    """Parse "T1:£1M, T2:£100K, ..." into {"T1": 1000000.0, ...}"""
+    limits = {}
+    for tier, number, suffix in _LIMIT_PATTERN.findall(text):
+        value = float(number.replace(",", ""))
+        value *= {"k": 1e3, "m": 1e6}.get(suffix.lower(), 1)
+        limits[tier] = value
+    return limits
+
+
+def _totals(items: Sequence[Dict[str, Any]]) -> Tuple[float, float]:
+    """(total cost, total price) of numeric items; TypeError for anything else"""
+    total_cost = 0.0
+    total_price = 0.0
+    for item in items:
+        cost = item.get("cost")
+        price = item.get("price")
+        if cost is None or price is None:
+            quantity = _quantity(item)
+            if cost is None:
+                cost = (item.get("unit_cost") or 0) * quantity
+            if price is None:
+                price = (item.get("unit_price") or 0) * quantity
+        discount = item.get("discount")
+        total_cost += cost
+        total_price += price * (1 - discount) if discount else price
+    return total_cost, total_price
+
+
+def _quantity(item: Dict[str, Any]) -> Any:
+    quantity = item.get("quantity")
+    if quantity is None:
+        quantity = item.get("qty")
+    return 1 if quantity is None else quantity
+
+
+def _number(value: Any) -> Any:
+    return None if value is None or value == "" else float(value)
+
+
+def parse_tier_discounts(text: str) -> Dict[str, float]:
+    """Parse "Platinum: 10%, Sapphire: 7%, ..." into {"platinum": 0.1, ...}"""
+    return {tier.lower(): float(percent) / 100 for tier, percent in _DISCOUNT_PATTERN.findall(text)}
@@ -0,0 +1,533 @@
+"""
+SFG Aluminium - Production Scheduler
+Version: 1.0.0
+Date: November 5, 2025
+
+Places approved orders on the workshop's production lines, replacing the
+fixed production date in handle_order_approved.
+
+- Each line keeps a capacity calendar: free minutes per day from its hours
+  per working day (weekends closed), with set_capacity() overrides for
+  overtime, shutdowns or breakdowns
+- Free minutes are held in a Fenwick (binary indexed) tree per line, so
+  the day on which an order of N hours would finish, starting from its
+  earliest day, is one O(log days) descent instead of a walk along the
+  calendar (the first SHORT_WALK days are read directly, which is cheaper
+  while little is booked ahead). An order goes to the line that finishes
+  it first, filling the free capacity of each day from its earliest start
+  (lead time after approval, "fabrication_lead_time" in the manifest) on
+- set_capacity() and reschedule() re-plan in bulk: every order of the
+  workshop still running on or after the changed day is released in one
+  pass and placed again in approval order; work already done before that
+  day stays where it is
+- The calendar grows (doubling) as orders are booked further ahead
+- With a db_path (the shared state file under serve.py --workers N) every
+  change (placements, cancellations, capacity overrides, added lines) is
+  appended to a log in SQLite. Each change runs inside one BEGIN IMMEDIATE
+  transaction that first replays what the other workers logged since, so
+  every worker books against the same calendar and line capacity is never
+  sold twice. The transactions are short, and run on the event loop like
+  the idempotency store's queries. Days are logged as ordinals, so workers
+  started on different days agree
+
+Usage:
+
+    scheduler = ProductionScheduler.from_env(load_business_logic())
+    placement = scheduler.schedule("ORD-1", hours=24)
+    placement.start, placement.finish, placement.line
+    moved = scheduler.set_capacity("main", "line-2", date(2025, 12, 1),
+                                   date(2025, 12, 5), hours=0)
+"""
+
+import json
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from business_logic import scheduling_rules
+
+DEFAULT_LEAD_DAYS = 7
+DEFAULT_WORKSHOPS: Dict[str, Dict[str, float]] = {
+    # workshop -> line -> hours per working day
+    "main": {"line-1": 16.0, "line-2": 16.0, "line-3": 8.0},
+}
+WORKING_DAYS = (0, 1, 2, 3, 4)          # Monday to Friday
+HORIZON_DAYS = 512                      # initial calendar length (doubles as needed)
+MAX_HORIZON_DAYS = 1 << 16              # give up on a line with no capacity this far ahead
+SHORT_WALK = 14                         # days read directly before using the tree
+HOURS_PER_UNIT = 0.5                    # fabrication hours per item quantity
+MIN_ORDER_HOURS = 4.0
+
+_DAYS = re.compile(r"(\d+)\s*days?")
+
+Allocation = Tuple[int, int]            # (day index, minutes)
+Change = Tuple[str, str, Optional[Dict[str, Any]]]     # (action, order id, record)
+
+
+class UnknownLine(KeyError):
+    """Raised for a workshop or line the scheduler does not have"""
+
+
+class Placement:
+    """Where and when an order is made"""
+
+    __slots__ = ("order_id", "workshop", "line", "earliest", "minutes", "allocations",
+                 "sequence", "_origin")
+
+    def __init__(self, order_id: str, workshop: str, line: str, earliest: int, minutes: int,
+                 allocations: List[Allocation], sequence: int, origin: date):
+        self.order_id = order_id
+        self.workshop = workshop
+        self.line = line
+        self.earliest = earliest
+        self.minutes = minutes
+        self.allocations = allocations
+        self.sequence = sequence
+        self._origin = origin
+
+    @property
+    def start(self) -> date:
+        return self._origin + timedelta(days=self.allocations[0][0])
+
+    @property
+    def finish(self) -> date:
+        return self._origin + timedelta(days=self.allocations[-1][0])
+
+    @property
+    def hours(self) -> float:
+        return self.minutes / 60
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"order_id": self.order_id, "workshop": self.workshop, "line": self.line,
+                "start": self.start.isoformat(), "finish": self.finish.isoformat(),
+                "hours": self.hours, "working_days": len(self.allocations)}
+
+
+class _Line:
+    """One line's calendar: free minutes per day plus a Fenwick tree over them"""
+
+    __slots__ = ("workshop", "name", "daily", "weekdays", "origin", "overrides", "free", "tree",
+                 "size")
+
+    def __init__(self, workshop: str, name: str, hours: float, weekdays: Iterable[int],
+                 origin: date, size: int):
+        self.workshop = workshop
+        self.name = name
+        self.daily = round(hours * 60)
+        self.weekdays = frozenset(weekdays)
+        self.origin = origin
+        self.overrides: Dict[int, int] = {}
+        self.size = size
+        self.free = [self.capacity(day) for day in range(size)]
+        self._rebuild()
+
+    def capacity(self, day: int) -> int:
+        minutes = self.overrides.get(day)
+        if minutes is not None:
+            return minutes
+        weekday = (self.origin.weekday() + day) % 7
+        return self.daily if weekday in self.weekdays else 0
+
+    def finish_day(self, earliest: int, minutes: int) -> Optional[int]:
+        """Day the order would finish if started at earliest, or None past the horizon"""
+        if earliest >= self.size:
+            return None
+        # With little booked ahead the answer is a few days away: reading them
+        # is cheaper than two tree descents
+        free = self.free
+        total = 0
+        for day in range(earliest, min(earliest + SHORT_WALK, self.size)):
+            total += free[day]
+            if total >= minutes:
+                return day
+        day = self._search(self._prefix(earliest) + minutes)
+        return day if day < self.size else None
+
+    def take(self, earliest: int, finish: int, minutes: int) -> List[Allocation]:
+        """Book minutes on the days from earliest to finish (from finish_day())"""
+        free = self.free
+        allocations = []
+        if finish - earliest < SHORT_WALK:
+            days = range(earliest, finish + 1)
+        else:
+            # Days from earliest up to the current one end up empty, so the
+            # free minutes before the next day with room stay the same
+            base = self._prefix(earliest)
+            days = iter(lambda: self._search(base + 1), None)
+        for day in days:
+            used = min(free[day], minutes)
+            if used:
+                free[day] -= used
+                self._add(day, -used)
+                allocations.append((day, used))
+                minutes -= used
+                if not minutes:
+                    break
+        return allocations
+
+    def release(self, allocations: Iterable[Allocation]) -> None:
+        for day, minutes in allocations:
+            if day >= 0:    # days before the calendar starts were never booked
+                self.free[day] += minutes
+                self._add(day, minutes)
+
+    def occupy(self, allocations: Iterable[Allocation]) -> None:
+        """Book exactly these allocations (another worker's placement)"""
+        for day, minutes in allocations:
+            if day < 0:
+                continue
+            while day >= self.size:
+                self.grow()
+            self.free[day] -= minutes
+            self._add(day, -minutes)
+
+    def release_many(self, allocations: Iterable[Allocation]) -> None:
+        """release() for many orders at once: one O(days) rebuild instead of a tree update each"""
+        free = self.free
+        for day, minutes in allocations:
+            free[day] += minutes
+        self._rebuild()
+
+    def set_capacity(self, start: int, end: int, minutes: int) -> None:
+        """Override days start..end-1; the tree is rebuilt by the release_many() that follows"""
+        for day in range(start, end):
+            old = self.capacity(day)
+            self.overrides[day] = minutes
+            if day < self.size:
+                self.free[day] += minutes - old
+
+    def grow(self) -> None:
+        self.free.extend(self.capacity(day) for day in range(self.size, self.size * 2))
+        self.size *= 2
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        size = self.size
+        tree = [0] + self.free
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _add(self, day: int, delta: int) -> None:
+        tree, size = self.tree, self.size
+        i = day + 1
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, day: int) -> int:
+        """Free minutes on days before day"""
+        tree = self.tree
+        total = 0
+        while day > 0:
+            total += tree[day]
+            day -= day & -day
+        return total
+
+    def _search(self, target: int) -> int:
+        """First day by which target free minutes have accumulated (size if never)"""
+        tree = self.tree
+        if tree[self.size] < target:   # the total (size is a power of two)
+            return self.size
+        position = 0
+        step = self.size >> 1
+        while step:
+            value = tree[position + step]
+            if value < target:
+                position += step
+                target -= value
+            step >>= 1
+        return position
+
+
+class ProductionScheduler:
+    """Earliest-finish placement of approved orders on production lines"""
+
+    def __init__(self, workshops: Optional[Dict[str, Dict[str, float]]] = None,
+                 lead_days: int = DEFAULT_LEAD_DAYS, origin: Optional[date] = None,
+                 weekdays: Iterable[int] = WORKING_DAYS, horizon_days: int = HORIZON_DAYS,
+                 hours_per_unit: float = HOURS_PER_UNIT, min_hours: float = MIN_ORDER_HOURS,
+                 db_path: Optional[str] = None):
+        self.origin = origin or date.today()
+        self.lead_days = lead_days
+        self.weekdays = tuple(weekdays)
+        self.hours_per_unit = hours_per_unit
+        self.min_hours = min_hours
+        size = 1
+        while size < horizon_days:
+            size *= 2
+        self._size = size
+        self._lines: Dict[str, List[_Line]] = {}
+        for workshop, lines in (workshops or DEFAULT_WORKSHOPS).items():
+            for name, hours in lines.items():
+                self._add_line(workshop, name, hours)
+        self._placements: Dict[str, Placement] = {}
+        self._sequence = 0
+        self._counters = {"scheduled": 0, "cancelled": 0, "reschedules": 0, "moved": 0,
+                          "replayed": 0}
+        self._db = _open_db(db_path) if db_path else None
+        self._last_seq = 0
+        if self._db is not None:
+            self._replay()
+
+    @classmethod
+    def from_business_logic(cls, bl: Optional[Dict[str, Any]], **kwargs) -> "ProductionScheduler":
+        """Use the manifest's fabrication_lead_time ("7 days")"""
+        match = _DAYS.search(str(scheduling_rules(bl).get("fabrication_lead_time", "")))
+        if match:
+            kwargs.setdefault("lead_days", int(match.group(1)))
+        return cls(**kwargs)
+
+    @classmethod
+    def from_env(cls, bl: Optional[Dict[str, Any]], **kwargs) -> "ProductionScheduler":
+        """Lines from the JSON file in SFG_PRODUCTION_LINES ({workshop: {line: hours}})"""
+        path = os.environ.get("SFG_PRODUCTION_LINES")
+        if path:
+            with open(path, "r") as f:
+                kwargs.setdefault("workshops", json.load(f))
+        return cls.from_business_logic(bl, **kwargs)
+
+    def order_hours(self, items: Iterable[Any], hours: Optional[float] = None) -> float:
+        """Fabrication hours for an order: explicit, else from the item quantities"""
+        if hours:
+            return float(hours)
+        units = sum(item.get("quantity") or 1 for item in items)
+        return max(self.min_hours, units * self.hours_per_unit)
+
+    def get(self, order_id: str) -> Optional[Placement]:
+        if self._db is not None:
+            self._replay()
+        return self._placements.get(order_id)
+
+    def schedule(self, order_id: str, hours: float, approved: Optional[date] = None,
+                 workshop: Optional[str] = None) -> Placement:
+        """Book the order on the line that finishes it first (a repeat returns the booking)"""
+        with self._changes() as changes:
+            placement = self._placements.get(order_id)
+            if placement is not None:
+                return placement
+            lines = self._workshop(workshop) if workshop else [
+                line for lines in self._lines.values() for line in lines]
+            earliest = self._day((approved or date.today()) + timedelta(days=self.lead_days))
+            minutes = max(1, round(hours * 60))
+            line, allocations = self._place(lines, earliest, minutes)
+            self._sequence += 1
+            placement = Placement(order_id, line.workshop, line.name, earliest, minutes,
+                                  allocations, self._sequence, self.origin)
+            self._placements[order_id] = placement
+            self._counters["scheduled"] += 1
+            changes.append(self._placed(placement))
+        return placement
+
+    def cancel(self, order_id: str) -> bool:
+        with self._changes() as changes:
+            placement = self._placements.pop(order_id, None)
+            if placement is None:
+                return False
+            self._line(placement.workshop, placement.line).release(placement.allocations)
+            self._counters["cancelled"] += 1
+            changes.append(("cancelled", order_id, None))
+        return True
+
+    def set_capacity(self, workshop: str, line: str, start: date, end: date,
+                     hours: float) -> List[Placement]:
+        """Hours per day for start..end inclusive (0 to close), then re-plan; returns moved orders"""
+        with self._changes() as changes:
+            first, last = self._day(start), self._day(end) + 1
+            self._line(workshop, line).set_capacity(first, last, round(hours * 60))
+            origin = self.origin.toordinal()
+            changes.append(("capacity", "", {"workshop": workshop, "line": line,
+                                             "start": first + origin, "end": last + origin,
+                                             "minutes": round(hours * 60)}))
+            return self._reschedule(workshop, start, changes)
+
+    def add_line(self, workshop: str, name: str, hours: float,
+                 from_date: Optional[date] = None) -> List[Placement]:
+        """Add a line (hours per working day); orders already booked move to it from from_date"""
+        with self._changes() as changes:
+            self._add_line(workshop, name, hours)
+            changes.append(("line_added", "", {"workshop": workshop, "name": name,
+                                               "hours": hours}))
+            if from_date is None:
+                return []
+            return self._reschedule(workshop, from_date, changes)
+
+    def reschedule(self, workshop: str, from_date: date) -> List[Placement]:
+        """Release and re-place every order of the workshop still running on or after from_date"""
+        with self._changes() as changes:
+            return self._reschedule(workshop, from_date, changes)
+
+    def _reschedule(self, workshop: str, from_date: date,
+                    changes: List[Change]) -> List[Placement]:
+        start = self._day(from_date)
+        lines = self._workshop(workshop)
+        affected = [placement for placement in self._placements.values()
+                    if placement.workshop == workshop and placement.allocations[-1][0] >= start]
+        before = {placement.order_id: (placement.line, placement.allocations[0][0],
+                                       placement.allocations[-1][0]) for placement in affected}
+        released: Dict[str, List[Allocation]] = {line.name: [] for line in lines}
+        for placement in affected:
+            released[placement.line].extend(
+                allocation for allocation in placement.allocations if allocation[0] >= start)
+        for line in lines:
+            line.release_many(released[line.name])
+
+        # Orders already in production carry on from start on their own line,
+        # then the rest are placed again first-approved first
+        affected.sort(key=lambda placement: (placement.allocations[0][0] >= start,
+                                             placement.sequence))
+        moved = []
+        for placement in affected:
+            kept = [allocation for allocation in placement.allocations if allocation[0] < start]
+            if kept:
+                done = sum(minutes for _, minutes in kept)
+                line, allocations = self._place([self._line(workshop, placement.line)], start,
+                                                placement.minutes - done)
+            else:
+                line, allocations = self._place(lines, placement.earliest, placement.minutes)
+            placement.line = line.name
+            placement.allocations = kept + allocations
+            changes.append(self._placed(placement))
+            if before[placement.order_id] != (line.name, placement.allocations[0][0],
+                                              placement.allocations[-1][0]):
+                moved.append(placement)
+        self._counters["reschedules"] += 1
+        self._counters["moved"] += len(moved)
+        return moved
+
+    def stats(self) -> Dict[str, Any]:
+        if self._db is not None:
+            self._replay()
+        horizon = max((line.size for lines in self._lines.values() for line in lines), default=0)
+        return {**self._counters, "orders": len(self._placements), "lead_days": self.lead_days,
+                "lines": {workshop: [line.name for line in lines]
+                          for workshop, lines in self._lines.items()},
+                "horizon": (self.origin + timedelta(days=horizon)).isoformat(),
+                "shared": self._db is not None}
+
+    # -- shared log ----------------------------------------------------------
+
+    @contextmanager
+    def _changes(self):
+        """Collects an operation's changes; with a db, under the write lock after a replay"""
+        changes: List[Change] = []
+        if self._db is None:
+            yield changes
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            self._replay()
+            yield changes
+            for action, order_id, record in changes:
+                self._last_seq = self._db.execute(
+                    "INSERT INTO production_log (action, order_id, record) VALUES (?, ?, ?)",
+                    (action, order_id, json.dumps(record) if record is not None else None)
+                ).lastrowid
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _replay(self) -> None:
+        """Apply the changes other workers logged since the last replay"""
+        rows = self._db.execute(
+            "SELECT seq, action, order_id, record FROM production_log WHERE seq > ? ORDER BY seq",
+            (self._last_seq,)).fetchall()
+        origin = self.origin.toordinal()
+        for seq, action, order_id, record in rows:
+            record = json.loads(record) if record else None
+            if action == "placed":
+                self._apply_placed(order_id, record)
+            elif action == "cancelled":
+                placement = self._placements.pop(order_id, None)
+                if placement is not None:
+                    self._line(placement.workshop, placement.line).release(placement.allocations)
+            elif action == "capacity":
+                line = self._line(record["workshop"], record["line"])
+                line.set_capacity(max(0, record["start"] - origin),
+                                  max(0, record["end"] - origin), record["minutes"])
+                line._rebuild()
+            elif action == "line_added":
+                if not any(line.name == record["name"]
+                           for line in self._lines.get(record["workshop"], ())):
+                    self._add_line(record["workshop"], record["name"], record["hours"])
+            self._last_seq = seq
+            self._counters["replayed"] += 1
+
+    def _apply_placed(self, order_id: str, record: Dict[str, Any]) -> None:
+        origin = self.origin.toordinal()
+        allocations = [(day - origin, minutes) for day, minutes in record["allocations"]]
+        placement = self._placements.get(order_id)
+        if placement is not None:
+            self._line(placement.workshop, placement.line).release(placement.allocations)
+        self._line(record["workshop"], record["line"]).occupy(allocations)
+        if placement is None:
+            placement = Placement(order_id, record["workshop"], record["line"],
+                                  max(0, record["earliest"] - origin), record["minutes"],
+                                  allocations, record["sequence"], self.origin)
+            self._placements[order_id] = placement
+        else:
+            placement.line = record["line"]
+            placement.allocations = allocations
+        self._sequence = max(self._sequence, record["sequence"])
+
+    def _placed(self, placement: Placement) -> Change:
+        origin = self.origin.toordinal()
+        return ("placed", placement.order_id, {
+            "workshop": placement.workshop, "line": placement.line,
+            "earliest": placement.earliest + origin, "minutes": placement.minutes,
+            "sequence": placement.sequence,
+            "allocations": [[day + origin, minutes] for day, minutes in placement.allocations]})
+
+    def _add_line(self, workshop: str, name: str, hours: float) -> None:
+        lines = self._lines.setdefault(workshop, [])
+        if any(line.name == name for line in lines):
+            raise ValueError(f"Line {workshop}/{name} already exists")
+        lines.append(_Line(workshop, name, hours, self.weekdays, self.origin, self._size))
+
+    def _place(self, lines: List[_Line], earliest: int, minutes: int
+               ) -> Tuple[_Line, List[Allocation]]:
+        best, best_finish = None, None
+        for line in lines:
+            finish = line.finish_day(earliest, minutes)
+            while finish is None and line.size < MAX_HORIZON_DAYS:
+                line.grow()
+                finish = line.finish_day(earliest, minutes)
+            if finish is not None and (best is None or finish < best_finish):
+                best, best_finish = line, finish
+        if best is None:
+            raise ValueError("No production capacity within the planning horizon")
+        return best, best.take(earliest, best_finish, minutes)
+
+    def _workshop(self, workshop: str) -> List[_Line]:
+        lines = self._lines.get(workshop)
+        if not lines:
+            raise UnknownLine(workshop)
+        return lines
+
+    def _line(self, workshop: str, name: str) -> _Line:
+        for line in self._workshop(workshop):
+            if line.name == name:
+                return line
+        raise UnknownLine(f"{workshop}/{name}")
+
+    def _day(self, when: date) -> int:
+        return max(0, (when - self.origin).days)
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS production_log ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, action TEXT NOT NULL, "
+        "order_id TEXT NOT NULL, record TEXT)")
+    return db
@@ -0,0 +1,168 @@
+"""
+SFG Aluminium - Query Cache
+Version: 1.0.0
+Date: November 5, 2025
+
+Read-through cache for the query.* message handlers.
+
+- Bounded LRU with a TTL per message type
+- Concurrent misses for the same key share one load (single-flight)
+- Entries are tagged with the entity they describe (customer, quote, order)
+  so webhook events can invalidate them, e.g. payment.received drops the
+  cached customer and order it refers to
+
+Usage:
+
+    cache = QueryCache(max_entries=10000)
+
+    @router.on("query.customer_data")
+    @cache.cached("query.customer_data", entity="customer", key="customer_id", ttl=300)
+    async def get_customer_data(params): ...
+"""
+
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from weakref import WeakSet
+
+from response_models import is_error
+
+Loader = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# Webhook events that change an entity, and where its id is in the event data
+INVALIDATION_EVENTS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "payment.received": (("customer", "customer_id"), ("order", "order_id"),
+                         ("customer", "customer.id")),
+    "order.approved": (("order", "order_id"), ("customer", "customer_id"),
+                       ("customer", "customer.id")),
+    "customer.registered": (("customer", "customer_id"),),
+}
+
+_caches: "WeakSet[QueryCache]" = WeakSet()
+
+
+class QueryCache:
+    """Bounded LRU + TTL cache with single-flight loading"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        # (message_type, entity_id) -> (expires_at, value)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._types_by_entity: Dict[str, List[str]] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0,
+                          "expirations": 0, "invalidations": 0}
+        _caches.add(self)
+
+    def cached(self, message_type: str, entity: str, key: str,
+               ttl: float) -> Callable[[Loader], Loader]:
+        """Cache the decorated handler's results by params[key]"""
+        self._types_by_entity.setdefault(entity, []).append(message_type)
+
+        def decorator(loader: Loader) -> Loader:
+            @functools.wraps(loader)
+            async def wrapper(params: Dict[str, Any]) -> Dict[str, Any]:
+                entity_id = params.get(key)
+                if not entity_id:
+                    return await loader(params)  # let the handler report the error
+                return await self.get_or_load((message_type, str(entity_id)), ttl,
+                                              lambda: loader(params))
+            return wrapper
+        return decorator
+
+    async def get_or_load(self, cache_key: Tuple[str, str], ttl: float,
+                          load: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        entry = self._entries.get(cache_key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(cache_key)
+                self._counters["hits"] += 1
+                return entry[1]
+            del self._entries[cache_key]
+            self._counters["expirations"] += 1
+
+        future = self._inflight.get(cache_key)
+        if future is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        self._counters["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value = await load()
+        except BaseException as e:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+            future.set_exception(e)
+            future.exception()  # waiters re-raise; don't warn if there are none
+            raise
+
+        # Skip storing if the entity was invalidated while loading
+        if self._inflight.get(cache_key) is future:
+            del self._inflight[cache_key]
+            if not is_error(value):
+                self._store(cache_key, ttl, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, entity: str, entity_id: Any) -> int:
+        """Drop every cached result for one entity; returns entries removed"""
+        removed = 0
+        for message_type in self._types_by_entity.get(entity, ()):
+            cache_key = (message_type, str(entity_id))
+            if self._entries.pop(cache_key, None) is not None:
+                removed += 1
+            self._inflight.pop(cache_key, None)
+        self._counters["invalidations"] += removed
+        return removed
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _store(self, cache_key: Tuple[str, str], ttl: float, value: Dict[str, Any]) -> None:
+        self._entries[cache_key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+
+def entities_for_event(event_type: Optional[str], data: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Entities (kind, id) whose cached query results an event makes stale"""
+    if not isinstance(event_type, str):
+        return []
+    fields = INVALIDATION_EVENTS.get(event_type)
+    if not fields or not isinstance(data, dict):
+        return []
+    entities = []
+    for entity, path in fields:
+        value: Any = data
+        for part in path.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value and (entity, str(value)) not in entities:
+            entities.append((entity, str(value)))
+    return entities
+
+
+def invalidate_entities(entities: Iterable[Tuple[str, str]]) -> int:
+    """Invalidate entities in every cache in this process"""
+    removed = 0
+    for entity, entity_id in entities:
+        for cache in list(_caches):
+            removed += cache.invalidate(entity, entity_id)
+    return removed
@@ -0,0 +1,309 @@
+"""
+SFG Aluminium - Rate Limiter
+Version: 1.0.0
+Date: November 5, 2025
+
+Enforces the rate_limit each apiEndpoints entry of business-logic.json
+declares ("1000/minute" for the NEXUS webhooks and messages, "10/minute"
+for the contact form), per endpoint and client, so one misbehaving caller
+cannot saturate a worker.
+
+- GCRA (the generic cell rate algorithm, a token bucket kept as a single
+  number): each client key stores only its theoretical arrival time. A
+  request is allowed while that time is no more than the burst tolerance
+  ahead of now, and moves it on by one emission interval (period / count).
+  The burst defaults to the full count, so "10/minute" allows ten at once
+  and then one every six seconds. A request can cost several: charge()
+  counts a /messages/batch once per message against the /messages/handle
+  limit (capped at the burst, so a batch can always get through)
+- Memory: the keys are spread over SHARDS dicts. A key whose arrival time
+  has passed holds no information (it behaves exactly like an unseen key),
+  so every SWEEP_INTERVAL one shard is swept of them; a sweep never walks
+  more than a shard's keys, and idle clients cost nothing
+- Shared backend: with SFG_SHARED_STATE (several workers) the arrival times
+  live in the shared SQLite file and each check is one upsert, so the
+  limit holds for the host rather than per worker. Clients already over
+  their limit are refused from a local cache without touching the file.
+  The upserts run on one limiter thread, never on the event loop, so a
+  worker waiting on another's write lock (up to the 5 s busy timeout)
+  does not stall its other requests
+- Refused requests get 429 with Retry-After: the whole seconds until the
+  request would be allowed
+
+Endpoints are matched to the app's routes by path suffix, so
+/api/webhooks/nexus in the manifest limits /webhooks/nexus here. Clients are
+the peer address, or the first X-Forwarded-For address with
+SFG_TRUST_PROXY=1. SFG_RATE_LIMITS=off turns limiting off (load tests).
+
+Usage:
+
+    limiter = RateLimiter.from_env(load_business_logic(), shared_path=shared.path)
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+"""
+
+import asyncio
+import math
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_codec import dumps
+
+SHARDS = 16
+SWEEP_INTERVAL = 1.0            # seconds between idle-key sweeps (one shard each)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_RATE = re.compile(r"(\d+)\s*/\s*(second|minute|hour|day)")
+
+
+class Limit:
+    """count requests per period, with a burst of up to `burst` at once"""
+
+    __slots__ = ("count", "period", "burst", "interval", "tolerance", "methods", "text")
+
+    def __init__(self, count: int, period: float, burst: Optional[int] = None,
+                 methods: Optional[Iterable[str]] = None):
+        if count <= 0:
+            raise ValueError("A rate limit needs a positive count")
+        self.count = count
+        self.period = period
+        self.burst = burst or count
+        self.interval = period / count
+        self.tolerance = self.interval * (self.burst - 1)
+        self.methods = frozenset(m.upper() for m in methods) if methods else None
+        unit = next((name for name, seconds in PERIODS.items() if seconds == period), None)
+        self.text = f"{count}/{unit}" if unit else f"{count}/{period:g}s"
+
+    @classmethod
+    def parse(cls, text: Any, **kwargs) -> Optional["Limit"]:
+        """Limit from "10/minute" (None if it does not parse)"""
+        match = _RATE.search(str(text or ""))
+        if not match:
+            return None
+        return cls(int(match.group(1)), PERIODS[match.group(2)], **kwargs)
+
+
+class MemoryBackend:
+    """Arrival times in SHARDS dicts, for one worker"""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, shards: int = SHARDS):
+        self._shards: List[Dict[str, float]] = [{} for _ in range(shards)]
+        self._next = 0
+
+    def acquire(self, key: str, limit: Limit, now: float, cost: int = 1) -> float:
+        """0 if allowed (and counted cost times), else seconds until it would be"""
+        shard = self._shards[hash(key) % len(self._shards)]
+        tat = shard.get(key, now)
+        if tat < now:
+            tat = now
+        wait = tat + (cost - 1) * limit.interval - limit.tolerance - now
+        if wait > 0:
+            return wait
+        shard[key] = tat + cost * limit.interval
+        return 0.0
+
+    def sweep(self, now: float) -> int:
+        """Drop the idle keys of the next shard; returns how many"""
+        shard = self._shards[self._next]
+        self._next = (self._next + 1) % len(self._shards)
+        idle = [key for key, tat in shard.items() if tat <= now]
+        for key in idle:
+            del shard[key]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBackend:
+    """Arrival times in the workers' shared SQLite file"""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str):
+        self._db = _open_db(path)
+        # Clients known to be over their limit, refused without a write
+        self._blocked: Dict[str, float] = {}
+
+    def acquire(self, key: str, limit: Limit, now: float, cost: int = 1) -> float:
+        until = self._blocked.get(key)
+        if until is not None:
+            if until > now:
+                return until - now
+            del self._blocked[key]
+        # Allowed: insert or move the arrival time on, in one statement;
+        # refused: the WHERE leaves the row alone and nothing is returned
+        excess = (cost - 1) * limit.interval - limit.tolerance
+        row = self._db.execute(
+            "INSERT INTO rate_limits (key, tat) VALUES (?1, ?2 + ?3) "
+            "ON CONFLICT(key) DO UPDATE SET tat = max(tat, ?2) + ?3 "
+            "WHERE max(tat, ?2) + ?4 <= ?2 RETURNING tat",
+            (key, now, cost * limit.interval, excess)).fetchone()
+        if row is not None:
+            return 0.0
+        row = self._db.execute("SELECT tat FROM rate_limits WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return 0.001
+        # Cache the refusal only as long as a single request would be refused
+        if row[0] - limit.tolerance > now:
+            self._blocked[key] = row[0] - limit.tolerance
+        return max(row[0] + excess - now, 0.001)
+
+    def sweep(self, now: float) -> int:
+        for key in [key for key, until in self._blocked.items() if until <= now]:
+            del self._blocked[key]
+        return self._db.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT count(*) FROM rate_limits").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class RateLimiter:
+    """Per-endpoint limits from the manifest, checked per client"""
+
+    def __init__(self, limits: Dict[str, Limit], backend=None, trust_proxy: bool = False,
+                 clock=time.time):
+        self.limits = limits
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.trust_proxy = trust_proxy
+        self._clock = clock
+        self._next_sweep = clock() + SWEEP_INTERVAL
+        self._counters = {"allowed": 0, "limited": 0, "evicted": 0}
+        self._routes: Dict[str, Optional[Limit]] = {}
+        # One thread, so the backend's connection is only ever used by one check at a time
+        self._executor = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limits")
+                          if self.backend.blocking else None)
+
+    @classmethod
+    def from_business_logic(cls, bl: Optional[Dict[str, Any]], shared_path: Optional[str] = None,
+                            **kwargs) -> "RateLimiter":
+        """Limits from apiEndpoints[].rate_limit, keyed by the declared path"""
+        limits = {}
+        for endpoint in (bl or {}).get("apiEndpoints", []):
+            method = endpoint.get("method")
+            limit = Limit.parse(endpoint.get("rate_limit"), methods=[method] if method else None)
+            if limit is not None and endpoint.get("path"):
+                limits[endpoint["path"]] = limit
+        if shared_path:
+            kwargs.setdefault("backend", SQLiteBackend(shared_path))
+        return cls(limits, **kwargs)
+
+    @classmethod
+    def from_env(cls, bl: Optional[Dict[str, Any]], shared_path: Optional[str] = None,
+                 **kwargs) -> Optional["RateLimiter"]:
+        """None with SFG_RATE_LIMITS=off; SFG_TRUST_PROXY=1 keys on X-Forwarded-For"""
+        if os.environ.get("SFG_RATE_LIMITS", "").lower() in ("off", "0", "false"):
+            return None
+        kwargs.setdefault("trust_proxy", os.environ.get("SFG_TRUST_PROXY") == "1")
+        return cls.from_business_logic(bl, shared_path=shared_path, **kwargs)
+
+    def resolve(self, routes: Iterable[str]) -> Dict[str, Limit]:
+        """The limit for each route path, matching declared paths by suffix"""
+        resolved = {}
+        for route in routes:
+            if not route:
+                continue
+            for path, limit in self.limits.items():
+                if path == route or (route.startswith("/") and path.endswith(route)):
+                    resolved[route] = limit
+                    break
+        return resolved
+
+    def client(self, scope: Dict[str, Any]) -> str:
+        if self.trust_proxy:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-forwarded-for":
+                    return value.split(b",", 1)[0].strip().decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def check(self, key: str, limit: Limit, cost: int = 1) -> float:
+        """0 if the request (counted cost times) may go ahead, else the seconds to wait"""
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._next_sweep = now + SWEEP_INTERVAL
+            self._counters["evicted"] += self.backend.sweep(now)
+        wait = self.backend.acquire(key, limit, now, min(cost, limit.burst))
+        self._counters["limited" if wait else "allowed"] += 1
+        return wait
+
+    async def check_async(self, key: str, limit: Limit, cost: int = 1) -> float:
+        """check(), on the limiter thread when the backend blocks (shared SQLite)"""
+        if self._executor is None:
+            return self.check(key, limit, cost)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.check, key, limit, cost)
+
+    async def charge(self, scope: Dict[str, Any], route: str,
+                     cost: int) -> Tuple[Optional[Limit], float]:
+        """Count cost requests to route for the client of scope: (route's limit, seconds to wait)"""
+        if route not in self._routes:
+            self._routes[route] = self.resolve((route,)).get(route)
+        limit = self._routes[route]
+        if limit is None:
+            return None, 0.0
+        return limit, await self.check_async(route + " " + self.client(scope), limit, cost)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "backend": self.backend.name, "keys": len(self.backend),
+                "limits": {path: limit.text for path, limit in self.limits.items()}}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        self.backend.close()
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 (with Retry-After) once a client is over its limit"""
+
+    def __init__(self, app, limiter: Optional[RateLimiter]):
+        self.app = app
+        self.limiter = limiter
+        self._limits: Optional[Dict[str, Limit]] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.limiter is None:
+            await self.app(scope, receive, send)
+            return
+        limits = self._limits
+        if limits is None:
+            limits = self._limits = self.limiter.resolve(
+                getattr(route, "path", None) for route in getattr(scope.get("app"), "routes", ()))
+        path = scope["path"]
+        limit = limits.get(path)
+        if limit is None or (limit.methods is not None and scope["method"] not in limit.methods):
+            await self.app(scope, receive, send)
+            return
+        wait = await self.limiter.check_async(path + " " + self.limiter.client(scope), limit)
+        if not wait:
+            await self.app(scope, receive, send)
+            return
+        body = dumps({"detail": f"Rate limit exceeded ({limit.text})"})
+        await send({"type": "http.response.start", "status": 429, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("CREATE TABLE IF NOT EXISTS rate_limits (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+    return db
@@ -0,0 +1,454 @@
+"""
+SFG Aluminium - Record Store
+Version: 1.0.0
+Date: November 5, 2025
+
+Persistent customers, enquiries, quotes, orders and services in one SQLite
+file in WAL mode (SFG_RECORD_STORE=/var/lib/sfg/records.db), instead of one
+JSON file per record under data/.
+
+- One table per kind: the record as JSON text plus the columns it is
+  looked up by. id is the primary key; customer_id, status and created_at
+  have secondary indexes, each paired with created_at so "latest for this
+  customer" and "sent quotes this week" are index range scans that come
+  back already ordered
+- changes() pages through rows in (updated_at, id) order, returning the
+  stored JSON text as it is, for bulk exports: a (updated_at, id) cursor
+  resumes after the last row, and updated_at > watermark gives only the
+  rows written since. Each write transaction stamps its rows after any
+  already in the table, so rows committed later always sort after a
+  cursor or watermark taken earlier
+- Indexed values are read from the flat domain_models shape
+  (quote["status"]) or the data/*/TEMPLATE.json shape
+  (quote["status"]["current"]), whichever the record uses
+- ConnectionPool hands out a fixed set of connections, so threads read in
+  parallel (WAL readers do not block each other or the writer)
+- AsyncRecordStore runs the same calls on a thread pool of the same size
+  for the handlers, keeping SQLite and JSON decoding off the event loop
+- import_directory() bulk-loads existing records (data/<kind>/*.json, one
+  record or a list per file, and *.jsonl), batch_size rows per transaction
+
+Usage:
+
+    python record_store.py import ../../data --db records.db
+
+    records = AsyncRecordStore.from_env()
+    quote = await records.get("quotes", "QUO-20251105-001")
+    latest = await records.find("quotes", customer_id="CUST-1", limit=20)
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from json_codec import dumps, loads
+
+KINDS = ("customers", "enquiries", "quotes", "orders", "services")
+
+POOL_SIZE = 4
+BATCH_SIZE = 10000
+FIND_LIMIT = 100
+
+# Per-connection page cache (KiB when negative) and memory-mapped read window
+CACHE_KIB = 64 * 1024
+MMAP_BYTES = 256 * 1024 * 1024
+
+# Where records keep their indexed values: the flat domain_models shape
+# first, then the data/*/TEMPLATE.json shape
+INDEXED_PATHS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "customer_id": (("customer_id",), ("customer", "id")),
+    "status": (("status",), ("status", "current")),
+    "created_at": (("created_at",), ("metadata", "created_at")),
+}
+
+_SCALARS = (str, int, float)
+
+
+def pick(record: Dict[str, Any], *paths: Tuple[str, ...], default: Any = None) -> Any:
+    """The first scalar found at one of the key paths"""
+    for path in paths:
+        value: Any = record
+        for key in path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        if isinstance(value, _SCALARS) and not isinstance(value, bool):
+            return value
+    return default
+
+
+def index_values(kind: str, record: Dict[str, Any]) -> Tuple[Any, Any, Any]:
+    """(customer_id, status, created_at) of a record"""
+    customer_id = pick(record, *INDEXED_PATHS["customer_id"])
+    if customer_id is None and kind == "customers":
+        customer_id = record.get("id")
+    return (customer_id, pick(record, *INDEXED_PATHS["status"]),
+            pick(record, *INDEXED_PATHS["created_at"]))
+
+
+class ConnectionPool:
+    """A fixed number of SQLite connections shared by threads"""
+
+    def __init__(self, path: str, size: int = POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, opening one if fewer than size exist"""
+        try:
+            db = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                opened = len(self._all) < self.size
+                if opened:
+                    db = _connect(self.path)
+                    self._all.append(db)
+            if not opened:
+                db = self._idle.get()
+        try:
+            yield db
+        finally:
+            self._idle.put(db)
+
+    def close(self) -> None:
+        with self._lock:
+            for db in self._all:
+                db.close()
+            self._all.clear()
+        self._idle = queue.LifoQueue()
+
+
+class RecordStore:
+    """Indexed JSON records in a SQLite WAL file (thread-safe, blocking calls)"""
+
+    def __init__(self, path: str, pool_size: int = POOL_SIZE):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._pool = ConnectionPool(path, pool_size)
+        with self._pool.connection() as db:
+            _create_schema(db)
+        self._counters = {"reads": 0, "writes": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["RecordStore"]:
+        """RecordStore on SFG_RECORD_STORE, or None when the variable is unset"""
+        path = os.environ.get("SFG_RECORD_STORE")
+        return cls(path) if path else None
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool.size
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """One record by id, or None"""
+        with self._pool.connection() as db:
+            row = db.execute(f"SELECT data FROM {_table(kind)} WHERE id = ?",
+                             (record_id,)).fetchone()
+        self._counters["reads"] += 1
+        return loads(row[0]) if row else None
+
+    def get_many(self, kind: str, record_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Records by id (missing ids are left out)"""
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._pool.connection() as db:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(record_ids), 500):
+                chunk = record_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for record_id, data in db.execute(
+                        f"SELECT id, data FROM {_table(kind)} WHERE id IN ({placeholders})",
+                        tuple(chunk)):
+                    found[record_id] = loads(data)
+        self._counters["reads"] += 1
+        return found
+
+    def find(self, kind: str, customer_id: Optional[str] = None, status: Optional[str] = None,
+             since: Optional[str] = None, until: Optional[str] = None,
+             limit: int = FIND_LIMIT, newest_first: bool = True) -> List[Dict[str, Any]]:
+        """
+        Records matching every given filter, ordered by created_at
+
+        since / until bound created_at (ISO 8601, since inclusive, until
+        exclusive). Served from the customer_id, status or created_at index.
+        """
+        where, params = _filters(customer_id, status, since, until)
+        order = "DESC" if newest_first else "ASC"
+        with self._pool.connection() as db:
+            rows = db.execute(
+                f"SELECT data FROM {_table(kind)}{where} ORDER BY created_at {order} LIMIT ?",
+                params + (limit,)).fetchall()
+        self._counters["reads"] += 1
+        return [loads(data) for data, in rows]
+
+    def changes(self, kind: str, customer_id: Optional[str] = None, status: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None,
+                after: Optional[Tuple[float, str]] = None, modified_after: Optional[float] = None,
+                limit: int = FIND_LIMIT) -> List[Tuple[float, str, str]]:
+        """
+        (updated_at, id, JSON text) of matching rows, ordered by (updated_at, id)
+
+        after is the (updated_at, id) of the last row already seen;
+        modified_after leaves out rows written at or before that time. The
+        other filters are those of find().
+        """
+        table = _table(kind)
+        where, params = _filters(customer_id, status, since, until)
+        for clause, values in (("updated_at > ?", (modified_after,)),
+                               ("(updated_at, id) > (?, ?)", after)):
+            if values is not None and values[0] is not None:
+                where += (" AND " if where else " WHERE ") + clause
+                params += tuple(values)
+        # One customer's rows come from the customer index and are sorted;
+        # otherwise walk the updated_at index, so each page resumes where
+        # the last one stopped instead of sorting the whole table again
+        index = "" if customer_id is not None else f" INDEXED BY {table}_updated"
+        with self._pool.connection() as db:
+            rows = db.execute(
+                f"SELECT updated_at, id, data FROM {table}{index}{where} "
+                f"ORDER BY updated_at, id LIMIT ?", params + (limit,)).fetchall()
+        self._counters["reads"] += 1
+        return rows
+
+    def last_modified(self, kind: str) -> Optional[float]:
+        """updated_at of the latest write to kind (None when it is empty)"""
+        with self._pool.connection() as db:
+            return db.execute(f"SELECT max(updated_at) FROM {_table(kind)}").fetchone()[0]
+
+    def count(self, kind: str, customer_id: Optional[str] = None, status: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> int:
+        where, params = _filters(customer_id, status, since, until)
+        with self._pool.connection() as db:
+            return db.execute(f"SELECT COUNT(*) FROM {_table(kind)}{where}", params).fetchone()[0]
+
+    def put(self, kind: str, record: Dict[str, Any]) -> None:
+        """Insert or replace one record (it needs an "id")"""
+        self.put_many(kind, [record])
+
+    def put_many(self, kind: str, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace records in one transaction; returns how many"""
+        table = _table(kind)
+        rows = [(_record_id(record),) + index_values(kind, record) + (dumps(record).decode(),)
+                for record in records]
+        if not rows:
+            return 0
+        with self._pool.connection() as db:
+            with _Transaction(db):
+                # Stamped under the write lock and after the latest row, so
+                # updated_at order is commit order (see changes())
+                latest = db.execute(f"SELECT max(updated_at) FROM {table}").fetchone()[0]
+                now = time.time() if latest is None else max(time.time(), latest + 1e-6)
+                db.executemany(
+                    f"INSERT OR REPLACE INTO {table} "
+                    f"(id, customer_id, status, created_at, data, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [row + (now,) for row in rows])
+        self._counters["writes"] += len(rows)
+        return len(rows)
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        with self._pool.connection() as db:
+            deleted = db.execute(f"DELETE FROM {_table(kind)} WHERE id = ?", (record_id,)).rowcount
+        self._counters["writes"] += deleted
+        return bool(deleted)
+
+    def import_directory(self, root: str, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Load data/<kind>/*.json and *.jsonl under root into the store
+
+        A .json file holds one record or a list of them; TEMPLATE.json files
+        are skipped. Returns the number of records imported per kind.
+        """
+        imported = {}
+        for kind in KINDS:
+            directory = os.path.join(root, kind)
+            if not os.path.isdir(directory):
+                continue
+            count = 0
+            batch: List[Dict[str, Any]] = []
+            for record in _read_records(directory):
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    count += self.put_many(kind, batch)
+                    batch = []
+            count += self.put_many(kind, batch)
+            imported[kind] = count
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._counters, path=self.path, pool_size=self._pool.size)
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+class AsyncRecordStore:
+    """RecordStore calls run on a thread pool sized to its connection pool"""
+
+    def __init__(self, store: RecordStore):
+        self.store = store
+        self._executor = ThreadPoolExecutor(max_workers=store.pool_size,
+                                            thread_name_prefix="record-store")
+
+    @classmethod
+    def from_env(cls) -> Optional["AsyncRecordStore"]:
+        """AsyncRecordStore on SFG_RECORD_STORE, or None when the variable is unset"""
+        store = RecordStore.from_env()
+        return cls(store) if store else None
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        if kwargs:
+            return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.store.get, kind, record_id)
+
+    async def get_many(self, kind: str, record_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        return await self._run(self.store.get_many, kind, record_ids)
+
+    async def find(self, kind: str, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._run(self.store.find, kind, **filters)
+
+    async def changes(self, kind: str, **filters: Any) -> List[Tuple[float, str, str]]:
+        return await self._run(self.store.changes, kind, **filters)
+
+    async def last_modified(self, kind: str) -> Optional[float]:
+        return await self._run(self.store.last_modified, kind)
+
+    async def count(self, kind: str, **filters: Any) -> int:
+        return await self._run(self.store.count, kind, **filters)
+
+    async def put(self, kind: str, record: Dict[str, Any]) -> None:
+        await self._run(self.store.put, kind, record)
+
+    async def put_many(self, kind: str, records: Iterable[Dict[str, Any]]) -> int:
+        return await self._run(self.store.put_many, kind, list(records))
+
+    async def delete(self, kind: str, record_id: str) -> bool:
+        return await self._run(self.store.delete, kind, record_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.store.close()
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT around a batch of writes"""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def _table(kind: str) -> str:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown record kind {kind!r} (expected one of {', '.join(KINDS)})")
+    return kind
+
+
+def _record_id(record: Dict[str, Any]) -> str:
+    record_id = record.get("id") if isinstance(record, dict) else None
+    if not isinstance(record_id, str) or not record_id:
+        raise ValueError("Records need a string id")
+    return record_id
+
+
+def _filters(customer_id: Optional[str], status: Optional[str], since: Optional[str],
+             until: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+    clauses, params = [], []
+    for clause, value in (("customer_id = ?", customer_id), ("status = ?", status),
+                          ("created_at >= ?", since), ("created_at < ?", until)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), tuple(params)
+
+
+def _read_records(directory: str) -> Iterator[Dict[str, Any]]:
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        if os.path.basename(path) == "TEMPLATE.json":
+            continue
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        yield from (data if isinstance(data, list) else [data])
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+    db.execute(f"PRAGMA mmap_size={MMAP_BYTES}")
+    return db
+
+
+def _create_schema(db: sqlite3.Connection) -> None:
+    for kind in KINDS:
+        db.execute(
+            f"CREATE TABLE IF NOT EXISTS {kind} ("
+            "id TEXT PRIMARY KEY, customer_id TEXT, status TEXT, created_at TEXT, "
+            "updated_at REAL NOT NULL, data TEXT NOT NULL)")
+        db.execute(f"CREATE INDEX IF NOT EXISTS {kind}_customer ON {kind} (customer_id, created_at)")
+        db.execute(f"CREATE INDEX IF NOT EXISTS {kind}_status ON {kind} (status, created_at)")
+        db.execute(f"CREATE INDEX IF NOT EXISTS {kind}_created ON {kind} (created_at)")
+        db.execute(f"CREATE INDEX IF NOT EXISTS {kind}_updated ON {kind} (updated_at, id)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="bulk-load data/<kind>/*.json[l] records")
+    importer.add_argument("root", help="directory holding customers/, quotes/, ...")
+    importer.add_argument("--db", default=os.environ.get("SFG_RECORD_STORE"),
+                          help="store file (default: SFG_RECORD_STORE)")
+    importer.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if not args.db:
+        parser.error("--db or SFG_RECORD_STORE is required")
+    store = RecordStore(args.db)
+    start = time.perf_counter()
+    try:
+        imported = store.import_directory(args.root, args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        store.close()
+    elapsed = time.perf_counter() - start
+    for kind, count in imported.items():
+        print(f"{kind:<10} {count:>10,}")
+    print(f"{sum(imported.values()):,} records in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
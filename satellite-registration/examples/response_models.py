@@ -0,0 +1,122 @@
+"""
+SFG Aluminium - Response Models
+Version: 1.0.0
+Date: November 5, 2025
+
+Slotted response models for the high-volume query.* messages
+(query.customer_data, query.quote_status, query.order_status).
+
+Each model is a fixed set of attributes instead of a dict: no per-instance
+__dict__, and json_codec encodes it from one attrgetter call. A model is
+always a successful result; handlers report failures as {"error": ...}
+dicts, and is_error() tells the two apart for the query cache and
+process_message.
+"""
+
+from operator import attrgetter
+from typing import Any, Dict, Optional, Tuple
+
+
+def is_error(result: Any) -> bool:
+    """True for a handler's {"error": ...} result (models never are)"""
+    return isinstance(result, dict) and "error" in result
+
+
+class ResponseModel:
+    """Base class: subclasses list their fields in __slots__"""
+
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(cls.__slots__)
+        if cls._fields:     # intermediate bases (domain_models.DomainModel) have none
+            cls._values = attrgetter(*cls._fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self._values(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ResponseModel):
+            return type(self) is type(other) and self._values(self) == other._values(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self._values(self)))
+        return f"{type(self).__name__}({fields})"
+
+
+class CustomerData(ResponseModel):
+    """query.customer_data result"""
+
+    __slots__ = ("customer_id", "name", "email", "phone", "tier", "tier_color",
+                 "credit_limit", "outstanding_balance", "available_credit", "payment_terms",
+                 "last_order_date", "total_orders", "total_revenue")
+
+    def __init__(self, *, customer_id: str, name: str, email: str, phone: str, tier: str,
+                 tier_color: str, credit_limit: float, outstanding_balance: float,
+                 available_credit: float, payment_terms: str, last_order_date: Optional[str],
+                 total_orders: int, total_revenue: float):
+        self.customer_id = customer_id
+        self.name = name
+        self.email = email
+        self.phone = phone
+        self.tier = tier
+        self.tier_color = tier_color
+        self.credit_limit = credit_limit
+        self.outstanding_balance = outstanding_balance
+        self.available_credit = available_credit
+        self.payment_terms = payment_terms
+        self.last_order_date = last_order_date
+        self.total_orders = total_orders
+        self.total_revenue = total_revenue
+
+
+class QuoteStatus(ResponseModel):
+    """query.quote_status result"""
+
+    __slots__ = ("quote_id", "quote_number", "status", "customer_name", "total_amount",
+                 "margin", "created_at", "sent_at", "expires_at", "valid", "items_count",
+                 "pdf_url")
+
+    def __init__(self, *, quote_id: str, quote_number: str, status: str, customer_name: str,
+                 total_amount: float, margin: float, created_at: str, sent_at: Optional[str],
+                 expires_at: str, valid: bool, items_count: int, pdf_url: str):
+        self.quote_id = quote_id
+        self.quote_number = quote_number
+        self.status = status
+        self.customer_name = customer_name
+        self.total_amount = total_amount
+        self.margin = margin
+        self.created_at = created_at
+        self.sent_at = sent_at
+        self.expires_at = expires_at
+        self.valid = valid
+        self.items_count = items_count
+        self.pdf_url = pdf_url
+
+
+class OrderStatus(ResponseModel):
+    """query.order_status result"""
+
+    __slots__ = ("order_id", "order_number", "status", "customer_name", "total_amount",
+                 "created_at", "production_start", "estimated_completion", "installation_date",
+                 "progress", "items_completed", "items_total")
+
+    def __init__(self, *, order_id: str, order_number: str, status: str, customer_name: str,
+                 total_amount: float, created_at: str, production_start: Optional[str],
+                 estimated_completion: Optional[str], installation_date: Optional[str],
+                 progress: float, items_completed: int, items_total: int):
+        self.order_id = order_id
+        self.order_number = order_number
+        self.status = status
+        self.customer_name = customer_name
+        self.total_amount = total_amount
+        self.created_at = created_at
+        self.production_start = production_start
+        self.estimated_completion = estimated_completion
+        self.installation_date = installation_date
+        self.progress = progress
+        self.items_completed = items_completed
+        self.items_total = items_total
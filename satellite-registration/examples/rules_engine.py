@@ -0,0 +1,318 @@
+"""
+SFG Aluminium - Business Rules Engine
+Version: 1.0.0
+Date: November 5, 2025
+
+Evaluates the businessRules declared in business-logic.json instead of
+hard-coding their thresholds in the handlers.
+
+Each rule's condition is normalised ("estimated_value > £50,000" becomes
+"estimated_value > 50000", "credit_check_age < 90_days" becomes
+"credit_check_age < 90", "true" becomes True), parsed once with the Python
+ast module, checked against a whitelist and compiled into a closure.
+Conditions that are descriptive text rather than expressions are kept as
+documentation and never evaluated.
+
+A rule applies to an event when the event supplies every name its condition
+uses. evaluate() runs every applicable rule in one pass. A bare flag like
+"product_selected" is true when the event sets it.
+
+Apps give the same rule different names ("Credit check threshold", "Credit
+check for orders > £10,000"), so handlers look rules up with check() by the
+field the condition reads; an app without such a rule gets the DEFAULT_RULES
+one.
+
+The engine can watch its manifest and recompile when the file changes, and
+the same engine works for any app manifest in apps/*/business-logic.json.
+"""
+
+import ast
+import json
+import operator
+import os
+import re
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from business_logic import business_rules
+
+Predicate = Callable[[Dict[str, Any]], Any]
+
+RELOAD_INTERVAL = 1.0   # seconds between manifest mtime checks
+
+_COMPARE = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub,
+    ast.Mult: operator.mul, ast.Div: operator.truediv,
+}
+
+_CURRENCY = re.compile(r"£\s*(\d[\d,]*(?:\.\d+)?)\s*([KkMm]?)\b")
+_DURATION = re.compile(r"\b(\d+)[_ ](days?|hours?|minutes?)\b")
+_THOUSANDS = re.compile(r"\b(\d{1,3}(?:,\d{3})+)\b")
+_LITERALS = {"true": "True", "false": "False", "null": "None",
+             "&&": " and ", "||": " or "}
+
+# Fallback when the app has no manifest file: the numeric rules the handlers
+# used to hard-code
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"rule": "High-value enquiry flagging", "condition": "estimated_value > £50,000",
+     "action": "Flag for director review"},
+    {"rule": "Minimum margin requirement", "condition": "margin >= 0.15",
+     "action": "Allow quote (15% minimum, 25% target)"},
+    {"rule": "Credit check threshold", "condition": "order_value > 10000",
+     "action": "Require credit check via Experian (MCP-FINANCE)"},
+    {"rule": "Credit check validity", "condition": "credit_check_age < 90_days",
+     "action": "Use existing check, otherwise request new one"},
+    {"rule": "Margin warning threshold", "condition": "margin < 0.18",
+     "action": "Warn sales team - below 18% warning threshold"},
+]
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a condition is not a supported expression"""
+
+
+class CompiledRule:
+    __slots__ = ("name", "condition", "action", "names", "predicate")
+
+    def __init__(self, name: str, condition: str, action: str,
+                 names: FrozenSet[str], predicate: Predicate):
+        self.name = name
+        self.condition = condition
+        self.action = action
+        self.names = names
+        self.predicate = predicate
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"rule": self.name, "condition": self.condition, "action": self.action}
+
+
+class RulesEngine:
+    """Compiled, optionally hot-reloading set of business rules"""
+
+    def __init__(self, rules: List[Dict[str, Any]], path: Optional[str] = None,
+                 reload_interval: float = RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._mtime = _mtime(path)
+        self._next_check = time.monotonic() + reload_interval
+        self._compile(rules)
+        self._defaults, _ = _compile_rules(DEFAULT_RULES)
+
+    @classmethod
+    def from_manifest(cls, bl: Optional[Dict[str, Any]], **kwargs) -> "RulesEngine":
+        """Compile a manifest's rules (DEFAULT_RULES when there is no manifest)"""
+        return cls(business_rules(bl) if bl is not None else DEFAULT_RULES, **kwargs)
+
+    @classmethod
+    def from_file(cls, path: str, watch: bool = True, **kwargs) -> "RulesEngine":
+        """Load a manifest file; with watch=True it is recompiled when it changes"""
+        return cls(_read_rules(path), path=path if watch else None, **kwargs)
+
+    @property
+    def rules(self) -> List[CompiledRule]:
+        return list(self._rules)
+
+    @property
+    def skipped(self) -> List[Dict[str, Any]]:
+        """Rules whose conditions are descriptive text, not expressions"""
+        return list(self._skipped)
+
+    def evaluate(self, context: Dict[str, Any]) -> List[CompiledRule]:
+        """Return every applicable rule whose condition holds for context"""
+        self.reload_if_changed()
+        keys = context.keys()
+        matched = []
+        for rule in self._rules:
+            if rule.names <= keys and _holds(rule, context):
+                matched.append(rule)
+        return matched
+
+    def matches(self, context: Dict[str, Any]) -> Dict[str, CompiledRule]:
+        """evaluate() keyed by rule name"""
+        return {rule.name: rule for rule in self.evaluate(context)}
+
+    def check(self, field: str, context: Dict[str, Any]) -> Optional[CompiledRule]:
+        """The first applicable rule reading field that holds (DEFAULT_RULES' if none apply)"""
+        self.reload_if_changed()
+        keys = context.keys()
+        for rules in (self._rules, self._defaults):
+            applicable = [rule for rule in rules if field in rule.names and rule.names <= keys]
+            if applicable:
+                return next((rule for rule in applicable if _holds(rule, context)), None)
+        return None
+
+    def reload_if_changed(self) -> bool:
+        if self.path is None:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_interval
+        mtime = _mtime(self.path)
+        if mtime == self._mtime:
+            return False
+        try:
+            rules = _read_rules(self.path)
+        except (OSError, ValueError):
+            return False  # keep serving the last good rules (e.g. mid-write)
+        self._compile(rules)
+        self._mtime = mtime
+        return True
+
+    def _compile(self, rules: List[Dict[str, Any]]) -> None:
+        # Swap in one assignment so concurrent evaluate() calls never see a mix
+        self._rules, self._skipped = _compile_rules(rules)
+
+
+def _compile_rules(rules: List[Dict[str, Any]]) -> Tuple[Tuple[CompiledRule, ...],
+                                                         Tuple[Dict[str, Any], ...]]:
+    compiled, skipped = [], []
+    for rule in rules:
+        condition = rule.get("condition")
+        if not isinstance(condition, str):
+            continue
+        name = rule.get("rule") or rule.get("name") or rule.get("rule_id") or condition
+        try:
+            names, predicate = compile_condition(condition)
+        except RuleSyntaxError:
+            skipped.append(rule)
+            continue
+        compiled.append(CompiledRule(name, condition, str(rule.get("action", "")),
+                                     names, predicate))
+    return tuple(compiled), tuple(skipped)
+
+
+def _holds(rule: CompiledRule, context: Dict[str, Any]) -> bool:
+    try:
+        return bool(rule.predicate(context))
+    except (TypeError, ValueError, ZeroDivisionError, KeyError):
+        return False  # e.g. comparing a missing/None field with a number
+
+
+def compile_condition(condition: str) -> Tuple[FrozenSet[str], Predicate]:
+    """Compile a condition string into (names it reads, predicate)"""
+    source = normalise(condition)
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise RuleSyntaxError(f"Unsupported condition: {condition!r}") from e
+    names: set = set()
+    predicate = _compile_node(tree.body, names)
+    if not names:
+        raise RuleSyntaxError(f"Condition reads no fields: {condition!r}")
+    return frozenset(names), predicate
+
+
+def normalise(condition: str) -> str:
+    text = condition.strip()
+    if text.upper().startswith("IF "):
+        text = text[3:]
+    text = _CURRENCY.sub(lambda m: str(_scaled(m.group(1), m.group(2))), text)
+    text = _DURATION.sub(r"\1", text)
+    text = _THOUSANDS.sub(lambda m: m.group(1).replace(",", ""), text)
+    for literal, replacement in _LITERALS.items():
+        text = re.sub(rf"(?<![\w.]){re.escape(literal)}(?![\w.])", replacement, text)
+    return text
+
+
+def _scaled(number: str, suffix: str) -> float:
+    value = float(number.replace(",", ""))
+    value *= {"k": 1e3, "m": 1e6}.get(suffix.lower(), 1)
+    return int(value) if value.is_integer() else value
+
+
+def _compile_node(node: ast.AST, names: set) -> Predicate:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool, type(None))):
+        value = node.value
+        return lambda ctx: value
+
+    if isinstance(node, ast.Name):
+        names.add(node.id)
+        key = node.id
+        return lambda ctx: ctx[key]
+
+    if isinstance(node, ast.Attribute):
+        # user.role -> ctx["user"]["role"]
+        path = []
+        while isinstance(node, ast.Attribute):
+            path.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            raise RuleSyntaxError("Unsupported attribute access")
+        names.add(node.id)
+        root, path = node.id, tuple(reversed(path))
+
+        def get_path(ctx):
+            value = ctx[root]
+            for part in path:
+                value = value[part]
+            return value
+        return get_path
+
+    if isinstance(node, ast.Compare):
+        left = _compile_node(node.left, names)
+        steps = [(_op(_COMPARE, op), _compile_node(right, names))
+                 for op, right in zip(node.ops, node.comparators)]
+        if len(steps) == 1:
+            compare, right = steps[0]
+            return lambda ctx: compare(left(ctx), right(ctx))
+
+        def chained(ctx):
+            current = left(ctx)
+            for compare, right in steps:
+                value = right(ctx)
+                if not compare(current, value):
+                    return False
+                current = value
+            return True
+        return chained
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value, names) for value in node.values]
+        if isinstance(node.op, ast.And):
+            return lambda ctx: all(part(ctx) for part in parts)
+        return lambda ctx: any(part(ctx) for part in parts)
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.USub)):
+        operand = _compile_node(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda ctx: not operand(ctx)
+        return lambda ctx: -operand(ctx)
+
+    if isinstance(node, ast.BinOp):
+        combine = _op(_BINARY, node.op)
+        left, right = _compile_node(node.left, names), _compile_node(node.right, names)
+        return lambda ctx: combine(left(ctx), right(ctx))
+
+    if isinstance(node, (ast.Tuple, ast.List)):
+        items = [_compile_node(item, names) for item in node.elts]
+        return lambda ctx: tuple(item(ctx) for item in items)
+
+    raise RuleSyntaxError(f"Unsupported expression: {type(node).__name__}")
+
+
+def _op(table: Dict[type, Callable], op: ast.AST) -> Callable:
+    try:
+        return table[type(op)]
+    except KeyError:
+        raise RuleSyntaxError(f"Unsupported operator: {type(op).__name__}") from None
+
+
+def _read_rules(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r") as f:
+        return business_rules(json.load(f))
+
+
+def _mtime(path: Optional[str]) -> Optional[float]:
+    if path is None:
+        return None
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,110 @@
+"""
+SFG Aluminium - Handler Server
+Version: 1.0.0
+Date: November 5, 2025
+
+Runs the webhook or message handler under uvicorn with several worker
+processes sharing one listening socket.
+
+Usage:
+
+    python serve.py webhook --workers 4
+    python serve.py message --workers 2 --port 8001
+
+- --workers defaults to SFG_WORKERS, else 1 (use --workers auto for one per
+  CPU core)
+- SIGHUP reloads gracefully: each worker is replaced by a new one that has
+  passed its health check before the old one stops taking connections and
+  finishes its in-flight requests (up to --graceful-timeout seconds)
+- SIGTTIN / SIGTTOU add or remove a worker; SIGTERM / SIGINT stop them all
+- Workers share idempotency keys, query-cache invalidations and metrics
+  through SFG_SHARED_STATE; --shared-state (default: shared-state.db next to
+  this file) sets it when it is not already in the environment. Run the
+  webhook and message handlers with the same file so webhook events
+  invalidate the message handler's cached queries.
+"""
+
+import argparse
+import os
+import sys
+from typing import Optional, Union
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# handler name -> (uvicorn import string, default port)
+HANDLERS = {
+    "webhook": ("webhook-handler-python:app", 8000),
+    "message": ("message-handler-python:app", 8001),
+}
+
+DEFAULT_SHARED_STATE = os.path.join(HERE, "shared-state.db")
+
+GRACEFUL_TIMEOUT = 30
+
+
+def worker_count(value: Optional[Union[int, str]] = None) -> int:
+    """Resolve a worker count: an int, "auto" (CPU cores) or SFG_WORKERS"""
+    value = value if value is not None else os.environ.get("SFG_WORKERS", 1)
+    if value == "auto":
+        return os.cpu_count() or 1
+    count = int(value)
+    if count < 1:
+        raise ValueError("Worker count must be at least 1")
+    return count
+
+
+def serve(handler: str, workers: Optional[Union[int, str]] = None, host: str = "0.0.0.0",
+          port: Optional[int] = None, shared_state: Optional[str] = None,
+          graceful_timeout: int = GRACEFUL_TIMEOUT, log_level: str = "info") -> None:
+    """Serve a handler with a supervised pool of worker processes"""
+    app, default_port = HANDLERS[handler]
+    workers = worker_count(workers)
+    # Workers inherit the environment; the variable makes them open the file
+    os.environ.setdefault("SFG_SHARED_STATE", shared_state or DEFAULT_SHARED_STATE)
+    # Spawned workers inherit sys.path and import the handler modules from here
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port or default_port,
+        workers=workers,
+        timeout_graceful_shutdown=graceful_timeout,
+        log_level=log_level,
+    )
+    # The supervisor runs even for one worker so SIGHUP reloads still work
+    sock = config.bind_socket()
+    try:
+        Multiprocess(config, sockets=[sock]).run()
+    finally:
+        sock.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("handler", choices=sorted(HANDLERS))
+    parser.add_argument("--workers", default=None,
+                        help="worker processes, or 'auto' for one per CPU core (default: SFG_WORKERS or 1)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--shared-state", default=None,
+                        help=f"SQLite file shared by the workers (default: {DEFAULT_SHARED_STATE})")
+    parser.add_argument("--graceful-timeout", type=int, default=GRACEFUL_TIMEOUT,
+                        help="seconds a stopping worker may spend finishing requests")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    try:
+        serve(args.handler, args.workers, args.host, args.port, args.shared_state,
+              args.graceful_timeout, args.log_level)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+SFG Aluminium - Shared Worker State
+Version: 1.0.0
+Date: November 5, 2025
+
+State the handler worker processes on one host share through a SQLite file
+in WAL mode (SFG_SHARED_STATE=/var/lib/sfg/shared-state.db, set by serve.py
+when running more than one worker).
+
+- Worker slots: each worker claims the lowest slot for its role not held by
+  a live worker, and with it that slot's background-queue journal, so jobs
+  left by a crashed or reloaded worker are replayed by the next one to start
+- Cache invalidations: an append-only log that every worker polls, so a
+  payment.received handled by one worker drops the cached query results in
+  all of them (and in the message handler's workers)
+- Metrics: each worker publishes its registry dump every PUBLISH_INTERVAL;
+  /metrics on any worker sums the dumps of every live worker plus the
+  totals of retired ones
+- Idempotency keys live in the same file (IdempotencyStore(db_path=...)),
+  which also stops two workers running one retried event at the same time
+
+WAL mode lets every worker read while one writes; each statement is a short
+autocommit transaction, cheap enough to run on the event loop like the
+idempotency store's queries.
+
+Usage:
+
+    shared = SharedState.from_env("messages")
+    if shared:
+        await shared.start(on_invalidate=invalidate_entities, metrics=metrics)
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from structured_log import StructuredLogger
+
+# Seconds between polls of the invalidation log (the cross-worker staleness bound)
+SYNC_INTERVAL = 0.05
+
+# Seconds between metrics publications and worker heartbeats
+PUBLISH_INTERVAL = 1.0
+
+# A worker that has not sent a heartbeat for this long is treated as gone
+WORKER_TIMEOUT = 30.0
+
+# Invalidation log entries older than this are pruned
+LOG_RETENTION = 3600.0
+
+# Metric kinds that are totals since start, kept after their worker exits
+_CUMULATIVE = ("counter", "histogram")
+
+_RETIRED_PID = 0
+
+
+class SharedState:
+    """Per-worker handle on the host's shared SQLite state file"""
+
+    def __init__(self, path: str, role: str, sync_interval: float = SYNC_INTERVAL,
+                 publish_interval: float = PUBLISH_INTERVAL,
+                 log: Optional[StructuredLogger] = None, clock=time.time):
+        self.path = path
+        self.role = role
+        self.pid = os.getpid()
+        self.sync_interval = sync_interval
+        self.publish_interval = publish_interval
+        self.log = log or StructuredLogger("shared_state")
+        self._clock = clock
+        self._db = _open_db(path)
+        self.slot: Optional[int] = None
+        # New workers start with empty caches, so earlier invalidations are skipped
+        self._last_seq = self._db.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {"invalidations_published": 0, "invalidations_applied": 0,
+                          "metrics_published": 0}
+
+    @classmethod
+    def from_env(cls, role: str, log: Optional[StructuredLogger] = None) -> Optional["SharedState"]:
+        """SharedState on SFG_SHARED_STATE, or None when the variable is unset"""
+        path = os.environ.get("SFG_SHARED_STATE")
+        return cls(path, role, log=log) if path else None
+
+    def claim_slot(self) -> int:
+        """Take the lowest slot for this role not held by a live worker"""
+        now = self._clock()
+        with self._transaction() as db:
+            held = set()
+            for slot, pid, heartbeat in db.execute(
+                    "SELECT slot, pid, heartbeat FROM workers WHERE role = ?",
+                    (self.role,)).fetchall():
+                if pid != self.pid and now - heartbeat < WORKER_TIMEOUT and _pid_alive(pid):
+                    held.add(slot)
+                    continue
+                db.execute("DELETE FROM workers WHERE role = ? AND slot = ?", (self.role, slot))
+                if pid != self.pid:
+                    self._retire_metrics(db, pid)
+            slot = next(s for s in range(len(held) + 1) if s not in held)
+            db.execute("INSERT OR REPLACE INTO workers (role, slot, pid, started_at, heartbeat) "
+                       "VALUES (?, ?, ?, ?, ?)", (self.role, slot, self.pid, now, now))
+        self.slot = slot
+        return slot
+
+    def release_slot(self) -> None:
+        """Give up this worker's slot and fold its metrics into the retired totals"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM workers WHERE role = ? AND pid = ?", (self.role, self.pid))
+            self._retire_metrics(db, self.pid)
+        self.slot = None
+
+    def workers(self) -> List[Dict[str, Any]]:
+        rows = self._db.execute(
+            "SELECT slot, pid, started_at, heartbeat FROM workers WHERE role = ? ORDER BY slot",
+            (self.role,)).fetchall()
+        return [{"slot": slot, "pid": pid, "started_at": started_at, "heartbeat": heartbeat}
+                for slot, pid, started_at, heartbeat in rows]
+
+    def publish_invalidations(self, entities: Iterable[Tuple[str, str]]) -> int:
+        """Append (entity, id) pairs to the log the other workers poll"""
+        now = self._clock()
+        rows = [(entity, str(entity_id), self.pid, now) for entity, entity_id in entities]
+        if rows:
+            self._db.executemany(
+                "INSERT INTO invalidations (entity, entity_id, pid, created_at) VALUES (?, ?, ?, ?)",
+                rows)
+            self._counters["invalidations_published"] += len(rows)
+        return len(rows)
+
+    def poll_invalidations(self) -> List[Tuple[str, str]]:
+        """Invalidations published by other workers since the last poll"""
+        rows = self._db.execute(
+            "SELECT seq, entity, entity_id, pid FROM invalidations WHERE seq > ? ORDER BY seq",
+            (self._last_seq,)).fetchall()
+        if not rows:
+            return []
+        self._last_seq = rows[-1][0]
+        return [(entity, entity_id) for _, entity, entity_id, pid in rows if pid != self.pid]
+
+    def publish_metrics(self, dump: Dict[str, Dict[str, Any]]) -> None:
+        """Store this worker's MetricsRegistry.dump() and refresh its heartbeat"""
+        now = self._clock()
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO metrics (role, pid, updated_at, dump) "
+                       "VALUES (?, ?, ?, ?)", (self.role, self.pid, now, json.dumps(dump)))
+            db.execute("UPDATE workers SET heartbeat = ? WHERE role = ? AND pid = ?",
+                       (now, self.role, self.pid))
+        self._counters["metrics_published"] += 1
+
+    def worker_metrics(self) -> List[Dict[str, Dict[str, Any]]]:
+        """Dumps of every live worker for this role plus the retired totals"""
+        cutoff = self._clock() - WORKER_TIMEOUT
+        rows = self._db.execute(
+            "SELECT dump FROM metrics WHERE role = ? AND (pid = ? OR updated_at >= ?)",
+            (self.role, _RETIRED_PID, cutoff)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    async def start(self, on_invalidate: Optional[Callable[[List[Tuple[str, str]]], Any]] = None,
+                    metrics=None) -> None:
+        """Claim a slot (if not yet claimed) and start the sync loop"""
+        if self.slot is None:
+            self.claim_slot()
+        if metrics is not None:
+            self.publish_metrics(metrics.dump())
+        self._task = asyncio.create_task(self._sync(on_invalidate, metrics))
+
+    async def stop(self, metrics=None) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if metrics is not None:
+            self.publish_metrics(metrics.dump())
+        self.release_slot()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "path": self.path, "role": self.role, "slot": self.slot,
+                "pid": self.pid, "workers": len(self.workers())}
+
+    def close(self) -> None:
+        self._db.close()
+
+    async def _sync(self, on_invalidate, metrics) -> None:
+        next_publish = self._clock() + self.publish_interval
+        next_prune = self._clock() + LOG_RETENTION / 10
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                entities = self.poll_invalidations()
+                if entities and on_invalidate is not None:
+                    on_invalidate(entities)
+                    self._counters["invalidations_applied"] += len(entities)
+                now = self._clock()
+                if metrics is not None and now >= next_publish:
+                    self.publish_metrics(metrics.dump())
+                    next_publish = now + self.publish_interval
+                if now >= next_prune:
+                    self._db.execute("DELETE FROM invalidations WHERE created_at < ?",
+                                     (now - LOG_RETENTION,))
+                    next_prune = now + LOG_RETENTION / 10
+            except sqlite3.OperationalError as e:
+                # Busy or locked past the timeout; try again on the next tick
+                self.log.warning("shared_state.sync_failed", role=self.role, error=str(e))
+
+    def _transaction(self):
+        return _Transaction(self._db)
+
+    def _retire_metrics(self, db: sqlite3.Connection, pid: int) -> None:
+        # Counters and histograms are totals, so an exited worker's counts
+        # are added to the retired row instead of vanishing from the sum
+        row = db.execute("SELECT dump FROM metrics WHERE role = ? AND pid = ?",
+                         (self.role, pid)).fetchone()
+        if row is None:
+            return
+        retired = db.execute("SELECT dump FROM metrics WHERE role = ? AND pid = ?",
+                             (self.role, _RETIRED_PID)).fetchone()
+        totals = json.loads(retired[0]) if retired else {}
+        for name, family in json.loads(row[0]).items():
+            if family["kind"] not in _CUMULATIVE:
+                continue
+            target = totals.setdefault(name, {"help": family["help"], "kind": family["kind"],
+                                              "samples": []})
+            values = dict(target["samples"])
+            for series, value in family["samples"]:
+                values[series] = values.get(series, 0) + value
+            target["samples"] = list(values.items())
+        db.execute("DELETE FROM metrics WHERE role = ? AND pid = ?", (self.role, pid))
+        db.execute("INSERT OR REPLACE INTO metrics (role, pid, updated_at, dump) VALUES (?, ?, ?, ?)",
+                   (self.role, _RETIRED_PID, self._clock(), json.dumps(totals)))
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, so read-modify-write steps see no other writer"""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.db.execute("COMMIT" if exc_type is None else "ROLLBACK")
+
+
+def _open_db(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    db = sqlite3.connect(path, isolation_level=None, check_same_thread=False, timeout=5.0)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS workers ("
+        "role TEXT NOT NULL, slot INTEGER NOT NULL, pid INTEGER NOT NULL, "
+        "started_at REAL NOT NULL, heartbeat REAL NOT NULL, PRIMARY KEY (role, slot))")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS invalidations ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, entity TEXT NOT NULL, "
+        "entity_id TEXT NOT NULL, pid INTEGER NOT NULL, created_at REAL NOT NULL)")
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS metrics ("
+        "role TEXT NOT NULL, pid INTEGER NOT NULL, updated_at REAL NOT NULL, "
+        "dump TEXT NOT NULL, PRIMARY KEY (role, pid))")
+    return db
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True   # exists, owned by another user
+    return True
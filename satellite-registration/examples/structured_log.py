@@ -0,0 +1,148 @@
+"""
+SFG Aluminium - Structured Logger
+Version: 1.0.0
+Date: November 5, 2025
+
+Buffered JSON-lines logger for the webhook and message handlers.
+
+Logging a line only appends a tuple to an in-memory buffer; a background
+thread formats the buffered records and writes them in one call every
+FLUSH_INTERVAL seconds (or sooner once FLUSH_AT records are waiting). The
+request path never formats, encodes or blocks on stdout.
+
+- One JSON object per line: {"ts", "level", "logger", "event", ...fields}
+- SFG_LOG_LEVEL=debug|info|warning|error (default info); lines below the
+  level cost one comparison
+- The buffer is bounded; when a slow stdout lets it fill, the oldest lines
+  are dropped and counted rather than blocking the handlers
+- Buffered lines are flushed at exit and on flush()
+
+Usage:
+
+    log = StructuredLogger("webhooks")
+    log.info("event.received", type=event_type)
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional, TextIO
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+FLUSH_INTERVAL = 0.25
+
+# Wake the writer early once this many lines are waiting
+FLUSH_AT = 512
+
+# Lines kept while the writer catches up; older ones are dropped past this
+MAX_BUFFER = 50000
+
+
+class StructuredLogger:
+    """Non-blocking JSON-lines logger with a background writer thread"""
+
+    def __init__(self, name: str, stream: Optional[TextIO] = None,
+                 level: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL,
+                 flush_at: int = FLUSH_AT, max_buffer: int = MAX_BUFFER):
+        self.name = name
+        self._stream = stream
+        self.level = LEVELS.get((level or os.environ.get("SFG_LOG_LEVEL", "info")).lower(), 20)
+        self.flush_interval = flush_interval
+        self.flush_at = flush_at
+        self._buffer: deque = deque(maxlen=max_buffer)
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+        atexit.register(self.close)
+
+    def log(self, level: str, event: str, **fields: Any) -> None:
+        levelno = LEVELS[level]
+        if levelno < self.level:
+            return
+        buffer = self._buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), level, event, fields))
+        if self._thread is None:
+            self._start()
+        elif len(buffer) == self.flush_at:
+            self._wake.set()
+
+    def debug(self, event: str, **fields: Any) -> None:
+        self.log("debug", event, **fields)
+
+    def info(self, event: str, **fields: Any) -> None:
+        self.log("info", event, **fields)
+
+    def warning(self, event: str, **fields: Any) -> None:
+        self.log("warning", event, **fields)
+
+    def error(self, event: str, **fields: Any) -> None:
+        self.log("error", event, **fields)
+
+    def flush(self) -> None:
+        """Write everything buffered so far (called by the writer thread)"""
+        with self._write_lock:
+            buffer = self._buffer
+            lines = []
+            while buffer:
+                try:
+                    created, level, event, fields = buffer.popleft()
+                except IndexError:
+                    break
+                record = {
+                    "ts": datetime.fromtimestamp(created).isoformat(),
+                    "level": level,
+                    "logger": self.name,
+                    "event": event,
+                }
+                record.update(fields)
+                lines.append(json.dumps(record, default=str))
+            if not lines:
+                return
+            stream = self._stream or sys.stdout
+            try:
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+            except (OSError, ValueError):
+                # stdout closed or broken; logging must never take the app down
+                self.dropped += len(lines)
+                return
+            self.written += len(lines)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=2)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "level": next(name for name, no in LEVELS.items() if no >= self.level),
+            "buffered": len(self._buffer),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+    def _start(self) -> None:
+        if self._closed:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"log-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
@@ -7,19 +7,168 @@ Date: November 5, 2025
 This webhook handler receives real-time events from NEXUS and other SFG apps.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import PlainTextResponse
 from typing import Dict, Any
-import hmac
-import hashlib
-import json
 from datetime import datetime
+import asyncio
+import json
+import os
+import urllib.request
+
+from background_queue import BackgroundQueue
+from business_logic import data_models, load_business_logic, manifest_path
+from credit_checks import CreditChecker
+from domain_models import ValidationError, build_models
+from estimator_assignment import EstimatorAssigner, NoEstimator
+from event_router import EventRouter, UnknownEvent
+from idempotency_store import IdempotencyStore, StaleEvent
+from json_codec import JSONBytesResponse, dumps
+from metrics import CONTENT_TYPE, MetricsMiddleware, MetricsRegistry
+from pricing_engine import PricingEngine
+from production_scheduler import ProductionScheduler
+from query_cache import entities_for_event, invalidate_entities
+from rate_limiter import RateLimiter, RateLimitMiddleware
+from rules_engine import RulesEngine
+from shared_state import SharedState
+from structured_log import StructuredLogger
+from webhook_dispatcher import BATCH_EVENT, WebhookDispatcher
+from webhook_verifier import InvalidPayload, InvalidSignature, WebhookVerifier, load_secrets
+
+# JSON lines to stdout, written by a background thread (SFG_LOG_LEVEL)
+log = StructuredLogger("webhooks")
+
+# Workers started by serve.py share idempotency keys, cache invalidations and
+# metrics through SFG_SHARED_STATE (a SQLite WAL file on this host)
+shared = SharedState.from_env("webhooks", log=log)
+
+# Side effects (SharePoint, Xero, notifications) run in the background so the
+# webhook is acknowledged immediately. Concurrency is bounded per integration.
+# Set SFG_QUEUE_JOURNAL to a file path to keep queued work across restarts.
+QUEUE_JOURNAL = os.environ.get("SFG_QUEUE_JOURNAL")
+queue = BackgroundQueue(
+    limits={"SharePoint": 4, "Xero": 2, "Experian": 2, "Notifications": 8},
+    journal_path=QUEUE_JOURNAL
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if shared:
+        # One journal per worker slot, so a replacement worker replays the
+        # jobs its predecessor left unfinished (slot 0 keeps the plain name)
+        slot = shared.claim_slot()
+        if QUEUE_JOURNAL and slot:
+            queue.set_journal_path(f"{QUEUE_JOURNAL}.{slot}")
+    await queue.start()
+    await dispatcher.start()
+    if shared:
+        await shared.start(on_invalidate=invalidate_entities, metrics=metrics)
+    yield
+    if estimators.snapshot_path:
+        estimators.save()
+    if shared:
+        await shared.stop(metrics=metrics)
+    await dispatcher.stop()
+    await queue.stop()
+    if limiter:
+        limiter.close()
+    log.flush()
+
 
-app = FastAPI(title="SFG Aluminium Webhook Handler")
+app = FastAPI(title="SFG Aluminium Webhook Handler", lifespan=lifespan)
+
+# Per-client limits from the manifest's apiEndpoints rate_limit (shared
+# across workers through SFG_SHARED_STATE); SFG_RATE_LIMITS=off disables them
+limiter = RateLimiter.from_env(load_business_logic(), shared_path=shared.path if shared else None)
+if limiter:
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+# Request and per-event counters/latency histograms, served at /metrics
+metrics = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics)
 
 # Webhook secret for signature verification
 # IMPORTANT: Store this securely in environment variables
 WEBHOOK_SECRET = "your-webhook-secret-here"
 
+# Pre-keyed HMAC templates, built once at startup
+# Set NEXUS_WEBHOOK_SECRETS="new,old" to accept two secrets while rotating
+verifier = WebhookVerifier(load_secrets(WEBHOOK_SECRET))
+
+# Margin and T1-T5 approval rules from business-logic.json (shared with the
+# message handler's action.create_quote)
+pricing = PricingEngine.from_business_logic(load_business_logic())
+
+# businessRules compiled once; recompiled when business-logic.json changes
+rules = (RulesEngine.from_file(manifest_path()) if os.path.exists(manifest_path())
+         else RulesEngine.from_manifest(None))
+
+# Typed payload models (domain_models built-ins plus the manifest's
+# dataModels); validators are compiled once here, not per event
+models = build_models(data_models(load_business_logic()))
+Customer, QuoteItem, Payment = models["Customer"], models["QuoteItem"], models["Payment"]
+
+# Processed events are remembered for 24 hours so NEXUS retries are answered
+# from the stored result. Set SFG_IDEMPOTENCY_DB to persist keys in SQLite
+# (defaults to the shared state file when workers share one). Once a real
+# secret is configured, events without a signed timestamp are rejected.
+idempotency = IdempotencyStore(
+    db_path=os.environ.get("SFG_IDEMPOTENCY_DB") or (shared.path if shared else None),
+    require_timestamp=bool(os.environ.get("NEXUS_WEBHOOK_SECRETS")
+                           or os.environ.get("WEBHOOK_SECRET")),
+    log=log
+)
+
+# Experian and Companies House looked up in parallel, results cached per
+# customer for the "Credit check validity" period (SFG_CREDIT_DB, else the
+# shared state file). Bureaus come from SFG_EXPERIAN_URL /
+# COMPANIES_HOUSE_API_KEY; mock connectors only with SFG_CREDIT_MOCK=1.
+# Without them credit checks are held as pending, never approved.
+credit = CreditChecker.from_env(
+    load_business_logic(),
+    db_path=os.environ.get("SFG_CREDIT_DB") or (shared.path if shared else None)
+)
+if not credit.configured:
+    log.warning("credit.unconfigured", connectors=credit.stats()["connectors"])
+
+# Approved orders are booked on the production line that finishes them first
+# (lines from SFG_PRODUCTION_LINES, lead time from the manifest's scheduling).
+# The calendar is logged in SFG_PRODUCTION_DB, else the shared state file, so
+# every worker books against the same line capacity.
+scheduler = ProductionScheduler.from_env(
+    load_business_logic(),
+    db_path=os.environ.get("SFG_PRODUCTION_DB") or (shared.path if shared else None)
+)
+
+# New enquiries go to the least-loaded estimator with the skill, in the region
+# (roster from SFG_ESTIMATORS). Loads are logged in SFG_ESTIMATOR_DB, else
+# the shared state file, so every worker assigns from the same loads; a
+# single process without either keeps them in SFG_ESTIMATOR_SNAPSHOT.
+estimators = EstimatorAssigner.from_env(
+    db_path=os.environ.get("SFG_ESTIMATOR_DB") or (shared.path if shared else None)
+)
+
+# Message handler to notify when cached query results go stale
+# e.g. http://localhost:8001 (unset when both apps share one process)
+MESSAGE_HANDLER_URL = os.environ.get("SFG_MESSAGE_HANDLER_URL")
+
+# Events are forwarded to the other apps that list them in webhook_events.
+# Set SFG_SUBSCRIBER_MANIFESTS to a glob of their manifests, e.g.
+# "../../apps/*/business-logic.json"; SFG_WEBHOOK_URL is this app's own
+# webhook URL, which is never subscribed.
+dispatcher = WebhookDispatcher.from_manifest_files(
+    os.environ.get("SFG_SUBSCRIBER_MANIFESTS"), verifier,
+    exclude_urls=[os.environ.get("SFG_WEBHOOK_URL", "")], log=log
+)
+
+# Event routes are registered once at import with @router.on(...)
+router = EventRouter("webhooks", metrics=metrics)
+
+metrics.collect("queue_depth", "Background jobs waiting per integration",
+                lambda: queue.stats()["queued"], label_names=("integration",))
+
 @app.post("/webhooks/nexus")
 async def handle_nexus_webhook(request: Request):
     """
@@ -33,48 +182,80 @@ async def handle_nexus_webhook(request: Request):
     - credit.check_required: Credit check needed
     - invoice.due: Invoice payment is due
     - payment.received: Payment has been received
+    - event.batch: Several of the above, forwarded together by another app
     """
     # Verify signature to ensure request is from NEXUS
-    signature = request.headers.get("X-Nexus-Signature")
-    body = await request.body()
-    
-    expected_signature = hmac.new(
-        WEBHOOK_SECRET.encode(),
-        body,
-        hashlib.sha256
-    ).hexdigest()
-    
-    if not hmac.compare_digest(signature or "", expected_signature):
+    # (hashed while the body streams in, then parsed once)
+    try:
+        _, event = await verifier.read_verified(request)
+    except InvalidSignature:
         raise HTTPException(status_code=401, detail="Invalid signature")
-    
-    # Parse event
-    event = await request.json()
+    except InvalidPayload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if event.get("type") == BATCH_EVENT:
+        # Each event in the batch is checked and deduplicated on its own
+        events = (event.get("data") or {}).get("events")
+        if not isinstance(events, list):
+            raise HTTPException(status_code=400, detail="event.batch needs data.events")
+        results = []
+        for inner in events:
+            if not isinstance(inner, dict):
+                results.append({"status": "error", "error": "Event must be a JSON object"})
+                continue
+            try:
+                _, _, result = await process_event(inner)
+            except (StaleEvent, ValidationError) as e:
+                result = {"status": "error", "error": str(e)}
+            results.append(result)
+        return JSONBytesResponse({"status": "processed", "count": len(results), "results": results})
+    
+    # Reject replays of old signed events and payloads that fail their model
+    try:
+        duplicate, status_code, result = await process_event(event)
+    except (StaleEvent, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Encoded in one pass by json_codec (no jsonable_encoder walk)
+    headers = {"X-Idempotent-Replay": "true"} if duplicate else None
+    return JSONBytesResponse(result, status_code=status_code, headers=headers)
+
+
+async def process_event(event: Dict[str, Any]):
+    """Run one verified event through its handler; returns (duplicate, status_code, result)"""
     event_type = event.get("type")
     data = event.get("data")
     
-    print(f"[{datetime.now().isoformat()}] Received event: {event_type}")
-    
-    # Route to appropriate handler
-    handlers = {
-        "enquiry.created": handle_enquiry_created,
-        "quote.requested": handle_quote_requested,
-        "order.approved": handle_order_approved,
-        "customer.registered": handle_customer_registered,
-        "credit.check_required": handle_credit_check,
-        "invoice.due": handle_invoice_due,
-        "payment.received": handle_payment_received
-    }
-    
-    handler = handlers.get(event_type)
-    if handler:
-        return await handler(data)
-    else:
-        return {
-            "status": "ignored",
-            "reason": f"Unknown event type: {event_type}"
-        }
+    log.info("event.received", type=event_type)
+    
+    async def process():
+        # Route to appropriate handler
+        try:
+            result = await router.dispatch(event_type, data)
+        except UnknownEvent:
+            result = {
+                "status": "ignored",
+                "reason": f"Unknown event type: {event_type}"
+            }
+        
+        # Only once the event is handled (a failure is retried by NEXUS and
+        # must not have been forwarded already): drop cached query results
+        # for entities it changes and forward it to subscribed apps (queued;
+        # delivered in the background)
+        invalidate_cached_queries(event_type, data)
+        dispatcher.publish(event_type, data, event)
+        
+        # Work still running in the background is acknowledged with 202
+        return (202 if result.get("status") == "accepted" else 200), result
+    
+    # Retried deliveries get the stored result without re-running the handler;
+    # only events not seen before have their timestamp checked
+    duplicate, (status_code, result) = await idempotency.run_once(
+        idempotency.key_for(event), process, event
+    )
+    return duplicate, status_code, result
 
 
+@router.on("enquiry.created")
 async def handle_enquiry_created(data: Dict[str, Any]):
     """
     Handle new enquiry event
@@ -83,42 +264,83 @@ async def handle_enquiry_created(data: Dict[str, Any]):
     1. Create project folder in SharePoint
     2. Assign estimator based on workload
     3. Check if credit check required (> £10k)
-    4. Send notification to sales team
+    4. Flag high-value enquiries for director review (> £50k)
+    5. Send notification to sales team
+    
+    Thresholds come from the businessRules in business-logic.json.
     """
     enquiry_id = data.get("enquiry_id")
-    customer = data.get("customer")
+    customer = Customer.from_field(data, "customer")
     estimated_value = data.get("estimated_value", 0)
     
-    print(f"Processing enquiry {enquiry_id} from {customer.get('name')}")
+    log.info("enquiry.processing", enquiry_id=enquiry_id, customer=customer.get("name"))
     
     # Your business logic here
+    # Side effects are queued and run after NEXUS has been acknowledged
     actions = []
+    jobs = []
     
     # 1. Create project folder
-    # folder_created = await create_sharepoint_folder(enquiry_id)
-    actions.append("Project folder created in SharePoint")
-    
-    # 2. Assign estimator
-    # estimator = await assign_estimator_by_workload()
-    actions.append("Estimator assigned based on current workload")
-    
-    # 3. Check if credit check required
-    if estimated_value > 10000:
-        # await request_credit_check(customer["id"])
-        actions.append("Credit check requested via Experian")
+    jobs.append(queue.enqueue("sharepoint.create_folder", {"enquiry_id": enquiry_id}))
+    actions.append("Project folder creation queued in SharePoint")
+    
+    # 2. Assign estimator (least-loaded with the project type, in the region)
+    enquiry = data.get("enquiry") or {}
+    try:
+        assignment = estimators.assign(
+            enquiry_id,
+            project_type=data.get("project_type") or enquiry.get("project_type"),
+            region=data.get("region"),
+            estimated_value=estimated_value
+        )
+    except NoEstimator:
+        actions.append("No estimator available, enquiry left unassigned")
+    else:
+        jobs.append(queue.enqueue("estimator.assign", assignment.to_dict()))
+        estimator = estimators.get(assignment.estimator_id)
+        actions.append(f"Estimator {estimator.name} assigned based on current workload")
     
-    # 4. Send notification
-    # await send_notification("sales_team", f"New enquiry {enquiry_id}")
-    actions.append("Sales team notified")
+    facts = {
+        "estimated_value": estimated_value,
+        "order_value": estimated_value
+    }
+    credit_check_age = credit.age_days(customer.id) if customer.id else None
+    if credit_check_age is not None:
+        facts["credit_check_age"] = credit_check_age
+    
+    # 3. Check if credit check required (unless the last one is still valid).
+    # Rules are found by the field they read, since apps name them differently
+    if rules.check("order_value", facts):
+        if rules.check("credit_check_age", facts):
+            actions.append(f"Existing credit check used ({credit_check_age:.0f} days old)")
+        elif not customer.id:
+            actions.append("Credit check required (customer has no id yet)")
+        else:
+            jobs.append(queue.enqueue("credit.request_check", {"customer_id": customer.id}))
+            actions.append("Credit check queued via Experian")
+    
+    # 4. Flag high-value enquiries
+    high_value = rules.check("estimated_value", facts)
+    if high_value:
+        actions.append(high_value.action)
+    
+    # 5. Send notification
+    jobs.append(queue.enqueue("notify.send", {
+        "recipient": "sales_team",
+        "message": f"New enquiry {enquiry_id}"
+    }))
+    actions.append("Sales team notification queued")
     
     return {
-        "status": "processed",
+        "status": "accepted",
         "enquiry_id": enquiry_id,
         "actions": actions,
+        "jobs": jobs,
         "timestamp": datetime.now().isoformat()
     }
 
 
+@router.on("quote.requested")
 async def handle_quote_requested(data: Dict[str, Any]):
     """
     Handle quote request event
@@ -131,38 +353,33 @@ async def handle_quote_requested(data: Dict[str, Any]):
     5. Generate quote document
     """
     enquiry_id = data.get("enquiry_id")
-    items = data.get("items", [])
+    items = QuoteItem.validate_many(data.get("items", []), "items")
     customer_tier = data.get("customer_tier", "steel")
     
-    print(f"Generating quote for enquiry {enquiry_id}")
+    log.info("quote.generating", enquiry_id=enquiry_id)
     
     # Your business logic here
     
-    # 1. Calculate pricing
-    total_cost = sum(item.get("cost", 0) for item in items)
-    total_price = sum(item.get("price", 0) for item in items)
-    margin = (total_price - total_cost) / total_price if total_price > 0 else 0
+    # 1. Calculate pricing (line discounts, tier discount, margin, approval tier)
+    priced = pricing.price_quote(items, customer_tier)
+    total_price = priced["total_price"]
+    margin = priced["margin"]
     
     # 2. Check minimum margin (15%)
-    if margin < 0.15:
+    if not priced["margin_ok"]:
         return {
             "status": "rejected",
-            "reason": "Margin below minimum (15%)",
+            "reason": f"Margin below minimum ({pricing.min_margin:.0%})",
             "margin": margin,
-            "required_margin": 0.15
+            "required_margin": pricing.min_margin
         }
     
-    # 3. Check if approval needed
-    approval_needed = False
-    approval_tier = None
-    if total_price > 100000:
-        approval_needed = True
-        approval_tier = "T2"  # Senior Manager
-    elif total_price > 25000:
-        approval_needed = True
-        approval_tier = "T3"  # Manager
-    
-    # 4. Generate quote
+    # 3. Check if approval needed (T1-T5 tier limits)
+    approval_needed = priced["approval_needed"]
+    approval_tier = priced["approval_tier"]
+    
+    # 4. Generate quote (the estimator's work on the enquiry is done)
+    estimators.release(enquiry_id)
     quote_number = f"QUO-{datetime.now().strftime('%y%m%d')}-{enquiry_id[-4:]}"
     
     return {
@@ -176,6 +393,7 @@ async def handle_quote_requested(data: Dict[str, Any]):
     }
 
 
+@router.on("order.approved")
 async def handle_order_approved(data: Dict[str, Any]):
     """
     Handle order approval event
@@ -187,44 +405,63 @@ async def handle_order_approved(data: Dict[str, Any]):
     4. Notify production team
     """
     order_id = data.get("order_id")
-    customer = data.get("customer")
-    items = data.get("items", [])
+    customer = Customer.from_field(data, "customer")
+    items = QuoteItem.validate_many(data.get("items", []), "items")
     
-    print(f"Processing approved order {order_id}")
+    log.info("order.processing", order_id=order_id)
     
     # Your business logic here
+    # Side effects are queued and run after NEXUS has been acknowledged
     actions = []
+    jobs = []
     
-    # 1. Schedule production
-    production_date = "2025-11-10"  # Calculate based on capacity
-    actions.append(f"Production scheduled for {production_date}")
+    # 1. Schedule production on the earliest free line capacity
+    placement = scheduler.schedule(
+        order_id, scheduler.order_hours(items, data.get("fabrication_hours"))
+    )
+    production_date = placement.start.isoformat()
+    actions.append(f"Production scheduled for {production_date} on {placement.line}")
     
     # 2. Create invoice
     invoice_number = f"INV-{datetime.now().strftime('%y%m%d')}-{order_id[-4:]}"
-    actions.append(f"Invoice {invoice_number} created in Xero")
+    jobs.append(queue.enqueue("xero.create_invoice", {
+        "order_id": order_id,
+        "invoice_number": invoice_number,
+        "customer": customer.to_dict(),
+        "items": [item.to_dict() for item in items]
+    }))
+    actions.append(f"Invoice {invoice_number} queued in Xero")
     
     # 3. Update SharePoint
-    actions.append("SharePoint updated with order details")
+    jobs.append(queue.enqueue("sharepoint.update_order", {"order_id": order_id}))
+    actions.append("SharePoint order update queued")
     
     # 4. Notify team
-    actions.append("Production team notified")
+    jobs.append(queue.enqueue("notify.send", {
+        "recipient": "production_team",
+        "message": f"Order {order_id} approved for production"
+    }))
+    actions.append("Production team notification queued")
     
     return {
-        "status": "processed",
+        "status": "accepted",
         "order_id": order_id,
         "production_scheduled": production_date,
+        "estimated_completion": placement.finish.isoformat(),
         "invoice_created": invoice_number,
         "actions": actions,
+        "jobs": jobs,
         "timestamp": datetime.now().isoformat()
     }
 
 
+@router.on("customer.registered")
 async def handle_customer_registered(data: Dict[str, Any]):
     """Handle new customer registration"""
     customer_id = data.get("customer_id")
     customer_name = data.get("customer_name")
     
-    print(f"New customer registered: {customer_name} ({customer_id})")
+    log.info("customer.registered", customer_id=customer_id, customer_name=customer_name)
     
     # Your business logic here
     return {
@@ -235,53 +472,59 @@ async def handle_customer_registered(data: Dict[str, Any]):
     }
 
 
+@router.on("credit.check_required")
 async def handle_credit_check(data: Dict[str, Any]):
     """
     Handle credit check request
     
     Business Logic:
-    1. Query Experian API via MCP-FINANCE
-    2. Evaluate credit score
+    1. Use the customer's last check if it is within the validity period
+    2. Otherwise query Experian (via MCP-FINANCE) and Companies House in parallel
     3. Set credit limit based on score
-    4. Update customer tier if needed
+    4. Decline if the company is no longer active
+    5. Pending (not approved) while the bureau connectors are unconfigured
     """
     customer_id = data.get("customer_id")
-    order_value = data.get("order_value")
+    order_value = data.get("order_value") or 0
     
-    print(f"Credit check requested for customer {customer_id}")
+    log.info("credit.check_requested", customer_id=customer_id)
     
-    # Your business logic here
-    # credit_score = await check_experian_credit(customer_id)
-    credit_score = 750  # Example
-    
-    # Determine credit limit
-    if credit_score >= 700:
-        credit_limit = 50000
-        approved = True
-    elif credit_score >= 600:
-        credit_limit = 25000
-        approved = order_value <= credit_limit
-    else:
-        credit_limit = 10000
-        approved = order_value <= credit_limit
+    if not credit.configured:
+        # No bureau to ask: hold the check rather than approve on no score
+        return {
+            "status": "pending",
+            "customer_id": customer_id,
+            "approved": False,
+            "reason": "Credit bureau connectors not configured",
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    result = await credit.check(customer_id, data.get("company_number"))
+    decision = credit.decide(result, order_value)
     
     return {
         "status": "processed",
         "customer_id": customer_id,
-        "credit_score": credit_score,
-        "credit_limit": credit_limit,
-        "approved": approved,
+        "credit_score": result.score,
+        "credit_limit": decision["credit_limit"],
+        "approved": decision["approved"],
+        "reason": decision["reason"],
+        "company_status": result.company_status,
+        "checked_at": datetime.fromtimestamp(result.checked_at).isoformat(),
+        "valid_until": datetime.fromtimestamp(credit.valid_until(result)).isoformat(),
+        "errors": list(result.errors),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@router.on("invoice.due")
 async def handle_invoice_due(data: Dict[str, Any]):
     """Handle invoice due notification"""
     invoice_id = data.get("invoice_id")
     customer_id = data.get("customer_id")
     amount_due = data.get("amount_due")
     
-    print(f"Invoice {invoice_id} is due: £{amount_due}")
+    log.info("invoice.due", invoice_id=invoice_id, amount_due=amount_due)
     
     # Your business logic here
     return {
@@ -292,23 +535,101 @@ async def handle_invoice_due(data: Dict[str, Any]):
     }
 
 
+@router.on("payment.received")
 async def handle_payment_received(data: Dict[str, Any]):
     """Handle payment received notification"""
-    payment_id = data.get("payment_id")
-    invoice_id = data.get("invoice_id")
-    amount = data.get("amount")
+    payment = Payment.validate(data)
     
-    print(f"Payment received: £{amount} for invoice {invoice_id}")
+    log.info("payment.received", invoice_id=payment.invoice_id, amount=payment.amount)
     
     # Your business logic here
     return {
         "status": "processed",
-        "payment_id": payment_id,
+        "payment_id": payment.payment_id,
         "actions": ["Invoice marked as paid", "Customer notified", "Xero updated"],
         "timestamp": datetime.now().isoformat()
     }
 
 
+def invalidate_cached_queries(event_type: str, data: Dict[str, Any]):
+    """Invalidate query.* cache entries here and in the message handler"""
+    entities = entities_for_event(event_type, data)
+    if not entities:
+        return
+    invalidate_entities(entities)
+    if shared:
+        # Other workers, including the message handler's on this host
+        shared.publish_invalidations(entities)
+    if MESSAGE_HANDLER_URL:
+        queue.enqueue("cache.invalidate", {"type": event_type, "data": data})
+
+
+# Background tasks
+# Failures raise and are retried with backoff by the queue.
+
+@queue.task("cache.invalidate", integration="Cache")
+async def notify_cache_invalidation(payload: Dict[str, Any]):
+    """Tell the message handler to drop stale cached query results"""
+    body = dumps(payload)
+    req = urllib.request.Request(
+        f"{MESSAGE_HANDLER_URL}/cache/invalidate",
+        data=body,
+        headers={"Content-Type": "application/json", "X-Nexus-Signature": verifier.sign(body)},
+        method="POST"
+    )
+    await asyncio.to_thread(lambda: urllib.request.urlopen(req, timeout=5).close())
+
+
+@queue.task("sharepoint.create_folder", integration="SharePoint")
+async def create_sharepoint_folder(payload: Dict[str, Any]):
+    """Create the project folder for a new enquiry"""
+    # await graph_client.create_folder(f"Projects/{payload['enquiry_id']}")
+    pass
+
+
+@queue.task("sharepoint.update_order", integration="SharePoint")
+async def update_sharepoint_order(payload: Dict[str, Any]):
+    """Write approved order details to the project folder"""
+    # await graph_client.upload_json(f"Orders/{payload['order_id']}.json", payload)
+    pass
+
+
+@queue.task("estimator.assign", integration="Estimating")
+async def assign_estimator(payload: Dict[str, Any]):
+    """Tell the assigned estimator, and checkpoint the workload snapshot"""
+    # await mcp_communications.send(payload["estimator_id"], f"Enquiry {payload['enquiry_id']}")
+    await estimators.save_if_due()
+
+
+@queue.task("credit.request_check", integration="Experian")
+async def request_credit_check(payload: Dict[str, Any]):
+    """Run (or reuse) the customer's credit check ahead of the order"""
+    await credit.check(payload["customer_id"], payload.get("company_number"))
+
+
+@queue.task("credit.recheck_expiring", integration="Experian")
+async def recheck_expiring_credit(payload: Dict[str, Any]):
+    """Re-check, in bureau batches, every customer whose check expires within N days"""
+    due = credit.expiring(payload.get("within_days", 7))
+    results = await credit.check_many(due, force=True)
+    log.info("credit.rechecked", customers=len(results),
+             incomplete=sum(not result.complete for result in results.values()))
+
+
+@queue.task("xero.create_invoice", integration="Xero")
+async def create_xero_invoice(payload: Dict[str, Any]):
+    """Create the invoice for an approved order in Xero"""
+    # await xero.invoices.create(payload["invoice_number"], payload["items"])
+    pass
+
+
+@queue.task("notify.send", integration="Notifications")
+async def send_notification(payload: Dict[str, Any]):
+    """Send an internal notification via MCP-COMMUNICATIONS"""
+    # await mcp_communications.send(payload["recipient"], payload["message"])
+    pass
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -316,10 +637,30 @@ async def health_check():
         "status": "healthy",
         "service": "SFG Aluminium Webhook Handler",
         "version": "1.0.0",
+        "dispatch": router.stats(),
+        "queue": queue.stats(),
+        "idempotency": idempotency.stats(),
+        "forwarding": dispatcher.stats(),
+        "logging": log.stats(),
+        "workers": shared.stats() if shared else None,
+        "rate_limits": limiter.stats() if limiter else None,
+        "credit": credit.stats(),
+        "production": scheduler.stats(),
+        "estimators": estimators.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Counters and latency histograms in the Prometheus text format (all workers)"""
+    if shared:
+        shared.publish_metrics(metrics.dump())
+        return PlainTextResponse(metrics.render(shared.worker_metrics()), media_type=CONTENT_TYPE)
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # SFG_WORKERS=4 (or "auto") for more worker processes; see serve.py
+    from serve import serve
+    serve("webhook")
@@ -0,0 +1,494 @@
+"""
+SFG Aluminium - Webhook Fan-out Dispatcher
+Version: 1.0.0
+Date: November 5, 2025
+
+Delivers events onward to the webhook_url of every app whose manifest lists
+them in webhook_events.
+
+- Each subscriber's event patterns are compiled into its own EventRouter,
+  so wildcards ("quote.*") match exactly as they do for incoming webhooks.
+  The subscribers for an event type are resolved once and memoised.
+- One pooled HTTP client per target host keeps connections alive (HTTP/2
+  when the optional h2 package is installed).
+- Events queue per subscriber and go out in batches: a single event is sent
+  as-is; several are wrapped in one "event.batch" envelope.
+- Every body is signed with WebhookVerifier.sign, the X-Nexus-Signature
+  scheme handle_nexus_webhook verifies. The timestamp (of the envelope and
+  of each event in a batch) is stamped, and the body signed, per delivery
+  attempt, so events held back by retries or an open breaker still pass
+  the receiver's replay window. A receiver that rejects one as stale
+  (idempotency_store.STALE_MESSAGE) gets it again with a fresh timestamp.
+- The forwarded envelope is built deterministically from the original
+  event: its id (or, without one, a digest of the event) and data. A retry
+  by NEXUS or by the dispatcher is therefore the same event to the
+  receiver's idempotency store, which ignores the timestamp.
+- A circuit breaker per subscriber stops sending to an app that keeps
+  failing and probes it again after a cool-down, so one dead app neither
+  slows the others nor gets hammered with retries.
+
+Forwarded events carry "forwarded_by" and are never forwarded again, so two
+apps subscribed to each other cannot loop.
+"""
+
+import asyncio
+import glob
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from event_router import EventRouter
+from idempotency_store import STALE_MESSAGE, event_digest
+from json_codec import dumps
+from structured_log import StructuredLogger
+from webhook_verifier import WebhookVerifier
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is optional
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:  # pragma: no cover - HTTP/2 is optional
+    HTTP2 = False
+
+BATCH_EVENT = "event.batch"
+BATCH_SIZE = 50
+LINGER = 0.005            # seconds to wait for a batch to fill once one event is queued
+MAX_PENDING = 10000       # per subscriber; the oldest event is dropped beyond this
+SENDERS = 2               # concurrent batches in flight per subscriber
+MAX_ATTEMPTS = 5
+BASE_DELAY = 0.5          # seconds, doubled on every retry
+MAX_DELAY = 30.0
+FAILURE_THRESHOLD = 5     # consecutive failures before the breaker opens
+RESET_TIMEOUT = 30.0      # seconds the breaker stays open before a probe
+REQUEST_TIMEOUT = 10.0
+MAX_CONNECTIONS = 16      # per host
+
+NOT_SET = {None, "", "N/A"}
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open probe -> closed"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def delay(self) -> float:
+        """Seconds to wait before calling (0 means call now)"""
+        if self.state == self.CLOSED:
+            return 0.0
+        if self.state == self.OPEN:
+            remaining = self._opened_at + self.reset_timeout - self._clock()
+            if remaining > 0:
+                return remaining
+            self.state = self.HALF_OPEN
+        if self._probing:
+            return min(1.0, self.reset_timeout)
+        self._probing = True   # this caller is the probe
+        return 0.0
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probing = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.opened += 1
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+
+
+class Subscriber:
+    """One app's webhook_url, the event patterns it wants and its delivery state"""
+
+    def __init__(self, name: str, url: str, patterns: Iterable[str],
+                 batch_size: int = BATCH_SIZE, max_pending: int = MAX_PENDING,
+                 breaker: Optional[CircuitBreaker] = None,
+                 verifier: Optional[WebhookVerifier] = None):
+        self.name = name
+        self.url = url
+        self.batch_size = batch_size
+        self.breaker = breaker or CircuitBreaker()
+        self.verifier = verifier
+        self.router = EventRouter(f"subscriber:{name}")
+        for pattern in dict.fromkeys(patterns):
+            self.router.add(pattern, _subscribed)
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(max_pending)
+        self.counters = {"queued": 0, "delivered": 0, "batches": 0, "retries": 0,
+                         "rejected": 0, "failed": 0, "dropped": 0}
+        self._latency_total = 0.0
+
+    def wants(self, event_type: str) -> bool:
+        return self.router.resolve(event_type) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self.counters["batches"]
+        return {
+            "url": self.url,
+            "patterns": self.router.patterns(),
+            "pending": self.queue.qsize(),
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            **self.counters,
+            "avg_batch_ms": round(self._latency_total / batches * 1000, 3) if batches else 0.0,
+        }
+
+
+async def _subscribed(payload: Dict[str, Any]) -> None:
+    """Route target for subscriber patterns (matching only; never called)"""
+
+
+class WebhookDispatcher:
+    """Fan-out of events to subscriber webhooks over pooled HTTP clients"""
+
+    def __init__(self, verifier: WebhookVerifier, source: str = "sfg-webhook-handler",
+                 batch_size: int = BATCH_SIZE, linger: float = LINGER,
+                 max_pending: int = MAX_PENDING, senders: int = SENDERS,
+                 max_attempts: int = MAX_ATTEMPTS, base_delay: float = BASE_DELAY,
+                 max_delay: float = MAX_DELAY, failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT, timeout: float = REQUEST_TIMEOUT,
+                 max_connections: int = MAX_CONNECTIONS,
+                 log: Optional[StructuredLogger] = None):
+        self.verifier = verifier
+        self.log = log or StructuredLogger("dispatcher")
+        self.source = source
+        self.batch_size = batch_size
+        self.linger = linger
+        self.max_pending = max_pending
+        self.senders = senders
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.subscribers: Dict[str, Subscriber] = {}
+        self._targets: Dict[str, List[Subscriber]] = {}
+        self._clients: Dict[Tuple[str, str, int], Any] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    # -- configuration -----------------------------------------------------
+
+    def subscribe(self, name: str, url: str, patterns: Iterable[str],
+                  secret: Optional[str] = None, batch_size: Optional[int] = None) -> Subscriber:
+        """Add a subscriber (batch_size=1 for receivers without event.batch support)"""
+        if name in self.subscribers:
+            raise ValueError(f"Duplicate subscriber '{name}'")
+        subscriber = Subscriber(
+            name, url, patterns,
+            batch_size=batch_size or self.batch_size,
+            max_pending=self.max_pending,
+            breaker=CircuitBreaker(self.failure_threshold, self.reset_timeout),
+            verifier=WebhookVerifier([secret]) if secret else None,
+        )
+        self.subscribers[name] = subscriber
+        self._targets.clear()
+        if self._running:
+            self._start_senders(subscriber)
+        return subscriber
+
+    @classmethod
+    def from_manifests(cls, manifests: Iterable[Dict[str, Any]], verifier: WebhookVerifier,
+                       exclude_urls: Iterable[str] = (), **kwargs) -> "WebhookDispatcher":
+        """Subscribe every manifest that declares a webhook_url and webhook_events"""
+        dispatcher = cls(verifier, **kwargs)
+        excluded = {url.rstrip("/") for url in exclude_urls if url}
+        for manifest in manifests:
+            url = manifest.get("webhook_url") or manifest.get("webhookUrl")
+            if url in NOT_SET or url.rstrip("/") in excluded:
+                continue
+            events = manifest.get("webhook_events") or manifest.get("webhookEvents") or []
+            patterns = [_event_name(e) for e in events if _event_name(e)]
+            if not patterns:
+                continue
+            name = manifest.get("appName") or manifest.get("app_name") or manifest.get("name") or url
+            while name in dispatcher.subscribers:
+                name += "'"
+            dispatcher.subscribe(name, url, patterns)
+        return dispatcher
+
+    @classmethod
+    def from_manifest_files(cls, pattern: Optional[str], verifier: WebhookVerifier,
+                            **kwargs) -> "WebhookDispatcher":
+        """from_manifests() over a glob of business-logic.json files (invalid files are skipped)"""
+        log = kwargs["log"] = kwargs.get("log") or StructuredLogger("dispatcher")
+        manifests = []
+        for path in sorted(glob.glob(pattern)) if pattern else []:
+            try:
+                with open(path, "r") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("subscriber.manifest_skipped", path=path, error=str(e))
+                continue
+            if isinstance(manifest, dict):
+                manifests.append(manifest)
+        return cls.from_manifests(manifests, verifier, **kwargs)
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        if httpx is None and self.subscribers:
+            raise RuntimeError("httpx is required to deliver webhooks (pip install httpx)")
+        self._running = True
+        for subscriber in self.subscribers.values():
+            self._start_senders(subscriber)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Deliver what is queued (up to timeout), then close the connection pools"""
+        if not self._running:
+            return
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(s.queue.join() for s in self.subscribers.values())), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def _start_senders(self, subscriber: Subscriber) -> None:
+        for _ in range(self.senders):
+            self._tasks.append(asyncio.create_task(self._sender(subscriber)))
+
+    # -- publishing --------------------------------------------------------
+
+    def targets(self, event_type: str) -> List[Subscriber]:
+        """Subscribers for an event type (resolved once per type)"""
+        targets = self._targets.get(event_type)
+        if targets is None:
+            targets = [s for s in self.subscribers.values() if s.wants(event_type)]
+            self._targets[event_type] = targets
+        return targets
+
+    def publish(self, event_type: Optional[str], data: Any,
+                event: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Queue an event for every subscriber; returns how many were queued
+
+        Never blocks: a subscriber whose queue is full loses its oldest event.
+        Events that were themselves forwarded are not published again.
+        """
+        if not event_type or not isinstance(event_type, str) or (event or {}).get("forwarded_by"):
+            return 0
+        targets = self.targets(event_type)
+        if not targets:
+            return 0
+        # No timestamp yet: _deliver stamps each attempt
+        envelope = {
+            "id": _event_id(event) if event else uuid.uuid4().hex,
+            "type": event_type,
+            "forwarded_by": self.source,
+            "data": data,
+        }
+        for subscriber in targets:
+            if subscriber.queue.full():
+                subscriber.queue.get_nowait()
+                subscriber.queue.task_done()
+                subscriber.counters["dropped"] += 1
+            subscriber.queue.put_nowait(envelope)
+            subscriber.counters["queued"] += 1
+        return len(targets)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": HTTP2,
+            "hosts": len(self._clients),
+            "subscribers": {name: s.stats() for name, s in self.subscribers.items()},
+        }
+
+    # -- delivery ----------------------------------------------------------
+
+    async def _sender(self, subscriber: Subscriber) -> None:
+        loop = asyncio.get_running_loop()
+        queue = subscriber.queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.linger
+            while len(batch) < subscriber.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._deliver(subscriber, batch)
+            except Exception as e:
+                subscriber.counters["failed"] += len(batch)
+                self.log.error("delivery.failed", subscriber=subscriber.name,
+                               events=len(batch), error=str(e))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _deliver(self, subscriber: Subscriber, batch: List[Dict[str, Any]]) -> None:
+        verifier = subscriber.verifier or self.verifier
+        client = self._client(subscriber.url)
+        breaker = subscriber.breaker
+        batch_id = uuid.uuid4().hex
+
+        attempt = 0
+        while True:
+            wait = breaker.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            # Stamp and sign at send time: a retry must not carry a stale timestamp
+            now = _now()
+            if len(batch) == 1:
+                payload = {**batch[0], "timestamp": now}
+            else:
+                payload = {
+                    "id": batch_id,
+                    "type": BATCH_EVENT,
+                    "timestamp": now,
+                    "forwarded_by": self.source,
+                    "data": {"events": [{**event, "timestamp": now} for event in batch]},
+                }
+            body = dumps(payload)
+            headers = {
+                "Content-Type": "application/json",
+                "X-Nexus-Signature": verifier.sign(body),
+                "X-Nexus-Event": payload["type"],
+                "X-Nexus-Delivery": payload["id"],
+            }
+
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = await client.post(subscriber.url, content=body, headers=headers)
+            except httpx.HTTPError as e:
+                error = str(e) or type(e).__name__
+                breaker.record_failure()
+            else:
+                if response.status_code < 300:
+                    breaker.record_success()
+                    stale = _stale_events(batch, response) if len(batch) > 1 else []
+                    subscriber.counters["delivered"] += len(batch) - len(stale)
+                    subscriber.counters["batches"] += 1
+                    subscriber._latency_total += time.perf_counter() - start
+                    if not stale:
+                        return
+                    # Only the events refused as stale go again
+                    batch = stale
+                    error = STALE_MESSAGE
+                elif _stale_rejection(response):
+                    # The app is up; the event only needs a fresh timestamp
+                    breaker.record_success()
+                    error = STALE_MESSAGE
+                elif response.status_code < 500 and response.status_code not in (408, 429):
+                    # The app is up but refused the events; retrying will not help
+                    breaker.record_success()
+                    subscriber.counters["rejected"] += len(batch)
+                    self.log.warning("delivery.rejected", subscriber=subscriber.name,
+                                     events=len(batch), status=response.status_code)
+                    return
+                else:
+                    error = f"HTTP {response.status_code}"
+                    retry_after = _retry_after(response.headers.get("Retry-After"))
+                    breaker.record_failure()
+
+            attempt += 1
+            if attempt >= self.max_attempts:
+                subscriber.counters["failed"] += len(batch)
+                self.log.error("delivery.abandoned", subscriber=subscriber.name,
+                               events=len(batch), attempts=attempt, error=error)
+                return
+            subscriber.counters["retries"] += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+            await asyncio.sleep(retry_after if retry_after is not None else random.uniform(0, delay))
+
+    def _client(self, url: str):
+        """The pooled client for url's host (created on first use)"""
+        parsed = httpx.URL(url)
+        key = (parsed.scheme, parsed.host, parsed.port or (443 if parsed.scheme == "https" else 80))
+        client = self._clients.get(key)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=HTTP2,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections,
+                                    keepalive_expiry=60.0),
+            )
+            self._clients[key] = client
+        return client
+
+
+def _event_name(entry: Any) -> Optional[str]:
+    if isinstance(entry, str):
+        return entry.strip() or None
+    if isinstance(entry, dict):
+        for key in ("event", "name", "type"):
+            if isinstance(entry.get(key), str) and entry[key].strip():
+                return entry[key].strip()
+    return None
+
+
+def _event_id(event: Dict[str, Any]) -> str:
+    """The original event's id, or a digest of it: stable across NEXUS retries"""
+    return event.get("id") or event.get("event_id") or event_digest(event)
+
+
+def _stale_rejection(response) -> bool:
+    """A 4xx for a timestamp outside the receiver's replay window"""
+    return 400 <= response.status_code < 500 and STALE_MESSAGE in response.text
+
+
+def _stale_events(batch: List[Dict[str, Any]], response) -> List[Dict[str, Any]]:
+    """Events of a delivered batch that the receiver refused as stale"""
+    try:
+        results = response.json().get("results")
+    except (ValueError, AttributeError):
+        return []
+    if not isinstance(results, list) or len(results) != len(batch):
+        return []
+    return [event for event, result in zip(batch, results)
+            if isinstance(result, dict) and result.get("error") == STALE_MESSAGE]
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
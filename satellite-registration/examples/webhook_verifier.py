@@ -0,0 +1,130 @@
+"""
+SFG Aluminium - Webhook Signature Verifier
+Version: 1.0.0
+Date: November 5, 2025
+
+Verifies the X-Nexus-Signature HMAC of incoming NEXUS webhooks.
+
+The HMAC key schedule is computed once per secret and kept as a pre-keyed
+template; each request only pays for a cheap .copy() of that state. The body
+is hashed while it streams in and the JSON is parsed exactly once from the
+same buffer (with json_codec, so orjson/msgspec when installed).
+"""
+
+import hashlib
+import hmac
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from json_codec import loads
+
+
+class InvalidSignature(Exception):
+    """Raised when a webhook body does not match any active secret"""
+
+
+class InvalidPayload(Exception):
+    """Raised when a verified webhook body is not valid JSON"""
+
+
+class WebhookVerifier:
+    """
+    HMAC-SHA256 verifier with pre-keyed digest templates
+
+    Several secrets can be active at once so a secret can be rotated without
+    dropping deliveries: NEXUS switches to the new secret while the old one
+    is still accepted, then the old one is removed with rotate().
+    """
+
+    def __init__(self, secrets: Iterable[str], digestmod=hashlib.sha256):
+        self._digestmod = digestmod
+        self._templates: List[Any] = []
+        self.rotate(secrets)
+
+    def rotate(self, secrets: Iterable[str]) -> None:
+        """Replace the active secrets (first secret is the primary one)"""
+        templates = [
+            hmac.new(secret.encode(), digestmod=self._digestmod)
+            for secret in secrets
+            if secret
+        ]
+        if not templates:
+            raise ValueError("At least one webhook secret is required")
+        self._templates = templates
+
+    def sign(self, body: bytes) -> str:
+        """Sign a body with the primary secret (used for outgoing webhooks)"""
+        mac = self._templates[0].copy()
+        mac.update(body)
+        return mac.hexdigest()
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        """Check a fully buffered body against every active secret"""
+        macs = self._start()
+        for mac in macs:
+            mac.update(body)
+        return self._matches(macs, signature)
+
+    def verify_and_parse(self, body: bytes, signature: Optional[str]) -> Dict[str, Any]:
+        """Verify a buffered body and parse it once"""
+        if not self.verify(body, signature):
+            raise InvalidSignature("Invalid signature")
+        return _parse(body)
+
+    async def read_verified(self, request) -> Tuple[bytes, Dict[str, Any]]:
+        """
+        Read, verify and parse a Starlette/FastAPI request body
+
+        The digest is updated chunk by chunk as the body streams in, so the
+        signature is settled as soon as the last chunk arrives.
+        """
+        signature = request.headers.get("X-Nexus-Signature")
+        macs = self._start()
+        chunks = []
+        async for chunk in request.stream():
+            if chunk:
+                chunks.append(chunk)
+                for mac in macs:
+                    mac.update(chunk)
+
+        if not self._matches(macs, signature):
+            raise InvalidSignature("Invalid signature")
+
+        body = b"".join(chunks)
+        return body, _parse(body)
+
+    def _start(self) -> List[Any]:
+        return [template.copy() for template in self._templates]
+
+    @staticmethod
+    def _matches(macs: List[Any], signature: Optional[str]) -> bool:
+        signature = signature or ""
+        matched = False
+        # Compare against every secret so timing does not reveal which matched
+        for mac in macs:
+            matched |= hmac.compare_digest(signature, mac.hexdigest())
+        return matched
+
+
+def _parse(body: bytes) -> Dict[str, Any]:
+    try:
+        event = loads(body)
+    except ValueError as e:
+        raise InvalidPayload(f"Invalid JSON body: {e}") from e
+    if not isinstance(event, dict):
+        raise InvalidPayload("Webhook body must be a JSON object")
+    return event
+
+
+def load_secrets(default: str) -> List[str]:
+    """
+    Load the active webhook secrets from the environment
+
+    NEXUS_WEBHOOK_SECRETS is a comma-separated list (primary first) used while
+    rotating; otherwise WEBHOOK_SECRET or the supplied default is used.
+    """
+    rotating = os.environ.get("NEXUS_WEBHOOK_SECRETS", "")
+    secrets = [s.strip() for s in rotating.split(",") if s.strip()]
+    if secrets:
+        return secrets
+    return [os.environ.get("WEBHOOK_SECRET", default)]
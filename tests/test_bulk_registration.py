@@ -0,0 +1,172 @@
+"""
+Bulk registration (autonomous_registration.py --all) against the local
+GitHub stub in benchmarks/github_stub.py
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import autonomous_registration as registration
+from github_stub import GithubStub
+
+CREDS = {'owner': 'sfgaluminium1-spec', 'repo': 'sfg-app-portfolio'}
+APPS = ['sfg-website', 'sfg-dashboard', 'sfg-analysis', 'sfg-comms-hub']
+
+
+class Tokens:
+    """fetch_token() for InstallationTokenCache, counting its calls"""
+
+    def __init__(self, lifetime=timedelta(hours=1)):
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    def __call__(self):
+        self.fetches += 1
+        return f'token-{self.fetches}', datetime.now(timezone.utc) + self.lifetime
+
+
+def write_manifest(apps_dir, app, **extra):
+    os.makedirs(apps_dir / app, exist_ok=True)
+    bl = {'appName': app, 'version': '1.0.0', 'description': f'{app} satellite app',
+          'capabilities': ['Quotes', 'Orders'], **extra}
+    (apps_dir / app / 'business-logic.json').write_text(json.dumps(bl))
+
+
+@pytest.fixture
+def apps_dir(tmp_path, monkeypatch):
+    # The portfolio backup is written to the working directory
+    monkeypatch.chdir(tmp_path)
+    for app in APPS:
+        write_manifest(tmp_path / 'apps', app)
+    return tmp_path / 'apps'
+
+
+@pytest.fixture
+def stub():
+    with GithubStub() as stub:
+        yield stub
+
+
+def register(stub, apps_dir, tokens=None, **kwargs):
+    cache = registration.InstallationTokenCache(tokens or Tokens(), stub.url)
+    backup = registration.register_portfolio(str(apps_dir), 4, stub.url, token_cache=cache,
+                                             creds=CREDS, min_write_interval=0, **kwargs)
+    return backup, cache
+
+
+def actions(backup):
+    return {app['app']: app['action'] for app in backup['apps']}
+
+
+def test_one_token_fetch_for_the_whole_run(stub, apps_dir):
+    tokens = Tokens()
+    _, cache = register(stub, apps_dir, tokens)
+    assert tokens.fetches == 1
+    cache.token()
+    assert tokens.fetches == 1
+
+
+def test_token_refetched_once_expired(monkeypatch):
+    monkeypatch.setattr(registration, 'TOKEN_REFRESH_MARGIN', timedelta(0))
+    tokens = Tokens(lifetime=timedelta(seconds=0.2))
+    cache = registration.InstallationTokenCache(tokens, 'http://127.0.0.1:9')
+    client = cache.client()
+    assert cache.token() == 'token-1' and cache.client() is client
+    time.sleep(0.3)
+    assert cache.token() == 'token-2' and tokens.fetches == 2
+    assert cache.client() is not client
+
+
+def test_first_run_creates_one_issue_per_manifest(stub, apps_dir):
+    backup, _ = register(stub, apps_dir)
+    assert actions(backup) == {app: 'created' for app in APPS}
+    assert sorted(issue['title'] for issue in stub.issues.values()) == sorted(
+        f'[Registration] {app}' for app in APPS)
+    assert stub.count('POST') == len(APPS)
+    assert all('registration' in issue['labels'] for issue in stub.issues.values())
+    assert backup['failures'] == []
+
+
+def test_unchanged_rerun_makes_no_api_calls(stub, apps_dir):
+    register(stub, apps_dir)
+    calls = len(stub.requests)
+    tokens = Tokens()
+    backup, _ = register(stub, apps_dir, tokens)
+    assert actions(backup) == {app: 'unchanged' for app in APPS}
+    assert len(stub.requests) == calls
+    assert tokens.fetches == 0
+
+
+@pytest.mark.parametrize('on_change', registration.ON_CHANGE_MODES)
+def test_rerun_touches_only_changed_apps(stub, apps_dir, on_change):
+    first, _ = register(stub, apps_dir)
+    numbers = {app['app']: app['issue_number'] for app in first['apps']}
+    bodies = {number: issue['body'] for number, issue in stub.issues.items()}
+    write_manifest(apps_dir, 'sfg-analysis', capabilities=['Quotes', 'Orders', 'Forecasts'])
+    calls = len(stub.requests)
+
+    backup, _ = register(stub, apps_dir, on_change=on_change)
+
+    expected = {'edit': 'updated', 'comment': 'commented'}[on_change]
+    assert actions(backup) == {app: expected if app == 'sfg-analysis' else 'unchanged'
+                               for app in APPS}
+    changed = numbers['sfg-analysis']
+    written = [(method, path) for method, path in stub.requests[calls:] if method != 'GET']
+    if on_change == 'edit':
+        assert written == [('PATCH', f"/repos/{CREDS['owner']}/{CREDS['repo']}/issues/{changed}")]
+        assert 'Forecasts' in stub.issues[changed]['body']
+    else:
+        assert written == [('POST', f"/repos/{CREDS['owner']}/{CREDS['repo']}"
+                                    f"/issues/{changed}/comments")]
+        assert 'Forecasts' in stub.issues[changed]['comments'][0]
+        assert stub.issues[changed]['body'] == bodies[changed]
+    for number, issue in stub.issues.items():
+        if number != changed:
+            assert issue['body'] == bodies[number] and issue['comments'] == []
+
+
+@pytest.mark.parametrize('status', [403, 429])
+def test_secondary_rate_limit_backs_off_and_retries(stub, apps_dir, status):
+    stub.rate_limit(1, status, retry_after=1)
+    start = time.monotonic()
+    backup, _ = register(stub, apps_dir)
+    assert time.monotonic() - start >= 1
+    assert backup['failures'] == []
+    assert actions(backup) == {app: 'created' for app in APPS}
+    assert len(stub.rate_limited) == 1
+    assert stub.count('POST') == len(APPS) + 1
+    assert len(stub.issues) == len(APPS)
+
+
+def test_forbidden_write_fails_without_retrying(stub, apps_dir):
+    stub.forbid(1)
+    start = time.monotonic()
+    backup, _ = register(stub, apps_dir)
+    assert time.monotonic() - start < 1
+    assert len(stub.forbidden) == 1
+    assert len(backup['failures']) == 1
+    assert stub.count('POST') == len(APPS)
+    assert len(stub.issues) == len(APPS) - 1
+
+
+def test_failed_update_is_reported_and_retried(stub, apps_dir):
+    first, _ = register(stub, apps_dir)
+    number = next(app['issue_number'] for app in first['apps'] if app['app'] == 'sfg-website')
+    issue = stub.issues.pop(number)
+    write_manifest(apps_dir, 'sfg-website', version='1.1.0')
+
+    backup, _ = register(stub, apps_dir)
+    failed = next(app for app in backup['apps'] if app['app'] == 'sfg-website')
+    assert failed['action'] == 'failed' and failed['issue_number'] == number
+    assert failed['error']
+    assert [f['app'] for f in backup['failures']] == ['sfg-website']
+
+    # The next run tries again, even though the manifest has not changed since
+    stub.issues[number] = issue
+    backup, _ = register(stub, apps_dir)
+    assert actions(backup)['sfg-website'] == 'updated'
+    assert backup['failures'] == []
@@ -0,0 +1,44 @@
+"""
+Business rules from the real app manifests in apps/*/business-logic.json,
+looked up the way the webhook handler does: by the field a condition reads
+"""
+
+import json
+import os
+
+import pytest
+
+from rules_engine import RulesEngine
+
+APPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'apps')
+
+APPS = ['sfg-esp', 'sfg-nexus-core', 'SFG-Aluminium-Unified-Dashboard']
+
+
+def engine(app):
+    with open(os.path.join(APPS_DIR, app, 'business-logic.json')) as f:
+        return RulesEngine.from_manifest(json.load(f))
+
+
+@pytest.mark.parametrize('app', APPS)
+def test_credit_check_rule_found_by_field(app):
+    rules = engine(app)
+    assert 'Credit check for orders > £10,000' in [rule.name for rule in rules.rules]
+
+    rule = rules.check('order_value', {'order_value': 25000, 'estimated_value': 25000})
+    assert rule is not None and rule.condition == 'order_value > 10000'
+    assert rules.check('order_value', {'order_value': 5000, 'estimated_value': 5000}) is None
+
+
+def test_credit_check_validity_in_days():
+    rules = engine('sfg-esp')    # "credit_check_age <= 90 days"
+    assert rules.check('credit_check_age', {'credit_check_age': 30}) is not None
+    assert rules.check('credit_check_age', {'credit_check_age': 120}) is None
+
+
+@pytest.mark.parametrize('app', APPS)
+def test_missing_rule_falls_back_to_defaults(app):
+    rules = engine(app)    # none of them flag high-value enquiries
+    rule = rules.check('estimated_value', {'estimated_value': 75000, 'order_value': 75000})
+    assert rule is not None and rule.name == 'High-value enquiry flagging'
+    assert rules.check('estimated_value', {'estimated_value': 20000}) is None